@@ -4,6 +4,7 @@ Command-line interface for PDF-Extraction app.
 Usage:
     python -m app.cli batch-process [OPTIONS]
     python app/cli.py batch-process [OPTIONS]
+    python -m app.cli export-dataset --output DIR [OPTIONS]
 """
 
 import argparse
@@ -13,6 +14,8 @@ import sys
 
 from app.config import get_settings
 from app.services.batch_processor import process_directory
+from app.services.dataset_export import DEFAULT_BATCH_ROWS, export_dataset
+from app.services.scheduler import lane
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -58,6 +61,36 @@ def create_parser() -> argparse.ArgumentParser:
         help="Max concurrent Gemini API calls (default: from env or 3)"
     )
 
+    # Dataset export command
+    export_parser = subparsers.add_parser(
+        "export-dataset",
+        help="Export questions and memo answers as a partitioned Parquet dataset"
+    )
+    export_parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        required=True,
+        help="Dataset directory (one subdirectory per table)"
+    )
+    export_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Export everything instead of continuing from the previous run"
+    )
+    export_parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only export records updated at or after this ISO 8601 timestamp"
+    )
+    export_parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=DEFAULT_BATCH_ROWS,
+        help=f"Rows buffered per table before a Parquet write (default: {DEFAULT_BATCH_ROWS})"
+    )
+
     return parser
 
 
@@ -113,12 +146,13 @@ async def batch_process_command(args: argparse.Namespace) -> int:
 
     # Process directory
     try:
-        results = await process_directory(
-            directory=directory,
-            workers=workers,
-            api_limit=api_limit,
-            pattern=args.pattern
-        )
+        with lane("background"):
+            results = await process_directory(
+                directory=directory,
+                workers=workers,
+                api_limit=api_limit,
+                pattern=args.pattern
+            )
 
         # Return success if at least one file succeeded
         succeeded = sum(1 for r in results if r["status"] == "ok")
@@ -134,6 +168,45 @@ async def batch_process_command(args: argparse.Namespace) -> int:
         return 1
 
 
+async def export_dataset_command(args: argparse.Namespace) -> int:
+    """
+    Execute dataset export command.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        int: Exit code (0 for success, 1 for error)
+    """
+    # Imported here so batch-process works without Supabase settings
+    from app.db.supabase_client import get_supabase_client
+
+    if args.batch_rows < 1:
+        print("Error: --batch-rows must be at least 1")
+        return 1
+
+    since = None
+    if args.since:
+        since = {"question_paper": args.since, "memo": args.since}
+
+    try:
+        rows = await export_dataset(
+            get_supabase_client(),
+            args.output,
+            incremental=not args.full,
+            updated_since=since,
+            batch_rows=args.batch_rows
+        )
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    for table, count in rows.items():
+        print(f"  {table:<16} {count:>10,} rows")
+    print(f"Dataset written to {args.output}")
+    return 0
+
+
 def main() -> int:
     """Main CLI entry point."""
     parser = create_parser()
@@ -146,6 +219,8 @@ def main() -> int:
     # Route to command handler
     if args.command == "batch-process":
         return asyncio.run(batch_process_command(args))
+    elif args.command == "export-dataset":
+        return asyncio.run(export_dataset_command(args))
     else:
         print(f"Unknown command: {args.command}")
         return 1
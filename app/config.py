@@ -41,6 +41,34 @@ class Settings(BaseSettings):
         description="Gemini model to use for extraction"
     )
 
+    # Model cascade (app/services/model_cascade.py)
+    model_cascade_enabled: bool = Field(
+        default=False,
+        description="Extract simple documents with the fast model first, escalating on failure"
+    )
+    model_cascade_fast_model: str = Field(
+        default="gemini-2.5-flash-lite",
+        description="Gemini model of the cascade's fast tier"
+    )
+    model_cascade_min_quality: float = Field(
+        default=0.9,
+        ge=0.0,
+        le=1.0,
+        description="Minimum OpenDataLoader quality score for the fast tier"
+    )
+    model_cascade_max_markdown_chars: int = Field(
+        default=30_000,
+        ge=0,
+        le=10_000_000,
+        description="Longest document Markdown sent to the fast tier"
+    )
+    model_cascade_max_groups: int = Field(
+        default=6,
+        ge=0,
+        le=100,
+        description="Most QUESTION groups in a document sent to the fast tier"
+    )
+
     # CORS Configuration
     allowed_origins: str = Field(
         default="*",
@@ -60,6 +88,17 @@ class Settings(BaseSettings):
         description="Comma-separated list of trusted proxy IPs"
     )
 
+    rate_limit_storage_uri: str = Field(
+        default="memory://",
+        description="Rate limit counter storage: memory:// (per process), sqlite:///<path> (shared by workers on one host) or redis://host:port"
+    )
+    extract_cost_budget_per_minute: int = Field(
+        default=200,
+        ge=1,
+        le=1_000_000,
+        description="Cost units per client per minute for POST /api/extract (see app/services/extraction_cost.py)"
+    )
+
     # Feature Flags
     enable_hybrid_mode: bool = Field(
         default=True,
@@ -80,6 +119,292 @@ class Settings(BaseSettings):
         description="Max concurrent Gemini API calls (prevents rate limits)"
     )
 
+    # Write-behind buffer for batch extraction inserts
+    write_buffer_max_rows: int = Field(
+        default=25,
+        ge=1,
+        le=500,
+        description="Flush buffered extraction rows once this many are queued"
+    )
+    write_buffer_max_delay_seconds: float = Field(
+        default=2.0,
+        gt=0,
+        le=60,
+        description="Flush buffered extraction rows at most this long after the first is queued"
+    )
+
+    # In-process read cache for GET /api/extractions/{id} and /api/batch/{id}
+    read_cache_max_entries: int = Field(
+        default=1024,
+        ge=0,
+        le=100_000,
+        description="Maximum cached records (0 disables the read cache)"
+    )
+    read_cache_ttl_seconds: float = Field(
+        default=5.0,
+        ge=0,
+        le=300,
+        description="How long a cached record is served before re-reading (bounds staleness across workers)"
+    )
+
+    # In-process cache of completed duplicate lookups (file hash -> matches; records are in the read cache)
+    dedup_cache_max_entries: int = Field(
+        default=4096,
+        ge=0,
+        le=1_000_000,
+        description="Maximum cached file hashes with a completed extraction (0 disables the cache)"
+    )
+    dedup_cache_ttl_seconds: float = Field(
+        default=600.0,
+        ge=0,
+        le=86400,
+        description="How long a completed duplicate lookup is served from memory"
+    )
+
+    # Response compression (gzip, plus br/zstd when brotli/zstandard are installed)
+    compression_enabled: bool = Field(
+        default=True,
+        description="Compress responses for clients that send Accept-Encoding"
+    )
+    compression_minimum_size: int = Field(
+        default=1024,
+        ge=0,
+        le=10 * 1024 * 1024,
+        description="Responses smaller than this many bytes are sent uncompressed"
+    )
+
+    # Idempotency-Key support on POST /api/extract
+    idempotency_max_keys: int = Field(
+        default=10_000,
+        ge=1,
+        le=1_000_000,
+        description="Maximum remembered Idempotency-Key values (least recently used are forgotten)"
+    )
+    idempotency_key_ttl_seconds: float = Field(
+        default=86400.0,
+        gt=0,
+        le=7 * 86400,
+        description="How long an Idempotency-Key is remembered"
+    )
+
+    # Background dependency probing for /readyz and /health (app/services/health.py)
+    health_probe_interval_seconds: float = Field(
+        default=15.0,
+        gt=0,
+        le=3600,
+        description="How often dependencies are checked; results are cached in between"
+    )
+    health_probe_timeout_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        le=60,
+        description="Timeout of each dependency check (a slower dependency counts as unhealthy)"
+    )
+
+    # Admission control for POST /api/extract and /api/batch (app/services/admission.py)
+    admission_enabled: bool = Field(
+        default=True,
+        description="Reject new uploads with 503 + Retry-After while over any budget below"
+    )
+    admission_max_parses: int = Field(
+        default=4,
+        ge=1,
+        le=256,
+        description="In-flight OpenDataLoader parses at which new uploads are rejected"
+    )
+    admission_max_gemini_calls: int = Field(
+        default=16,
+        ge=1,
+        le=1024,
+        description="In-flight Gemini calls at which new uploads are rejected"
+    )
+    admission_max_spooled_mb: int = Field(
+        default=1024,
+        ge=1,
+        le=1024 * 1024,
+        description="Upload bytes held by admitted requests beyond which new uploads are rejected"
+    )
+    admission_max_loop_lag_ms: float = Field(
+        default=2000.0,
+        gt=0,
+        le=600_000,
+        description="Recent event-loop lag beyond which new uploads are rejected"
+    )
+    admission_retry_after_seconds: int = Field(
+        default=5,
+        ge=1,
+        le=3600,
+        description="Retry-After sent with a rejected upload"
+    )
+
+    # Per-request deadlines for /api/extract (app/utils/deadline.py)
+    request_deadline_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        le=3600,
+        description="Time an extraction may take before it is cancelled with 504"
+    )
+    request_deadline_max_seconds: float = Field(
+        default=900.0,
+        gt=0,
+        le=3600,
+        description="Upper bound for a client's X-Request-Timeout header"
+    )
+
+    # Retry budget and circuit breakers (app/utils/resilience.py)
+    retry_budget_ratio: float = Field(
+        default=0.2,
+        ge=0,
+        le=10,
+        description="Retries allowed per successful call within the retry budget window"
+    )
+    retry_budget_min_retries: int = Field(
+        default=10,
+        ge=0,
+        le=100_000,
+        description="Retries allowed per window regardless of successes (low-traffic floor)"
+    )
+    retry_budget_window_seconds: int = Field(
+        default=60,
+        ge=1,
+        le=3600,
+        description="Sliding window over which retries and successes are counted"
+    )
+    circuit_breaker_failure_threshold: int = Field(
+        default=5,
+        ge=1,
+        le=1000,
+        description="Consecutive dependency failures that open a circuit breaker"
+    )
+    circuit_breaker_reset_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        le=3600,
+        description="Time an open breaker fails fast before letting a probe call through"
+    )
+
+    # Priority lanes for the parse and LLM stages (app/services/scheduler.py)
+    scheduler_parse_slots: int = Field(
+        default=2,
+        ge=1,
+        le=256,
+        description="Concurrent OpenDataLoader parses shared between lanes"
+    )
+    scheduler_llm_slots: int = Field(
+        default=8,
+        ge=1,
+        le=1024,
+        description="Concurrent Gemini calls shared between lanes"
+    )
+    scheduler_weight_interactive: int = Field(
+        default=8,
+        ge=1,
+        le=1000,
+        description="Share of free slots for /api/extract requests"
+    )
+    scheduler_weight_batch: int = Field(
+        default=2,
+        ge=1,
+        le=1000,
+        description="Share of free slots for /api/batch files"
+    )
+    scheduler_weight_background: int = Field(
+        default=1,
+        ge=1,
+        le=1000,
+        description="Share of free slots for CLI runs and resumed checkpoints"
+    )
+    scheduler_max_wait_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        le=3600,
+        description="Queue wait after which a lane is served ahead of the weights (starvation bound)"
+    )
+
+    # Hedged Gemini calls (app/services/hedging.py)
+    gemini_hedging_enabled: bool = Field(
+        default=False,
+        description="Send a duplicate of Gemini extraction calls slower than the hedge percentile"
+    )
+    gemini_hedge_percentile: float = Field(
+        default=95.0,
+        ge=50,
+        le=99.9,
+        description="Latency percentile of a call's size bucket after which it is hedged"
+    )
+    gemini_hedge_min_samples: int = Field(
+        default=20,
+        ge=1,
+        le=200,
+        description="Calls observed in a size bucket before its calls are hedged"
+    )
+    gemini_hedge_budget_ratio: float = Field(
+        default=0.05,
+        ge=0,
+        le=1,
+        description="Hedges allowed per Gemini call within the last minute (caps the extra cost)"
+    )
+
+    # Graceful shutdown (app/services/drain.py)
+    shutdown_drain_seconds: float = Field(
+        default=25.0,
+        ge=0,
+        le=3600,
+        description="How long shutdown waits for in-flight extractions before checkpointing them"
+    )
+    checkpoint_dir: str = Field(
+        default="checkpoints",
+        description="Directory for work interrupted by shutdown, resumed on the next start"
+    )
+
+    # Webhook outbox delivery (app/services/webhook_outbox.py)
+    webhook_outbox_enabled: bool = Field(
+        default=True,
+        description="Run webhook delivery workers in this process"
+    )
+    webhook_workers: int = Field(
+        default=4,
+        ge=1,
+        le=64,
+        description="Concurrent webhook deliveries per process"
+    )
+    webhook_per_host_limit: int = Field(
+        default=2,
+        ge=1,
+        le=64,
+        description="Concurrent deliveries to any single webhook host"
+    )
+    webhook_max_attempts: int = Field(
+        default=8,
+        ge=1,
+        le=50,
+        description="Delivery attempts before a webhook event is dead-lettered"
+    )
+    webhook_retry_base_seconds: float = Field(
+        default=2.0,
+        gt=0,
+        le=3600,
+        description="Delay before the second attempt; doubles on each further attempt"
+    )
+    webhook_retry_max_seconds: float = Field(
+        default=900.0,
+        gt=0,
+        le=86400,
+        description="Longest delay between two attempts"
+    )
+    webhook_timeout_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        le=120,
+        description="Timeout of one webhook POST"
+    )
+    webhook_poll_interval_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        le=300,
+        description="How often idle workers check the outbox for due events"
+    )
+
     # Model configuration
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -4,10 +4,14 @@ This module provides CRUD operations for batch jobs in Supabase,
 including creation, status updates, and routing statistics tracking.
 """
 
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Optional, cast
 from uuid import UUID
 from supabase import Client
 
+from app.db import read_cache
+from app.db.pagination import paginate, validate_page
+
 
 async def create_batch_job(
     client: Client,
@@ -91,9 +95,13 @@ async def add_extraction_to_batch(
     status: str,
     cost_estimate_usd: float = 0.0,
     cost_savings_usd: float = 0.0
-) -> None:
+) -> Dict[str, Any]:
     """Add an extraction result to a batch job and update statistics.
 
+    Counters, routing stats, extraction IDs, cost totals and the derived batch
+    status are updated atomically by the ``add_extraction_to_batch`` Postgres
+    function, so concurrent calls for the same batch are safe.
+
     Args:
         client: Supabase client instance
         batch_job_id: UUID of the batch job
@@ -103,6 +111,10 @@ async def add_extraction_to_batch(
         cost_estimate_usd: Cost for this extraction
         cost_savings_usd: Cost savings for this extraction
 
+    Returns:
+        Dict[str, Any]: Updated counters (id, status, total_files,
+            completed_files, failed_files)
+
     Raises:
         ValueError: If UUIDs are invalid or status/method are invalid
         Exception: If database update fails
@@ -124,84 +136,89 @@ async def add_extraction_to_batch(
     if status not in valid_statuses:
         raise ValueError(f"Invalid status '{status}'. Must be one of: {', '.join(valid_statuses)}")
 
+    params = {
+        'p_batch_job_id': batch_job_id,
+        'p_extraction_id': extraction_id,
+        'p_processing_method': processing_method,
+        'p_status': status,
+        'p_cost_estimate_usd': cost_estimate_usd,
+        'p_cost_savings_usd': cost_savings_usd,
+    }
+
+    read_cache.invalidate('batch_jobs', batch_job_id)
     try:
-        # First, get current batch job state
-        batch_job = await get_batch_job(client, batch_job_id)
-        if not batch_job:
-            raise Exception(f"Batch job {batch_job_id} not found")
-
-        # Update counts
-        completed_files = batch_job['completed_files']
-        failed_files = batch_job['failed_files']
-        if status == 'completed' or status == 'partial':
-            completed_files += 1
-        else:
-            failed_files += 1
-
-        # Update routing stats
-        routing_stats = batch_job['routing_stats']
-        routing_stats['pending'] = max(0, routing_stats['pending'] - 1)
-        routing_stats[processing_method] = routing_stats.get(processing_method, 0) + 1
-
-        # Update extraction IDs
-        extraction_ids = batch_job['extraction_ids']
-        extraction_ids.append(extraction_id)
-
-        # Update cost tracking
-        current_cost = batch_job.get('cost_estimate_usd') or 0.0
-        current_savings = batch_job.get('cost_savings_usd') or 0.0
-        new_cost = current_cost + cost_estimate_usd
-        new_savings = current_savings + cost_savings_usd
-
-        # Determine batch status
-        total_files = batch_job['total_files']
-        if completed_files + failed_files == total_files:
-            if failed_files == 0:
-                batch_status = 'completed'
-            elif completed_files == 0:
-                batch_status = 'failed'
-            else:
-                batch_status = 'partial'
-        else:
-            batch_status = 'processing'
-
-        # Update batch job
-        update_data = {
-            'completed_files': completed_files,
-            'failed_files': failed_files,
-            'routing_stats': routing_stats,
-            'extraction_ids': extraction_ids,
-            'cost_estimate_usd': new_cost,
-            'cost_savings_usd': new_savings,
-            'status': batch_status
-        }
-
-        response = client.table('batch_jobs').update(update_data).eq('id', batch_job_id).execute()
-        if not response.data or len(response.data) == 0:
+        # Single atomic UPDATE in Postgres (migration 009): no select of the
+        # growing extraction_ids array and no lost updates under concurrency
+        response = await asyncio.to_thread(
+            lambda: client.rpc('add_extraction_to_batch', params).execute()
+        )
+        read_cache.invalidate('batch_jobs', batch_job_id)
+        rows = cast(List[Dict[str, Any]], response.data or [])
+        if not rows:
             raise Exception(f"No batch job found with id {batch_job_id}")
+        return rows[0]
     except Exception as e:
         raise Exception(f"Failed to update batch job: {str(e)}")
 
 
+async def update_batch_job_status(
+    client: Client,
+    batch_job_id: str,
+    status: str
+) -> None:
+    """Set a batch job's status (e.g. 'partial' when the batch times out).
+
+    Args:
+        client: Supabase client instance
+        batch_job_id: UUID of the batch job
+        status: New status
+
+    Raises:
+        ValueError: If batch_job_id is not a valid UUID or status is invalid
+        Exception: If database update fails
+    """
+    try:
+        UUID(batch_job_id)
+    except ValueError:
+        raise ValueError(f"Invalid UUID format: {batch_job_id}")
+
+    valid_statuses = ['pending', 'processing', 'completed', 'failed', 'partial']
+    if status not in valid_statuses:
+        raise ValueError(f"Invalid status '{status}'. Must be one of: {', '.join(valid_statuses)}")
+
+    read_cache.invalidate('batch_jobs', batch_job_id)
+    try:
+        await asyncio.to_thread(
+            lambda: client.table('batch_jobs').update({'status': status}).eq('id', batch_job_id).execute()
+        )
+        read_cache.invalidate('batch_jobs', batch_job_id)
+    except Exception as e:
+        raise Exception(f"Failed to update batch job status: {str(e)}")
+
+
 async def list_batch_jobs(
     client: Client,
     limit: int = 50,
     offset: int = 0,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """List batch jobs with pagination and optional filtering.
 
+    Jobs are ordered newest first by (created_at, id).
+
     Args:
         client: Supabase client instance
         limit: Maximum number of records to return (default: 50)
-        offset: Number of records to skip (default: 0)
+        offset: Number of records to skip (default: 0; not with cursor)
         status: Optional status filter
+        cursor: Optional keyset cursor of the previous page's last job
 
     Returns:
         List[Dict[str, Any]]: List of batch job records
 
     Raises:
-        ValueError: If status filter is invalid
+        ValueError: If status filter or cursor is invalid
         Exception: If database query fails
     """
     if status is not None:
@@ -209,13 +226,15 @@ async def list_batch_jobs(
         if status not in valid_statuses:
             raise ValueError(f"Invalid status filter '{status}'. Must be one of: {', '.join(valid_statuses)}")
 
+    validate_page(offset, cursor)
+
     try:
         query = client.table('batch_jobs').select('*')
 
         if status is not None:
             query = query.eq('status', status)
 
-        query = query.order('created_at', desc=True).range(offset, offset + limit - 1)
+        query = paginate(query, limit, offset=offset, cursor=cursor)
 
         response = query.execute()
         return response.data if response.data else []
@@ -0,0 +1,246 @@
+"""One-round-trip duplicate lookup by file hash, fronted by an in-process LRU.
+
+Before any work, an upload needs to know whether the same PDF was already
+extracted into either table and, if so, with which status and retry count.
+find_by_file_hash() (migration 012) answers that for extractions and
+memo_extractions in a single query, and returns the full record of a completed
+match so a duplicate upload needs no second read.
+
+Completed lookups are kept here (LRU-bounded, for dedup_cache_ttl_seconds) as
+their HashMatch tuples only; the completed record itself goes to the read cache
+(app/db/read_cache.py), which holds its serialized body, so re-uploads of a
+known file are answered without touching the database while the record is
+cached there, and the dedup cache stays a few hundred bytes per file hash
+however large the extractions are. Only completed matches are cached:
+pending/partial/failed rows are about to change and misses are not cached, so a
+file first uploaded through another worker is never hidden. Every update
+function in app/db drops the affected record via invalidate_record().
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from supabase import Client
+
+from app.config import get_settings
+from app.db.read_cache import CachedRecord, get_read_cache
+
+# Tables searched by find_by_file_hash(), in the order a completed match is preferred
+DEDUP_TABLES = ('extractions', 'memo_extractions')
+
+
+class HashMatch(NamedTuple):
+    """Best existing record for a file hash in one table."""
+
+    table: str
+    id: str
+    status: str
+    retry_count: int
+
+
+class DedupLookup:
+    """Result of a file-hash lookup across both extraction tables."""
+
+    __slots__ = ('matches', 'record', 'from_cache')
+
+    def __init__(
+        self,
+        matches: Tuple[HashMatch, ...] = (),
+        record: Optional[CachedRecord] = None,
+        from_cache: bool = False
+    ) -> None:
+        self.matches = matches
+        self.record = record
+        self.from_cache = from_cache
+
+    @property
+    def completed(self) -> Optional[HashMatch]:
+        """The completed match (question papers preferred), or None."""
+        for match in self.matches:
+            if match.status == 'completed':
+                return match
+        return None
+
+    def match(self, table: str) -> Optional[HashMatch]:
+        """The best match in `table`, or None."""
+        for match in self.matches:
+            if match.table == table:
+                return match
+        return None
+
+
+def _build_lookup(rows: Any) -> DedupLookup:
+    """Turn find_by_file_hash() rows into a DedupLookup."""
+    matches = sorted(
+        (
+            HashMatch(
+                table=row['source_table'],
+                id=str(row['id']),
+                status=row['status'],
+                retry_count=int(row.get('retry_count') or 0),
+            )
+            for row in rows or []
+        ),
+        key=lambda m: DEDUP_TABLES.index(m.table) if m.table in DEDUP_TABLES else len(DEDUP_TABLES),
+    )
+    lookup = DedupLookup(tuple(matches))
+    completed = lookup.completed
+    if completed is not None:
+        for row in rows:
+            if row['source_table'] == completed.table and row.get('record'):
+                lookup.record = CachedRecord(row['record'])
+    return lookup
+
+
+class DedupCache:
+    """Thread-safe TTL + LRU cache of completed lookups' matches keyed by file hash."""
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[HashMatch, ...]]]" = OrderedDict()
+        self._hash_by_record: Dict[Tuple[str, str], str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, file_hash: str) -> Optional[DedupLookup]:
+        """Return the live lookup for file_hash (matches only, no record), or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(file_hash)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._drop(file_hash)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(file_hash)
+            self.hits += 1
+            return DedupLookup(entry[1], from_cache=True)
+
+    def peek(self, file_hash: str) -> Optional[DedupLookup]:
+        """Like get, but a miss is not counted (the caller goes on to lookup_file_hash)."""
+        with self._lock:
+            if file_hash not in self._entries:
+                return None
+        return self.get(file_hash)
+
+    def put(self, file_hash: str, lookup: DedupLookup) -> None:
+        """Cache a lookup's matches if one is completed (anything else is not cached)."""
+        if lookup.completed is None:
+            return
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._drop(file_hash)
+            self._entries[file_hash] = (self._clock() + self.ttl_seconds, lookup.matches)
+            for match in lookup.matches:
+                self._hash_by_record[(match.table, match.id)] = file_hash
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_record(self, table: str, record_id: str) -> None:
+        """Drop the lookup that mentions (table, id) so the next upload re-queries."""
+        with self._lock:
+            file_hash = self._hash_by_record.get((table, str(record_id)))
+            if file_hash is not None and self._drop(file_hash):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hash_by_record.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, file_hash: str) -> bool:
+        entry = self._entries.pop(file_hash, None)
+        if entry is None:
+            return False
+        for match in entry[1]:
+            if self._hash_by_record.get((match.table, match.id)) == file_hash:
+                del self._hash_by_record[(match.table, match.id)]
+        return True
+
+
+_cache: Optional[DedupCache] = None
+_lock = threading.Lock()
+
+
+def get_dedup_cache() -> DedupCache:
+    """Return the process-wide dedup cache, sized from Settings on first use."""
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = DedupCache(
+                max_entries=settings.dedup_cache_max_entries,
+                ttl_seconds=settings.dedup_cache_ttl_seconds,
+            )
+        return _cache
+
+
+def invalidate_record(table: str, record_id: str) -> None:
+    """Invalidate a cached lookup after a write (no-op if the cache is unused)."""
+    if _cache is not None:
+        _cache.invalidate_record(table, record_id)
+
+
+async def lookup_file_hash(client: Client, file_hash: str) -> DedupLookup:
+    """Find existing extractions of a file in both tables with one query.
+
+    Args:
+        client: Supabase client instance
+        file_hash: SHA-256 hash of the file
+
+    Returns:
+        DedupLookup: Best match per table (status and retry_count) and, for a
+            completed match returned by the query, the full record (None when
+            answered from the dedup cache: the record is then in the read
+            cache or must be re-read)
+
+    Raises:
+        RuntimeError: If the database query fails
+    """
+    cache = get_dedup_cache()
+    cached = cache.get(file_hash)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await asyncio.to_thread(
+            lambda: client.rpc('find_by_file_hash', {'p_file_hash': file_hash}).execute()
+        )
+        lookup = _build_lookup(response.data)
+    except Exception as e:
+        raise RuntimeError(f"Failed to look up file hash: {str(e)}") from e
+
+    completed = lookup.completed
+    if completed is not None and lookup.record is not None:
+        lookup.record = get_read_cache().put(completed.table, completed.id, lookup.record.record)
+    cache.put(file_hash, lookup)
+    return lookup
+
@@ -0,0 +1,216 @@
+"""Streaming bulk export of extraction records.
+
+Exports walk a table oldest change first by (updated_at, id) with the keyset
+helpers of app.db.pagination, one page at a time, so memory stays constant
+no matter how many rows match and each page is a single index range scan
+(migration 013). Pages are produced lazily: the next page is only read once
+the caller has consumed the previous one, so a slow client slows the export
+down instead of rows piling up in memory.
+
+Incremental mode: pass the updated_at of the last row a previous export
+returned as updated_since and only rows changed at or after that instant are
+exported (rows sharing that exact timestamp are exported again, so consumers
+should upsert by id). To resume exactly where a previous export stopped, pass
+the cursor of its last row (encode_cursor(row, 'updated_at')) as `after`
+instead: only rows strictly after that (updated_at, id) are exported.
+created_since bounds the export by creation time instead (rows created at or
+after it), e.g. to export only papers added since a date.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence, Tuple
+
+from supabase import Client
+
+from app.db.extractions import EXTRACTION_SUMMARY_COLUMNS
+from app.db.pagination import apply_keyset, encode_cursor
+
+# Exportable document types and their tables
+EXPORT_TABLES: Dict[str, str] = {
+    'question_paper': 'extractions',
+    'memo': 'memo_extractions',
+}
+
+# Every column of each table in export (CSV header) order
+EXPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'question_paper': (
+        'id', 'file_name', 'file_size_bytes', 'file_hash', 'status', 'processing_method',
+        'quality_score', 'subject', 'syllabus', 'year', 'session', 'grade', 'language',
+        'total_marks', 'groups', 'tables', 'processing_metadata', 'error_message', 'retry_count',
+        'processing_time_seconds', 'cost_estimate_usd', 'created_at', 'updated_at',
+        'webhook_url', 'scraped_file_id',
+    ),
+    'memo': (
+        'id', 'file_name', 'file_size_bytes', 'file_hash', 'status', 'processing_method',
+        'quality_score', 'subject', 'year', 'session', 'grade', 'total_marks', 'sections',
+        'processing_metadata', 'error_message', 'retry_count', 'processing_time_seconds',
+        'cost_estimate_usd', 'created_at', 'updated_at', 'webhook_url', 'scraped_file_id',
+    ),
+}
+
+# Flat columns (no large JSONB payloads), the default CSV projection
+EXPORT_SUMMARY_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'question_paper': EXTRACTION_SUMMARY_COLUMNS,
+    'memo': tuple(
+        c for c in EXPORT_COLUMNS['memo'] if c not in ('sections', 'processing_metadata', 'webhook_url')
+    ),
+}
+
+# Rows read per round trip
+EXPORT_PAGE_SIZE = 500
+
+# Keyset sort column of exports
+EXPORT_KEY = 'updated_at'
+
+
+def resolve_export_columns(doc_type: str, fields: Optional[str], default_summary: bool) -> Tuple[str, ...]:
+    """Validate an export's document type and projection.
+
+    Args:
+        doc_type: 'question_paper' or 'memo'
+        fields: Comma-separated column list, '*' for every column, or None
+        default_summary: Without fields, export the summary columns instead of every column
+
+    Returns:
+        Tuple[str, ...]: Columns to export, in output order
+
+    Raises:
+        ValueError: If doc_type or a field is unknown
+    """
+    if doc_type not in EXPORT_TABLES:
+        raise ValueError(
+            f"Invalid doc_type '{doc_type}'. Must be one of: {', '.join(EXPORT_TABLES)}"
+        )
+    if fields is None:
+        return EXPORT_SUMMARY_COLUMNS[doc_type] if default_summary else EXPORT_COLUMNS[doc_type]
+    if fields.strip() == '*':
+        return EXPORT_COLUMNS[doc_type]
+
+    columns = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    if not columns:
+        raise ValueError("fields must list at least one field")
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS[doc_type]]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Must be one of: {', '.join(sorted(EXPORT_COLUMNS[doc_type]))}"
+        )
+    return columns
+
+
+def parse_updated_since(updated_since: Optional[str], name: str = 'updated_since') -> Optional[str]:
+    """Validate an updated_since (or since) timestamp (ISO 8601).
+
+    Args:
+        updated_since: Timestamp from the request, or None
+        name: Parameter name for the error message
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 date or timestamp
+    """
+    if updated_since is None:
+        return None
+    try:
+        return datetime.fromisoformat(updated_since.strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{updated_since}'. Must be an ISO 8601 timestamp")
+
+
+def _export_query(
+    client: Client,
+    doc_type: str,
+    columns: Sequence[str],
+    subject: Optional[str],
+    year: Optional[int],
+    language: Optional[str],
+    status: Optional[str],
+    updated_since: Optional[str],
+    created_since: Optional[str],
+) -> Any:
+    """Filtered select for one export page (keyset applied by the caller)."""
+    if language is not None and 'language' not in EXPORT_COLUMNS[doc_type]:
+        raise ValueError(f"language filter is not supported for doc_type '{doc_type}'")
+
+    # id and updated_at build the cursor of the next page
+    select = ','.join(dict.fromkeys(['id', *columns, EXPORT_KEY]))
+    query = client.table(EXPORT_TABLES[doc_type]).select(select)
+    if subject is not None:
+        query = query.eq('subject', subject)
+    if year is not None:
+        query = query.eq('year', year)
+    if language is not None:
+        query = query.eq('language', language)
+    if status is not None:
+        query = query.eq('status', status)
+    if updated_since is not None:
+        query = query.gte(EXPORT_KEY, updated_since)
+    if created_since is not None:
+        query = query.gte('created_at', created_since)
+    return query
+
+
+async def iter_export_pages(
+    client: Client,
+    doc_type: str = 'question_paper',
+    columns: Optional[Sequence[str]] = None,
+    subject: Optional[str] = None,
+    year: Optional[int] = None,
+    language: Optional[str] = None,
+    status: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+    after: Optional[str] = None,
+    created_since: Optional[str] = None,
+) -> AsyncGenerator[List[Dict[str, Any]], None]:
+    """Yield the matching rows of a table page by page, oldest change first.
+
+    Args:
+        client: Supabase client instance
+        doc_type: 'question_paper' (extractions) or 'memo' (memo_extractions)
+        columns: Columns to select (default: every column of the table)
+        subject: Optional exact subject filter
+        year: Optional exam year filter
+        language: Optional language filter (question papers only)
+        status: Optional status filter ('pending', 'completed', 'failed', 'partial')
+        updated_since: Optional ISO 8601 timestamp; only rows updated at or after it
+        page_size: Rows per database round trip
+        after: Optional cursor of the last row of a previous export; only rows
+            after it in (updated_at, id) order
+        created_since: Optional ISO 8601 timestamp; only rows created at or after it
+
+    Yields:
+        List[Dict[str, Any]]: Non-empty pages of rows ordered by (updated_at, id)
+
+    Raises:
+        ValueError: If doc_type, status, a filter or the `after` cursor is invalid
+        RuntimeError: If a database query fails
+    """
+    if doc_type not in EXPORT_TABLES:
+        raise ValueError(
+            f"Invalid doc_type '{doc_type}'. Must be one of: {', '.join(EXPORT_TABLES)}"
+        )
+    if status is not None and status not in ('pending', 'completed', 'failed', 'partial'):
+        raise ValueError(
+            f"Invalid status filter '{status}'. Must be one of: pending, completed, failed, partial"
+        )
+    columns = EXPORT_COLUMNS[doc_type] if columns is None else columns
+    cursor: Optional[str] = after
+
+    while True:
+        query = _export_query(
+            client, doc_type, columns, subject, year, language, status, updated_since, created_since
+        )
+        query = apply_keyset(query, page_size, cursor, key=EXPORT_KEY, descending=False)
+        try:
+            response = await asyncio.to_thread(lambda: query.execute())
+        except Exception as e:
+            raise RuntimeError(f"Failed to export {EXPORT_TABLES[doc_type]}: {str(e)}") from e
+
+        page = response.data or []
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        cursor = encode_cursor(page[-1], EXPORT_KEY)
@@ -5,23 +5,89 @@ including insertion, retrieval, deduplication, and status updates.
 """
 
 import asyncio
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Collection, Sequence, Tuple
 from uuid import UUID
 from supabase import Client
 
+from app.db import dedup, read_cache
+from app.db.pagination import paginate, validate_page
 from app.models.extraction import FullExamPaper
 
+# Columns of the extractions table (exam paper schema, migrations 001/005/008)
+EXTRACTION_COLUMNS = frozenset({
+    'id', 'file_name', 'file_size_bytes', 'file_hash', 'status', 'processing_method',
+    'quality_score', 'subject', 'syllabus', 'year', 'session', 'grade', 'language',
+    'total_marks', 'groups', 'tables', 'processing_metadata', 'error_message', 'retry_count',
+    'processing_time_seconds', 'cost_estimate_usd', 'created_at', 'updated_at',
+    'webhook_url', 'scraped_file_id',
+})
 
-async def create_extraction(
-    client: Client,
+# Academic-paper columns read by the bounding-box/element endpoints but dropped by
+# migration 005; projections skip them, so those keys are simply absent from rows
+LEGACY_EXTRACTION_COLUMNS = frozenset({'bounding_boxes', 'sections'})
+
+# Default projection for list views: row metadata without the large JSONB payloads
+# (groups, tables, processing_metadata), so list payloads don't grow with paper size
+EXTRACTION_SUMMARY_COLUMNS: Tuple[str, ...] = (
+    'id', 'file_name', 'file_size_bytes', 'file_hash', 'status', 'processing_method',
+    'quality_score', 'subject', 'syllabus', 'year', 'session', 'grade', 'language',
+    'total_marks', 'error_message', 'retry_count', 'processing_time_seconds',
+    'cost_estimate_usd', 'created_at', 'updated_at', 'scraped_file_id',
+)
+
+
+def parse_fields(fields: Optional[str], allowed: Collection[str] = EXTRACTION_COLUMNS) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields=`` query value into a column list.
+
+    Args:
+        fields: Comma-separated column names, '*' for all columns, or None
+        allowed: Column names that may be requested
+
+    Returns:
+        Optional[List[str]]: Requested columns in order (duplicates removed),
+            or None when all columns were requested ('*')
+
+    Raises:
+        ValueError: If no field or an unknown field is requested
+    """
+    if fields is None or fields.strip() == '*':
+        return None
+    columns = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    if not columns:
+        raise ValueError("fields must list at least one field")
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. Must be one of: {', '.join(sorted(allowed))}"
+        )
+    return columns
+
+
+def _select_clause(columns: Optional[Sequence[str]]) -> str:
+    """PostgREST select clause for a projection (None selects every column).
+
+    id is always included and legacy columns are skipped.
+
+    Raises:
+        ValueError: If a column is not an extractions column
+    """
+    if columns is None:
+        return '*'
+    unknown = [c for c in columns if c not in EXTRACTION_COLUMNS and c not in LEGACY_EXTRACTION_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown extraction column(s): {', '.join(unknown)}")
+    selected = [c for c in columns if c not in LEGACY_EXTRACTION_COLUMNS]
+    return ','.join(dict.fromkeys(['id', *selected]))
+
+
+def build_extraction_record(
     data: FullExamPaper,
     file_info: Dict[str, Any],
     status: str = 'completed'
-) -> str:
-    """Insert a new extraction result into the database.
+) -> Dict[str, Any]:
+    """Build the extractions table row for an extraction result.
 
     Args:
-        client: Supabase client instance
         data: Extraction result with all extracted data
         file_info: File metadata dictionary with keys:
             - file_name (str): Sanitized filename
@@ -33,11 +99,10 @@ async def create_extraction(
         status: Extraction status ('completed', 'partial', 'failed', 'pending')
 
     Returns:
-        str: UUID of created extraction record
+        Dict[str, Any]: Row ready for insertion into the extractions table
 
     Raises:
         ValueError: If required file_info fields are missing or status is invalid
-        Exception: If database insertion fails
     """
     # Validate required file_info fields
     required_fields = ['file_name', 'file_size_bytes', 'file_hash']
@@ -87,6 +152,52 @@ async def create_extraction(
     if file_info.get('scraped_file_id'):
         record['scraped_file_id'] = file_info['scraped_file_id']
 
+    return record
+
+
+async def create_extraction(
+    client: Client,
+    data: FullExamPaper,
+    file_info: Dict[str, Any],
+    status: str = 'completed'
+) -> str:
+    """Insert a new extraction result into the database.
+
+    The paper's questions are indexed into the questions table by the
+    trigger of migration 014 as part of the insert.
+
+    Args:
+        client: Supabase client instance
+        data: Extraction result with all extracted data
+        file_info: File metadata dictionary (see build_extraction_record)
+        status: Extraction status ('completed', 'partial', 'failed', 'pending')
+
+    Returns:
+        str: UUID of created extraction record (or of the existing
+            completed/pending record with the same file_hash)
+
+    Raises:
+        ValueError: If required file_info fields are missing or status is invalid
+        Exception: If database insertion fails
+    """
+    record = build_extraction_record(data, file_info, status)
+    return await insert_extraction_record(client, record)
+
+
+async def insert_extraction_record(client: Client, record: Dict[str, Any]) -> str:
+    """Insert a prebuilt extractions row, resolving unique file_hash conflicts.
+
+    Args:
+        client: Supabase client instance
+        record: Row built by build_extraction_record
+
+    Returns:
+        str: UUID of the inserted row, or of the existing completed/pending
+            row if the file_hash unique index rejected the insert
+
+    Raises:
+        RuntimeError: If database insertion fails
+    """
     try:
         response = await asyncio.to_thread(
             lambda: client.table('extractions').insert(record).execute()
@@ -96,14 +207,19 @@ async def create_extraction(
         return str(response.data[0]['id'])
     except Exception as e:
         # ON CONFLICT: unique partial index (file_hash WHERE status IN completed/pending)
-        err_msg = str(e).lower()
-        if "23505" in err_msg or "unique" in err_msg or "duplicate" in err_msg:
-            existing = await _get_id_by_file_hash(client, file_info['file_hash'])
+        if is_unique_violation(e):
+            existing = await _get_id_by_file_hash(client, record['file_hash'])
             if existing:
                 return existing
         raise RuntimeError(f"Failed to insert extraction: {str(e)}") from e
 
 
+def is_unique_violation(exc: Exception) -> bool:
+    """True if a database error is a unique-constraint violation (SQLSTATE 23505)."""
+    err_msg = str(exc).lower()
+    return "23505" in err_msg or "unique" in err_msg or "duplicate" in err_msg
+
+
 async def _get_id_by_file_hash(client: Client, file_hash: str) -> Optional[str]:
     """Return extraction id for file_hash where status in ('completed','pending'), or None."""
     try:
@@ -124,19 +240,22 @@ async def _get_id_by_file_hash(client: Client, file_hash: str) -> Optional[str]:
 
 async def get_extraction(
     client: Client,
-    extraction_id: str
+    extraction_id: str,
+    columns: Optional[Sequence[str]] = None
 ) -> Optional[Dict[str, Any]]:
     """Retrieve an extraction record by ID.
 
     Args:
         client: Supabase client instance
         extraction_id: UUID string of the extraction
+        columns: Optional projection (id is always included; legacy
+            columns are skipped). None selects every column.
 
     Returns:
         Optional[Dict[str, Any]]: Extraction record as dictionary, or None if not found
 
     Raises:
-        ValueError: If extraction_id is not a valid UUID
+        ValueError: If extraction_id is not a valid UUID or a column is unknown
         Exception: If database query fails
     """
     # Validate UUID format
@@ -145,9 +264,11 @@ async def get_extraction(
     except ValueError:
         raise ValueError(f"Invalid UUID format: {extraction_id}")
 
+    select = _select_clause(columns)
+
     try:
         response = await asyncio.to_thread(
-            lambda: client.table('extractions').select('*').eq('id', extraction_id).execute()
+            lambda: client.table('extractions').select(select).eq('id', extraction_id).execute()
         )
         if not response.data or len(response.data) == 0:
             return None
@@ -180,25 +301,6 @@ async def check_duplicate(
         raise RuntimeError(f"Failed to check duplicate: {str(e)}") from e
 
 
-async def check_duplicate_any(
-    client: Client,
-    file_hash: str
-) -> Optional[Tuple[str, str]]:
-    """Check both extractions and memo_extractions for an existing completed/pending record.
-
-    Returns:
-        ('extractions', id) or ('memo_extractions', id) if found, None otherwise.
-    """
-    from app.db import memo_extractions
-    ex_id = await check_duplicate(client, file_hash)
-    if ex_id:
-        return ("extractions", ex_id)
-    memo_id = await memo_extractions.check_memo_duplicate(client, file_hash)
-    if memo_id:
-        return ("memo_extractions", memo_id)
-    return None
-
-
 async def update_extraction_status(
     client: Client,
     extraction_id: str,
@@ -233,10 +335,13 @@ async def update_extraction_status(
     if error is not None:
         update_data['error_message'] = error
 
+    read_cache.invalidate('extractions', extraction_id)
     try:
         response = await asyncio.to_thread(
             lambda: client.table('extractions').update(update_data).eq('id', extraction_id).execute()
         )
+        read_cache.invalidate('extractions', extraction_id)
+        dedup.invalidate_record('extractions', extraction_id)
         if not response.data or len(response.data) == 0:
             raise RuntimeError(f"No extraction found with id {extraction_id}")
     except Exception as e:
@@ -247,21 +352,30 @@ async def list_extractions(
     client: Client,
     limit: int = 50,
     offset: int = 0,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    columns: Optional[Sequence[str]] = EXTRACTION_SUMMARY_COLUMNS,
+    cursor: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """List extraction records with pagination and optional filtering.
 
+    Records are ordered newest first by (created_at, id). Pass the cursor of
+    the previous page (see app.db.pagination.next_cursor) instead of an
+    offset to page without rescanning skipped rows.
+
     Args:
         client: Supabase client instance
         limit: Maximum number of records to return (default: 50)
-        offset: Number of records to skip (default: 0)
+        offset: Number of records to skip (default: 0; not with cursor)
         status: Optional status filter ('pending', 'completed', 'failed', 'partial')
+        columns: Projection (id and created_at are always included); defaults to
+            EXTRACTION_SUMMARY_COLUMNS, None selects every column
+        cursor: Optional keyset cursor of the previous page's last record
 
     Returns:
         List[Dict[str, Any]]: List of extraction records
 
     Raises:
-        ValueError: If status filter is invalid
+        ValueError: If status filter, a column or the cursor is invalid
         Exception: If database query fails
     """
     # Validate status filter if provided
@@ -270,15 +384,20 @@ async def list_extractions(
         if status not in valid_statuses:
             raise ValueError(f"Invalid status filter '{status}'. Must be one of: {', '.join(valid_statuses)}")
 
+    validate_page(offset, cursor)
+
+    # created_at is the keyset sort column, so it is needed to build the next cursor
+    select = _select_clause(None if columns is None else [*columns, 'created_at'])
+
     try:
-        query = client.table('extractions').select('*')
+        query = client.table('extractions').select(select)
 
         # Apply status filter if provided
         if status is not None:
             query = query.eq('status', status)
 
         # Apply pagination and ordering
-        query = query.order('created_at', desc=True).range(offset, offset + limit - 1)
+        query = paginate(query, limit, offset=offset, cursor=cursor)
 
         response = await asyncio.to_thread(lambda: query.execute())
         return response.data if response.data else []
@@ -296,6 +415,8 @@ async def update_extraction(
 ) -> None:
     """Update an existing extraction with new data (for retries).
 
+    The questions table rows of the paper are rebuilt by trigger (migration 014).
+
     Args:
         client: Supabase client instance
         extraction_id: UUID of the extraction to update
@@ -346,10 +467,13 @@ async def update_extraction(
         'retry_count': retry_count
     }
 
+    read_cache.invalidate('extractions', extraction_id)
     try:
         response = await asyncio.to_thread(
             lambda: client.table('extractions').update(update_data).eq('id', extraction_id).execute()
         )
+        read_cache.invalidate('extractions', extraction_id)
+        dedup.invalidate_record('extractions', extraction_id)
         if not response.data or len(response.data) == 0:
             raise RuntimeError(f"No extraction found with id {extraction_id}")
     except Exception as e:
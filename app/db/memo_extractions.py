@@ -11,19 +11,20 @@ from typing import Optional, List, Dict, Any
 from uuid import UUID
 from supabase import Client
 
+from app.db import dedup, read_cache
+from app.db.extractions import is_unique_violation
+from app.db.pagination import paginate, validate_page
 from app.models.memo_extraction import MarkingGuideline
 
 
-async def create_memo_extraction(
-    client: Client,
+def build_memo_extraction_record(
     data: MarkingGuideline,
     file_info: Dict[str, Any],
     status: str = 'completed'
-) -> str:
-    """Insert a new memo extraction result into the database.
+) -> Dict[str, Any]:
+    """Build the memo_extractions table row for a memo extraction result.
 
     Args:
-        client: Supabase client instance
         data: Memo extraction result with all extracted data
         file_info: File metadata dictionary with keys:
             - file_name (str): Sanitized filename
@@ -35,11 +36,10 @@ async def create_memo_extraction(
         status: Extraction status ('completed', 'partial', 'failed', 'pending')
 
     Returns:
-        str: UUID of created memo extraction record
+        Dict[str, Any]: Row ready for insertion into the memo_extractions table
 
     Raises:
         ValueError: If required file_info fields are missing or status is invalid
-        Exception: If database insertion fails
     """
     # Validate required file_info fields
     required_fields = ['file_name', 'file_size_bytes', 'file_hash']
@@ -95,6 +95,49 @@ async def create_memo_extraction(
     if file_info.get('scraped_file_id'):
         record['scraped_file_id'] = file_info['scraped_file_id']
 
+    return record
+
+
+async def create_memo_extraction(
+    client: Client,
+    data: MarkingGuideline,
+    file_info: Dict[str, Any],
+    status: str = 'completed'
+) -> str:
+    """Insert a new memo extraction result into the database.
+
+    Args:
+        client: Supabase client instance
+        data: Memo extraction result with all extracted data
+        file_info: File metadata dictionary (see build_memo_extraction_record)
+        status: Extraction status ('completed', 'partial', 'failed', 'pending')
+
+    Returns:
+        str: UUID of created memo extraction record (or of the existing
+            completed/pending record with the same file_hash)
+
+    Raises:
+        ValueError: If required file_info fields are missing or status is invalid
+        Exception: If database insertion fails
+    """
+    record = build_memo_extraction_record(data, file_info, status)
+    return await insert_memo_extraction_record(client, record)
+
+
+async def insert_memo_extraction_record(client: Client, record: Dict[str, Any]) -> str:
+    """Insert a prebuilt memo_extractions row, resolving unique file_hash conflicts.
+
+    Args:
+        client: Supabase client instance
+        record: Row built by build_memo_extraction_record
+
+    Returns:
+        str: UUID of the inserted row, or of the existing completed/pending
+            row if the file_hash unique index rejected the insert
+
+    Raises:
+        RuntimeError: If database insertion fails
+    """
     try:
         response = await asyncio.to_thread(
             lambda: client.table('memo_extractions').insert(record).execute()
@@ -103,9 +146,8 @@ async def create_memo_extraction(
             raise RuntimeError("Insert returned no data")
         return str(response.data[0]['id'])
     except Exception as e:
-        err_msg = str(e).lower()
-        if "23505" in err_msg or "unique" in err_msg or "duplicate" in err_msg:
-            existing = await _get_memo_id_by_file_hash(client, file_info['file_hash'])
+        if is_unique_violation(e):
+            existing = await _get_memo_id_by_file_hash(client, record['file_hash'])
             if existing:
                 return existing
         raise RuntimeError(f"Failed to insert memo extraction: {str(e)}") from e
@@ -221,10 +263,13 @@ async def update_memo_extraction_status(
     if error is not None:
         update_data['error_message'] = error
 
+    read_cache.invalidate('memo_extractions', extraction_id)
     try:
         response = await asyncio.to_thread(
             lambda: client.table('memo_extractions').update(update_data).eq('id', extraction_id).execute()
         )
+        read_cache.invalidate('memo_extractions', extraction_id)
+        dedup.invalidate_record('memo_extractions', extraction_id)
         if not response.data or len(response.data) == 0:
             raise RuntimeError(f"No memo extraction found with id {extraction_id}")
     except Exception as e:
@@ -235,21 +280,25 @@ async def list_memo_extractions(
     client: Client,
     limit: int = 50,
     offset: int = 0,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """List memo extraction records with pagination and optional filtering.
 
+    Records are ordered newest first by (created_at, id).
+
     Args:
         client: Supabase client instance
         limit: Maximum number of records to return (default: 50)
-        offset: Number of records to skip (default: 0)
+        offset: Number of records to skip (default: 0; not with cursor)
         status: Optional status filter ('pending', 'completed', 'failed', 'partial')
+        cursor: Optional keyset cursor of the previous page's last record
 
     Returns:
         List[Dict[str, Any]]: List of memo extraction records
 
     Raises:
-        ValueError: If status filter is invalid
+        ValueError: If status filter or cursor is invalid
         Exception: If database query fails
     """
     # Validate status filter if provided
@@ -258,6 +307,8 @@ async def list_memo_extractions(
         if status not in valid_statuses:
             raise ValueError(f"Invalid status filter '{status}'. Must be one of: {', '.join(valid_statuses)}")
 
+    validate_page(offset, cursor)
+
     try:
         query = client.table('memo_extractions').select('*')
 
@@ -266,7 +317,7 @@ async def list_memo_extractions(
             query = query.eq('status', status)
 
         # Apply pagination and ordering
-        query = query.order('created_at', desc=True).range(offset, offset + limit - 1)
+        query = paginate(query, limit, offset=offset, cursor=cursor)
 
         response = await asyncio.to_thread(lambda: query.execute())
         return response.data if response.data else []
@@ -341,10 +392,13 @@ async def update_memo_extraction(
         'cost_estimate_usd': cost_estimate
     }
 
+    read_cache.invalidate('memo_extractions', extraction_id)
     try:
         response = await asyncio.to_thread(
             lambda: client.table('memo_extractions').update(update_data).eq('id', extraction_id).execute()
         )
+        read_cache.invalidate('memo_extractions', extraction_id)
+        dedup.invalidate_record('memo_extractions', extraction_id)
         if not response.data or len(response.data) == 0:
             raise RuntimeError(f"No memo extraction found with id {extraction_id}")
     except Exception as e:
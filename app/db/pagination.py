@@ -0,0 +1,150 @@
+"""Keyset (cursor) pagination helpers for Supabase list queries.
+
+Offset pagination (`.range(offset, offset + limit - 1)`) makes Postgres walk and
+discard every skipped row, so deep pages get slower, and pages shift when new
+rows are inserted. Keyset pagination instead orders by a unique key
+(`<sort column> DESC, id DESC`) and asks for rows strictly after the last row
+of the previous page, which the composite indexes of migration 011 answer with
+a single index range scan regardless of depth.
+
+Cursors are opaque to clients: URL-safe base64 of the JSON pair
+`[sort value, id]` of the last row returned.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+def encode_cursor(row: Dict[str, Any], key: str = 'created_at') -> str:
+    """Build the opaque cursor pointing just past `row`.
+
+    Args:
+        row: Last record of a page (must contain `key` and 'id')
+        key: Sort column the listing is ordered by
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = json.dumps([row[key], str(row['id'])], default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        Tuple[str, str]: (sort value, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    if (
+        not isinstance(value, list) or len(value) != 2
+        or not all(isinstance(part, str) and part for part in value)
+    ):
+        raise ValueError("Invalid cursor")
+    return value[0], value[1]
+
+
+def _quote(value: str) -> str:
+    """Quote a value for a PostgREST logic-tree filter (timestamps contain ':' and '+')."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def apply_keyset(
+    query: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    key: str = 'created_at',
+    descending: bool = True
+) -> Any:
+    """Order a query newest first by (key, id) and fetch the page after `cursor`.
+
+    Args:
+        query: PostgREST select query builder
+        limit: Page size
+        cursor: Cursor of the previous page's last row, or None for the first page
+        key: Sort column (the listing's timestamp)
+        descending: Newest first (listings); False walks oldest first (exports)
+
+    Returns:
+        The query with keyset filter, ordering and limit applied
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor is not None:
+        after_value, after_id = decode_cursor(cursor)
+        value, row_id = _quote(after_value), _quote(after_id)
+        op = 'lt' if descending else 'gt'
+        query = query.or_(f"{key}.{op}.{value},and({key}.eq.{value},id.{op}.{row_id})")
+
+    return query.order(key, desc=descending).order('id', desc=descending).limit(limit)
+
+
+def validate_page(offset: int = 0, cursor: Optional[str] = None) -> None:
+    """Check pagination arguments before a query is built.
+
+    Raises:
+        ValueError: If both cursor and offset are given, or the cursor is malformed
+    """
+    if cursor is not None:
+        if offset:
+            raise ValueError("cursor and offset cannot be combined")
+        decode_cursor(cursor)
+
+
+def paginate(
+    query: Any,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    key: str = 'created_at'
+) -> Any:
+    """Apply cursor or (legacy) offset pagination to a listing query.
+
+    Both modes use the same (key DESC, id DESC) ordering, so the cursor of an
+    offset page's last row continues where that page ended.
+
+    Args:
+        query: PostgREST select query builder
+        limit: Page size
+        offset: Rows to skip (only without a cursor)
+        cursor: Cursor of the previous page's last row
+
+    Returns:
+        The paginated query
+
+    Raises:
+        ValueError: If both cursor and offset are given, or the cursor is malformed
+    """
+    validate_page(offset, cursor)
+    if cursor is not None or not offset:
+        return apply_keyset(query, limit, cursor, key)
+    return query.order(key, desc=True).order('id', desc=True).range(offset, offset + limit - 1)
+
+
+def next_cursor(rows: Sequence[Dict[str, Any]], limit: int, key: str = 'created_at') -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page.
+
+    A full page may still be the last one; the following request then simply
+    returns no rows.
+    """
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    if last.get(key) is None or last.get('id') is None:
+        return None
+    return encode_cursor(last, key)
+
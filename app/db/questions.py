@@ -0,0 +1,102 @@
+"""Database functions for searching the normalized questions table.
+
+The questions table (migration 014) holds one row per question of every
+completed or partial question paper. It is maintained by a trigger on
+extractions, so create_extraction, update_extraction and the batch write
+buffer keep it current in the same statement as their write; nothing here
+writes to it.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+from app.db.pagination import paginate
+
+# Columns returned by search_questions (search_vector is internal)
+QUESTION_COLUMNS = (
+    'id', 'extraction_id', 'group_id', 'group_index', 'question_index', 'question_id',
+    'parent_id', 'marks', 'text', 'is_mcq', 'has_match_data', 'has_guide_table',
+    'subject', 'year', 'session', 'grade', 'language', 'created_at',
+)
+
+# Question type filters of the search endpoint -> flag column
+QUESTION_TYPES = {
+    'mcq': 'is_mcq',
+    'match': 'has_match_data',
+    'guide_table': 'has_guide_table',
+}
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards in user input."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+async def search_questions(
+    client: Client,
+    q: Optional[str] = None,
+    subject: Optional[str] = None,
+    year: Optional[int] = None,
+    grade: Optional[str] = None,
+    language: Optional[str] = None,
+    question_type: Optional[str] = None,
+    extraction_id: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Search questions by text and paper metadata.
+
+    Matches are ordered newest first by (created_at, id) and paged with the
+    keyset cursor of app.db.pagination.
+
+    Args:
+        client: Supabase client instance
+        q: Optional full-text query in web search syntax (words, "phrases",
+            -excluded, OR)
+        subject: Optional subject prefix, case-insensitive ("Business Studies"
+            matches "Business Studies P1")
+        year: Optional exam year
+        grade: Optional grade
+        language: Optional paper language
+        question_type: Optional type filter ('mcq', 'match' or 'guide_table')
+        extraction_id: Optional paper to search within
+        limit: Maximum number of questions to return
+        cursor: Optional keyset cursor of the previous page's last question
+
+    Returns:
+        List[Dict[str, Any]]: Matching question rows
+
+    Raises:
+        ValueError: If question_type or the cursor is invalid
+        RuntimeError: If the database query fails
+    """
+    if question_type is not None and question_type not in QUESTION_TYPES:
+        raise ValueError(
+            f"Invalid question_type '{question_type}'. Must be one of: {', '.join(QUESTION_TYPES)}"
+        )
+
+    query = client.table('questions').select(','.join(QUESTION_COLUMNS))
+    if q:
+        # The tsvector is built with the 'simple' config, so the query must be too
+        query = query.filter('search_vector', 'wfts(simple)', q)
+    if subject:
+        query = query.ilike('subject', f"{_escape_like(subject)}%")
+    if year is not None:
+        query = query.eq('year', year)
+    if grade is not None:
+        query = query.eq('grade', grade)
+    if language is not None:
+        query = query.eq('language', language)
+    if question_type is not None:
+        query = query.eq(QUESTION_TYPES[question_type], True)
+    if extraction_id is not None:
+        query = query.eq('extraction_id', extraction_id)
+    query = paginate(query, limit, cursor=cursor)
+
+    try:
+        response = await asyncio.to_thread(lambda: query.execute())
+        return response.data if response.data else []
+    except Exception as e:
+        raise RuntimeError(f"Failed to search questions: {str(e)}") from e
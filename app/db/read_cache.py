@@ -0,0 +1,203 @@
+"""In-process read cache and ETags for single-record status endpoints.
+
+The review UI and batch pollers request GET /api/extractions/{id} and
+GET /api/batch/{id} over and over while nothing changes. Records fetched for
+those endpoints are kept here for a short TTL (LRU-bounded), together with a
+strong ETag and the serialized JSON body (plus its compressed forms, built on
+first use per content-coding), so a repeated poll costs neither a Supabase
+round trip nor a re-serialization or re-compression of the full record, and a
+poll carrying If-None-Match gets an empty 304.
+
+Every update function in app/db invalidates the affected key both before and
+after its write, so writes made by this process are visible immediately: the
+first drop keeps the old row from being served while the write is in flight,
+the second drops a copy re-read by a concurrent request during the write
+(creates need no invalidation: a row that did not exist was never cached,
+since misses are not cached). Writes made by other worker processes become
+visible once the entry expires (read_cache_ttl_seconds). Expired entries are
+purged by put() at most once per TTL, so they do not sit in memory until LRU
+eviction reaches them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.config import get_settings
+from app.utils.compression import compress, negotiate_encoding
+from app.utils.serialization import dumps_str
+
+
+def compute_etag(record: Dict[str, Any]) -> str:
+    """Strong ETag of a record, derived from its id, updated_at and status.
+
+    updated_at is maintained by a trigger on every UPDATE (migrations 001/003),
+    so any change to the stored row yields a new ETag.
+    """
+    version = f"{record.get('id')}|{record.get('updated_at')}|{record.get('status')}"
+    return '"' + hashlib.sha256(version.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+class CachedRecord:
+    """A cached row with its ETag and lazily serialized (and compressed) JSON body."""
+
+    __slots__ = ('record', 'etag', '_body', '_encoded')
+
+    def __init__(self, record: Dict[str, Any]) -> None:
+        self.record = record
+        self.etag = compute_etag(record)
+        self._body: Optional[str] = None
+        self._encoded: Dict[str, bytes] = {}
+
+    def body(self, render: Optional[Callable[[Dict[str, Any]], str]] = None) -> str:
+        """Response body for the record, rendered once per cache entry.
+
+        Args:
+            render: Record -> JSON string (default: serialization.dumps_str)
+        """
+        if self._body is None:
+            self._body = render(self.record) if render else dumps_str(self.record)
+        return self._body
+
+    def encoded(
+        self,
+        accept_encoding: Optional[str],
+        render: Optional[Callable[[Dict[str, Any]], str]] = None
+    ) -> Tuple[Union[str, bytes], Optional[str]]:
+        """Response body compressed for the client, compressed once per coding.
+
+        Args:
+            accept_encoding: Request Accept-Encoding header value
+            render: Record -> JSON string (see body)
+
+        Returns:
+            Tuple: (body, content-coding), with coding None when the body is
+                sent uncompressed (client accepts none, body below
+                compression_minimum_size, or compression disabled)
+        """
+        body = self.body(render)
+        settings = get_settings()
+        encoding = negotiate_encoding(accept_encoding) if settings.compression_enabled else None
+        if encoding is None or len(body) < settings.compression_minimum_size:
+            return body, None
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = compress(body.encode('utf-8'), encoding)
+        return data, encoding
+
+
+class ReadCache:
+    """Thread-safe TTL + LRU cache of records keyed by (table, id)."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, CachedRecord]]" = OrderedDict()
+        self._next_purge = clock() + ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, table: str, record_id: str) -> Optional[CachedRecord]:
+        """Return the live entry for (table, id), or None on a miss."""
+        key = (table, record_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, table: str, record_id: str, record: Dict[str, Any]) -> CachedRecord:
+        """Cache a freshly read record and return its entry."""
+        cached = CachedRecord(record)
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return cached
+        key = (table, record_id)
+        with self._lock:
+            now = self._clock()
+            if now >= self._next_purge:
+                self._purge_expired(now)
+            self._entries[key] = (now + self.ttl_seconds, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def _purge_expired(self, now: float) -> None:
+        # LRU order is not expiry order (hits move entries to the end): scan all
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        self._next_purge = now + self.ttl_seconds
+
+    def invalidate(self, table: str, record_id: str) -> None:
+        """Drop (table, id) so the next read goes to the database."""
+        with self._lock:
+            if self._entries.pop((table, str(record_id)), None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache: Optional[ReadCache] = None
+_lock = threading.Lock()
+
+
+def get_read_cache() -> ReadCache:
+    """Return the process-wide read cache, sized from Settings on first use."""
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = ReadCache(
+                max_entries=settings.read_cache_max_entries,
+                ttl_seconds=settings.read_cache_ttl_seconds,
+            )
+        return _cache
+
+
+def invalidate(table: str, record_id: str) -> None:
+    """Invalidate a cached record after a write (no-op if the cache is unused)."""
+    if _cache is not None:
+        _cache.invalidate(table, record_id)
@@ -9,6 +9,8 @@ from typing import Optional, List, Dict, Any
 from uuid import UUID
 from supabase import Client
 
+from app.db.pagination import paginate, validate_page
+
 
 async def add_to_review_queue(
     client: Client,
@@ -66,19 +68,24 @@ async def get_pending_reviews(
     client: Client,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """Retrieve pending review queue items (not yet resolved).
 
+    Items are ordered newest first by (queued_at, id); the cursor is keyed on
+    queued_at.
+
     Args:
         client: Supabase client instance
         limit: Maximum number of records to return (default: 50, max: 100)
-        offset: Number of records to skip for pagination (default: 0)
+        offset: Number of records to skip for pagination (default: 0; not with cursor)
+        cursor: Optional keyset cursor of the previous page's last item
 
     Returns:
         List[Dict]: List of pending review queue records with extraction data
 
     Raises:
-        ValueError: If limit or offset are invalid
+        ValueError: If limit, offset or cursor are invalid
         Exception: If database query fails
     """
     # Validate pagination parameters
@@ -86,10 +93,11 @@ async def get_pending_reviews(
         raise ValueError("Limit must be between 1 and 100")
     if offset < 0:
         raise ValueError("Offset must be non-negative")
+    validate_page(offset, cursor)
 
     try:
         # Query review_queue joined with extractions for file context
-        response = (
+        query = (
             client.table('review_queue')
             .select('''
                 id,
@@ -108,10 +116,8 @@ async def get_pending_reviews(
                 )
             ''')
             .is_('resolution', 'null')
-            .order('queued_at', desc=True)
-            .range(offset, offset + limit - 1)
-            .execute()
         )
+        response = paginate(query, limit, offset=offset, cursor=cursor, key='queued_at').execute()
 
         return response.data if response.data else []
     except Exception as e:
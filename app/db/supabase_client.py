@@ -2,16 +2,64 @@
 Supabase client initialization module.
 
 This module provides a thread-safe singleton Supabase client for database operations.
+Every HTTP request of the client passes through the "supabase" circuit breaker
+(app/utils/resilience.py), so DAO calls fail fast while Supabase is down.
 """
 
 import threading
-from supabase import create_client, Client
+
+import httpx
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+from supabase import ClientOptions, create_client, Client
+
 from app.config import get_settings
+from app.utils.resilience import CircuitBreaker, get_breaker
 
 _client: Client | None = None
 _lock = threading.Lock()
 
 
+class CircuitBreakerTransport(httpx.BaseTransport):
+    """httpx transport that reports each request's outcome to a circuit breaker.
+
+    Connection errors, timeouts and 5xx/429 responses are failures; any other
+    response is a success. While the breaker is open, requests raise
+    CircuitOpenError without touching the network.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, breaker: CircuitBreaker) -> None:
+        self._transport = transport
+        self._breaker = breaker
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._breaker.before_call()
+        try:
+            response = self._transport.handle_request(request)
+        except httpx.TransportError:
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            self._breaker.release()
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def _http_client() -> httpx.Client:
+    """HTTP client for Supabase (as postgrest builds its own, plus the breaker)."""
+    return httpx.Client(
+        transport=CircuitBreakerTransport(httpx.HTTPTransport(http2=True), get_breaker("supabase")),
+        timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+        follow_redirects=True,
+    )
+
+
 def get_supabase_client() -> Client:
     """
     Return the shared Supabase client (singleton), initializing once in a thread-safe way.
@@ -34,7 +82,7 @@ def get_supabase_client() -> Client:
         url = settings.supabase_url
         key = settings.supabase_key
         try:
-            _client = create_client(url, key)
+            _client = create_client(url, key, options=ClientOptions(httpx_client=_http_client()))
             return _client
         except Exception as e:
             raise ValueError(f"Failed to create Supabase client: {str(e)}") from e
@@ -0,0 +1,148 @@
+"""Database functions for the durable webhook outbox.
+
+Webhook events are inserted into the webhook_outbox table (migration 015) and
+delivered by the workers of app/services/webhook_outbox.py. A worker leases
+due rows with claim_webhook_deliveries() and records each attempt's outcome
+here: delivered, rescheduled for a later attempt, or dead after the last one.
+"""
+
+import asyncio
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, cast
+
+from supabase import Client
+
+# Longest last_error stored per row
+MAX_ERROR_LENGTH = 500
+
+
+async def enqueue_webhook_event(
+    client: Client,
+    event: str,
+    webhook_url: str,
+    payload: Dict[str, Any],
+    max_attempts: int
+) -> str:
+    """Insert a webhook event for delivery.
+
+    Args:
+        client: Supabase client instance
+        event: Event name (e.g. 'extraction.completed')
+        webhook_url: Target webhook URL
+        payload: JSON payload to POST
+        max_attempts: Delivery attempts before the event is dead-lettered
+
+    Returns:
+        str: UUID of the outbox row
+
+    Raises:
+        RuntimeError: If the insert fails
+    """
+    record: Dict[str, Any] = {
+        'event': event,
+        'webhook_url': webhook_url,
+        'payload': payload,
+        'max_attempts': max_attempts,
+    }
+    try:
+        response = await asyncio.to_thread(
+            lambda: client.table('webhook_outbox').insert(record).execute()
+        )
+        if not response.data:
+            raise RuntimeError("No data returned from insert")
+        rows = cast(List[Dict[str, Any]], response.data)
+        return str(rows[0]['id'])
+    except Exception as e:
+        raise RuntimeError(f"Failed to enqueue webhook event: {str(e)}") from e
+
+
+async def claim_webhook_deliveries(client: Client, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+    """Lease up to `limit` due webhook events.
+
+    Claimed rows move to 'delivering' with their attempt counter incremented.
+    A row whose lease expires without an outcome is claimed again.
+
+    Args:
+        client: Supabase client instance
+        limit: Maximum number of events to claim
+        lease_seconds: How long the claim is held
+
+    Returns:
+        List[Dict[str, Any]]: Claimed rows (id, event, webhook_url, payload,
+            attempts, max_attempts, created_at)
+
+    Raises:
+        RuntimeError: If the claim fails
+    """
+    params = {'p_limit': limit, 'p_lease_seconds': lease_seconds}
+    try:
+        response = await asyncio.to_thread(
+            lambda: client.rpc('claim_webhook_deliveries', params).execute()
+        )
+        return cast(List[Dict[str, Any]], response.data or [])
+    except Exception as e:
+        raise RuntimeError(f"Failed to claim webhook deliveries: {str(e)}") from e
+
+
+async def _update_delivery(client: Client, delivery_id: str, update_data: Dict[str, Any]) -> None:
+    try:
+        await asyncio.to_thread(
+            lambda: client.table('webhook_outbox').update(update_data).eq('id', delivery_id).execute()
+        )
+    except Exception as e:
+        raise RuntimeError(f"Failed to update webhook delivery {delivery_id}: {str(e)}") from e
+
+
+async def mark_webhook_delivered(client: Client, delivery_id: str, status_code: int) -> None:
+    """Record a successful delivery.
+
+    Raises:
+        RuntimeError: If the update fails
+    """
+    await _update_delivery(client, delivery_id, {
+        'status': 'delivered',
+        'delivered_at': datetime.now(UTC).isoformat(),
+        'locked_until': None,
+        'last_status_code': status_code,
+        'last_error': None,
+    })
+
+
+async def reschedule_webhook_delivery(
+    client: Client,
+    delivery_id: str,
+    next_attempt_at: datetime,
+    error: str,
+    status_code: Optional[int] = None
+) -> None:
+    """Record a failed attempt and schedule the next one.
+
+    Raises:
+        RuntimeError: If the update fails
+    """
+    await _update_delivery(client, delivery_id, {
+        'status': 'pending',
+        'next_attempt_at': next_attempt_at.isoformat(),
+        'locked_until': None,
+        'last_status_code': status_code,
+        'last_error': error[:MAX_ERROR_LENGTH],
+    })
+
+
+async def mark_webhook_dead(
+    client: Client,
+    delivery_id: str,
+    error: str,
+    status_code: Optional[int] = None
+) -> None:
+    """Record the final failed attempt; the event is not retried again.
+
+    Raises:
+        RuntimeError: If the update fails
+    """
+    await _update_delivery(client, delivery_id, {
+        'status': 'dead',
+        'locked_until': None,
+        'last_status_code': status_code,
+        'last_error': error[:MAX_ERROR_LENGTH],
+    })
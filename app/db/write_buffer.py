@@ -0,0 +1,226 @@
+"""Write-behind buffer for bulk insertion of extraction results.
+
+Batch processing produces one extractions/memo_extractions row per file.
+Instead of one HTTP round trip per row, completed rows are queued here and
+flushed with a single multi-row insert per table, either when enough rows are
+queued or when the oldest queued row has waited long enough.
+
+Callers receive an asyncio.Future that resolves to the row's UUID once it is
+flushed. If a multi-row insert is rejected by the unique file_hash index, the
+rows are re-inserted one by one through the same conflict path used by
+create_extraction, so a conflicting row resolves to the existing record's ID.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, cast
+
+from supabase import Client
+
+from app.db.extractions import insert_extraction_record, is_unique_violation
+from app.db.memo_extractions import insert_memo_extraction_record
+
+logger = logging.getLogger(__name__)
+
+# Per-row insert (with unique file_hash conflict handling) for each buffered table
+_SINGLE_ROW_INSERTS: Dict[str, Callable[[Client, Dict[str, Any]], Awaitable[str]]] = {
+    'extractions': insert_extraction_record,
+    'memo_extractions': insert_memo_extraction_record,
+}
+
+_PendingRow = Tuple[Dict[str, Any], "asyncio.Future[str]"]
+
+
+class WriteBufferMetrics:
+    """Process-wide flush statistics shared by all write buffers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.flushes = 0
+            self.rows_flushed = 0
+            self.conflict_fallbacks = 0
+            self.failed_flushes = 0
+            self.max_batch_size = 0
+            self.total_flush_latency_ms = 0.0
+            self.max_flush_latency_ms = 0.0
+            self.last_flush_latency_ms = 0.0
+            self.last_batch_size = 0
+
+    def record_flush(self, batch_size: int, latency_ms: float, conflict_fallback: bool, failed: bool) -> None:
+        with self._lock:
+            self.flushes += 1
+            self.rows_flushed += batch_size
+            self.conflict_fallbacks += int(conflict_fallback)
+            self.failed_flushes += int(failed)
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.total_flush_latency_ms += latency_ms
+            self.max_flush_latency_ms = max(self.max_flush_latency_ms, latency_ms)
+            self.last_flush_latency_ms = latency_ms
+            self.last_batch_size = batch_size
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            flushes = self.flushes
+            return {
+                "flushes": flushes,
+                "rows_flushed": self.rows_flushed,
+                "conflict_fallbacks": self.conflict_fallbacks,
+                "failed_flushes": self.failed_flushes,
+                "avg_batch_size": round(self.rows_flushed / flushes, 2) if flushes else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "last_batch_size": self.last_batch_size,
+                "avg_flush_latency_ms": round(self.total_flush_latency_ms / flushes, 2) if flushes else 0.0,
+                "max_flush_latency_ms": round(self.max_flush_latency_ms, 2),
+                "last_flush_latency_ms": round(self.last_flush_latency_ms, 2),
+            }
+
+
+_metrics = WriteBufferMetrics()
+
+
+def get_write_buffer_metrics() -> Dict[str, Any]:
+    """Return flush latency and batch-size statistics for this process."""
+    return _metrics.snapshot()
+
+
+class ExtractionWriteBuffer:
+    """Accumulates extraction rows and flushes them with multi-row inserts.
+
+    Usage:
+        buffer = ExtractionWriteBuffer(client)
+        future = await buffer.add('extractions', build_extraction_record(...))
+        ...
+        await buffer.close()           # flush anything still queued
+        extraction_id = await future
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        max_rows: Optional[int] = None,
+        max_delay_seconds: Optional[float] = None,
+    ) -> None:
+        if max_rows is None or max_delay_seconds is None:
+            from app.config import get_settings
+            settings = get_settings()
+            if max_rows is None:
+                max_rows = settings.write_buffer_max_rows
+            if max_delay_seconds is None:
+                max_delay_seconds = settings.write_buffer_max_delay_seconds
+
+        self._client = client
+        self._max_rows = max_rows
+        self._max_delay_seconds = max_delay_seconds
+        self._pending: Dict[str, List[_PendingRow]] = {}
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task[None]] = None
+        self._closed = False
+
+    @property
+    def pending_count(self) -> int:
+        """Number of rows queued but not yet flushed."""
+        return sum(len(rows) for rows in self._pending.values())
+
+    async def add(self, table: str, record: Dict[str, Any]) -> "asyncio.Future[str]":
+        """Queue a row for insertion.
+
+        Args:
+            table: 'extractions' or 'memo_extractions'
+            record: Row built by build_extraction_record / build_memo_extraction_record
+
+        Returns:
+            Future resolving to the row's UUID (or the existing row's UUID on
+            a file_hash conflict) once flushed
+
+        Raises:
+            ValueError: If the table is not buffered
+            RuntimeError: If the buffer has been closed
+        """
+        if table not in _SINGLE_ROW_INSERTS:
+            raise ValueError(f"Unsupported table '{table}'. Must be one of: {', '.join(_SINGLE_ROW_INSERTS)}")
+        if self._closed:
+            raise RuntimeError("Write buffer is closed")
+
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(table, []).append((record, future))
+
+        if self.pending_count >= self._max_rows:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_delay())
+        return future
+
+    async def flush(self) -> None:
+        """Insert every queued row now (one multi-row insert per table)."""
+        self._cancel_timer()
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            for table, rows in pending.items():
+                if rows:
+                    await self._flush_table(table, rows)
+
+    async def close(self) -> None:
+        """Flush remaining rows and reject further writes."""
+        self._closed = True
+        await self.flush()
+
+    async def _flush_after_delay(self) -> None:
+        await asyncio.sleep(self._max_delay_seconds)
+        self._timer = None
+        await self.flush()
+
+    def _cancel_timer(self) -> None:
+        timer = self._timer
+        self._timer = None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+    async def _flush_table(self, table: str, rows: List[_PendingRow]) -> None:
+        records = [record for record, _ in rows]
+        start = time.perf_counter()
+        conflict_fallback = False
+        failed = False
+
+        try:
+            response = await asyncio.to_thread(
+                lambda: self._client.table(table).insert(records).execute()
+            )
+            data = cast(List[Dict[str, Any]], response.data or [])
+            if len(data) != len(records):
+                raise RuntimeError(f"Bulk insert returned {len(data)} rows for {len(records)} records")
+            # PostgREST returns inserted rows in VALUES order
+            for (_, future), row in zip(rows, data):
+                if not future.done():
+                    future.set_result(str(row['id']))
+        except Exception as e:
+            if is_unique_violation(e):
+                # One or more rows hit the file_hash unique index; resolve them individually
+                conflict_fallback = True
+                logger.info("Bulk insert into %s hit a unique conflict; retrying %d rows individually", table, len(rows))
+                insert_one = _SINGLE_ROW_INSERTS[table]
+                for record, future in rows:
+                    try:
+                        row_id = await insert_one(self._client, record)
+                    except Exception as row_error:
+                        failed = True
+                        if not future.done():
+                            future.set_exception(row_error)
+                    else:
+                        if not future.done():
+                            future.set_result(row_id)
+            else:
+                failed = True
+                logger.warning("Bulk insert of %d rows into %s failed: %s", len(rows), table, e)
+                error = RuntimeError(f"Failed to insert {table} rows: {str(e)}")
+                for _, future in rows:
+                    if not future.done():
+                        future.set_exception(error)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            _metrics.record_flush(len(rows), latency_ms, conflict_fallback, failed)
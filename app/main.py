@@ -1,5 +1,7 @@
 """FastAPI application for PDF extraction service."""
 
+import asyncio
+import os
 import shutil
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -12,14 +14,22 @@ from slowapi.errors import RateLimitExceeded
 
 from app.config import get_settings
 from app.db.supabase_client import get_supabase_client
-from app.middleware.logging import RequestLoggingMiddleware
-from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.logging import RequestContextMiddleware
 from app.middleware.rate_limit import (
+    CostLimitExceeded,
     get_limiter,
     rate_limit_exceeded_handler,
-    RateLimitMiddleware,
+    rate_limit_headers,
 )
+from app.services.admission import get_admission_controller
+from app.services.drain import get_work_tracker, install_drain_signal_handlers, resume_checkpoints
 from app.services.gemini_client import get_gemini_client
+from app.services.health import HealthProber, is_healthy
+from app.services.webhook_outbox import resume_webhook, start_webhook_dispatcher, stop_webhook_dispatcher
+from app.utils.resilience import get_breaker_states
+from app.utils.serialization import dumps
 
 # Application metadata
 VERSION = "1.0.0"
@@ -44,10 +54,36 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         print(f"Startup validation failed: {e}")
         raise
 
+    # Probe dependencies in the background for /readyz and /health
+    await health_prober.start()
+
+    # Sample event-loop lag for admission control
+    await get_admission_controller().start()
+
+    # Deliver queued webhook events (including retries left by a previous run)
+    await start_webhook_dispatcher()
+
+    # Drain from the first SIGTERM/SIGINT, and resume work checkpointed by
+    # the previous shutdown
+    get_work_tracker().reset()
+    install_drain_signal_handlers(settings.shutdown_drain_seconds)
+    await resume_checkpoints({
+        "extract": extraction.resume_extraction,
+        "batch": batch.resume_batch,
+        "webhook": resume_webhook,
+    })
+
     yield
 
-    # Shutdown: cleanup if needed
+    # Shutdown: stop admitting work, let in-flight work finish (checkpointing
+    # what misses the deadline), then stop the webhook workers
     print("Shutting down PDF Extraction API")
+    drained = await get_work_tracker().drain(settings.shutdown_drain_seconds)
+    if drained["cancelled"]:
+        print(f"Checkpointed {drained['checkpointed']} of {drained['cancelled']} unfinished work item(s)")
+    await stop_webhook_dispatcher()
+    await health_prober.stop()
+    await get_admission_controller().stop()
 
 
 app = FastAPI(
@@ -65,17 +101,19 @@ app.state.limiter = limiter
 
 # Register custom rate limit exceeded handler
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)  # type: ignore[arg-type]
+app.add_exception_handler(CostLimitExceeded, rate_limit_exceeded_handler)  # type: ignore[arg-type]
+
+settings = get_settings()
 
-# Add request ID middleware (outermost so every request gets an ID)
-app.add_middleware(RequestIDMiddleware)
-# Add logging middleware (so it wraps all other middleware)
-app.add_middleware(RequestLoggingMiddleware)
+# Shed new uploads while this worker is over its load budgets (inside the
+# request context middleware, so rejections are logged with a request ID)
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, retry_after_seconds=settings.admission_retry_after_seconds)
 
-# Add rate limit middleware for adding X-RateLimit-Remaining header
-app.add_middleware(RateLimitMiddleware)
+# Add request ID, X-RateLimit-Remaining and structured request logging
+app.add_middleware(RequestContextMiddleware, rate_limit_headers=rate_limit_headers)
 
 # Add CORS middleware
-settings = get_settings()
 allowed_origins_list = (
     ["*"] if settings.allowed_origins == "*"
     else [origin.strip() for origin in settings.allowed_origins.split(",")]
@@ -89,81 +127,133 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Add response compression (outermost, so it sees the final headers and body)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+
+async def _check_disk() -> str:
+    """Free space on root (Unix) or the current drive (Windows)."""
+    disk_path = "/" if os.name != "nt" else os.path.abspath(".")
+    usage = await asyncio.to_thread(shutil.disk_usage, disk_path)
+    free_gb = usage.free / (1024**3)
+    total_gb = usage.total / (1024**3)
+    if free_gb < 1.0:
+        return f"degraded: {free_gb:.2f}GB free of {total_gb:.2f}GB"
+    return f"healthy: {free_gb:.2f}GB free of {total_gb:.2f}GB"
+
+
+async def _check_opendataloader() -> str:
+    from opendataloader_pdf import convert  # noqa: F401
+    return "healthy"
+
+
+async def _check_gemini() -> str:
+    client = get_gemini_client()
+    return "healthy" if client else "unhealthy: client is None"
+
+
+async def _check_supabase() -> str:
+    supabase_client = get_supabase_client()
+    # Test database connection with a simple query
+    response = await asyncio.to_thread(
+        lambda: supabase_client.table("extractions").select("id").limit(1).execute()
+    )
+    return "healthy" if response is not None else "unhealthy: no response"
+
+
+# Dependency checks run in the background; /readyz and /health read the results
+health_prober = HealthProber(
+    {
+        "disk": _check_disk,
+        "opendataloader": _check_opendataloader,
+        "gemini_api": _check_gemini,
+        "supabase": _check_supabase,
+    },
+    interval_seconds=settings.health_probe_interval_seconds,
+    timeout_seconds=settings.health_probe_timeout_seconds,
+)
+
+
+@app.get("/livez")
+async def liveness() -> Dict[str, str]:
+    """
+    Liveness probe: the process is up and serving requests.
+
+    Checks no dependencies, so a slow database never gets the process
+    restarted.
+
+    Returns:
+        200: {"status": "alive"}
+    """
+    return {"status": "alive"}
+
+
+@app.get("/readyz", response_model=None)
+async def readiness() -> Response:
+    """
+    Readiness probe from the cached dependency checks.
+
+    Not ready while a dependency check fails or while the server is
+    draining for shutdown, so the load balancer stops routing to it.
+
+    Status Codes:
+        200: Ready
+        503: A dependency is unhealthy or the server is shutting down
+    """
+    report = await health_prober.report()
+    failing = {
+        name: check["status"] for name, check in report["checks"].items() if not is_healthy(check["status"])
+    }
+    draining = get_work_tracker().draining
+    ready = not failing and not draining
+    return Response(
+        content=dumps({
+            "status": "ready" if ready else "not_ready",
+            "checked_at": report["checked_at"],
+            "draining": draining,
+            "failing": failing,
+        }),
+        status_code=200 if ready else 503,
+        media_type="application/json",
+    )
+
 
 @app.get("/health", response_model=None)
 async def health_check() -> Union[Dict[str, Any], Response]:
     """
-    Health check endpoint that verifies all required services are operational.
+    Detailed health view of all required services.
+
+    Reads the background prober's cached results (refreshed every
+    HEALTH_PROBE_INTERVAL_SECONDS), so a probe costs no dependency calls.
+    Circuit breaker states are reported alongside; an open breaker does not
+    change the status (the dependency, not this instance, is failing).
 
     Returns:
-        JSON response with overall status and individual service statuses.
+        JSON response with overall status, individual service statuses,
+        when they were checked, how long each check took and the state of
+        each dependency's circuit breaker.
 
     Status Codes:
         200: All services healthy
         503: One or more services unavailable
     """
-    timestamp = datetime.utcnow().isoformat()
-    services: Dict[str, str] = {}
-    overall_healthy = True
-
-    # Check disk space (root on Unix, current drive on Windows)
-    import os
-    _disk_path = "/" if os.name != "nt" else os.path.abspath(".")
-    try:
-        usage = shutil.disk_usage(_disk_path)
-        free_gb = usage.free / (1024**3)
-        total_gb = usage.total / (1024**3)
-        if free_gb < 1.0:
-            services["disk"] = f"degraded: {free_gb:.2f}GB free of {total_gb:.2f}GB"
-            overall_healthy = False
-        else:
-            services["disk"] = f"healthy: {free_gb:.2f}GB free of {total_gb:.2f}GB"
-    except OSError as e:
-        services["disk"] = f"unhealthy: {e}"
-        overall_healthy = False
-
-    # Check OpenDataLoader
-    try:
-        from opendataloader_pdf import convert  # noqa: F401
-        services["opendataloader"] = "healthy"
-    except Exception as e:
-        services["opendataloader"] = f"unhealthy: {str(e)}"
-        overall_healthy = False
-
-    # Check Gemini API client
-    try:
-        client = get_gemini_client()
-        if client:
-            services["gemini_api"] = "healthy"
-        else:
-            services["gemini_api"] = "unhealthy: client is None"
-            overall_healthy = False
-    except Exception as e:
-        services["gemini_api"] = f"unhealthy: {str(e)}"
-        overall_healthy = False
-
-    # Check Supabase connection
-    try:
-        supabase_client = get_supabase_client()
-        # Test database connection with a simple query
-        response = supabase_client.table("extractions").select("id").limit(1).execute()
-        if response is not None:
-            services["supabase"] = "healthy"
-        else:
-            services["supabase"] = "unhealthy: no response"
-            overall_healthy = False
-    except Exception as e:
-        services["supabase"] = f"unhealthy: {str(e)}"
-        overall_healthy = False
+    report = await health_prober.report()
+    services = {name: check["status"] for name, check in report["checks"].items()}
+    overall_healthy = all(is_healthy(service_status) for service_status in services.values())
 
     response_data: Dict[str, Any] = {
         "status": "healthy" if overall_healthy else "unhealthy",
-        "timestamp": timestamp,
+        "timestamp": datetime.utcnow().isoformat(),
+        "checked_at": report["checked_at"],
+        "age_seconds": report["age_seconds"],
         "services": services,
+        "latency_ms": {name: check["latency_ms"] for name, check in report["checks"].items()},
+        "circuit_breakers": get_breaker_states(),
     }
 
     # Build X-Health-Detail header with degraded/unhealthy components
-    degraded = [k for k, v in services.items() if v != "healthy" and not v.startswith("healthy:")]
+    degraded = [k for k, v in services.items() if not is_healthy(v)]
     health_detail = "; ".join(f"{k}={v}" for k, v in services.items() if k in degraded) if degraded else ""
 
     # FastAPI doesn't allow setting status_code in the return directly,
@@ -209,3 +299,7 @@ app.include_router(batch.router)
 # Include statistics router
 from app.routers import stats
 app.include_router(stats.router)
+
+# Include question search router
+from app.routers import questions
+app.include_router(questions.router)
@@ -0,0 +1,65 @@
+"""Admission control middleware (load shedding) for upload endpoints.
+
+Runs before the request body is read, so a rejected upload is never spooled
+or parsed. Admitted uploads count their Content-Length as spooled bytes until
+the response completes. See app/services/admission.py for the signals.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.admission import AdmissionController, get_admission_controller
+from app.utils.serialization import dumps
+
+# (method, path) pairs subject to admission control
+ADMITTED_ROUTES: Tuple[Tuple[str, str], ...] = (("POST", "/api/extract"), ("POST", "/api/batch"))
+
+
+class AdmissionMiddleware:
+    """503 + Retry-After for new uploads while the worker is over budget."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        retry_after_seconds: int = 5,
+        routes: Sequence[Tuple[str, str]] = ADMITTED_ROUTES,
+        controller: Optional[AdmissionController] = None,
+    ) -> None:
+        self.app = app
+        self.retry_after_seconds = retry_after_seconds
+        self.routes = frozenset(routes)
+        self._controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (scope["method"], scope["path"].rstrip("/")) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        controller = self._controller or get_admission_controller()
+        try:
+            incoming_bytes = int(Headers(scope=scope).get("content-length") or 0)
+        except ValueError:
+            incoming_bytes = 0
+
+        reason = controller.check(incoming_bytes)
+        if reason is not None:
+            body = dumps({
+                "detail": f"Server is at capacity ({reason}); retry shortly",
+                "retry_after": self.retry_after_seconds,
+            })
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after_seconds).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        with controller.spool(incoming_bytes):
+            await self.app(scope, receive, send)
@@ -0,0 +1,114 @@
+"""Response compression middleware.
+
+Compresses JSON/text responses with the content-coding negotiated from the
+request's Accept-Encoding (zstd, br or gzip; see app/utils/compression.py).
+
+Implemented as a plain ASGI middleware so bodies are compressed as they are
+sent: the first bytes are held back only until the size threshold is known to
+be exceeded, after which every body chunk is compressed and flushed
+immediately, so streamed responses (NDJSON/CSV exports) stay incremental.
+
+Responses are passed through untouched when they are below
+compression_minimum_size, already carry a Content-Encoding (e.g. records
+served pre-compressed from the read cache), are not a compressible media type,
+or have no body (204/304).
+"""
+
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.compression import ENCODERS, Encoder, is_compressible, mark_encoded, negotiate_encoding
+
+
+class CompressionMiddleware:
+    """Negotiated, streaming gzip/brotli/zstd compression of response bodies."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    """ASGI send wrapper that decides per response whether and how to compress."""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self.encoder: Optional[Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+                or message["status"] in (204, 304)
+                or message["status"] < 200
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.encoder is not None:
+            data = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+            if data or not more_body:
+                await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        # Hold the first chunks back until the threshold decision can be made
+        self.pending.append(body)
+        self.pending_size += len(body)
+        if more_body and self.pending_size < self.minimum_size:
+            return
+
+        assert self.start_message is not None
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        buffered = b"".join(self.pending)
+        self.pending = []
+
+        if not more_body and self.pending_size < self.minimum_size:
+            # Small complete body: send as-is (the response may still vary)
+            mark_encoded(headers, None)
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": buffered, "more_body": False})
+            return
+
+        self.encoder = ENCODERS[self.encoding]()
+        mark_encoded(headers, self.encoding)
+        if more_body:
+            del headers["content-length"]
+            data = self.encoder.chunk(buffered)
+        else:
+            data = self.encoder.finish(buffered)
+            headers["Content-Length"] = str(len(data))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
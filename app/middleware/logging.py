@@ -1,15 +1,23 @@
-"""Logging middleware for request tracking and structured logging."""
+"""Request context middleware: request IDs, rate limit headers and structured logging.
+
+A single plain ASGI middleware replaces the three BaseHTTPMiddleware layers
+(request ID, request logging, X-RateLimit-Remaining) the app used to stack.
+Each of those ran the rest of the app in a separate task and re-wrapped the
+response body stream; this one only wraps ``send`` to edit the start message
+and log once the response completes, so streamed bodies pass straight through.
+"""
 
-import json
 import logging
 import sys
 import time
 import uuid
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from app.utils.serialization import dumps_str
 
 # Configure structured logging
 logging.basicConfig(
@@ -21,89 +29,96 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestContextMiddleware:
     """
-    Middleware that logs request/response information in structured JSON format.
+    Middleware that assigns a request ID and logs each request as one JSON line.
 
-    Logs include:
-    - Request ID (UUID)
-    - HTTP method and path
-    - Status code
-    - Processing time
-    - Client IP
-    - Routing decisions (processing_method, quality_score)
+    Per request it:
+    - Sets request.state.request_id (the client's X-Request-ID, or a new UUID)
+    - Returns it in the X-Request-ID response header
+    - Adds X-RateLimit-Limit/Remaining from rate_limit_headers(request.state),
+      if given (app/middleware/rate_limit.py)
+    - Logs method, path, status code, processing time, client IP and the
+      routing headers (processing_method, doc_type, quality_score)
 
     Security notes:
     - Does NOT log API keys, file contents, or sensitive user data
     - Does NOT log request/response bodies
     """
 
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-        """Process request and log structured information."""
-        # Use request ID from RequestIDMiddleware if present, otherwise generate
-        request_id = getattr(request.state, "request_id", None) or str(uuid.uuid4())
-        request.state.request_id = request_id
-
-        # Record start time
-        start_time = time.time()
-
-        # Extract basic request info (before processing)
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limit_headers: Optional[Callable[[Dict[str, Any]], Awaitable[Dict[str, str]]]] = None,
+    ) -> None:
+        self.app = app
+        self.rate_limit_headers = rate_limit_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
+        state: Dict[str, Any] = scope.setdefault("state", {})
+        state["request_id"] = request_id
+
+        start_time = time.perf_counter()
+        client = scope.get("client")
         log_data: Dict[str, Any] = {
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "request_id": request_id,
-            "method": request.method,
-            "path": request.url.path,
-            "user_ip": request.client.host if request.client else "unknown",
+            "method": scope["method"],
+            "path": scope["path"],
+            "user_ip": client[0] if client else "unknown",
         }
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                _add_routing_fields(log_data, headers)
+                headers["X-Request-ID"] = request_id
+                if self.rate_limit_headers is not None:
+                    for name, value in (await self.rate_limit_headers(state)).items():
+                        headers[name] = value
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                log_data["status_code"] = status_code
+                log_data["processing_time_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+                logger.info(dumps_str(log_data))
+            await send(message)
 
-        # Process the request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Log error with full stack trace and contextual message
-            processing_time_ms = (time.time() - start_time) * 1000
             error_log = {
                 **log_data,
-                "status_code": 500,
-                "processing_time_ms": round(processing_time_ms, 2),
+                "status_code": status_code or 500,
+                "processing_time_ms": round((time.perf_counter() - start_time) * 1000, 2),
                 "error": str(e),
                 "error_type": type(e).__name__,
-                "message": f"Request failed: {request.method} {request.url.path}",
+                "message": f"Request failed: {scope['method']} {scope['path']}",
             }
-            logger.error(json.dumps(error_log), exc_info=True)
+            logger.error(dumps_str(error_log), exc_info=True)
             raise
 
-        # Calculate processing time
-        processing_time_ms = (time.time() - start_time) * 1000
-
-        # Add response information
-        log_data.update({
-            "status_code": response.status_code,
-            "processing_time_ms": round(processing_time_ms, 2),
-        })
 
-        # Extract routing/context from response headers (if present)
-        if "X-Processing-Method" in response.headers:
-            log_data["processing_method"] = response.headers["X-Processing-Method"]
-        if "X-Doc-Type" in response.headers:
-            log_data["doc_type"] = response.headers["X-Doc-Type"]
-
-        if "X-Quality-Score" in response.headers:
-            try:
-                log_data["quality_score"] = float(response.headers["X-Quality-Score"])
-            except (ValueError, TypeError):
-                pass  # Ignore invalid quality scores
-
-        # Log the request (as JSON)
-        logger.info(json.dumps(log_data))
-
-        # Add request ID to response headers for client reference
-        response.headers["X-Request-ID"] = request_id
-
-        return response
+def _add_routing_fields(log_data: Dict[str, Any], headers: MutableHeaders) -> None:
+    """Copy routing/context response headers (if present) into the log line."""
+    if "X-Processing-Method" in headers:
+        log_data["processing_method"] = headers["X-Processing-Method"]
+    if "X-Doc-Type" in headers:
+        log_data["doc_type"] = headers["X-Doc-Type"]
+    if "X-Cancel-Reason" in headers:
+        log_data["cancel_reason"] = headers["X-Cancel-Reason"]
+    if "X-Quality-Score" in headers:
+        try:
+            log_data["quality_score"] = float(headers["X-Quality-Score"])
+        except (ValueError, TypeError):
+            pass  # Ignore invalid quality scores
 
 
 def get_request_id(request: Request) -> str:
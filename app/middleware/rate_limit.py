@@ -1,19 +1,34 @@
 """Rate limiting middleware using slowapi for abuse prevention.
 
-Limitation: Uses in-memory storage by default. Counts are per-process and do not
-persist across restarts or scale to multiple instances.
-TODO: For production with multiple workers/instances, use a Redis backend
-(e.g. slowapi with storage_uri="redis://...") so rate limits are shared.
+Counters live in the storage named by rate_limit_storage_uri: ``memory://``
+(per-process, the default), ``sqlite:///path.db`` (shared by all workers on
+one host; see app/middleware/rate_limit_storage.py) or ``redis://host:port``
+(shared across hosts).
+
+Routes carry flat request-count limits (slowapi decorators). POST
+/api/extract is additionally charged cost units per upload (file size, page
+count and predicted route; see app/services/extraction_cost.py) against a
+per-client budget of extract_cost_budget_per_minute units, so one large
+scanned paper uses up more of a client's allowance than a short memo.
+
+Storage calls made outside slowapi's decorators (cost charges and the
+X-RateLimit headers) run in a worker thread: with ``sqlite://`` or
+``redis://`` they are blocking I/O.
 """
 
-from typing import Any, Callable
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from fastapi import Request, Response
+from fastapi import HTTPException, Request, Response
+from limits import RateLimitItem, RateLimitItemPerMinute
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+
+from app.config import get_settings
+from app.middleware import rate_limit_storage  # noqa: F401  (registers the sqlite:// scheme)
 
 
 def get_client_ip(request: Request) -> str:
@@ -29,8 +44,6 @@ def get_client_ip(request: Request) -> str:
     Returns:
         Client IP address string
     """
-    from app.config import get_settings
-
     direct_ip: str = get_remote_address(request)
 
     # Check trusted proxies
@@ -53,10 +66,13 @@ def get_client_ip(request: Request) -> str:
     return direct_ip
 
 
-# Create the limiter with in-memory storage (MVP).
+# Create the limiter on the configured storage (see module docstring).
 # Uses client IP as the key for rate limiting.
-# TODO: Production: use Redis backend for shared limits across instances.
-limiter = Limiter(key_func=get_client_ip, default_limits=["200/minute"])
+limiter = Limiter(
+    key_func=get_client_ip,
+    default_limits=["200/minute"],
+    storage_uri=get_settings().rate_limit_storage_uri,
+)
 
 
 # Rate limit configurations for specific endpoints
@@ -67,6 +83,96 @@ RATE_LIMITS = {
 }
 
 
+class CostLimitExceeded(HTTPException):
+    """429 for an upload whose cost units exceed the client's remaining budget."""
+
+    def __init__(self, limit: str, retry_after: int) -> None:
+        super().__init__(status_code=429, detail=limit)
+        self.retry_after = retry_after
+
+
+def _charge(item: RateLimitItem, key: str, scope: str, units: int) -> Tuple[bool, int, float]:
+    """Charge units with one atomic increment, undone if it went over (blocking storage I/O).
+
+    Returns:
+        (allowed, remaining, reset_time)
+    """
+    strategy = limiter.limiter
+    allowed = strategy.hit(item, key, scope, cost=units)
+    if not allowed:
+        # The increment already landed; take it back so a rejected request uses no budget
+        strategy.storage.incr(item.key_for(key, scope), item.get_expiry(), amount=-units)
+    stats = strategy.get_window_stats(item, key, scope)
+    return allowed, int(stats.remaining), stats.reset_time
+
+
+async def charge_cost(request: Request, units: int, scope: str = "extract_cost", budget: Optional[int] = None) -> int:
+    """
+    Charge a request cost units against its client's per-minute budget.
+
+    A single charge is capped at the whole budget, so any upload can go
+    through once a client's window is fresh. A request that does not fit is
+    rejected without using up any budget. The check and the charge are one
+    increment, so concurrent requests cannot both fit into the same units.
+
+    Args:
+        request: FastAPI request object (client IP is the key)
+        units: Cost of this request
+        scope: Budget name; separate scopes keep separate counters
+        budget: Units per minute (default: extract_cost_budget_per_minute)
+
+    Returns:
+        Units left in the current window
+
+    Raises:
+        CostLimitExceeded: If the budget cannot cover the charge (429)
+    """
+    budget = budget or get_settings().extract_cost_budget_per_minute
+    if not limiter.enabled:
+        return budget
+
+    item = RateLimitItemPerMinute(budget)
+    units = max(1, min(units, budget))
+    allowed, remaining, reset_time = await asyncio.to_thread(_charge, item, get_client_ip(request), scope, units)
+    request.state._rate_limit_data = {"limit": budget, "remaining": remaining}
+    if not allowed:
+        raise CostLimitExceeded(
+            f"{budget} cost units per 1 minute",
+            retry_after=max(1, math.ceil(reset_time - time.time())),
+        )
+    return remaining
+
+
+async def rate_limit_headers(state: Dict[str, Any]) -> Dict[str, str]:
+    """
+    X-RateLimit-Limit/Remaining for a response, read from the request state.
+
+    Uses the cost budget recorded by charge_cost if the request was charged,
+    else the tightest slowapi limit checked for the route (view_rate_limit),
+    read from the storage in a worker thread. Routes without a limit, or a
+    storage error, give no headers.
+
+    Args:
+        state: The ASGI scope's "state" dict (request.state)
+
+    Returns:
+        Header names and values
+    """
+    data = state.get("_rate_limit_data")
+    if data:
+        return {"X-RateLimit-Limit": str(data["limit"]), "X-RateLimit-Remaining": str(data["remaining"])}
+
+    view = state.get("view_rate_limit")
+    if not view:
+        return {}
+    item, args = view
+    try:
+        stats = await asyncio.to_thread(limiter.limiter.get_window_stats, item, *args)
+    except Exception:
+        return {}
+    return {"X-RateLimit-Limit": str(item.amount), "X-RateLimit-Remaining": str(stats.remaining)}
+
+
 def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Response:
     """
     Custom handler for rate limit exceeded errors.
@@ -113,39 +219,6 @@ def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Res
     return response
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware that adds X-RateLimit-Remaining header to all responses.
-
-    This middleware works in conjunction with slowapi's route-based limiting
-    to provide consistent rate limit information to clients.
-
-    Note: The actual rate limiting is done by slowapi decorators on routes.
-    This middleware adds the remaining count header to all responses.
-    """
-
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
-
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Any,
-    ) -> Response:
-        """Add rate limit headers to all responses."""
-        response: Response = await call_next(request)
-
-        # Get the current rate limit state if available
-        # slowapi stores this in request.state after checking limits
-        if hasattr(request.state, "_rate_limiting_complete"):
-            rate_limit_data = getattr(request.state, "_rate_limit_data", None)
-            if rate_limit_data:
-                remaining = rate_limit_data.get("remaining", 0)
-                response.headers["X-RateLimit-Remaining"] = str(remaining)
-
-        return response
-
-
 def get_limiter() -> Any:
     """
     Get the configured limiter instance.
@@ -0,0 +1,114 @@
+"""SQLite storage backend for the rate limiter.
+
+slowapi keeps its counters in a `limits` storage chosen by URI
+(rate_limit_storage_uri). ``memory://`` is per-process, so with several
+uvicorn workers each one enforces the full limit on its own. ``redis://``
+(or any other Redis-compatible server; needs the ``redis`` package) shares
+counters across hosts. This module adds ``sqlite:///path/to/file.db`` for a
+single host without a Redis server: every worker opens the same database file
+and increments counters in one write transaction, so limits hold across
+workers.
+
+Importing this module registers the ``sqlite`` scheme with
+limits.storage.storage_from_string. It supports the fixed-window strategy
+(slowapi's default).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from limits.storage import Storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class SQLiteStorage(Storage):
+    """Fixed-window counters in a SQLite file shared by all local workers.
+
+    URI forms (as SQLAlchemy): ``sqlite:///relative/path.db`` and
+    ``sqlite:////absolute/path.db``.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options: float | str | bool) -> None:
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        if not uri or not uri.startswith("sqlite:///") or uri == "sqlite:///":
+            raise ValueError(f"Expected sqlite:///<path>, got {uri!r}")
+        self.path = uri[len("sqlite:///"):]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so read-modify-write is
+            # atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM rate_limit_counters WHERE key = ? AND expires_at <= ?", (key, now)
+                )
+                self._conn.execute(
+                    "INSERT INTO rate_limit_counters (key, value, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                    (key, amount, now + expiry),
+                )
+                row = self._conn.execute(
+                    "SELECT value FROM rate_limit_counters WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return int(row[0])
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return float(row[0]) if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM rate_limit_counters")
+        return cursor.rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
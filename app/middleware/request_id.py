@@ -1,23 +0,0 @@
-"""Request ID middleware.
-
-Assigns a unique request ID to each request and returns it in the X-Request-ID response header.
-"""
-
-import uuid
-from collections.abc import Awaitable, Callable
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware that sets request.state.request_id and adds X-Request-ID to response."""
-
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-        request.state.request_id = request_id
-        response: Response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
@@ -5,36 +5,50 @@ Provides endpoints for batch file uploads and job status tracking.
 """
 
 import asyncio
-import json
+import io
 import logging
 import os
 import tempfile
+import time
 import uuid
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 BATCH_TIMEOUT_SECONDS = 3600  # 1 hour max for entire batch
 
-from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile, status
+from fastapi import APIRouter, File, Form, HTTPException, Request, Response, UploadFile, status
 from pydantic import ValidationError
+from supabase import Client
 
 from app.db.batch_jobs import (
     create_batch_job,
     get_batch_job,
     add_extraction_to_batch,
     list_batch_jobs,
+    update_batch_job_status,
 )
-from app.db.extractions import check_duplicate_any, create_extraction, get_extraction
-from app.db.memo_extractions import create_memo_extraction, get_memo_extraction
+from app.db import dedup, read_cache
+from app.db.dedup import DedupLookup, lookup_file_hash
+from app.db.extractions import build_extraction_record, get_extraction
+from app.db.memo_extractions import build_memo_extraction_record, get_memo_extraction
+from app.db.pagination import next_cursor
+from app.db.read_cache import etag_matches, get_read_cache
 from app.db.supabase_client import get_supabase_client
+from app.db.write_buffer import ExtractionWriteBuffer, get_write_buffer_metrics
 from app.middleware.rate_limit import get_limiter
 from app.models.batch import BatchJobCreate, BatchJobStatus, RoutingStats
 from app.services.file_validator import validate_pdf
 from app.services.gemini_client import get_gemini_client
 from app.services.document_classifier import classify_document
+from app.services.drain import get_work_tracker, reject_if_draining, save_checkpoint
 from app.services.memo_extractor import extract_memo_data_hybrid, PartialMemoExtractionError
 from app.services.opendataloader_extractor import extract_pdf_structure
+from app.services.scheduler import lane, run_stage
 from app.services.pdf_extractor import extract_pdf_data_hybrid, PartialExtractionError
-from app.services.webhook_sender import send_batch_completed_webhook
+from app.services.webhook_outbox import enqueue_webhook
+from app.services.webhook_sender import batch_completed_payload
+from app.utils.compression import mark_encoded
+from app.utils.live_stats import record_extraction
+from app.utils.serialization import JSONDecodeError, dumps, loads
 
 router = APIRouter(prefix="/api/batch", tags=["batch"])
 limiter = get_limiter()
@@ -75,6 +89,9 @@ async def create_batch_extraction(
     Raises:
         HTTPException: Various error conditions
     """
+    # Refuse new work while shutting down
+    reject_if_draining()
+
     # Validate file count
     if len(files) < 1:
         raise HTTPException(
@@ -99,8 +116,8 @@ async def create_batch_extraction(
     parsed_source_ids: Optional[List[str]] = None
     if source_ids:
         try:
-            parsed_source_ids = json.loads(source_ids)
-        except (json.JSONDecodeError, TypeError):
+            parsed_source_ids = loads(source_ids)
+        except (JSONDecodeError, TypeError):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="source_ids must be a valid JSON array of UUID strings"
@@ -119,12 +136,121 @@ async def create_batch_extraction(
         webhook_url=webhook_url
     )
 
+    with lane("batch"):
+        batch_job = await _run_batch(
+            supabase_client, batch_job_id, list(enumerate(files)), parsed_source_ids, webhook_url
+        )
+
+    # Return response
+    return {
+        "batch_job_id": batch_job_id,
+        "status_url": f"/api/batch/{batch_job_id}",
+        "total_files": len(files),
+        "status": "processing" if batch_job else "unknown"
+    }
+
+
+async def _run_batch(
+    supabase_client: Client,
+    batch_job_id: str,
+    files: List[Tuple[int, UploadFile]],
+    parsed_source_ids: Optional[List[str]],
+    webhook_url: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """Process files of a batch job and send its webhook once it is complete.
+
+    Runs as tracked work (app/services/drain.py): when shutdown begins the
+    loop stops before the next file, and the files not yet processed are
+    checkpointed so resume_batch() continues them into the same batch job on
+    the next start. Rows already extracted are flushed either way.
+
+    Args:
+        supabase_client: Supabase client instance
+        batch_job_id: UUID of the batch job
+        files: (index in the original upload, file) pairs to process
+        parsed_source_ids: Optional scraped_file_id per original upload index
+        webhook_url: Optional HTTPS URL to notify when the batch completes
+
+    Returns:
+        Optional[Dict[str, Any]]: The batch job record after processing
+
+    Raises:
+        WorkCheckpointed: If shutdown interrupted a file mid-extraction
+    """
     # Process each file with overall timeout (Gap 7.1)
     gemini_client = get_gemini_client()
+    tracker = get_work_tracker()
+
+    # Extraction rows are written behind with multi-row inserts; each file's
+    # batch-job update runs once its row has been flushed and has an ID
+    write_buffer = ExtractionWriteBuffer(supabase_client)
+    batch_updates: List[asyncio.Task[None]] = []
+
+    async def _record_buffered_extraction(
+        stored: "asyncio.Future[str]",
+        processing_method: str,
+        extraction_status: str,
+        cost_estimate: float,
+        cost_savings: float,
+    ) -> None:
+        try:
+            extraction_id = await stored
+            await add_extraction_to_batch(
+                supabase_client,
+                batch_job_id,
+                extraction_id=extraction_id,
+                processing_method=processing_method,
+                status=extraction_status,
+                cost_estimate_usd=cost_estimate,
+                cost_savings_usd=cost_savings
+            )
+        except Exception as e:
+            # Mark as failed, same as an error while processing the file
+            logger.warning("Error storing file result in batch %s: %s", batch_job_id, e)
+            await add_extraction_to_batch(
+                supabase_client,
+                batch_job_id,
+                extraction_id=str(uuid.uuid4()),  # Placeholder ID
+                processing_method='hybrid',
+                status='failed',
+                cost_estimate_usd=0.0,
+                cost_savings_usd=0.0
+            )
+
+    # Position in files of the file being processed, and the checkpoint of
+    # the unprocessed rest if shutdown stops the loop
+    next_position = 0
+    checkpointed = False
+
+    async def _checkpoint_remaining() -> None:
+        nonlocal checkpointed
+        if checkpointed:
+            return
+        checkpointed = True
+        remaining = files[next_position:]
+        contents = []
+        for _, upload in remaining:
+            await upload.seek(0)
+            contents.append(await upload.read())
+        params = {
+            "batch_job_id": batch_job_id,
+            "file_indexes": [file_idx for file_idx, _ in remaining],
+            "file_names": [upload.filename for _, upload in remaining],
+            "source_ids": parsed_source_ids,
+            "webhook_url": webhook_url,
+        }
+        await asyncio.to_thread(save_checkpoint, "batch", params, contents)
 
     async def _process_batch_files() -> None:
-        for file_idx, file in enumerate(files):
+        nonlocal next_position
+        for position, (file_idx, file) in enumerate(files):
+            next_position = position
+            if tracker.draining:
+                # Stop between files; the rest resumes after restart
+                await _checkpoint_remaining()
+                return
             temp_file_path: Optional[str] = None
+            file_start = time.perf_counter()
 
             try:
                 # Validate PDF file
@@ -143,12 +269,19 @@ async def create_batch_extraction(
                     )
                     continue
 
-                # Check for duplicate across both tables
-                existing_any = await check_duplicate_any(supabase_client, file_hash)
-                if existing_any:
-                    table_name, existing_id = existing_any
-                    # Fetch from whichever table matched
-                    if table_name == "extractions":
+                # Check for duplicate across both tables (one query, or the dedup cache)
+                try:
+                    existing = await lookup_file_hash(supabase_client, file_hash)
+                except RuntimeError as e:
+                    logger.warning("Duplicate lookup failed for %s: %s", file_hash, e)
+                    existing = DedupLookup()
+                completed = existing.completed
+                if completed is not None:
+                    table_name, existing_id = completed.table, completed.id
+                    existing_result: Optional[Dict[str, Any]]
+                    if existing.record is not None:
+                        existing_result = existing.record.record
+                    elif table_name == "extractions":
                         existing_result = await get_extraction(supabase_client, existing_id)
                     else:
                         existing_result = await get_memo_extraction(supabase_client, existing_id)
@@ -156,6 +289,7 @@ async def create_batch_extraction(
                         # Backfill scraped_file_id on deduped record if missing
                         if parsed_source_ids and not existing_result.get("scraped_file_id"):
                             sfid = parsed_source_ids[file_idx]
+                            read_cache.invalidate(table_name, existing_id)
                             try:
                                 await asyncio.to_thread(
                                     lambda t=table_name, eid=existing_id, sid=sfid: (
@@ -165,6 +299,8 @@ async def create_batch_extraction(
                                         .execute()
                                     )
                                 )
+                                dedup.invalidate_record(table_name, existing_id)
+                                read_cache.invalidate(table_name, existing_id)
                             except Exception as e:
                                 logger.warning("Failed to backfill scraped_file_id on %s %s: %s", table_name, existing_id, e)
                         # Add existing extraction to batch
@@ -196,7 +332,7 @@ async def create_batch_extraction(
                     temp_file_path = tmp.name
 
                 # Classify document type
-                doc_structure = extract_pdf_structure(temp_file_path)
+                doc_structure = await run_stage("parse", extract_pdf_structure, temp_file_path)
                 classification = classify_document(
                     filename=sanitized_filename,
                     markdown_text=doc_structure.markdown,
@@ -239,6 +375,7 @@ async def create_batch_extraction(
                         "webhook_url": None,  # Batch-level webhook, not per-file
                         "error_message": error_message,
                         "retry_count": 0,
+                        "processing_time_seconds": round(time.perf_counter() - file_start, 3),
                     }
 
                     # Thread scraped_file_id if provided
@@ -246,19 +383,21 @@ async def create_batch_extraction(
                         file_info["scraped_file_id"] = parsed_source_ids[file_idx]
 
                     if doc_type == 'memo':
-                        extraction_id = await create_memo_extraction(
-                            supabase_client,
+                        table_name = 'memo_extractions'
+                        record = build_memo_extraction_record(
                             extraction_result,
                             file_info,
                             status=extraction_status
                         )
                     else:
-                        extraction_id = await create_extraction(
-                            supabase_client,
+                        table_name = 'extractions'
+                        record = build_extraction_record(
                             extraction_result,
                             file_info,
                             status=extraction_status
                         )
+                    stored = await write_buffer.add(table_name, record)
+                    record_extraction(extraction_result.processing_metadata, time.perf_counter() - file_start)
 
                     # Calculate cost and savings
                     proc_meta = extraction_result.processing_metadata
@@ -270,16 +409,16 @@ async def create_batch_extraction(
                     else:
                         cost_savings = 0.0
 
-                    # Update batch job
-                    await add_extraction_to_batch(
-                        supabase_client,
-                        batch_job_id,
-                        extraction_id=extraction_id,
-                        processing_method=processing_method,
-                        status=extraction_status,
-                        cost_estimate_usd=cost_estimate,
-                        cost_savings_usd=cost_savings
-                    )
+                    # Update batch job once the buffered row is flushed
+                    batch_updates.append(asyncio.create_task(
+                        _record_buffered_extraction(
+                            stored,
+                            processing_method,
+                            extraction_status,
+                            cost_estimate,
+                            cost_savings,
+                        )
+                    ))
                 else:
                     # Complete failure - add placeholder
                     placeholder_id = str(uuid.uuid4())
@@ -321,16 +460,25 @@ async def create_batch_extraction(
                             exc_info=True,
                         )
 
+    timed_out = False
     try:
-        await asyncio.wait_for(_process_batch_files(), timeout=BATCH_TIMEOUT_SECONDS)
-    except asyncio.TimeoutError:
+        async with tracker.track("batch", _checkpoint_remaining):
+            try:
+                await asyncio.wait_for(_process_batch_files(), timeout=BATCH_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                timed_out = True
+    finally:
+        # Flush remaining buffered rows and wait for their batch-job updates,
+        # also when shutdown interrupted the loop
+        await write_buffer.close()
+        for update_result in await asyncio.gather(*batch_updates, return_exceptions=True):
+            if isinstance(update_result, Exception):
+                logger.warning("Batch job update failed for %s: %s", batch_job_id, update_result)
+        logger.info("Write buffer metrics after batch %s: %s", batch_job_id, get_write_buffer_metrics())
+
+    if timed_out:
         # Mark batch as partial and return completed extractions (Gap 7.1)
-        await asyncio.to_thread(
-            lambda: supabase_client.table("batch_jobs")
-            .update({"status": "partial"})
-            .eq("id", batch_job_id)
-            .execute()
-        )
+        await update_batch_job_status(supabase_client, batch_job_id, "partial")
 
     # Get final batch job status
     batch_job = await get_batch_job(supabase_client, batch_job_id)
@@ -347,40 +495,72 @@ async def create_batch_extraction(
                 'cost_estimate_usd': batch_job.get('cost_estimate_usd'),
                 'cost_savings_usd': batch_job.get('cost_savings_usd')
             }
-            # Fire and forget - don't wait for webhook
-            asyncio.create_task(
-                send_batch_completed_webhook(webhook_url, batch_job_id, batch_status, summary)
+            # Queue for durable delivery by the webhook workers
+            await enqueue_webhook(
+                supabase_client,
+                webhook_url,
+                batch_completed_payload(batch_job_id, batch_status, summary)
             )
 
-    # Return response
-    return {
-        "batch_job_id": batch_job_id,
-        "status_url": f"/api/batch/{batch_job_id}",
-        "total_files": len(files),
-        "status": "processing" if batch_job else "unknown"
-    }
+    return batch_job
 
 
-@router.get("/{batch_job_id}", response_model=BatchJobStatus)
-async def get_batch_status(
-    batch_job_id: str,
-) -> BatchJobStatus:
+async def resume_batch(params: Dict[str, Any], files: List[bytes]) -> None:
+    """Continue a batch job checkpointed by a previous shutdown."""
+    uploads = [
+        (file_idx, UploadFile(file=io.BytesIO(content), filename=file_name))
+        for file_idx, file_name, content in zip(params["file_indexes"], params["file_names"], files)
+    ]
+    await _run_batch(
+        get_supabase_client(), params["batch_job_id"], uploads, params.get("source_ids"), params.get("webhook_url")
+    )
+
+
+@router.get("", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def list_batches(
+    request: Request,
+    limit: int = 50,
+    offset: int = 0,
+    status_filter: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Response:
     """
-    Get the status of a batch processing job.
+    List batch jobs, newest first, with cursor or offset pagination.
 
     Args:
-        batch_job_id: UUID of the batch job
+        limit: Maximum number of jobs to return (default: 50, max: 100)
+        offset: Number of jobs to skip (default: 0)
+        status_filter: Optional status filter ('pending', 'processing', 'completed', 'failed', 'partial')
+        cursor: Opaque cursor from pagination.next_cursor of a previous response
 
     Returns:
-        BatchJobStatus: Complete batch job status with statistics
-
-    Raises:
-        HTTPException: 404 if batch job not found
+        200: List of batch jobs with pagination metadata
+        400: Invalid parameters (limit, offset, status, or cursor)
+        500: Database error
     """
+    if limit < 1 or limit > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Limit must be between 1 and 100"
+        )
+
+    if offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Offset must be non-negative"
+        )
+
     supabase_client = get_supabase_client()
 
     try:
-        batch_job = await get_batch_job(supabase_client, batch_job_id)
+        results = await list_batch_jobs(
+            supabase_client,
+            limit=limit,
+            offset=offset,
+            status=status_filter,
+            cursor=cursor
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -392,12 +572,97 @@ async def get_batch_status(
             detail=f"Database error: {str(e)}"
         )
 
-    if not batch_job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Batch job {batch_job_id} not found"
-        )
+    response_data = {
+        "data": results,
+        "pagination": {
+            "limit": limit,
+            "offset": offset,
+            "count": len(results),
+            "has_more": len(results) == limit,
+            "next_cursor": next_cursor(results, limit)
+        }
+    }
+
+    return Response(
+        content=dumps(response_data),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/{batch_job_id}", response_model=BatchJobStatus)
+async def get_batch_status(
+    request: Request,
+    batch_job_id: str,
+) -> Response:
+    """
+    Get the status of a batch processing job.
+
+    Responses carry a strong ETag (derived from updated_at and status);
+    pollers sending it back in If-None-Match get an empty 304 until the job
+    changes. Jobs are served from a short-lived in-process cache that batch
+    updates invalidate.
+
+    Args:
+        batch_job_id: UUID of the batch job
+
+    Returns:
+        BatchJobStatus: Complete batch job status with statistics
+        (304 with no body if unchanged)
+
+    Raises:
+        HTTPException: 404 if batch job not found
+    """
+    cache = get_read_cache()
+    cached = cache.get('batch_jobs', batch_job_id)
+    cache_hit = cached is not None
 
+    if cached is None:
+        supabase_client = get_supabase_client()
+
+        try:
+            batch_job = await get_batch_job(supabase_client, batch_job_id)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database error: {str(e)}"
+            )
+
+        if not batch_job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Batch job {batch_job_id} not found"
+            )
+
+        cached = cache.put('batch_jobs', batch_job_id, batch_job)
+
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": "no-cache",
+        "X-Cache-Hit": "true" if cache_hit else "false"
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Compressed once per content-coding and kept with the cached record
+    content, encoding = cached.encoded(request.headers.get("accept-encoding"), _render_batch_status)
+    mark_encoded(headers, encoding)
+    return Response(
+        content=content,
+        media_type="application/json",
+        status_code=status.HTTP_200_OK,
+        headers=headers
+    )
+
+
+def _render_batch_status(batch_job: Dict[str, Any]) -> str:
+    """Serialize a batch_jobs row as a BatchJobStatus JSON body."""
     # Convert routing_stats dict to RoutingStats model
     routing_stats_dict = batch_job.get('routing_stats', {})
     routing_stats = RoutingStats(
@@ -421,4 +686,4 @@ async def get_batch_status(
         updated_at=batch_job['updated_at'],
         estimated_completion=batch_job.get('estimated_completion'),
         webhook_url=batch_job.get('webhook_url')
-    )
+    ).model_dump_json()
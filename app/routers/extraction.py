@@ -4,49 +4,87 @@ PDF extraction API endpoints.
 Provides endpoints for uploading PDFs and retrieving extraction results.
 """
 
-import json
+import asyncio
+import csv
+import io
 import logging
 import os
 import tempfile
+import time
 import uuid
-from typing import Any, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 
-from fastapi import APIRouter, File, Form, HTTPException, Request, Response, UploadFile, status
+from fastapi import APIRouter, File, Form, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
+from supabase import Client
 
+from app.config import get_settings
 from app.db.extractions import (
-    check_duplicate,
-    check_duplicate_any,
+    EXTRACTION_SUMMARY_COLUMNS,
     create_extraction,
     get_extraction,
     list_extractions,
+    parse_fields,
     update_extraction_status,
     update_extraction,
 )
 from app.db.memo_extractions import (
-    check_memo_duplicate,
     create_memo_extraction,
     get_memo_extraction,
     update_memo_extraction_status,
     update_memo_extraction,
 )
+from app.db.dedup import DedupLookup, get_dedup_cache, lookup_file_hash
+from app.db.export import iter_export_pages, parse_updated_since, resolve_export_columns
+from app.db.pagination import decode_cursor, next_cursor
+from app.db.read_cache import CachedRecord, etag_matches, get_read_cache
 from app.db.review_queue import add_to_review_queue
 from app.db.supabase_client import get_supabase_client
-from app.middleware.rate_limit import get_limiter
+from app.middleware.rate_limit import charge_cost, get_limiter
 from app.models.extraction import DocumentStructure, FullExamPaper
 from app.models.memo_extraction import MarkingGuideline
 from app.services.document_classifier import classify_document
+from app.services.drain import get_work_tracker, reject_if_draining, save_checkpoint
+from app.services.extraction_cost import estimate_extraction_cost
 from app.services.file_validator import validate_pdf
 from app.services.gemini_client import get_gemini_client
 from app.services.opendataloader_extractor import extract_pdf_structure
+from app.services.scheduler import run_stage
 from app.services.pdf_extractor import extract_pdf_data_hybrid, PartialExtractionError
 from app.services.memo_extractor import extract_memo_data_hybrid, PartialMemoExtractionError
-from app.services.webhook_sender import send_extraction_completed_webhook
+from app.services.webhook_outbox import enqueue_webhook
+from app.services.webhook_sender import extraction_completed_payload
+from app.utils.compression import mark_encoded
+from app.utils.deadline import DeadlineExceeded, check_deadline, parse_deadline_header, run_until_done
+from app.utils.live_stats import record_extraction
+from app.utils.serialization import dumps, dumps_str
+from app.utils.single_flight import IdempotencyKeyMismatch, IdempotencyKeys, SingleFlight
 
 router = APIRouter(prefix="/api", tags=["extraction"])
 limiter = get_limiter()
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Attributes selectable with fields= on the bounding-box endpoint
+BOUNDING_BOX_FIELDS = ('x1', 'y1', 'x2', 'y2', 'page')
+
+# Response fields selectable with fields= on the element endpoint (element_id is always returned)
+ELEMENT_FIELDS = ('element_type', 'bounding_box', 'content')
+
+# Bulk export formats and their media types
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# In-flight extractions by file hash, and Idempotency-Key -> (status code, extraction ID, doc type)
+_extractions_in_flight: SingleFlight[Response] = SingleFlight()
+_idempotency_keys: IdempotencyKeys[Tuple[int, str, Optional[str]]] = IdempotencyKeys(
+    max_keys=settings.idempotency_max_keys,
+    ttl_seconds=settings.idempotency_key_ttl_seconds,
+)
+
 
 @router.post("/extract", status_code=status.HTTP_201_CREATED)
 @limiter.limit("10/minute")  # type: ignore[untyped-decorator]
@@ -55,6 +93,8 @@ async def extract_pdf(
     file: UploadFile = File(..., description="PDF file to extract"),
     webhook_url: Optional[str] = Form(None, description="Optional webhook URL for completion notification"),
     doc_type: Optional[str] = Form(None, description="Document type: 'question_paper' or 'memo'. If omitted, auto-detected."),
+    idempotency_key: Optional[str] = Header(None, description="Optional client key; retries with the same key attach to the same extraction"),
+    x_request_timeout: Optional[str] = Header(None, description="Optional deadline in seconds (capped by the server); the extraction is cancelled with 504 once it passes"),
 ) -> Response:
     """
     Extract structured data from a PDF file using hybrid pipeline.
@@ -66,65 +106,274 @@ async def extract_pdf(
     4. Stores results in database
     5. Returns extraction result with UUID in X-Extraction-ID header
 
+    Concurrent uploads of the same file (same hash) are coalesced: the first
+    request runs the pipeline and the others wait for its result (marked
+    with X-Coalesced: true) instead of parsing and calling Gemini again.
+
+    With an Idempotency-Key header, a retry using the same key attaches to
+    the in-flight extraction, or once it has finished gets the stored record
+    back (Idempotent-Replayed: true).
+
+    The extraction must finish within the request deadline (default
+    settings.request_deadline_seconds, or X-Request-Timeout). Without a
+    webhook_url the client is waiting on the response, so the work is also
+    cancelled as soon as it disconnects; with one, it runs on to deliver
+    the webhook. A coalesced request keeps its own deadline; the shared
+    pipeline runs until the latest deadline of the requests waiting on it.
+
     Args:
         file: PDF file to process (max 200MB)
         webhook_url: Optional HTTPS URL to receive completion notification
+        idempotency_key: Optional Idempotency-Key header (max 255 characters)
+        x_request_timeout: Optional X-Request-Timeout header (seconds)
 
     Returns:
         201: Extraction completed successfully
         400: Invalid file or validation error
         413: File too large (>200MB)
-        422: Corrupted PDF file
+        422: Corrupted PDF file, or Idempotency-Key already used for a different file
+        499: Client disconnected before the extraction finished (logged only)
         500: Processing error
+        504: Request deadline exceeded
 
     Raises:
         HTTPException: Various error conditions with appropriate status codes
     """
-    temp_file_path: Optional[str] = None
+    request_start = time.perf_counter()
+
+    # Step 0: Refuse new work while shutting down; validate doc_type,
+    # Idempotency-Key and X-Request-Timeout (if explicitly provided)
+    reject_if_draining()
+    classification_method: Optional[str] = None
+    deadline = parse_deadline_header(
+        x_request_timeout, settings.request_deadline_seconds, settings.request_deadline_max_seconds
+    )
 
-    try:
-        # Step 0: Validate doc_type (if explicitly provided)
-        classification_method: Optional[str] = None
-        precomputed_doc_structure: Optional[DocumentStructure] = None
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be 1-255 characters"
+        )
 
-        if doc_type is not None and doc_type not in ('question_paper', 'memo'):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid doc_type '{doc_type}'. Must be 'question_paper' or 'memo'"
-            )
+    if doc_type is not None and doc_type not in ('question_paper', 'memo'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid doc_type '{doc_type}'. Must be 'question_paper' or 'memo'"
+        )
 
-        if doc_type is not None:
-            classification_method = "user_provided"
+    if doc_type is not None:
+        classification_method = "user_provided"
 
-        # Step 1: Validate PDF file
+    # Step 1: Validate PDF file
+    try:
+        content, file_hash, sanitized_filename = await validate_pdf(file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Corrupted or invalid PDF: {str(e)}"
+        )
+
+    # Step 1a: Replay or attach to an earlier request with the same Idempotency-Key
+    if idempotency_key is not None:
         try:
-            content, file_hash, sanitized_filename = await validate_pdf(file)
-        except HTTPException:
-            raise
-        except Exception as e:
+            completed = _idempotency_keys.claim(idempotency_key, file_hash)
+        except IdempotencyKeyMismatch as e:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Corrupted or invalid PDF: {str(e)}"
+                detail=str(e)
             )
+        if completed is not None:
+            replayed = await _replay_extraction(*completed)
+            if replayed is not None:
+                return replayed
+
+    # Step 1b: A file held in the dedup cache is answered directly, with the
+    # record's body (read cache, else one read) pre-compressed for this
+    # client; anything else runs the pipeline once per file hash (concurrent
+    # uploads share it)
+    known = get_dedup_cache().peek(file_hash)
+    known_record: Optional[CachedRecord] = None
+    if known is not None:
+        try:
+            known_record = await _load_duplicate_record(get_supabase_client(), known)
+        except Exception as e:
+            # Not fatal: the pipeline below looks the file up again
+            logger.warning("Duplicate record read failed for %s: %s", file_hash, e)
+    if known is not None and known_record is not None:
+        response, coalesced = _duplicate_response(known, request.headers.get("accept-encoding")), False
+    else:
+        # Uploads that run the pipeline are charged cost units by predicted
+        # size, pages and route against the client's budget (429 if exhausted)
+        cost = await asyncio.to_thread(estimate_extraction_cost, content)
+        await charge_cost(request, cost.units)
+        response, coalesced = await run_until_done(
+            request,
+            _extractions_in_flight.do(
+                file_hash,
+                lambda: _tracked_extraction(
+                    content, file_hash, sanitized_filename, doc_type, classification_method, webhook_url, request_start
+                ),
+                deadline,
+            ),
+            deadline,
+            watch_disconnect=webhook_url is None,
+        )
 
-        # Step 1a: Cross-table duplicate check (both extractions and memo_extractions)
-        supabase_client = get_supabase_client()
-        existing_any = await check_duplicate_any(supabase_client, file_hash)
-        if existing_any:
-            table_name, existing_id = existing_any
-            if table_name == "extractions":
-                existing_result = await get_extraction(supabase_client, existing_id)
-            else:
-                existing_result = await get_memo_extraction(supabase_client, existing_id)
-            if existing_result and existing_result.get("status") == "completed":
-                return Response(
-                    content=json.dumps(existing_result),
-                    media_type="application/json",
-                    status_code=status.HTTP_200_OK,
-                    headers={"X-Extraction-ID": existing_id},
-                )
+    extraction_id = response.headers.get("X-Extraction-ID")
+    if idempotency_key is not None and extraction_id and response.status_code < 300:
+        _idempotency_keys.store(
+            idempotency_key, file_hash, (response.status_code, extraction_id, response.headers.get("X-Doc-Type"))
+        )
 
-        # Step 1b: Auto-classify if doc_type not provided
+    if not coalesced:
+        return response
+
+    # This request's own webhook still fires for a coalesced result
+    if webhook_url and extraction_id and response.status_code < 300:
+        await enqueue_webhook(
+            get_supabase_client(),
+            webhook_url,
+            extraction_completed_payload(
+                extraction_id,
+                "partial" if response.status_code == status.HTTP_206_PARTIAL_CONTENT else "completed",
+                {"file_name": sanitized_filename, "coalesced": True},
+            ),
+        )
+    return _copy_response(response, {"X-Coalesced": "true"})
+
+
+async def _load_duplicate_record(supabase_client: Client, existing: DedupLookup) -> Optional[CachedRecord]:
+    """Record of a lookup's completed match: from the lookup, the read cache or the database.
+
+    The dedup cache keeps only hash matches, so a lookup answered from it
+    carries no record. Sets existing.record when the match is still completed,
+    and returns it.
+
+    Raises:
+        Exception: If the database query fails
+    """
+    completed = existing.completed
+    if completed is None or existing.record is not None:
+        return existing.record
+
+    cache = get_read_cache()
+    cached = cache.get(completed.table, completed.id)
+    if cached is None:
+        if completed.table == "extractions":
+            existing_result = await get_extraction(supabase_client, completed.id)
+        else:
+            existing_result = await get_memo_extraction(supabase_client, completed.id)
+        if existing_result is None:
+            return None
+        cached = cache.put(completed.table, completed.id, existing_result)
+    if cached.record.get("status") == "completed":
+        existing.record = cached
+    return existing.record
+
+
+def _duplicate_response(existing: DedupLookup, accept_encoding: Optional[str] = None) -> Response:
+    """200 response with the stored record of an already completed extraction.
+
+    Args:
+        existing: Lookup with a completed match and its record
+        accept_encoding: Client Accept-Encoding, to send the record's cached
+            compressed body (None: uncompressed)
+    """
+    completed = existing.completed
+    assert completed is not None and existing.record is not None
+    content, encoding = existing.record.encoded(accept_encoding)
+    headers = {
+        "X-Extraction-ID": completed.id,
+        "X-Doc-Type": "memo" if completed.table == "memo_extractions" else "question_paper",
+        "X-Dedup-Cache-Hit": "true" if existing.from_cache else "false",
+    }
+    if accept_encoding is not None:
+        mark_encoded(headers, encoding)
+    return Response(
+        content=content,
+        media_type="application/json",
+        status_code=status.HTTP_200_OK,
+        headers=headers,
+    )
+
+
+async def _tracked_extraction(
+    content: bytes,
+    file_hash: str,
+    sanitized_filename: str,
+    doc_type: Optional[str],
+    classification_method: Optional[str],
+    webhook_url: Optional[str],
+    request_start: float,
+) -> Response:
+    """Run _extract_validated_pdf as tracked work.
+
+    If shutdown interrupts it, the PDF and parameters are checkpointed and
+    the extraction is redone on the next start (resume_extraction), with the
+    webhook, if any, sent when it completes.
+    """
+    params = {
+        "file_hash": file_hash,
+        "file_name": sanitized_filename,
+        "doc_type": doc_type,
+        "classification_method": classification_method,
+        "webhook_url": webhook_url,
+    }
+
+    async def checkpoint() -> None:
+        await asyncio.to_thread(save_checkpoint, "extract", params, [content])
+
+    async with get_work_tracker().track("extract", checkpoint):
+        return await _extract_validated_pdf(
+            content, file_hash, sanitized_filename, doc_type, classification_method, webhook_url, request_start
+        )
+
+
+async def resume_extraction(params: Dict[str, Any], files: List[bytes]) -> None:
+    """Redo an extraction checkpointed by a previous shutdown."""
+    file_hash = params["file_hash"]
+    await _extractions_in_flight.do(
+        file_hash,
+        lambda: _tracked_extraction(
+            files[0], file_hash, params["file_name"], params.get("doc_type"),
+            params.get("classification_method"), params.get("webhook_url"), time.perf_counter(),
+        ),
+    )
+
+
+async def _extract_validated_pdf(
+    content: bytes,
+    file_hash: str,
+    sanitized_filename: str,
+    doc_type: Optional[str],
+    classification_method: Optional[str],
+    webhook_url: Optional[str],
+    request_start: float,
+) -> Response:
+    """Deduplicate, classify, extract and store a validated PDF (steps 1c-7 of extract_pdf)."""
+    temp_file_path: Optional[str] = None
+    precomputed_doc_structure: Optional[DocumentStructure] = None
+
+    try:
+        # Step 1c: Cross-table duplicate lookup (both tables, one query or the dedup cache)
+        check_deadline("dedup")
+        supabase_client = get_supabase_client()
+        try:
+            existing = await lookup_file_hash(supabase_client, file_hash)
+        except RuntimeError as e:
+            # The unique file_hash index still prevents a second completed/pending row
+            logger.warning("Duplicate lookup failed for %s: %s", file_hash, e)
+            existing = DedupLookup()
+
+        completed = existing.completed
+        if completed is not None and await _load_duplicate_record(supabase_client, existing) is not None:
+            # Uncompressed: a coalesced response is shared by clients with
+            # different Accept-Encoding (CompressionMiddleware compresses it)
+            return _duplicate_response(existing)
+
+        # Step 1d: Auto-classify if doc_type not provided
         if doc_type is None:
             # Write temp file early so we can run OpenDataLoader for classification
             with tempfile.NamedTemporaryFile(
@@ -134,9 +383,10 @@ async def extract_pdf(
                 temp_file_path = tmp.name
 
             # Extract structure (reused later to avoid duplicate work)
-            precomputed_doc_structure = extract_pdf_structure(temp_file_path)
+            precomputed_doc_structure = await run_stage("parse", extract_pdf_structure, temp_file_path)
 
             # Run classifier cascade
+            check_deadline("classify")
             gemini_client = get_gemini_client()
             classification = classify_document(
                 filename=sanitized_filename,
@@ -146,38 +396,16 @@ async def extract_pdf(
             doc_type = classification.doc_type
             classification_method = classification.method
 
-        # Step 2: Check for duplicate in target table (route based on doc_type)
-        if doc_type == 'memo':
-            existing_id = await check_memo_duplicate(supabase_client, file_hash)
-        else:
-            existing_id = await check_duplicate(supabase_client, file_hash)
+        # Step 2: Retry a partial/failed extraction of this file in the target table
+        match = existing.match("memo_extractions" if doc_type == 'memo' else "extractions")
+        existing_id = match.id if match else None
 
         is_retry = False
         retry_count = 0
 
-        if existing_id:
-            # Check if existing extraction is partial/failed - if so, retry it
-            if doc_type == 'memo':
-                existing_result = await get_memo_extraction(supabase_client, existing_id)
-            else:
-                existing_result = await get_extraction(supabase_client, existing_id)
-
-            if existing_result:
-                existing_status = existing_result.get("status")
-
-                # If completed, return existing result
-                if existing_status == "completed":
-                    return Response(
-                        content=json.dumps(existing_result),
-                        media_type="application/json",
-                        status_code=status.HTTP_200_OK,
-                        headers={"X-Extraction-ID": existing_id}
-                    )
-
-                # If partial or failed, retry the extraction
-                if existing_status in ("partial", "failed"):
-                    is_retry = True
-                    retry_count = existing_result.get("retry_count", 0) + 1
+        if match and match.status in ("partial", "failed"):
+            is_retry = True
+            retry_count = match.retry_count + 1
 
         # Reject before attempting extraction if max retries already exceeded (Gap 5.2, 8.3)
         if is_retry and retry_count >= 5:
@@ -199,6 +427,7 @@ async def extract_pdf(
 
         # Step 4: Extract PDF data using hybrid pipeline (route based on doc_type)
         # get_gemini_client() returns a singleton, so this is cheap even if called twice
+        check_deadline("extract")
         gemini_client = get_gemini_client()
 
         extraction_result: Optional[Union[FullExamPaper, MarkingGuideline]] = None
@@ -228,6 +457,8 @@ async def extract_pdf(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail=f"PDF extraction failed validation: {str(e)}"
             )
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             # If retry count exceeds limit, set status to failed and prepare for review queue
             if retry_count > 5:
@@ -245,7 +476,9 @@ async def extract_pdf(
             extraction_result.processing_metadata["classification_method"] = classification_method
             extraction_result.processing_metadata["doc_type"] = doc_type
 
-        # Step 5: Store result in database (including partial results)
+        # Step 5: Store result in database (including partial results); past
+        # the deadline nothing is stored, so the client's retry starts afresh
+        check_deadline("store")
         file_info = {
             "file_name": sanitized_filename,
             "file_size_bytes": len(content),
@@ -253,6 +486,7 @@ async def extract_pdf(
             "webhook_url": webhook_url,
             "error_message": error_message,
             "retry_count": retry_count,
+            "processing_time_seconds": round(time.perf_counter() - request_start, 3),
         }
 
         try:
@@ -360,6 +594,11 @@ async def extract_pdf(
                 detail=f"Database error: {str(e)}"
             )
 
+        record_extraction(
+            extraction_result.processing_metadata if extraction_result is not None else None,
+            time.perf_counter() - request_start,
+        )
+
         # Step 6: Send webhook if configured
         if webhook_url:
             # Prepare webhook summary data
@@ -388,15 +627,11 @@ async def extract_pdf(
                 if processing_method:
                     webhook_data['processing_method'] = processing_method
 
-            # Fire and forget - don't wait for webhook
-            import asyncio
-            asyncio.create_task(
-                send_extraction_completed_webhook(
-                    webhook_url,
-                    extraction_id,
-                    extraction_status,
-                    webhook_data
-                )
+            # Queue for durable delivery by the webhook workers
+            await enqueue_webhook(
+                supabase_client,
+                webhook_url,
+                extraction_completed_payload(extraction_id, extraction_status, webhook_data)
             )
 
         # Step 7: Return extraction result
@@ -427,11 +662,12 @@ async def extract_pdf(
                 response_headers["X-Quality-Score"] = str(opendataloader_quality)
 
         # Build response content
+        response_content: Union[str, bytes]
         if extraction_result is not None:
             response_content = extraction_result.model_dump_json()
         else:
             # Failed extraction with no result
-            response_content = json.dumps({
+            response_content = dumps({
                 "status": "failed",
                 "error": error_message or "Extraction failed after maximum retries",
                 "extraction_id": extraction_id,
@@ -459,6 +695,203 @@ async def extract_pdf(
                 )
 
 
+def _copy_response(response: Response, extra_headers: Dict[str, str]) -> Response:
+    """Independent copy of a shared Response with additional headers."""
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    headers.update(extra_headers)
+    return Response(
+        content=response.body,
+        media_type=response.media_type,
+        status_code=response.status_code,
+        headers=headers
+    )
+
+
+async def _replay_extraction(status_code: int, extraction_id: str, doc_type: Optional[str]) -> Optional[Response]:
+    """Response for a completed Idempotency-Key: the stored record, read back.
+
+    Returns None (process the request normally) if the record is gone.
+    """
+    supabase_client = get_supabase_client()
+    try:
+        if doc_type == "memo":
+            record = await get_memo_extraction(supabase_client, extraction_id)
+        else:
+            record = await get_extraction(supabase_client, extraction_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+    if record is None:
+        return None
+
+    headers = {"X-Extraction-ID": extraction_id, "Idempotent-Replayed": "true"}
+    if doc_type:
+        headers["X-Doc-Type"] = doc_type
+    return Response(
+        content=dumps(record),
+        media_type="application/json",
+        # Like a duplicate upload, a finished extraction is returned with 200 (206 if partial)
+        status_code=status_code if status_code == status.HTTP_206_PARTIAL_CONTENT else status.HTTP_200_OK,
+        headers=headers
+    )
+
+
+def _ndjson_chunk(rows: List[Dict[str, Any]], columns: Sequence[str]) -> bytes:
+    """One JSON object per line for each row, projected to columns."""
+    return b"".join(dumps({c: row.get(c) for c in columns}) + b"\n" for row in rows)
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV cell for a column value (JSONB columns are written as JSON text)."""
+    if isinstance(value, (dict, list)):
+        return dumps_str(value)
+    return "" if value is None else value
+
+
+def _csv_chunk(rows: List[Dict[str, Any]], columns: Sequence[str], header: bool = False) -> bytes:
+    """CSV lines for rows, preceded by the header line if requested."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(row.get(c)) for c in columns] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+@router.get("/extractions/export", status_code=status.HTTP_200_OK)
+@limiter.limit("10/minute")
+async def export_extractions(
+    request: Request,
+    export_format: str = Query("ndjson", alias="format"),
+    doc_type: str = "question_paper",
+    subject: Optional[str] = None,
+    year: Optional[int] = None,
+    language: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
+    after: Optional[str] = None
+) -> StreamingResponse:
+    """
+    Stream every matching extraction as NDJSON or CSV.
+
+    Rows are read from the database one keyset page at a time, oldest change
+    first by (updated_at, id), and written to the client as each page is
+    read, so the export runs in constant memory and a slow client slows the
+    export instead of buffering it. For incremental syncs pass the
+    updated_at of the last row already received as updated_since; rows with
+    exactly that timestamp are sent again, so upsert by id. To resume
+    exactly after the last row received, pass its cursor as after instead.
+
+    NDJSON exports every column by default and CSV the summary columns
+    (JSONB columns in CSV are written as JSON text). Use fields= to choose
+    columns, or fields=* for all of them.
+
+    Args:
+        export_format: 'ndjson' (default) or 'csv' (query parameter "format")
+        doc_type: 'question_paper' (default, extractions) or 'memo' (memo_extractions)
+        subject: Optional exact subject filter
+        year: Optional exam year filter
+        language: Optional language filter (question papers only)
+        status_filter: Optional status filter ('pending', 'completed', 'failed', 'partial')
+        updated_since: Optional ISO 8601 timestamp; only rows updated at or after it
+        fields: Optional comma-separated column list, or "*"
+        since: Optional ISO 8601 timestamp; only rows created at or after it
+        after: Optional cursor of a row (URL-safe base64 of the JSON pair
+            [updated_at, id], as in the listings' next_cursor); only rows
+            after it in export order
+
+    Returns:
+        200: Streamed export (application/x-ndjson or text/csv)
+        400: Invalid format, doc_type, filter, fields, timestamp or cursor
+        500: Database error before the first row was sent
+
+    Raises:
+        HTTPException: Various error conditions with appropriate status codes
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format '{export_format}'. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    try:
+        columns = resolve_export_columns(doc_type, fields, default_summary=export_format == "csv")
+        updated_from = parse_updated_since(updated_since)
+        created_from = parse_updated_since(since, name='since')
+        if after is not None:
+            decode_cursor(after)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    pages = iter_export_pages(
+        get_supabase_client(),
+        doc_type=doc_type,
+        columns=columns,
+        subject=subject,
+        year=year,
+        language=language,
+        status=status_filter,
+        updated_since=updated_from,
+        after=after,
+        created_since=created_from
+    )
+
+    # Read the first page before answering, so bad filters and database
+    # errors still get a proper status code
+    try:
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = []
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+    def render(rows: List[Dict[str, Any]], first: bool = False) -> bytes:
+        if export_format == "csv":
+            return _csv_chunk(rows, columns, header=first)
+        return _ndjson_chunk(rows, columns)
+
+    async def body() -> AsyncIterator[bytes]:
+        exported = len(first_page)
+        try:
+            yield render(first_page, first=True)
+            if first_page:
+                async for page in pages:
+                    exported += len(page)
+                    yield render(page)
+        except Exception as e:
+            # Headers are already sent: end the response without its terminating
+            # chunk so the client sees a truncated transfer, not a short export
+            logger.error(f"Export aborted after {exported} rows: {e}")
+            raise
+        finally:
+            await pages.aclose()
+
+    extension = "ndjson" if export_format == "ndjson" else "csv"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{doc_type}-export.{extension}"',
+            "Cache-Control": "no-store"
+        }
+    )
+
+
 @router.get("/extractions/{extraction_id}", status_code=status.HTTP_200_OK)
 @limiter.limit("100/minute")  # type: ignore[untyped-decorator]
 async def get_extraction_by_id(request: Request, extraction_id: str) -> Response:
@@ -469,11 +902,16 @@ async def get_extraction_by_id(request: Request, extraction_id: str) -> Response
     by its UUID, including all extracted data, bounding boxes, and
     processing metadata.
 
+    Responses carry a strong ETag (derived from updated_at and status);
+    send it back in If-None-Match to get an empty 304 while the record is
+    unchanged. Records are served from a short-lived in-process cache.
+
     Args:
         extraction_id: UUID of the extraction to retrieve
 
     Returns:
         200: Extraction result found
+        304: Extraction unchanged (If-None-Match matched the ETag)
         400: Invalid UUID format
         404: Extraction not found
         500: Database error
@@ -490,28 +928,50 @@ async def get_extraction_by_id(request: Request, extraction_id: str) -> Response
             detail=f"Invalid UUID format: {extraction_id}"
         )
 
-    # Retrieve extraction from database
-    supabase_client = get_supabase_client()
+    # Serve from the in-process read cache (invalidated by app/db update functions)
+    cache = get_read_cache()
+    cached = cache.get('extractions', extraction_id)
+    cache_hit = cached is not None
 
-    try:
-        result = await get_extraction(supabase_client, extraction_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Database error: {str(e)}"
-        )
+    if cached is None:
+        # Retrieve extraction from database
+        supabase_client = get_supabase_client()
 
-    if result is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Extraction not found: {extraction_id}"
-        )
+        try:
+            result = await get_extraction(supabase_client, extraction_id)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database error: {str(e)}"
+            )
+
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Extraction not found: {extraction_id}"
+            )
+
+        cached = cache.put('extractions', extraction_id, result)
+
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": "no-cache",
+        "X-Cache-Hit": "true" if cache_hit else "false"
+    }
+
+    # Unchanged since the client's copy: empty 304
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
     # Return extraction result as JSON
+    # Compressed once per content-coding and kept with the cached record
+    content, encoding = cached.encoded(request.headers.get("accept-encoding"))
+    mark_encoded(headers, encoding)
     return Response(
-        content=json.dumps(result),
+        content=content,
         media_type="application/json",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        headers=headers
     )
 
 
@@ -521,7 +981,9 @@ async def list_all_extractions(
     request: Request,
     limit: int = 50,
     offset: int = 0,
-    status_filter: Optional[str] = None
+    status_filter: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> Response:
     """
     List extraction records with pagination and optional status filtering.
@@ -530,14 +992,26 @@ async def list_all_extractions(
     ordered by creation date (newest first). Results can be filtered
     by status.
 
+    Pages are best followed with cursors: pass pagination.next_cursor of one
+    response as cursor= of the next request. Cursor pages cost the same at
+    any depth and do not shift when new extractions arrive; offset is kept
+    for existing clients.
+
+    By default each record is a summary (file, status, exam metadata, cost
+    and timing columns) without the groups/tables/processing_metadata JSON,
+    so the payload does not grow with paper size. Use fields= to choose
+    columns, or fields=* for full records.
+
     Args:
         limit: Maximum number of records to return (default: 50, max: 100)
         offset: Number of records to skip for pagination (default: 0)
         status_filter: Optional status filter ('pending', 'completed', 'failed', 'partial')
+        fields: Optional comma-separated column list (e.g. "file_name,status,subject"), or "*"
+        cursor: Opaque cursor from a previous response (not combined with offset)
 
     Returns:
-        200: List of extractions with pagination metadata
-        400: Invalid parameters (limit, offset, or status)
+        200: List of extractions with pagination metadata (including next_cursor)
+        400: Invalid parameters (limit, offset, status, fields, or cursor)
         500: Database error
 
     Raises:
@@ -556,6 +1030,15 @@ async def list_all_extractions(
             detail="Offset must be non-negative"
         )
 
+    # Validate projection (default: summary columns)
+    try:
+        columns = EXTRACTION_SUMMARY_COLUMNS if fields is None else parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
     # Retrieve extractions from database
     supabase_client = get_supabase_client()
 
@@ -564,7 +1047,9 @@ async def list_all_extractions(
             supabase_client,
             limit=limit,
             offset=offset,
-            status=status_filter
+            status=status_filter,
+            columns=columns,
+            cursor=cursor
         )
     except ValueError as e:
         raise HTTPException(
@@ -584,12 +1069,13 @@ async def list_all_extractions(
             "limit": limit,
             "offset": offset,
             "count": len(results),
-            "has_more": len(results) == limit
+            "has_more": len(results) == limit,
+            "next_cursor": next_cursor(results, limit)
         }
     }
 
     return Response(
-        content=json.dumps(response_data, default=str),  # default=str handles UUID/datetime
+        content=dumps(response_data),
         media_type="application/json",
         status_code=status.HTTP_200_OK
     )
@@ -597,21 +1083,27 @@ async def list_all_extractions(
 
 @router.get("/extractions/{extraction_id}/bounding-boxes", status_code=status.HTTP_200_OK)
 @limiter.limit("100/minute")  # type: ignore[untyped-decorator]
-async def get_bounding_boxes(request: Request, extraction_id: str) -> Response:
+async def get_bounding_boxes(
+    request: Request,
+    extraction_id: str,
+    fields: Optional[str] = None
+) -> Response:
     """
     Retrieve all bounding boxes for an extraction.
 
     This endpoint returns all bounding box coordinates for elements
     in the extracted PDF, keyed by element_id. Useful for implementing
     citation features that need to link extracted content to specific
-    locations in the PDF.
+    locations in the PDF. Only the bounding_boxes column is read.
 
     Args:
         extraction_id: UUID of the extraction
+        fields: Optional comma-separated bbox attributes to return
+            (x1, y1, x2, y2, page), e.g. "page" for a page index
 
     Returns:
         200: Dictionary of bounding boxes (element_id -> bbox)
-        400: Invalid UUID format
+        400: Invalid UUID format or fields
         404: Extraction not found
         500: Database error
 
@@ -627,11 +1119,19 @@ async def get_bounding_boxes(request: Request, extraction_id: str) -> Response:
             detail=f"Invalid UUID format: {extraction_id}"
         )
 
-    # Retrieve extraction from database
+    try:
+        bbox_fields = parse_fields(fields, BOUNDING_BOX_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    # Retrieve only the bounding boxes from database
     supabase_client = get_supabase_client()
 
     try:
-        result = await get_extraction(supabase_client, extraction_id)
+        result = await get_extraction(supabase_client, extraction_id, columns=['bounding_boxes'])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -645,10 +1145,15 @@ async def get_bounding_boxes(request: Request, extraction_id: str) -> Response:
         )
 
     # Extract bounding_boxes from result
-    bounding_boxes = result.get("bounding_boxes", {})
+    bounding_boxes = result.get("bounding_boxes") or {}
+    if bbox_fields is not None:
+        bounding_boxes = {
+            element_id: {k: v for k, v in bbox.items() if k in bbox_fields}
+            for element_id, bbox in bounding_boxes.items()
+        }
 
     return Response(
-        content=json.dumps(bounding_boxes),
+        content=dumps(bounding_boxes),
         media_type="application/json",
         status_code=status.HTTP_200_OK
     )
@@ -656,7 +1161,12 @@ async def get_bounding_boxes(request: Request, extraction_id: str) -> Response:
 
 @router.get("/extractions/{extraction_id}/elements/{element_id}", status_code=status.HTTP_200_OK)
 @limiter.limit("100/minute")  # type: ignore[untyped-decorator]
-async def get_element(request: Request, extraction_id: str, element_id: str) -> Response:
+async def get_element(
+    request: Request,
+    extraction_id: str,
+    element_id: str,
+    fields: Optional[str] = None
+) -> Response:
     """
     Retrieve a specific element with its bounding box and content.
 
@@ -664,13 +1174,18 @@ async def get_element(request: Request, extraction_id: str, element_id: str) ->
     (heading, paragraph, table, etc.) including its bounding box coordinates
     and associated content. Useful for implementing precise citation features.
 
+    Only bounding_boxes is read unless element_type or content is requested,
+    which also reads the sections and tables columns to match content.
+
     Args:
         extraction_id: UUID of the extraction
         element_id: ID of the element (from bounding_boxes keys)
+        fields: Optional comma-separated response fields
+            (element_type, bounding_box, content); element_id is always returned
 
     Returns:
         200: Element data with bounding box, type, and content
-        400: Invalid UUID format
+        400: Invalid UUID format or fields
         404: Extraction or element not found
         500: Database error
 
@@ -686,11 +1201,22 @@ async def get_element(request: Request, extraction_id: str, element_id: str) ->
             detail=f"Invalid UUID format: {extraction_id}"
         )
 
+    try:
+        element_fields = parse_fields(fields, ELEMENT_FIELDS) or list(ELEMENT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    # Content matching (and therefore element_type) needs sections/tables
+    needs_content = 'content' in element_fields or 'element_type' in element_fields
+    columns = ['bounding_boxes', 'sections', 'tables'] if needs_content else ['bounding_boxes']
+
     # Retrieve extraction from database
     supabase_client = get_supabase_client()
 
     try:
-        result = await get_extraction(supabase_client, extraction_id)
+        result = await get_extraction(supabase_client, extraction_id, columns=columns)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -704,7 +1230,7 @@ async def get_element(request: Request, extraction_id: str, element_id: str) ->
         )
 
     # Extract bounding_boxes and find the specific element
-    bounding_boxes = result.get("bounding_boxes", {})
+    bounding_boxes = result.get("bounding_boxes") or {}
 
     if element_id not in bounding_boxes:
         raise HTTPException(
@@ -720,7 +1246,7 @@ async def get_element(request: Request, extraction_id: str, element_id: str) ->
     element_type = "unknown"
 
     # Check sections for matching element
-    sections = result.get("sections", [])
+    sections = (result.get("sections") or []) if needs_content else []
     for section in sections:
         if isinstance(section, dict):
             section_bbox = section.get("bbox")
@@ -735,7 +1261,7 @@ async def get_element(request: Request, extraction_id: str, element_id: str) ->
 
     # Check tables if not found in sections
     if element_content is None:
-        tables = result.get("tables", [])
+        tables = (result.get("tables") or []) if needs_content else []
         for table in tables:
             if isinstance(table, dict):
                 table_bbox = table.get("bbox")
@@ -760,9 +1286,10 @@ async def get_element(request: Request, extraction_id: str, element_id: str) ->
         "bounding_box": bbox,
         "content": element_content
     }
+    element_data = {k: v for k, v in element_data.items() if k == "element_id" or k in element_fields}
 
     return Response(
-        content=json.dumps(element_data),
+        content=dumps(element_data),
         media_type="application/json",
         status_code=status.HTTP_200_OK
     )
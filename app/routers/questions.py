@@ -0,0 +1,130 @@
+"""
+Question search API endpoints.
+
+Searches the normalized questions table (one row per question of every
+completed or partial question paper) by text and paper metadata.
+"""
+
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+
+from app.db.pagination import next_cursor
+from app.db.questions import search_questions
+from app.db.supabase_client import get_supabase_client
+from app.middleware.rate_limit import get_limiter
+from app.utils.serialization import dumps
+
+router = APIRouter(prefix="/api", tags=["questions"])
+limiter = get_limiter()
+
+# Longest accepted full-text query
+MAX_QUERY_LENGTH = 200
+
+
+@router.get("/questions/search", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def search(
+    request: Request,
+    q: Optional[str] = None,
+    subject: Optional[str] = None,
+    year: Optional[int] = None,
+    grade: Optional[str] = None,
+    language: Optional[str] = None,
+    question_type: Optional[str] = None,
+    extraction_id: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Response:
+    """
+    Search questions across all papers.
+
+    q is a full-text query in web search syntax: words must all appear,
+    "quoted phrases" must appear in order, -word excludes and OR
+    alternates. Matching ignores case but does not stem, so search for
+    "franchise OR franchises" to catch both. Filters narrow by paper
+    metadata and question type. Results are ordered newest first; follow
+    pagination.next_cursor with cursor= for the next page.
+
+    Args:
+        q: Optional full-text query (max 200 characters)
+        subject: Optional subject prefix, case-insensitive (e.g. "Business Studies")
+        year: Optional exam year
+        grade: Optional grade (e.g. "12")
+        language: Optional paper language (e.g. "English")
+        question_type: Optional 'mcq', 'match' or 'guide_table'
+        extraction_id: Optional UUID of a paper to search within
+        limit: Maximum number of questions to return (default: 50, max: 100)
+        cursor: Opaque cursor from a previous response
+
+    Returns:
+        200: Matching questions with pagination metadata (including next_cursor)
+        400: Invalid parameters
+        500: Database error
+
+    Raises:
+        HTTPException: Various error conditions with appropriate status codes
+    """
+    if limit < 1 or limit > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Limit must be between 1 and 100"
+        )
+
+    if q is not None and len(q) > MAX_QUERY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"q must be at most {MAX_QUERY_LENGTH} characters"
+        )
+
+    if extraction_id is not None:
+        try:
+            uuid.UUID(extraction_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid UUID format: {extraction_id}"
+            )
+
+    supabase_client = get_supabase_client()
+
+    try:
+        results = await search_questions(
+            supabase_client,
+            q=q.strip() if q else None,
+            subject=subject,
+            year=year,
+            grade=grade,
+            language=language,
+            question_type=question_type,
+            extraction_id=extraction_id,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+    response_data = {
+        "data": results,
+        "pagination": {
+            "limit": limit,
+            "count": len(results),
+            "has_more": len(results) == limit,
+            "next_cursor": next_cursor(results, limit)
+        }
+    }
+
+    return Response(
+        content=dumps(response_data),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
@@ -10,9 +10,11 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
 
+from app.db.pagination import next_cursor
 from app.db.review_queue import get_pending_reviews, resolve_review, get_review_by_id
 from app.db.supabase_client import get_supabase_client
 from app.middleware.rate_limit import get_limiter
+from app.utils.serialization import dumps
 
 router = APIRouter(prefix="/api", tags=["review-queue"])
 limiter = get_limiter()
@@ -30,21 +32,24 @@ async def get_review_queue(
     request: Request,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ) -> Response:
     """
     Retrieve pending review queue items (not yet resolved).
 
     This endpoint returns a paginated list of failed extractions that
     have exceeded the retry limit and require manual review. Items are
-    ordered by queued_at timestamp (newest first).
+    ordered by queued_at timestamp (newest first). Follow
+    pagination.next_cursor with cursor= to page without offsets.
 
     Args:
         limit: Maximum number of records to return (default: 50, max: 100)
         offset: Number of records to skip for pagination (default: 0)
+        cursor: Opaque cursor from a previous response (not combined with offset)
 
     Returns:
         200: List of pending review queue items with pagination metadata
-        400: Invalid parameters (limit or offset)
+        400: Invalid parameters (limit, offset or cursor)
         500: Database error
 
     Raises:
@@ -70,7 +75,8 @@ async def get_review_queue(
         results = await get_pending_reviews(
             supabase_client,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
     except ValueError as e:
         raise HTTPException(
@@ -90,13 +96,13 @@ async def get_review_queue(
             "limit": limit,
             "offset": offset,
             "count": len(results),
-            "has_more": len(results) == limit
+            "has_more": len(results) == limit,
+            "next_cursor": next_cursor(results, limit, key='queued_at')
         }
     }
 
-    import json
     return Response(
-        content=json.dumps(response_data, default=str),  # default=str handles UUID/datetime
+        content=dumps(response_data),
         media_type="application/json",
         status_code=status.HTTP_200_OK
     )
@@ -165,9 +171,8 @@ async def resolve_review_item(
         )
 
     # Return updated review record
-    import json
     return Response(
-        content=json.dumps(result, default=str),
+        content=dumps(result),
         media_type="application/json",
         status_code=status.HTTP_200_OK
     )
@@ -221,9 +226,8 @@ async def get_review_item(request: Request, review_id: str) -> Response:
         )
 
     # Return review record as JSON
-    import json
     return Response(
-        content=json.dumps(result, default=str),
+        content=dumps(result),
         media_type="application/json",
         status_code=status.HTTP_200_OK
     )
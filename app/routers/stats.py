@@ -5,11 +5,21 @@ Provides endpoints for caching statistics and routing performance metrics.
 """
 
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, cast
 from fastapi import APIRouter, Request, Response, HTTPException, status
 
+from app.db.dedup import get_dedup_cache
+from app.db.read_cache import get_read_cache
 from app.db.supabase_client import get_supabase_client
+from app.db.write_buffer import get_write_buffer_metrics
 from app.middleware.rate_limit import get_limiter
+from app.services.admission import get_admission_controller
+from app.services.hedging import get_hedging_stats
+from app.services.scheduler import get_scheduler_stats
+from app.services.webhook_outbox import get_webhook_stats
+from app.utils.live_stats import get_live_stats
+from app.utils.resilience import get_resilience_stats
+from app.utils.serialization import dumps
 
 router = APIRouter(prefix="/api/stats", tags=["statistics"])
 limiter = get_limiter()
@@ -19,6 +29,64 @@ _routing_stats_cache: Optional[Dict[str, Any]] = None
 _routing_stats_cache_time: float = 0
 _ROUTING_STATS_CACHE_TTL = 300  # 5 minutes in seconds
 
+# Tables reported individually under "by_table"
+_STATS_TABLES = ('extractions', 'memo_extractions')
+
+
+def _as_float(value: Any) -> float:
+    """Convert a nullable numeric aggregate to float (NULL -> 0.0)."""
+    return float(value) if value is not None else 0.0
+
+
+def _build_caching_stats(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive cache hit rate and averages from get_caching_stats() counts."""
+    total_requests = int(row.get('total_requests') or 0)
+    cache_hits = int(row.get('cache_hits') or 0)
+    total_cached_tokens = int(_as_float(row.get('total_cached_tokens')))
+
+    cache_hit_rate = (cache_hits / total_requests * 100) if total_requests > 0 else 0.0
+    avg_cached_tokens_per_hit = (total_cached_tokens / cache_hits) if cache_hits > 0 else 0.0
+
+    return {
+        "total_requests": total_requests,
+        "cache_hits": cache_hits,
+        "cache_misses": total_requests - cache_hits,
+        "cache_hit_rate": round(cache_hit_rate, 2),
+        "total_cached_tokens": total_cached_tokens,
+        "avg_cached_tokens_per_hit": round(avg_cached_tokens_per_hit, 2)
+    }
+
+
+def _build_routing_stats(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive cost savings and round get_routing_stats() aggregates."""
+    total_cost_usd = _as_float(row.get('total_cost_usd'))
+    estimated_pure_vision_cost_usd = _as_float(row.get('estimated_pure_vision_cost_usd'))
+    total_savings_usd = estimated_pure_vision_cost_usd - total_cost_usd
+    savings_percent = (
+        (total_savings_usd / estimated_pure_vision_cost_usd * 100)
+        if estimated_pure_vision_cost_usd > 0 else 0.0
+    )
+
+    return {
+        "total_extractions": int(row.get('total_extractions') or 0),
+        "routing_distribution": {
+            method: int(count) for method, count in (row.get('routing_distribution') or {}).items()
+        },
+        "avg_quality_score": round(_as_float(row.get('avg_quality_score')), 3),
+        "cost_metrics": {
+            "total_cost_usd": round(total_cost_usd, 6),
+            "estimated_pure_vision_cost_usd": round(estimated_pure_vision_cost_usd, 6),
+            "total_savings_usd": round(total_savings_usd, 6),
+            "savings_percent": round(savings_percent, 2)
+        },
+        "performance_metrics": {
+            "avg_processing_time_seconds": round(_as_float(row.get('avg_processing_time_seconds')), 3),
+            "p50_processing_time": round(_as_float(row.get('p50_processing_time')), 3),
+            "p95_processing_time": round(_as_float(row.get('p95_processing_time')), 3),
+            "p99_processing_time": round(_as_float(row.get('p99_processing_time')), 3)
+        }
+    }
+
 
 @router.get("/caching", status_code=status.HTTP_200_OK)
 @limiter.limit("100/minute")  # type: ignore[untyped-decorator]
@@ -26,8 +94,9 @@ async def get_caching_stats(request: Request) -> Response:
     """
     Get context caching statistics showing cache hit rate and cost savings.
 
-    This endpoint aggregates cache usage data from all completed extractions,
-    calculating the cache hit rate and estimated token savings from caching.
+    This endpoint aggregates cache usage data from all completed question paper
+    and memo extractions, calculating the cache hit rate and estimated token
+    savings from caching. Counting is done in the database (get_caching_stats).
 
     Returns:
         200: JSON with caching statistics including:
@@ -37,6 +106,7 @@ async def get_caching_stats(request: Request) -> Response:
             - cache_hit_rate: Percentage of requests with cache hits (0-100)
             - total_cached_tokens: Total tokens saved via caching
             - avg_cached_tokens_per_hit: Average tokens cached per hit
+            - by_table: The same fields for extractions and memo_extractions
         500: Database error
 
     Example response:
@@ -46,7 +116,11 @@ async def get_caching_stats(request: Request) -> Response:
             "cache_misses": 150,
             "cache_hit_rate": 85.0,
             "total_cached_tokens": 425000,
-            "avg_cached_tokens_per_hit": 500.0
+            "avg_cached_tokens_per_hit": 500.0,
+            "by_table": {
+                "extractions": {"total_requests": 700, ...},
+                "memo_extractions": {"total_requests": 300, ...}
+            }
         }
 
     Raises:
@@ -55,48 +129,14 @@ async def get_caching_stats(request: Request) -> Response:
     supabase_client = get_supabase_client()
 
     try:
-        # Query all completed extractions (exclude pending/failed without results)
-        response = supabase_client.table('extractions').select(
-            'processing_metadata'
-        ).in_('status', ['completed', 'partial']).execute()
-
-        extractions = response.data
-
-        # Calculate cache statistics
-        total_requests = 0
-        cache_hits = 0
-        cache_misses = 0
-        total_cached_tokens = 0
-
-        for extraction in extractions:
-            metadata = extraction.get('processing_metadata')
-            if not metadata or not isinstance(metadata, dict):
-                continue
-
-            total_requests += 1
-
-            # Check if cache was used
-            cache_hit = metadata.get('cache_hit', False)
-            cached_tokens = metadata.get('cached_tokens', 0)
-
-            if cache_hit:
-                cache_hits += 1
-                total_cached_tokens += cached_tokens
-            else:
-                cache_misses += 1
-
-        # Calculate derived metrics
-        cache_hit_rate = (cache_hits / total_requests * 100) if total_requests > 0 else 0.0
-        avg_cached_tokens_per_hit = (total_cached_tokens / cache_hits) if cache_hits > 0 else 0.0
-
-        # Build response
-        stats = {
-            "total_requests": total_requests,
-            "cache_hits": cache_hits,
-            "cache_misses": cache_misses,
-            "cache_hit_rate": round(cache_hit_rate, 2),
-            "total_cached_tokens": total_cached_tokens,
-            "avg_cached_tokens_per_hit": round(avg_cached_tokens_per_hit, 2)
+        # Aggregated server-side by the get_caching_stats() function (migration 010)
+        response = supabase_client.rpc('get_caching_stats', {}).execute()
+        aggregates = cast(Dict[str, Any], response.data or {})
+
+        stats = _build_caching_stats(aggregates.get('all') or {})
+        stats["by_table"] = {
+            table: _build_caching_stats(aggregates.get(table) or {})
+            for table in _STATS_TABLES
         }
 
         import json
@@ -121,6 +161,7 @@ async def get_routing_stats(request: Request) -> Response:
 
     This endpoint provides insights into how the hybrid extraction pipeline routes
     PDFs between different processing methods, along with cost and performance metrics.
+    Question papers and memos are aggregated in the database (get_routing_stats).
     Results are cached for 5 minutes to reduce database load.
 
     Returns:
@@ -135,7 +176,9 @@ async def get_routing_stats(request: Request) -> Response:
                 - savings_percent: Percentage cost reduction
             - performance_metrics:
                 - avg_processing_time_seconds: Average processing time
-                - p95_processing_time: 95th percentile processing time
+                - p50_processing_time / p95_processing_time / p99_processing_time:
+                  Processing time percentiles (continuous, interpolated)
+            - by_table: The same fields for extractions and memo_extractions
         500: Database error
 
     Example response:
@@ -155,7 +198,13 @@ async def get_routing_stats(request: Request) -> Response:
             },
             "performance_metrics": {
                 "avg_processing_time_seconds": 2.3,
-                "p95_processing_time": 5.1
+                "p50_processing_time": 1.9,
+                "p95_processing_time": 5.1,
+                "p99_processing_time": 8.4
+            },
+            "by_table": {
+                "extractions": {"total_extractions": 700, ...},
+                "memo_extractions": {"total_extractions": 300, ...}
             }
         }
 
@@ -178,85 +227,14 @@ async def get_routing_stats(request: Request) -> Response:
     supabase_client = get_supabase_client()
 
     try:
-        # Query all extractions with relevant fields
-        response = supabase_client.table('extractions').select(
-            'processing_method, quality_score, processing_time_seconds, cost_estimate_usd'
-        ).execute()
-
-        extractions = response.data
-
-        # Initialize counters
-        total_extractions = len(extractions)
-        routing_distribution: Dict[str, int] = {}
-        quality_scores: list[float] = []
-        processing_times: list[float] = []
-        total_cost_usd = 0.0
-        estimated_pure_vision_cost_usd = 0.0
-
-        for extraction in extractions:
-            # Count routing distribution
-            method = extraction.get('processing_method', 'unknown')
-            routing_distribution[method] = routing_distribution.get(method, 0) + 1
-
-            # Collect quality scores
-            quality_score = extraction.get('quality_score')
-            if quality_score is not None:
-                quality_scores.append(float(quality_score))
-
-            # Collect processing times
-            processing_time = extraction.get('processing_time_seconds')
-            if processing_time is not None:
-                processing_times.append(float(processing_time))
-
-            # Calculate cost metrics
-            cost = extraction.get('cost_estimate_usd')
-            if cost is not None:
-                cost_float = float(cost)
-                total_cost_usd += cost_float
-
-                # Estimate pure vision cost (hybrid saves 80%, so multiply by 5)
-                if method == 'hybrid':
-                    estimated_pure_vision_cost_usd += cost_float * 5
-                else:
-                    # Vision fallback or partial - already full cost
-                    estimated_pure_vision_cost_usd += cost_float
-
-        # Calculate average quality score
-        avg_quality_score = (sum(quality_scores) / len(quality_scores)) if quality_scores else 0.0
-
-        # Calculate cost savings
-        total_savings_usd = estimated_pure_vision_cost_usd - total_cost_usd
-        savings_percent = (
-            (total_savings_usd / estimated_pure_vision_cost_usd * 100)
-            if estimated_pure_vision_cost_usd > 0 else 0.0
-        )
-
-        # Calculate performance metrics
-        avg_processing_time = (sum(processing_times) / len(processing_times)) if processing_times else 0.0
-
-        # Calculate p95 processing time
-        p95_processing_time = 0.0
-        if processing_times:
-            sorted_times = sorted(processing_times)
-            p95_index = int(len(sorted_times) * 0.95)
-            if p95_index < len(sorted_times):
-                p95_processing_time = sorted_times[p95_index]
-
-        # Build response
-        stats = {
-            "total_extractions": total_extractions,
-            "routing_distribution": routing_distribution,
-            "avg_quality_score": round(avg_quality_score, 3),
-            "cost_metrics": {
-                "total_cost_usd": round(total_cost_usd, 6),
-                "estimated_pure_vision_cost_usd": round(estimated_pure_vision_cost_usd, 6),
-                "total_savings_usd": round(total_savings_usd, 6),
-                "savings_percent": round(savings_percent, 2)
-            },
-            "performance_metrics": {
-                "avg_processing_time_seconds": round(avg_processing_time, 3),
-                "p95_processing_time": round(p95_processing_time, 3)
-            }
+        # Aggregated server-side by the get_routing_stats() function (migration 010)
+        response = supabase_client.rpc('get_routing_stats', {}).execute()
+        aggregates = cast(Dict[str, Any], response.data or {})
+
+        stats = _build_routing_stats(aggregates.get('all') or {})
+        stats["by_table"] = {
+            table: _build_routing_stats(aggregates.get(table) or {})
+            for table in _STATS_TABLES
         }
 
         # Update cache
@@ -276,3 +254,211 @@ async def get_routing_stats(request: Request) -> Response:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {str(e)}"
         )
+
+
+@router.get("/live", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_live_stats_endpoint(request: Request) -> Response:
+    """
+    Get rolling latency, token and quality distributions for this worker.
+
+    Unlike /routing (all-time, database-backed, cached for 5 minutes), these
+    figures come from in-process quantile sketches over the last 1 minute,
+    15 minutes and 1 hour, so recent regressions show up immediately. Each
+    worker process reports its own traffic only.
+
+    Metrics (keyed by processing method, e.g. hybrid, vision_fallback, partial):
+        - e2e_latency_ms: Upload to stored result
+        - parse_latency_ms: OpenDataLoader structure extraction (method "opendataloader")
+        - gemini_latency_ms: Gemini generate_content call
+        - total_tokens: Gemini total token count per document
+        - quality_score: OpenDataLoader quality score
+
+    Returns:
+        200: JSON with per-window summaries (count, mean, min, max, p50, p90, p95, p99)
+
+    Example response:
+        {
+            "windows": ["1m", "15m", "1h"],
+            "quantiles": ["p50", "p90", "p95", "p99"],
+            "metrics": {
+                "e2e_latency_ms": {
+                    "hybrid": {
+                        "1m": {"count": 3, "mean": 8123.4, "min": 6100.2, "max": 9900.0,
+                               "p50": 8050.1, "p90": 9880.3, "p95": 9880.3, "p99": 9880.3},
+                        "15m": {...},
+                        "1h": {...}
+                    }
+                }
+            }
+        }
+    """
+    return Response(
+        content=dumps(get_live_stats()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/write-buffer", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_write_buffer_stats(request: Request) -> Response:
+    """
+    Get write-behind buffer statistics for batch extraction inserts.
+
+    Counters are per process and cover every batch processed since startup.
+
+    Returns:
+        200: JSON with flush statistics including:
+            - flushes: Number of bulk insert flushes
+            - rows_flushed: Total rows written through the buffer
+            - conflict_fallbacks: Flushes retried row-by-row after a file_hash conflict
+            - failed_flushes: Flushes where at least one row could not be stored
+            - avg_batch_size / max_batch_size / last_batch_size: Rows per flush
+            - avg_flush_latency_ms / max_flush_latency_ms / last_flush_latency_ms
+    """
+    return Response(
+        content=dumps(get_write_buffer_metrics()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/webhooks", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_webhook_delivery_stats(request: Request) -> Response:
+    """
+    Get webhook outbox delivery statistics for this process.
+
+    Enqueue-to-delivery and per-attempt latency quantiles are reported by
+    /api/stats/live (webhook_delivery_latency_ms, webhook_attempt_ms).
+
+    Returns:
+        200: JSON with delivery statistics including:
+            - enqueued / enqueue_failures: Events written to the outbox, and
+              events delivered in-process because the write failed
+            - attempts / delivered / failed_attempts / dead_lettered
+            - fallback_in_flight: In-process deliveries still running
+            - dispatcher: Worker pool state (running, workers, per_host_limit,
+              in_flight, queued)
+    """
+    return Response(
+        content=dumps(get_webhook_stats()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/admission", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_admission_stats(request: Request) -> Response:
+    """
+    Get the load signals behind admission control of uploads in this process.
+
+    Returns:
+        200: JSON with in_flight and limits (parse, gemini), spooled_bytes and
+            max_spooled_bytes, loop_lag_ms and max_loop_lag_ms, and rejected
+            (uploads refused with 503 since startup, by signal)
+    """
+    return Response(
+        content=dumps(get_admission_controller().snapshot()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/scheduler", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_scheduler_stats_endpoint(request: Request) -> Response:
+    """
+    Get the priority lanes of the parse and LLM stages in this process.
+
+    Returns:
+        200: JSON per stage (parse, llm) with slots, running, and lanes
+            (interactive, batch, background), each with weight, queued,
+            running, granted, preempted, avg_wait_ms, max_wait_ms and
+            oldest_wait_ms
+    """
+    return Response(
+        content=dumps(get_scheduler_stats()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/resilience", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_resilience_stats_endpoint(request: Request) -> Response:
+    """
+    Get the retry budget and circuit breakers of this process.
+
+    Returns:
+        200: JSON with retry_budget (ratio, min_retries, window_seconds,
+            successes, retries, available, rejected) and circuit_breakers per
+            dependency (state, consecutive_failures, failure_threshold,
+            retry_in_seconds, times_opened, rejected)
+    """
+    return Response(
+        content=dumps(get_resilience_stats()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/hedging", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_hedging_stats_endpoint(request: Request) -> Response:
+    """
+    Get hedged Gemini calls of this process.
+
+    Returns:
+        200: JSON with enabled, percentile, min_samples, budget (ratio,
+            window_seconds, hedges, available) and buckets per size bucket
+            (samples, threshold_ms, calls, hedged, hedge_won, hedge_lost,
+            budget_rejected)
+    """
+    return Response(
+        content=dumps(get_hedging_stats()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/read-cache", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_read_cache_stats(request: Request) -> Response:
+    """
+    Get statistics of the in-process read cache behind GET /api/extractions/{id}
+    and GET /api/batch/{id}.
+
+    Counters are per process and cover lookups since startup.
+
+    Returns:
+        200: JSON with entries, max_entries, ttl_seconds, hits, misses,
+            hit_rate (percent) and invalidations
+    """
+    return Response(
+        content=dumps(get_read_cache().snapshot()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/dedup-cache", status_code=status.HTTP_200_OK)
+@limiter.limit("100/minute")
+async def get_dedup_cache_stats(request: Request) -> Response:
+    """
+    Get statistics of the in-process cache of completed duplicate lookups
+    (file hash -> existing record) consulted by POST /api/extract and batch uploads.
+
+    Counters are per process and cover lookups since startup.
+
+    Returns:
+        200: JSON with entries, max_entries, ttl_seconds, hits, misses,
+            hit_rate (percent) and invalidations
+    """
+    return Response(
+        content=dumps(get_dedup_cache().snapshot()),
+        media_type="application/json",
+        status_code=status.HTTP_200_OK
+    )
@@ -0,0 +1,164 @@
+"""Admission control: shed new uploads when this worker is already saturated.
+
+When a batch job and a burst of interactive uploads hit one worker, accepting
+everything makes every request slow together until proxies time out. The
+AdmissionController keeps live load signals for the process:
+
+- OpenDataLoader parses and Gemini calls in flight, queued or running
+  (track("parse") / track("gemini"), in scheduler.run_stage and run_async_stage)
+- spooled upload bytes (uploads admitted and not yet answered)
+- event-loop lag (how late a periodic timer fires; blocking work left on
+  the loop shows up here)
+
+AdmissionMiddleware consults check() before POST /api/extract or /api/batch
+reads its body, and answers 503 with Retry-After when any signal is over its
+budget, so a client can retry another worker or later instead of waiting on
+work this one cannot finish.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config import get_settings
+
+# Kinds of tracked work with an in-flight budget
+TRACKED_KINDS = ("parse", "gemini")
+
+
+class AdmissionController:
+    """Live load signals with per-signal budgets.
+
+    Usage:
+        with get_admission_controller().track("parse"):
+            ...  # the parse
+        reason = get_admission_controller().check(incoming_bytes=len_of_upload)
+    """
+
+    def __init__(
+        self,
+        max_parses: int = 4,
+        max_gemini_calls: int = 16,
+        max_spooled_bytes: int = 1024 * 1024 * 1024,
+        max_loop_lag_ms: float = 1000.0,
+        lag_interval_seconds: float = 0.5,
+        lag_window: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = {"parse": max_parses, "gemini": max_gemini_calls}
+        self.max_spooled_bytes = max_spooled_bytes
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.lag_interval_seconds = lag_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {kind: 0 for kind in TRACKED_KINDS}
+        self._spooled_bytes = 0
+        self._lag_samples: List[float] = []
+        self._lag_window = lag_window
+        self._rejected: Dict[str, int] = {}
+        self._monitor: Optional["asyncio.Task[None]"] = None
+
+    @contextmanager
+    def track(self, kind: str) -> Iterator[None]:
+        """Count one in-flight unit of `kind` ("parse" or "gemini"); thread-safe."""
+        with self._lock:
+            self._in_flight[kind] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[kind] -= 1
+
+    @contextmanager
+    def spool(self, nbytes: int) -> Iterator[None]:
+        """Count an upload's bytes as spooled until the block exits."""
+        with self._lock:
+            self._spooled_bytes += nbytes
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._spooled_bytes -= nbytes
+
+    @property
+    def loop_lag_ms(self) -> float:
+        """Largest event-loop lag among the recent samples."""
+        return max(self._lag_samples, default=0.0)
+
+    def check(self, incoming_bytes: int = 0) -> Optional[str]:
+        """Reason to reject a new upload of incoming_bytes, or None to admit it."""
+        with self._lock:
+            for kind in TRACKED_KINDS:
+                if self._in_flight[kind] >= self.limits[kind]:
+                    return self._reject(kind, f"{kind}: {self._in_flight[kind]} in flight")
+            if self._spooled_bytes > 0 and self._spooled_bytes + incoming_bytes > self.max_spooled_bytes:
+                return self._reject("spooled_bytes", f"spooled uploads: {self._spooled_bytes // (1024 * 1024)}MB")
+            lag_ms = self.loop_lag_ms
+            if lag_ms > self.max_loop_lag_ms:
+                return self._reject("loop_lag", f"event loop lag: {lag_ms:.0f}ms")
+        return None
+
+    def _reject(self, signal: str, reason: str) -> str:
+        self._rejected[signal] = self._rejected.get(signal, 0) + 1
+        return reason
+
+    def record_lag(self, lag_ms: float) -> None:
+        """Add one event-loop lag sample (the monitor does this periodically)."""
+        with self._lock:
+            self._lag_samples.append(max(0.0, lag_ms))
+            del self._lag_samples[:-self._lag_window]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current load, budgets and rejection counts (for /api/stats/admission)."""
+        with self._lock:
+            return {
+                "in_flight": dict(self._in_flight),
+                "limits": dict(self.limits),
+                "spooled_bytes": self._spooled_bytes,
+                "max_spooled_bytes": self.max_spooled_bytes,
+                "loop_lag_ms": round(self.loop_lag_ms, 1),
+                "max_loop_lag_ms": self.max_loop_lag_ms,
+                "rejected": dict(self._rejected),
+            }
+
+    def reset(self) -> None:
+        """Zero lag samples and rejection counts (in-flight counts belong to running work)."""
+        with self._lock:
+            self._lag_samples = []
+            self._rejected = {}
+
+    async def start(self) -> None:
+        """Sample event-loop lag every lag_interval_seconds in the background."""
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._monitor_lag())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+
+    async def _monitor_lag(self) -> None:
+        while True:
+            started = self._clock()
+            await asyncio.sleep(self.lag_interval_seconds)
+            self.record_lag((self._clock() - started - self.lag_interval_seconds) * 1000)
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller (budgets from settings)."""
+    global _controller
+    if _controller is None:
+        settings = get_settings()
+        _controller = AdmissionController(
+            max_parses=settings.admission_max_parses,
+            max_gemini_calls=settings.admission_max_gemini_calls,
+            max_spooled_bytes=settings.admission_max_spooled_mb * 1024 * 1024,
+            max_loop_lag_ms=settings.admission_max_loop_lag_ms,
+        )
+    return _controller
@@ -8,7 +8,6 @@ Separate from the API batch endpoint (/api/batch) which handles uploads.
 import asyncio
 import glob
 import hashlib
-import json
 import os
 import shutil
 import time
@@ -17,10 +16,12 @@ from typing import List, Optional
 
 from app.config import get_settings
 from app.services.opendataloader_extractor import extract_pdf_structure
+from app.services.scheduler import run_stage
 from app.services.document_classifier import classify_document
 from app.services.gemini_client import get_gemini_client
 from app.services.memo_extractor import extract_memo_data_hybrid
 from app.services.pdf_extractor import extract_pdf_data_hybrid
+from app.utils.serialization import dumps
 
 
 async def process_single_pdf(
@@ -49,7 +50,7 @@ async def process_single_pdf(
 
     try:
         # Step 1: OpenDataLoader (local, fast, free)
-        doc = extract_pdf_structure(file_path)
+        doc = await run_stage("parse", extract_pdf_structure, file_path)
         info["quality"] = doc.quality_score
 
         # Step 2: Classify document type
@@ -87,9 +88,8 @@ async def process_single_pdf(
         pdf_path = os.path.join(input_dir, f"{canonical_stem}.pdf")
 
         # Save JSON result
-        json_str = json.dumps(result.model_dump(), indent=2, ensure_ascii=False)
-        with open(json_path, "w", encoding="utf-8") as f:
-            f.write(json_str)
+        with open(json_path, "wb") as f:
+            f.write(dumps(result.model_dump(), indent=True))
 
         # Move PDF to canonical name (shutil.move works across filesystems; check target exists)
         if os.path.exists(pdf_path) and os.path.abspath(file_path) != os.path.abspath(pdf_path):
@@ -201,8 +201,8 @@ async def process_directory(
 
     # Save summary
     summary_path = os.path.join(directory, "_batch_summary.json")
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    with open(summary_path, "wb") as f:
+        f.write(dumps(results, indent=True))
     print(f"\nSummary saved to {summary_path}")
 
     return results
@@ -0,0 +1,408 @@
+"""Columnar (Parquet) dataset export of normalized questions and memo answers.
+
+Flattens the nested `groups` JSON of question papers (FullExamPaper) and the
+`sections` JSON of memos (MarkingGuideline) into normalized tables, one row
+per entity, so analytics can scan "all questions" without parsing thousands of
+JSON blobs:
+
+    papers          one row per question paper
+    groups          QuestionGroup (paper -> group)
+    questions       Question (group -> question)
+    options         MultipleChoiceOption (question -> option)
+    match_items     MatchData column items (question -> item)
+    memos           one row per memo
+    memo_questions  MemoQuestion, including its marker_instruction
+    memo_answers    model answers, sub-question answers and structured answers
+
+Every table carries the partition columns year, subject and language and is
+written as a hive-partitioned Parquet dataset (`<table>/year=.../subject=.../
+language=.../part-*.parquet`).
+
+Records are read with the keyset export of app.db.export and flattened rows are
+buffered per table only up to `batch_rows` before being written out as new
+Parquet files, so memory is bounded by the batch size, not by the number of
+papers. Each run records a cursor of the last record it exported, its
+(updated_at, id), in a state file; the next run continues strictly after it
+(incremental mode), so unchanged records are never written twice. Rows of a
+record that changed since an earlier run are written again with the new
+updated_at, so readers should keep the latest updated_at per extraction_id.
+
+Requires the optional `pyarrow` package (pip install pyarrow); flattening
+itself has no dependencies.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from supabase import Client
+
+from app.db.export import EXPORT_KEY, iter_export_pages
+from app.db.pagination import encode_cursor
+from app.utils.serialization import dumps, dumps_str, loads
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+except ImportError:  # optional: pip install pyarrow
+    pyarrow = None
+
+# Hive partition columns of every table, outermost first
+PARTITION_COLUMNS = ('year', 'subject', 'language')
+
+# Flattened rows buffered per table before a Parquet write
+DEFAULT_BATCH_ROWS = 50_000
+
+# Incremental state file, kept in the dataset's root directory
+STATE_FILE = '_export_state.json'
+
+# Record columns read for each document type
+PAPER_SOURCE_COLUMNS = (
+    'id', 'file_name', 'subject', 'syllabus', 'year', 'session', 'grade', 'language',
+    'total_marks', 'groups', 'updated_at',
+)
+MEMO_SOURCE_COLUMNS = (
+    'id', 'file_name', 'subject', 'year', 'session', 'grade', 'total_marks', 'sections',
+    'updated_at',
+)
+
+# Column name -> Arrow type name, per table (partition columns are appended)
+TABLE_COLUMNS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    'papers': (
+        ('extraction_id', 'string'), ('file_name', 'string'), ('syllabus', 'string'),
+        ('session', 'string'), ('grade', 'string'), ('total_marks', 'int64'),
+        ('group_count', 'int32'), ('question_count', 'int32'), ('updated_at', 'string'),
+    ),
+    'groups': (
+        ('extraction_id', 'string'), ('group_index', 'int32'), ('group_id', 'string'),
+        ('title', 'string'), ('instructions', 'string'), ('question_count', 'int32'),
+        ('updated_at', 'string'),
+    ),
+    'questions': (
+        ('extraction_id', 'string'), ('group_id', 'string'), ('question_index', 'int32'),
+        ('question_id', 'string'), ('parent_id', 'string'), ('text', 'string'),
+        ('marks', 'int64'), ('scenario', 'string'), ('context', 'string'),
+        ('option_count', 'int32'), ('has_match_data', 'bool_'), ('guide_table', 'string'),
+        ('updated_at', 'string'),
+    ),
+    'options': (
+        ('extraction_id', 'string'), ('question_id', 'string'), ('option_index', 'int32'),
+        ('label', 'string'), ('text', 'string'), ('updated_at', 'string'),
+    ),
+    'match_items': (
+        ('extraction_id', 'string'), ('question_id', 'string'), ('column', 'string'),
+        ('column_title', 'string'), ('item_index', 'int32'), ('label', 'string'),
+        ('text', 'string'), ('updated_at', 'string'),
+    ),
+    'memos': (
+        ('memo_extraction_id', 'string'), ('file_name', 'string'), ('session', 'string'),
+        ('grade', 'string'), ('total_marks', 'int64'), ('section_count', 'int32'),
+        ('question_count', 'int32'), ('updated_at', 'string'),
+    ),
+    'memo_questions': (
+        ('memo_extraction_id', 'string'), ('section_id', 'string'), ('question_index', 'int32'),
+        ('question_id', 'string'), ('text', 'string'), ('type', 'string'), ('marks', 'int64'),
+        ('max_marks', 'int64'), ('marker_instruction', 'string'), ('notes', 'string'),
+        ('topic', 'string'), ('essay_structure', 'string'), ('answer_count', 'int32'),
+        ('updated_at', 'string'),
+    ),
+    'memo_answers': (
+        ('memo_extraction_id', 'string'), ('question_id', 'string'), ('answer_index', 'int32'),
+        ('kind', 'string'), ('key', 'string'), ('value', 'string'), ('updated_at', 'string'),
+    ),
+}
+
+_PARTITION_TYPES = (('year', 'int32'), ('subject', 'string'), ('language', 'string'))
+
+Row = Dict[str, Any]
+
+
+def _int(value: Any) -> Optional[int]:
+    """Integer value of a JSON field, or None when absent or not a number."""
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_text(value: Any) -> Optional[str]:
+    """JSON text of a nested value (None stays None)."""
+    return None if value is None else dumps_str(value)
+
+
+def _partition(record: Dict[str, Any]) -> Row:
+    """Partition columns of a record (memos have no language column: null partition)."""
+    return {
+        'year': _int(record.get('year')),
+        'subject': record.get('subject'),
+        'language': record.get('language'),
+    }
+
+
+def flatten_paper(record: Dict[str, Any]) -> Iterator[Tuple[str, Row]]:
+    """Flatten an extractions row (FullExamPaper) into (table, row) pairs.
+
+    Args:
+        record: Row with at least id, groups and the partition columns
+
+    Yields:
+        Tuple[str, Row]: Table name and row
+    """
+    extraction_id = str(record['id'])
+    updated_at = record.get('updated_at')
+    part = _partition(record)
+    groups = record.get('groups') or []
+    question_total = 0
+
+    for group_index, group in enumerate(groups):
+        questions = group.get('questions') or []
+        question_total += len(questions)
+        group_id = group.get('group_id')
+        yield 'groups', {
+            'extraction_id': extraction_id, 'group_index': group_index, 'group_id': group_id,
+            'title': group.get('title'), 'instructions': group.get('instructions'),
+            'question_count': len(questions), 'updated_at': updated_at, **part,
+        }
+
+        for question_index, question in enumerate(questions):
+            question_id = question.get('id')
+            options = question.get('options') or []
+            match_data = question.get('match_data')
+            yield 'questions', {
+                'extraction_id': extraction_id, 'group_id': group_id,
+                'question_index': question_index, 'question_id': question_id,
+                'parent_id': question.get('parent_id'), 'text': question.get('text'),
+                'marks': _int(question.get('marks')), 'scenario': question.get('scenario'),
+                'context': question.get('context'), 'option_count': len(options),
+                'has_match_data': bool(match_data),
+                'guide_table': _json_text(question.get('guide_table')),
+                'updated_at': updated_at, **part,
+            }
+
+            for option_index, option in enumerate(options):
+                yield 'options', {
+                    'extraction_id': extraction_id, 'question_id': question_id,
+                    'option_index': option_index, 'label': option.get('label'),
+                    'text': option.get('text'), 'updated_at': updated_at, **part,
+                }
+
+            if match_data:
+                for column in ('a', 'b'):
+                    title = match_data.get(f'column_{column}_title')
+                    for item_index, item in enumerate(match_data.get(f'column_{column}_items') or []):
+                        yield 'match_items', {
+                            'extraction_id': extraction_id, 'question_id': question_id,
+                            'column': column.upper(), 'column_title': title,
+                            'item_index': item_index, 'label': item.get('label'),
+                            'text': item.get('text'), 'updated_at': updated_at, **part,
+                        }
+
+    yield 'papers', {
+        'extraction_id': extraction_id, 'file_name': record.get('file_name'),
+        'syllabus': record.get('syllabus'), 'session': record.get('session'),
+        'grade': None if record.get('grade') is None else str(record['grade']),
+        'total_marks': _int(record.get('total_marks')), 'group_count': len(groups),
+        'question_count': question_total, 'updated_at': updated_at, **part,
+    }
+
+
+def _memo_answers(question: Dict[str, Any]) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """(kind, key, value) for every answer of a MemoQuestion."""
+    model_answers = question.get('model_answers')
+    if isinstance(model_answers, dict):
+        # e.g. {"positives": [...], "negatives": [...]}
+        for key, values in model_answers.items():
+            for value in values or []:
+                yield 'model_answer', key, value
+    elif model_answers:
+        for value in model_answers:
+            yield 'model_answer', None, value
+
+    for answer in question.get('answers') or []:
+        yield 'sub_answer', answer.get('sub_id'), answer.get('value')
+
+    for pair in question.get('structured_answer') or []:
+        yield 'structured_answer', None, _json_text(pair)
+
+
+def flatten_memo(record: Dict[str, Any]) -> Iterator[Tuple[str, Row]]:
+    """Flatten a memo_extractions row (MarkingGuideline) into (table, row) pairs.
+
+    Args:
+        record: Row with at least id, sections and the partition columns
+
+    Yields:
+        Tuple[str, Row]: Table name and row
+    """
+    memo_id = str(record['id'])
+    updated_at = record.get('updated_at')
+    part = _partition(record)
+    sections = record.get('sections') or []
+    question_total = 0
+
+    for section in sections:
+        section_id = section.get('section_id')
+        for question_index, question in enumerate(section.get('questions') or []):
+            question_total += 1
+            question_id = question.get('id')
+            answer_count = 0
+            for answer_index, (kind, key, value) in enumerate(_memo_answers(question)):
+                answer_count += 1
+                yield 'memo_answers', {
+                    'memo_extraction_id': memo_id, 'question_id': question_id,
+                    'answer_index': answer_index, 'kind': kind, 'key': key,
+                    'value': value if value is None or isinstance(value, str) else dumps_str(value),
+                    'updated_at': updated_at, **part,
+                }
+            yield 'memo_questions', {
+                'memo_extraction_id': memo_id, 'section_id': section_id,
+                'question_index': question_index, 'question_id': question_id,
+                'text': question.get('text'), 'type': question.get('type'),
+                'marks': _int(question.get('marks')), 'max_marks': _int(question.get('max_marks')),
+                'marker_instruction': question.get('marker_instruction'),
+                'notes': question.get('notes'), 'topic': question.get('topic'),
+                'essay_structure': _json_text(question.get('essay_structure')),
+                'answer_count': answer_count, 'updated_at': updated_at, **part,
+            }
+
+    yield 'memos', {
+        'memo_extraction_id': memo_id, 'file_name': record.get('file_name'),
+        'session': record.get('session'),
+        'grade': None if record.get('grade') is None else str(record['grade']),
+        'total_marks': _int(record.get('total_marks')), 'section_count': len(sections),
+        'question_count': question_total, 'updated_at': updated_at, **part,
+    }
+
+
+def _schema(table: str) -> Any:
+    """Arrow schema of a table (data columns, then partition columns)."""
+    return pyarrow.schema([
+        (name, getattr(pyarrow, type_name)())
+        for name, type_name in (*TABLE_COLUMNS[table], *_PARTITION_TYPES)
+    ])
+
+
+class DatasetWriter:
+    """Buffers flattened rows per table and writes them as partitioned Parquet."""
+
+    def __init__(self, output_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> None:
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.output_dir = output_dir
+        self.batch_rows = batch_rows
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.rows_written: Dict[str, int] = {table: 0 for table in TABLE_COLUMNS}
+        self._buffers: Dict[str, List[Row]] = {table: [] for table in TABLE_COLUMNS}
+        self._batches = 0
+        self._partitioning = pyarrow.dataset.partitioning(
+            pyarrow.schema([(name, getattr(pyarrow, type_name)()) for name, type_name in _PARTITION_TYPES]),
+            flavor='hive',
+        )
+
+    def add(self, table: str, row: Row) -> bool:
+        """Buffer a row; returns True once some table's buffer is full."""
+        buffer = self._buffers[table]
+        buffer.append(row)
+        return len(buffer) >= self.batch_rows
+
+    def flush(self, force: bool = False) -> None:
+        """Write every full buffer (every non-empty one if force) as new Parquet files."""
+        for table, rows in self._buffers.items():
+            if rows and (force or len(rows) >= self.batch_rows):
+                self._write(table, rows)
+                self._buffers[table] = []
+
+    def _write(self, table: str, rows: List[Row]) -> None:
+        self._batches += 1
+        pyarrow.dataset.write_dataset(
+            pyarrow.Table.from_pylist(rows, schema=_schema(table)),
+            base_dir=os.path.join(self.output_dir, table),
+            format='parquet',
+            partitioning=self._partitioning,
+            basename_template=f"part-{self.run_id}-{self._batches:05d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        self.rows_written[table] += len(rows)
+
+
+def read_state(output_dir: str) -> Dict[str, Any]:
+    """Incremental export state of a dataset directory ({} before the first run)."""
+    path = os.path.join(output_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as f:
+        state: Dict[str, Any] = loads(f.read())
+    return state
+
+
+def _write_state(output_dir: str, state: Dict[str, Any]) -> None:
+    path = os.path.join(output_dir, STATE_FILE)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(dumps(state, indent=True))
+    os.replace(path + '.tmp', path)
+
+
+async def export_dataset(
+    client: Client,
+    output_dir: str,
+    incremental: bool = True,
+    updated_since: Optional[Dict[str, str]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    page_size: int = 200,
+) -> Dict[str, int]:
+    """Export completed question papers and memos as a partitioned Parquet dataset.
+
+    Args:
+        client: Supabase client instance
+        output_dir: Dataset root directory (one subdirectory per table)
+        incremental: Continue after the last record of the previous run (state file)
+        updated_since: Explicit inclusive start per document type ('question_paper',
+            'memo'), overriding the state file
+        batch_rows: Rows buffered per table before a Parquet write
+        page_size: Records read per database round trip
+
+    Returns:
+        Dict[str, int]: Rows written per table
+
+    Raises:
+        RuntimeError: If pyarrow is not installed or a database query fails
+    """
+    writer = DatasetWriter(output_dir, batch_rows=batch_rows)
+    os.makedirs(output_dir, exist_ok=True)
+    state = read_state(output_dir) if incremental else {}
+    cursors: Dict[str, str] = dict(state.get('cursors', {}))
+
+    sources = (
+        ('question_paper', PAPER_SOURCE_COLUMNS, flatten_paper),
+        ('memo', MEMO_SOURCE_COLUMNS, flatten_memo),
+    )
+    for doc_type, columns, flatten in sources:
+        # An explicit start is inclusive; otherwise resume after the last exported record
+        start = (updated_since or {}).get(doc_type)
+        after = cursors.get(doc_type) if start is None else None
+        last_record: Optional[Dict[str, Any]] = None
+        async for page in iter_export_pages(
+            client,
+            doc_type=doc_type,
+            columns=columns,
+            status='completed',
+            updated_since=start,
+            page_size=page_size,
+            after=after,
+        ):
+            full = False
+            for record in page:
+                for table, row in flatten(record):
+                    full = writer.add(table, row) or full
+            last_record = page[-1]
+            if full:
+                # Parquet encoding is CPU/disk bound: keep it off the event loop
+                await asyncio.to_thread(writer.flush)
+        if last_record is not None:
+            cursors[doc_type] = encode_cursor(last_record, EXPORT_KEY)
+
+    await asyncio.to_thread(writer.flush, True)
+    _write_state(output_dir, {'cursors': cursors, 'last_run_id': writer.run_id})
+    return writer.rows_written
@@ -0,0 +1,384 @@
+"""Graceful shutdown: tracking, draining and checkpointing of in-flight work.
+
+Pipeline work (an /api/extract run, a batch loop, an in-process webhook
+fallback) runs inside WorkTracker.track(). When shutdown begins, on SIGTERM
+or SIGINT or at the latest in the application lifespan, the tracker stops
+admitting new work (reject_if_draining() answers 503 with Retry-After) and
+waits up to shutdown_drain_seconds for the tracked work to finish.
+
+Work still running at the deadline is checkpointed, then cancelled: its
+checkpoint callback saves what is needed to redo it (the uploaded PDFs and
+request parameters) under checkpoint_dir, and the caller receives
+WorkCheckpointed (503). On the next start resume_checkpoints() hands each
+saved checkpoint to the resume handler registered for its kind. A checkpoint
+directory is claimed by renaming it, so with several workers on one host
+each checkpoint is resumed once; a claim left by a worker that has since
+died is taken over on the next start. Checkpoints of a kind without a
+handler are moved aside (".unhandled-<name>") for an operator to inspect.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.services.scheduler import lane
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Retry-After sent while draining: long enough for a rolling deploy to
+# bring up the replacement instance
+RETRY_AFTER_SECONDS = 30
+
+_MANIFEST = "manifest.json"
+_CLAIMED_PREFIX = ".resuming-"
+_UNHANDLED_PREFIX = ".unhandled-"
+
+# Claims are named ".resuming-<pid>-<token>-<name>": the token tells this
+# process's claims from those of an earlier process that had the same pid
+# (e.g. pid 1 in a container)
+_CLAIM_TOKEN = uuid.uuid4().hex[:8]
+
+CheckpointFn = Callable[[], Awaitable[None]]
+ResumeFn = Callable[[Dict[str, Any], List[bytes]], Awaitable[Any]]
+
+
+class WorkCheckpointed(HTTPException):
+    """Tracked work was interrupted by shutdown after being checkpointed."""
+
+    def __init__(self, kind: str) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server is shutting down; this {kind} was saved and resumes after restart",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+        self.kind = kind
+
+
+class _Work:
+    """One tracked unit of work."""
+
+    __slots__ = ("kind", "checkpoint", "task", "interrupted")
+
+    def __init__(self, kind: str, checkpoint: Optional[CheckpointFn], task: "asyncio.Task[Any]") -> None:
+        self.kind = kind
+        self.checkpoint = checkpoint
+        self.task = task
+        self.interrupted = False
+
+
+class WorkTracker:
+    """Registry of in-flight work with drain-on-shutdown.
+
+    Usage:
+        async with get_work_tracker().track("extract", checkpoint=save_fn):
+            ...  # the pipeline
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._work: List[_Work] = []
+        self._idle: Optional[asyncio.Event] = None
+        self._drain_started: Optional[float] = None
+        self._drain_task: Optional["asyncio.Task[Dict[str, int]]"] = None
+
+    @property
+    def draining(self) -> bool:
+        return self._drain_started is not None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._work)
+
+    def snapshot(self) -> Dict[str, Any]:
+        kinds: Dict[str, int] = {}
+        for work in self._work:
+            kinds[work.kind] = kinds.get(work.kind, 0) + 1
+        return {"draining": self.draining, "in_flight": self.in_flight, "by_kind": kinds}
+
+    def begin_drain(self) -> None:
+        """Stop admitting new work (idempotent)."""
+        if self._drain_started is None:
+            self._drain_started = self._clock()
+            logger.info(f"Draining {self.in_flight} in-flight work item(s)")
+
+    def reset(self) -> None:
+        """Forget drain state and tracked work (on application start)."""
+        self._work.clear()
+        self._idle = None
+        self._drain_started = None
+        self._drain_task = None
+
+    @asynccontextmanager
+    async def track(self, kind: str, checkpoint: Optional[CheckpointFn] = None) -> AsyncIterator[None]:
+        """Track the enclosed work of the current task.
+
+        Args:
+            kind: Work type, also the checkpoint kind resumed on restart
+            checkpoint: Coroutine function saving what is needed to redo the
+                work; called if the work is still running at the drain deadline
+
+        Raises:
+            WorkCheckpointed: If shutdown interrupted the work
+        """
+        task = asyncio.current_task()
+        assert task is not None
+        work = _Work(kind, checkpoint, task)
+        self._work.append(work)
+        if self._idle is None:
+            self._idle = asyncio.Event()
+        self._idle.clear()
+        try:
+            yield
+        except asyncio.CancelledError:
+            if not work.interrupted:
+                raise
+            task.uncancel()
+            raise WorkCheckpointed(kind) from None
+        finally:
+            self._work.remove(work)
+            if not self._work and self._idle is not None:
+                self._idle.set()
+
+    async def drain(self, deadline_seconds: float) -> Dict[str, int]:
+        """Stop admitting work, wait for it, and checkpoint what is left.
+
+        The deadline counts from the first begin_drain(), so a drain started
+        by SIGTERM is not extended by the lifespan shutdown calling this
+        again; concurrent calls share one drain.
+
+        Returns:
+            Dict[str, int]: {'checkpointed': n, 'cancelled': m}
+        """
+        self.begin_drain()
+        if self._drain_task is None:
+            self._drain_task = asyncio.ensure_future(self._drain(deadline_seconds))
+        return await asyncio.shield(self._drain_task)
+
+    async def _drain(self, deadline_seconds: float) -> Dict[str, int]:
+        assert self._drain_started is not None
+        remaining = deadline_seconds - (self._clock() - self._drain_started)
+        if self._work and self._idle is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), max(remaining, 0))
+            except asyncio.TimeoutError:
+                pass
+
+        result = {"checkpointed": 0, "cancelled": 0}
+        unfinished = list(self._work)
+        for work in unfinished:
+            if work.checkpoint is not None:
+                try:
+                    await work.checkpoint()
+                    result["checkpointed"] += 1
+                except Exception:
+                    logger.exception(f"Failed to checkpoint in-flight {work.kind}")
+            work.interrupted = True
+            work.task.cancel()
+            result["cancelled"] += 1
+        if unfinished:
+            logger.warning(
+                f"Drain deadline reached: checkpointed {result['checkpointed']}, "
+                f"cancelled {result['cancelled']} in-flight work item(s)"
+            )
+            # Let the cancelled work unwind (flush buffers, answer 503)
+            await asyncio.wait([w.task for w in unfinished], timeout=5)
+        return result
+
+
+_tracker = WorkTracker()
+
+
+def get_work_tracker() -> WorkTracker:
+    """Return the process-wide work tracker."""
+    return _tracker
+
+
+def reject_if_draining() -> None:
+    """Refuse new pipeline work once shutdown has begun.
+
+    Raises:
+        HTTPException: 503 with Retry-After while draining
+    """
+    if _tracker.draining:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down; retry shortly",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+
+def install_drain_signal_handlers(deadline_seconds: float) -> None:
+    """Start draining as soon as SIGTERM/SIGINT arrives.
+
+    The server keeps serving in-flight requests after the signal, and only
+    runs the lifespan shutdown once they are done, so the drain deadline has
+    to start at the signal. The previous handler (the server's own) is still
+    called. A no-op outside the main thread.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+
+        def handler(signum: int, frame: Any, previous: Any = previous) -> None:
+            loop.call_soon_threadsafe(lambda: asyncio.ensure_future(_tracker.drain(deadline_seconds)))
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+def save_checkpoint(kind: str, params: Dict[str, Any], files: List[bytes], directory: Optional[str] = None) -> str:
+    """Persist interrupted work for resume_checkpoints().
+
+    Args:
+        kind: Work kind (selects the resume handler)
+        params: JSON-serializable parameters of the work
+        files: File contents (e.g. uploaded PDFs), in order
+        directory: Checkpoint directory (defaults to settings.checkpoint_dir)
+
+    Returns:
+        str: Path of the checkpoint
+    """
+    directory = directory or get_settings().checkpoint_dir
+    name = f"{int(time.time() * 1000)}-{kind}-{uuid.uuid4().hex[:8]}"
+    staging = os.path.join(directory, f".tmp-{name}")
+    os.makedirs(staging, exist_ok=True)
+    for index, content in enumerate(files):
+        with open(os.path.join(staging, f"file-{index}.bin"), "wb") as f:
+            f.write(content)
+    with open(os.path.join(staging, _MANIFEST), "wb") as f:
+        f.write(dumps({"kind": kind, "params": params, "files": len(files)}))
+    # Visible to resume_checkpoints() only once complete
+    path = os.path.join(directory, name)
+    os.rename(staging, path)
+    logger.info(f"Saved {kind} checkpoint {path}")
+    return path
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    except OSError:
+        return False
+    return True
+
+
+def _abandoned_claim(name: str) -> Optional[str]:
+    """Checkpoint name of a claim whose worker is gone, or None (not a claim, or still owned)."""
+    try:
+        pid, token, checkpoint = name[len(_CLAIMED_PREFIX):].split("-", 2)
+        owner = int(pid)
+    except ValueError:
+        return None
+    if owner == os.getpid():
+        return checkpoint if token != _CLAIM_TOKEN else None
+    return None if _pid_alive(owner) else checkpoint
+
+
+def _claim_checkpoints(directory: str) -> List[Tuple[str, Dict[str, Any], List[bytes]]]:
+    """Claim every complete or abandoned checkpoint in directory and load it."""
+    claimed = []
+    for entry in sorted(os.listdir(directory)):
+        if entry.startswith(_CLAIMED_PREFIX):
+            name = _abandoned_claim(entry)
+            if name is None:
+                continue  # Being resumed by a live worker
+            logger.warning(f"Reclaiming checkpoint {name} from a worker that exited while resuming it")
+        elif entry.startswith("."):
+            continue
+        else:
+            name = entry
+        path = os.path.join(directory, entry)
+        target = os.path.join(directory, f"{_CLAIMED_PREFIX}{os.getpid()}-{_CLAIM_TOKEN}-{name}")
+        try:
+            os.rename(path, target)
+        except OSError:
+            continue  # Claimed by another worker
+        try:
+            with open(os.path.join(target, _MANIFEST), "rb") as f:
+                manifest = loads(f.read())
+            files = []
+            for index in range(int(manifest["files"])):
+                with open(os.path.join(target, f"file-{index}.bin"), "rb") as f:
+                    files.append(f.read())
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Discarding unreadable checkpoint {name}: {str(e)}")
+            shutil.rmtree(target, ignore_errors=True)
+            continue
+        claimed.append((target, manifest, files))
+    return claimed
+
+
+async def _resume(path: str, kind: str, handler: ResumeFn, params: Dict[str, Any], files: List[bytes]) -> None:
+    try:
+        await handler(params, files)
+    except WorkCheckpointed:
+        pass  # Interrupted again; saved to a new checkpoint
+    except Exception:
+        logger.exception(f"Resuming {kind} checkpoint {path} failed")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# Resumed work in flight (held so it is not garbage collected)
+_resume_tasks: "set[asyncio.Task[None]]" = set()
+
+
+async def resume_checkpoints(handlers: Dict[str, ResumeFn], directory: Optional[str] = None) -> int:
+    """Resume work checkpointed by a previous shutdown, in the background.
+
+    Handlers track their own work, so a resumed run interrupted by the next
+    shutdown is checkpointed again.
+
+    Args:
+        handlers: Resume coroutine function per checkpoint kind, called with
+            (params, files)
+        directory: Checkpoint directory (defaults to settings.checkpoint_dir)
+
+    Returns:
+        int: Number of checkpoints resumed
+    """
+    directory = directory or get_settings().checkpoint_dir
+    if not os.path.isdir(directory):
+        return 0
+    resumed = 0
+    for path, manifest, files in await asyncio.to_thread(_claim_checkpoints, directory):
+        kind = manifest.get("kind")
+        handler = handlers.get(kind) if isinstance(kind, str) else None
+        if handler is None:
+            # Moved aside, so it is neither claimed again on every start nor lost
+            name = os.path.basename(path)[len(_CLAIMED_PREFIX):].split("-", 2)[2]
+            unhandled = os.path.join(directory, f"{_UNHANDLED_PREFIX}{name}")
+            logger.error(f"No resume handler for checkpoint {name} (kind {kind!r}); moved to {unhandled}")
+            try:
+                await asyncio.to_thread(os.rename, path, unhandled)
+            except OSError:
+                logger.exception(f"Failed to move aside checkpoint {path}")
+            continue
+        with lane("background"):  # The task inherits the lane; nobody is waiting on it
+            task = asyncio.create_task(_resume(path, str(kind), handler, manifest.get("params") or {}, files))
+        _resume_tasks.add(task)
+        task.add_done_callback(_resume_tasks.discard)
+        resumed += 1
+    if resumed:
+        logger.info(f"Resuming {resumed} checkpoint(s) from {directory}")
+    return resumed
@@ -0,0 +1,64 @@
+"""Up-front cost estimate of an extraction, for cost-weighted rate limiting.
+
+The real route (hybrid vs vision_fallback) is only known after OpenDataLoader
+has parsed the PDF and scored its quality. Rate limiting has to decide before
+that, so this module predicts it from the raw bytes:
+
+- Page count: ``/Type /Page`` objects, or one page per 100KB when the page
+  tree is hidden in compressed object streams
+- Route: a PDF with no font resources, or with more than 250KB per page, is
+  almost certainly scanned images and will take the vision fallback (the
+  whole file sent to Gemini) rather than the text route
+
+The estimate only sets how many rate-limit units a request is charged, so a
+wrong guess costs a client some budget, not an extraction.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+_FONT_RESOURCE = re.compile(rb"/Font\b")
+
+BYTES_PER_PAGE_FALLBACK = 100 * 1024
+SCANNED_BYTES_PER_PAGE = 250 * 1024
+
+# Units charged: one per request, per page and per MB; vision fallback multiplies the total
+UNITS_PER_REQUEST = 1
+UNITS_PER_PAGE = 1
+UNITS_PER_MB = 1
+VISION_MULTIPLIER = 3
+
+
+@dataclass(frozen=True)
+class ExtractionCost:
+    """Predicted size and route of an extraction, and the units it is charged."""
+
+    size_bytes: int
+    pages: int
+    predicted_route: str  # "hybrid" or "vision_fallback"
+    units: int
+
+
+def estimate_extraction_cost(content: bytes) -> ExtractionCost:
+    """Estimate the cost of extracting a PDF from its bytes (no parsing).
+
+    Scans the whole file with two regexes; for large uploads call it in a
+    worker thread.
+
+    Args:
+        content: Raw PDF bytes
+
+    Returns:
+        ExtractionCost with the predicted page count, route and units
+    """
+    size_bytes = len(content)
+    pages = len(_PAGE_OBJECT.findall(content)) or max(1, math.ceil(size_bytes / BYTES_PER_PAGE_FALLBACK))
+    scanned = _FONT_RESOURCE.search(content) is None or size_bytes / pages > SCANNED_BYTES_PER_PAGE
+    predicted_route = "vision_fallback" if scanned else "hybrid"
+
+    units = UNITS_PER_REQUEST + pages * UNITS_PER_PAGE + math.ceil(size_bytes / (1024 * 1024)) * UNITS_PER_MB
+    if scanned:
+        units *= VISION_MULTIPLIER
+    return ExtractionCost(size_bytes=size_bytes, pages=pages, predicted_route=predicted_route, units=units)
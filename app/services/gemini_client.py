@@ -4,8 +4,14 @@ This module provides a singleton Gemini client for the application.
 Uses the modern google-genai SDK (not google.generativeai).
 """
 
+from typing import Any, Awaitable, Callable, Optional
+
 from google import genai
 from app.config import get_settings
+from app.services.hedging import get_hedge_policy
+from app.services.scheduler import run_async_stage
+from app.utils.resilience import get_breaker
+from app.utils.retry import is_dependency_failure
 
 
 def get_gemini_client() -> genai.Client:
@@ -40,3 +46,53 @@ def get_gemini_client() -> genai.Client:
     # Initialize client with API key from settings
     # The genai.Client() automatically uses GEMINI_API_KEY from environment
     return genai.Client(api_key=settings.gemini_api_key)
+
+
+async def generate_content(client: genai.Client, hedge_bucket: Optional[str] = None, **kwargs: Any) -> Any:
+    """Call client.aio.models.generate_content in the "llm" stage scheduler.
+
+    The call waits for a slot in the lane of the current request
+    (app/services/scheduler.py) and uses the SDK's async client, so it does
+    not block the event loop and cancelling it (a deadline, a lost hedge)
+    stops the request and frees its slot. It goes through the "gemini"
+    circuit breaker: while Gemini keeps failing, calls fail fast with
+    CircuitOpenError.
+
+    Args:
+        client: Gemini API client
+        hedge_bucket: Size bucket of the call (hedging.size_bucket()); when
+            given and hedging is enabled, a slow call is hedged with a
+            duplicate. Its latency samples time the Gemini call only, not
+            the wait for a slot
+        **kwargs: Passed to client.aio.models.generate_content (model, contents, config)
+
+    Returns:
+        The GenerateContentResponse
+
+    Raises:
+        CircuitOpenError: If the gemini breaker is open
+    """
+    call = client.aio.models.generate_content
+    if hedge_bucket is None:
+        return await _generate_content(call, **kwargs)
+    policy = get_hedge_policy()
+    timed_call = policy.timed(hedge_bucket, call)
+    return await policy.run(hedge_bucket, lambda: _generate_content(timed_call, **kwargs))
+
+
+async def _generate_content(call: Callable[..., Awaitable[Any]], **kwargs: Any) -> Any:
+    breaker = get_breaker("gemini")
+    breaker.before_call()
+    try:
+        response = await run_async_stage("llm", call, **kwargs)
+    except Exception as e:
+        if is_dependency_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.release()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record_success()
+    return response
@@ -0,0 +1,120 @@
+"""Background dependency probing for the health endpoints.
+
+/health used to check every dependency inline: disk usage, the
+OpenDataLoader import, the Gemini client and a live Supabase query. Every
+probe paid that cost, and a slow Supabase response made the probe itself
+slow. HealthProber runs the checks on its own schedule, each under a
+timeout, and keeps the last results:
+
+- /livez answers from the process alone (constant time)
+- /readyz and /health read the cached results
+
+If the cache is older than max_age_seconds (the prober is not running, or
+has stalled), the next reader refreshes it; concurrent readers share that
+one refresh.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, UTC
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# A check returns its status string: "healthy", "healthy: <detail>",
+# "degraded: <detail>" or "unhealthy: <detail>"
+HealthCheck = Callable[[], Awaitable[str]]
+
+
+def is_healthy(service_status: str) -> bool:
+    """True for "healthy" and "healthy: <detail>" statuses."""
+    return service_status == "healthy" or service_status.startswith("healthy:")
+
+
+class HealthProber:
+    """Runs dependency checks periodically and caches their results.
+
+    Usage:
+        prober = HealthProber({"supabase": check_supabase}, interval_seconds=15)
+        await prober.start()
+        report = await prober.report()
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, HealthCheck],
+        interval_seconds: float = 15.0,
+        timeout_seconds: float = 5.0,
+        max_age_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._checks = checks
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else interval_seconds * 3
+        self._clock = clock
+        self._results: Optional[Dict[str, Any]] = None
+        self._checked_at: float = 0.0
+        self._refreshing: Optional["asyncio.Task[Dict[str, Any]]"] = None
+        self._loop_task: Optional["asyncio.Task[None]"] = None
+
+    async def _run_check(self, name: str, check: HealthCheck) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            service_status = await asyncio.wait_for(check(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            service_status = f"unhealthy: timed out after {self.timeout_seconds:g}s"
+        except Exception as e:
+            service_status = f"unhealthy: {str(e)}"
+        return {"status": service_status, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    async def _refresh(self) -> Dict[str, Any]:
+        names = list(self._checks)
+        outcomes = await asyncio.gather(*(self._run_check(name, self._checks[name]) for name in names))
+        results = dict(zip(names, outcomes))
+        self._results = {"checked_at": datetime.now(UTC).isoformat(), "checks": results}
+        self._checked_at = self._clock()
+        return self._results
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Run all checks now (concurrent callers share one run)."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._refreshing)
+
+    async def report(self) -> Dict[str, Any]:
+        """Cached results, refreshed first if missing or older than max_age_seconds.
+
+        Returns:
+            Dict[str, Any]: {'checked_at': iso, 'age_seconds': float,
+                'checks': {name: {'status': str, 'latency_ms': float}}}
+        """
+        if self._results is None or self._clock() - self._checked_at > self.max_age_seconds:
+            await self.refresh()
+        assert self._results is not None
+        return {**self._results, "age_seconds": round(self._clock() - self._checked_at, 3)}
+
+    def reset(self) -> None:
+        """Forget cached results."""
+        self._results = None
+        self._checked_at = 0.0
+
+    async def start(self) -> None:
+        """Probe now and then every interval_seconds in the background."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health probe failed")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,230 @@
+"""Hedged Gemini calls to cut tail latency.
+
+A few extraction calls take far longer than the rest, and they set the p99.
+When hedging is enabled (settings.gemini_hedging_enabled), a call that has
+not returned after the configured percentile of the latencies observed for
+its size bucket gets a duplicate; whichever response comes first is used
+and the other call is cancelled.
+
+- Latencies are kept per size bucket (size_bucket()): hybrid calls by
+  estimated prompt tokens, vision calls by file size. Hybrid buckets are
+  also split by model cascade tier ("fast:hybrid:<=4000"), as the fast
+  model's latencies say nothing about the strong model's. A bucket needs
+  min_samples calls before it hedges.
+- Hedges cost a second Gemini call, so they draw from a budget of
+  budget_ratio hedges per call made within the last minute. A call over
+  the threshold when the budget is spent just keeps waiting.
+- Latency samples time the Gemini call alone (timed() wraps it inside the
+  wait for an LLM slot), so a queue building up under load does not read
+  as a slow Gemini and trigger hedges that would only join the queue.
+- Calls go through the SDK's async client, so cancelling the losing call
+  stops its request and frees its LLM slot and admission count.
+
+Per-bucket thresholds and hedge wins and losses are reported by
+/api/stats/hedging.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.config import get_settings
+from app.utils.resilience import RetryBudget
+
+T = TypeVar("T")
+
+# Upper bounds of the size buckets: estimated prompt tokens (hybrid) or file bytes (vision)
+SIZE_BUCKETS = {
+    "hybrid": (4_000, 16_000, 64_000),
+    "vision": (1 << 20, 5 << 20, 20 << 20),
+}
+
+# Latencies kept per bucket for the percentile
+SAMPLE_SIZE = 200
+
+# Window over which hedges are budgeted against calls
+BUDGET_WINDOW_SECONDS = 60
+
+
+def size_bucket(method: str, size: int) -> str:
+    """Latency bucket of a call, e.g. "hybrid:<=16000" or "vision:>20971520".
+
+    Args:
+        method: "hybrid" (size in estimated prompt tokens) or "vision" (size in bytes)
+        size: Size of the call's input
+    """
+    bounds = SIZE_BUCKETS[method]
+    for bound in bounds:
+        if size <= bound:
+            return f"{method}:<={bound}"
+    return f"{method}:>{bounds[-1]}"
+
+
+class HedgePolicy:
+    """Issues a duplicate of a slow call once it passes its bucket's latency percentile.
+
+    Usage:
+        response = await policy.run(bucket, lambda: call(**kwargs))
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        budget_ratio: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._clock = clock
+        # Every call earns budget_ratio of a hedge; no floor, so an idle worker cannot burst hedges
+        self._budget = RetryBudget(
+            ratio=budget_ratio, min_retries=0, window_seconds=BUDGET_WINDOW_SECONDS, clock=clock
+        )
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def threshold(self, bucket: str) -> Optional[float]:
+        """Seconds after which a call in `bucket` is hedged (None until min_samples are observed)."""
+        with self._lock:
+            samples = sorted(self._samples.get(bucket, ()))
+        if len(samples) < self.min_samples:
+            return None
+        rank = max(1, math.ceil(self.percentile / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def _count(self, bucket: str, field: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                bucket, {"calls": 0, "hedged": 0, "hedge_won": 0, "hedge_lost": 0, "budget_rejected": 0}
+            )
+            stats[field] += 1
+
+    def _observe(self, bucket: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(bucket, deque(maxlen=SAMPLE_SIZE)).append(seconds)
+
+    def timed(self, bucket: str, call: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """Wrap call so that each call it completes adds a latency sample to bucket.
+
+        Wrap the service call itself, inside any wait for a slot, so the
+        percentile measures the service and not the queue in front of it.
+        A cancelled call adds no sample: its elapsed time is not a latency.
+        """
+        if not self.enabled:
+            return call
+
+        async def timed_call(*args: Any, **kwargs: Any) -> T:
+            start = self._clock()
+            result = await call(*args, **kwargs)
+            self._observe(bucket, self._clock() - start)
+            return result
+
+        return timed_call
+
+    async def run(self, bucket: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Await call(), hedging it with a second call() if it is slow.
+
+        Args:
+            bucket: Size bucket of the call (size_bucket())
+            call: Starts one attempt of the call (its service call wrapped
+                with timed(), so that latency samples are recorded)
+
+        Returns:
+            The first successful response
+
+        Raises:
+            Exception: The primary call's error, if both calls fail
+        """
+        if not self.enabled:
+            return await call()
+        self._count(bucket, "calls")
+        self._budget.record_success()
+        threshold = self.threshold(bucket)
+        primary = asyncio.ensure_future(call())
+        hedge: Optional["asyncio.Future[T]"] = None
+        try:
+            if threshold is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done:
+                return primary.result()
+            if not self._budget.try_spend():
+                self._count(bucket, "budget_rejected")
+                return await primary
+            self._count(bucket, "hedged")
+            hedge = asyncio.ensure_future(call())
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finished in the same step
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        self._count(bucket, "hedge_won" if task is hedge else "hedge_lost")
+                        return task.result()
+            return primary.result()  # Both failed: raise the primary's error
+        finally:
+            for attempt in (primary, hedge):
+                if attempt is not None and not attempt.done():
+                    attempt.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Settings, hedge budget and per-bucket threshold and outcome counts."""
+        buckets = {}
+        with self._lock:
+            names = sorted(set(self._samples) | set(self._stats))
+        for name in names:
+            threshold = self.threshold(name)
+            with self._lock:
+                buckets[name] = {
+                    "samples": len(self._samples.get(name, ())),
+                    "threshold_ms": round(threshold * 1000, 1) if threshold is not None else None,
+                    **self._stats.get(name, {}),
+                }
+        budget = self._budget.snapshot()
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "min_samples": self.min_samples,
+            "budget": {
+                "ratio": budget["ratio"],
+                "window_seconds": budget["window_seconds"],
+                "hedges": budget["retries"],
+                "available": budget["available"],
+            },
+            "buckets": buckets,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples = {}
+            self._stats = {}
+        self._budget.reset()
+
+
+_hedge_policy: Optional[HedgePolicy] = None
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """Get the process-wide hedge policy for Gemini calls."""
+    global _hedge_policy
+    if _hedge_policy is None:
+        settings = get_settings()
+        _hedge_policy = HedgePolicy(
+            enabled=settings.gemini_hedging_enabled,
+            percentile=settings.gemini_hedge_percentile,
+            min_samples=settings.gemini_hedge_min_samples,
+            budget_ratio=settings.gemini_hedge_budget_ratio,
+        )
+    return _hedge_policy
+
+
+def get_hedging_stats() -> Dict[str, Any]:
+    """Snapshot of the hedge policy (for /api/stats/hedging)."""
+    return get_hedge_policy().snapshot()
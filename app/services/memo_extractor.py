@@ -9,18 +9,25 @@ Reuses core infrastructure from pdf_extractor.py with memo-specific prompts.
 """
 
 import asyncio
-import json
 import logging
-from typing import Optional, Any, Dict
+import os
+import time
+from typing import Optional, Any, Dict, List, Tuple
 from pydantic import ValidationError
 from google import genai
 from google.genai import types
 
 from app.models.extraction import DocumentStructure
 from app.models.memo_extraction import MarkingGuideline
+from app.services.gemini_client import generate_content
+from app.services.hedging import size_bucket
+from app.services.model_cascade import FAST, STRONG, choose_tier, missing_question_numbers, model_for_tier
 from app.services.opendataloader_extractor import extract_pdf_structure
+from app.services.scheduler import run_stage
 from app.services.pdf_extractor import _remove_additional_properties, _estimate_token_count
+from app.utils.deadline import DeadlineExceeded
 from app.utils.retry import retry_with_backoff
+from app.utils.serialization import dumps_str, parse_model
 
 
 # Minimum tokens required for Gemini context caching (API requirement)
@@ -246,8 +253,12 @@ Extract ALL content without skipping any questions or answers."""
         if cache_name is not None:
             config_dict['cached_content'] = cache_name
 
+        hedge_bucket = size_bucket("vision", os.path.getsize(file_path))
+        gemini_start = time.perf_counter()
         try:
-            response = client.models.generate_content(
+            response = await generate_content(
+                client,
+                hedge_bucket=hedge_bucket,
                 model=model,
                 contents=contents_list,
                 config=types.GenerateContentConfig(**config_dict)
@@ -257,36 +268,36 @@ Extract ALL content without skipping any questions or answers."""
                 global _MEMO_CACHE_NAME
                 _MEMO_CACHE_NAME = None
                 config_dict = {k: v for k, v in config_dict.items() if k != 'cached_content'}
-                response = client.models.generate_content(
+                response = await generate_content(
+                    client,
+                    hedge_bucket=hedge_bucket,
                     model=model,
                     contents=contents_list,
                     config=types.GenerateContentConfig(**config_dict)
                 )
             else:
                 raise
+        gemini_latency_ms = (time.perf_counter() - gemini_start) * 1000
 
         # Parse structured response
         response_text = response.text
         if response_text is None:
             raise ValueError("Gemini API returned empty response")
         try:
-            response_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
+            # Parsed and validated in one pass (model_validate_json)
+            result = parse_model(MarkingGuideline, response_text)
+        except ValidationError as e:
+            logging.getLogger(__name__).warning(
+                "Gemini response schema validation failed: %s", e
+            )
+            raise
+        except ValueError as e:
             logging.getLogger(__name__).warning(
                 "Gemini response JSON decode failed: %s; response snippet: %s",
                 e,
                 (response_text[:500] if response_text else "") + "...",
             )
             raise ValueError(f"Invalid JSON in Gemini response: {e}") from e
-        try:
-            result = MarkingGuideline.model_validate(response_data)
-        except ValidationError as e:
-            logging.getLogger(__name__).warning(
-                "Gemini response schema validation failed: %s; data keys: %s",
-                e,
-                list(response_data.keys()) if isinstance(response_data, dict) else type(response_data).__name__,
-            )
-            raise
 
         # Extract cache statistics from usage metadata
         cache_hit = False
@@ -307,11 +318,13 @@ Extract ALL content without skipping any questions or answers."""
             "reason": "Low OpenDataLoader quality score",
             "cost_savings_percent": 0,  # No cost savings from hybrid mode
             "model": model,
+            "model_tier": STRONG,
             "cache_eligible": cache_name is not None,
             "cache_hit": cache_hit,
             "cached_tokens": cached_tokens,
             "total_tokens": total_tokens,
-            "cached_tokens_saved": cached_tokens
+            "cached_tokens_saved": cached_tokens,
+            "gemini_latency_ms": round(gemini_latency_ms, 1)
         }
 
         return result
@@ -326,6 +339,85 @@ Extract ALL content without skipping any questions or answers."""
                 pass
 
 
+async def _generate_marking_guideline(
+    client: genai.Client,
+    model: str,
+    prompt: str,
+    config_dict: Dict[str, Any],
+    hedge_bucket: str,
+) -> Tuple[MarkingGuideline, Any]:
+    """
+    Run one hybrid memo extraction call and parse its response.
+
+    Args:
+        client: Gemini API client
+        model: Gemini model name
+        prompt: Extraction prompt with the document Markdown
+        config_dict: GenerateContentConfig fields (with cached_content if cached)
+        hedge_bucket: Size bucket for hedging the call
+
+    Returns:
+        Tuple of (parsed MarkingGuideline, GenerateContentResponse)
+
+    Raises:
+        ValidationError: If the response does not match the schema
+        ValueError: If the response is empty or not valid JSON
+    """
+    global _MEMO_CACHE_NAME
+    try:
+        response = await generate_content(
+            client,
+            hedge_bucket=hedge_bucket,
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(**config_dict)
+        )
+    except Exception as e:
+        if 'cached_content' in config_dict and _is_cache_expired_error(e):
+            _MEMO_CACHE_NAME = None
+            config_dict = {k: v for k, v in config_dict.items() if k != 'cached_content'}
+            response = await generate_content(
+                client,
+                hedge_bucket=hedge_bucket,
+                model=model,
+                contents=prompt,
+                config=types.GenerateContentConfig(**config_dict)
+            )
+        else:
+            raise
+
+    # Parse structured response
+    response_text = response.text
+    if response_text is None:
+        raise ValueError("Gemini API returned empty response")
+    try:
+        # Parsed and validated in one pass (model_validate_json)
+        result = parse_model(MarkingGuideline, response_text)
+    except ValidationError as e:
+        logging.getLogger(__name__).warning(
+            "Gemini response schema validation failed: %s", e
+        )
+        raise
+    except ValueError as e:
+        logging.getLogger(__name__).warning(
+            "Gemini response JSON decode failed: %s; response snippet: %s",
+            e,
+            (response_text[:500] if response_text else "") + "...",
+        )
+        raise ValueError(f"Invalid JSON in Gemini response: {e}") from e
+    return result, response
+
+
+def _memo_question_ids(guideline: MarkingGuideline) -> List[str]:
+    """Question and answer sub-question ids of an extraction (for the coverage check)."""
+    ids = []
+    for section in guideline.sections:
+        for question in section.questions:
+            ids.append(question.id)
+            ids.extend(answer["sub_id"] for answer in question.answers or [] if "sub_id" in answer)
+    return ids
+
+
 @retry_with_backoff()
 async def extract_memo_data_hybrid(
     client: genai.Client,
@@ -341,8 +433,9 @@ async def extract_memo_data_hybrid(
     1. Extract PDF structure locally using OpenDataLoader
     2. Calculate quality score and route based on threshold
     3. Build prompt with structured markdown content
-    4. Call Gemini API with response schema for structured output
-    5. Add processing metadata (method, quality scores, cost savings)
+    4. Call Gemini API with response schema for structured output (simple
+       documents try the model cascade's fast tier first; see model_cascade.py)
+    5. Add processing metadata (method, quality scores, cost savings, model tier)
 
     If Gemini extraction fails but raise_on_partial=False, returns partial
     extraction with basic metadata only.
@@ -360,6 +453,7 @@ async def extract_memo_data_hybrid(
         FileNotFoundError: If PDF file doesn't exist
         ValueError: If PDF cannot be processed
         Exception: For Gemini API errors (only if raise_on_partial=True)
+        DeadlineExceeded: If the request's deadline passed
         PartialMemoExtractionError: If Gemini fails and raise_on_partial=False (contains partial result)
 
     Example:
@@ -371,12 +465,14 @@ async def extract_memo_data_hybrid(
     # Step 1: Extract PDF structure using OpenDataLoader (local, fast, free)
     # Re-use pre-computed structure if provided (avoids duplicate work during classification)
     if doc_structure is None:
-        doc_structure = extract_pdf_structure(file_path)
+        doc_structure = await run_stage("parse", extract_pdf_structure, file_path)
 
     # Step 2: Route based on quality score
     if doc_structure.quality_score < 0.7:
         # Low quality: fallback to Gemini Vision API
-        return await extract_memo_with_vision_fallback(client, file_path, model)
+        result = await extract_memo_with_vision_fallback(client, file_path, model)
+        result.processing_metadata["opendataloader_quality"] = doc_structure.quality_score
+        return result
 
     # Step 3: Get or create context cache for cost optimization
     cache_name = await get_or_create_memo_cache(client, model)
@@ -425,6 +521,7 @@ SECTION C (Essay Questions):
 IMPORTANT: Extract ALL questions from ALL sections without skipping any."""
 
     # Step 5: Call Gemini API with structured output schema
+    tier = choose_tier(doc_structure)
     try:
         # Generate clean schema without additionalProperties for Gemini compatibility
         raw_schema = MarkingGuideline.model_json_schema()
@@ -438,47 +535,36 @@ IMPORTANT: Extract ALL questions from ALL sections without skipping any."""
         if cache_name is not None:
             config_dict['cached_content'] = cache_name
 
-        try:
-            response = client.models.generate_content(
-                model=model,
-                contents=prompt,
-                config=types.GenerateContentConfig(**config_dict)
-            )
-        except Exception as e:
-            if cache_name is not None and _is_cache_expired_error(e):
-                global _MEMO_CACHE_NAME
-                _MEMO_CACHE_NAME = None
-                config_dict = {k: v for k, v in config_dict.items() if k != 'cached_content'}
-                response = client.models.generate_content(
-                    model=model,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(**config_dict)
+        # Tiers are hedged on their own latencies: fast-model samples would
+        # pull the strong model's percentile down
+        hedge_bucket = size_bucket("hybrid", _estimate_token_count(prompt))
+        escalation_reason: Optional[str] = None
+        gemini_start = time.perf_counter()
+        if tier == FAST:
+            served_model = model_for_tier(FAST, model)
+            # The context cache was created for the strong model
+            fast_config = {k: v for k, v in config_dict.items() if k != 'cached_content'}
+            try:
+                result, response = await _generate_marking_guideline(
+                    client, served_model, prompt, fast_config, f"{FAST}:{hedge_bucket}"
                 )
-            else:
-                raise
-
-        # Parse structured response
-        response_text = response.text
-        if response_text is None:
-            raise ValueError("Gemini API returned empty response")
-        try:
-            response_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            logging.getLogger(__name__).warning(
-                "Gemini response JSON decode failed: %s; response snippet: %s",
-                e,
-                (response_text[:500] if response_text else "") + "...",
-            )
-            raise ValueError(f"Invalid JSON in Gemini response: {e}") from e
-        try:
-            result = MarkingGuideline.model_validate(response_data)
-        except ValidationError as e:
-            logging.getLogger(__name__).warning(
-                "Gemini response schema validation failed: %s; data keys: %s",
-                e,
-                list(response_data.keys()) if isinstance(response_data, dict) else type(response_data).__name__,
+                missing = missing_question_numbers(doc_structure.markdown, _memo_question_ids(result))
+                if missing:
+                    escalation_reason = "coverage"
+                    logging.getLogger(__name__).info(
+                        "Fast tier (%s) missed questions %s; escalating to %s", served_model, missing, model
+                    )
+            except ValueError as e:  # Includes ValidationError
+                escalation_reason = "validation"
+                logging.getLogger(__name__).info(
+                    "Fast tier (%s) response failed validation (%s); escalating to %s", served_model, e, model
+                )
+        if tier == STRONG or escalation_reason is not None:
+            served_model = model
+            result, response = await _generate_marking_guideline(
+                client, model, prompt, config_dict, f"{STRONG}:{hedge_bucket}"
             )
-            raise
+        gemini_latency_ms = (time.perf_counter() - gemini_start) * 1000
 
         # Step 6: Extract cache statistics from usage metadata
         cache_hit = False
@@ -499,19 +585,23 @@ IMPORTANT: Extract ALL questions from ALL sections without skipping any."""
             "opendataloader_quality": doc_structure.quality_score,
             "cost_savings_percent": 80,  # Hybrid mode achieves ~80% cost reduction
             "element_count": doc_structure.element_count,
-            "model": model,
+            "model": served_model,
+            "model_tier": STRONG if escalation_reason is not None else tier,
+            "escalation_reason": escalation_reason,
             "cache_eligible": cache_name is not None,
             "cache_hit": cache_hit,
             "cached_tokens": cached_tokens,
             "total_tokens": total_tokens,
-            "cached_tokens_saved": cached_tokens
+            "cached_tokens_saved": cached_tokens,
+            "gemini_latency_ms": round(gemini_latency_ms, 1)
         }
 
         return result
 
     except Exception as e:
-        # If Gemini extraction fails, create partial result
-        if raise_on_partial:
+        # If Gemini extraction fails, create partial result (not when the
+        # request's deadline passed: nobody is waiting for it)
+        if raise_on_partial or isinstance(e, DeadlineExceeded):
             raise
 
         # Build partial extraction result with minimal data
@@ -531,6 +621,7 @@ IMPORTANT: Extract ALL questions from ALL sections without skipping any."""
                 "cost_savings_percent": 0,
                 "element_count": doc_structure.element_count,
                 "model": model,
+                "model_tier": tier,
                 "error": str(e),
                 "error_type": type(e).__name__
             }
@@ -570,9 +661,7 @@ if __name__ == "__main__":
         - Auto-saves to {input_filename}_memo_result.json alongside input PDF
     """
     import sys
-    import os
     import asyncio
-    import json
     from app.services.gemini_client import get_gemini_client
 
     # Check for file path argument
@@ -608,8 +697,7 @@ if __name__ == "__main__":
         canonical_stem = result.build_canonical_filename(document_id)
 
         # Convert to JSON
-        result_json = result.model_dump()
-        json_str = json.dumps(result_json, indent=2, ensure_ascii=False)
+        json_str = dumps_str(result.model_dump(), indent=True)
 
         # Print to stdout
         print(json_str)
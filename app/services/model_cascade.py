@@ -0,0 +1,98 @@
+"""Model cascade: simple documents go to a faster model first.
+
+With settings.model_cascade_enabled, hybrid extraction of a simple document
+(high OpenDataLoader quality, short Markdown, few question groups) is first
+sent to settings.model_cascade_fast_model, the "fast" tier. Its answer is
+used unless it fails validation (invalid JSON, schema errors) or misses
+question numbers that appear in the Markdown; then the document is
+extracted again with the extractor's model, the "strong" tier. Everything
+else, and every vision fallback, goes straight to the strong tier.
+
+The tier that served a document is recorded in processing_metadata as
+"model_tier", with "escalation_reason" ("validation" or "coverage") when the
+fast tier's answer was discarded.
+"""
+
+import re
+from typing import Iterable, List, Set
+
+from app.config import get_settings
+from app.models.extraction import DocumentStructure
+
+FAST = "fast"
+STRONG = "strong"
+
+# "QUESTION 3" headings (also the group_id convention of the extraction prompt)
+_QUESTION_HEADING = re.compile(r"\bQUESTION\s+(\d{1,2})\b", re.IGNORECASE)
+
+# Question numbers starting a Markdown line, e.g. "1.1.1 Which ...", "**2.6** Read ...", "| 3.2 |"
+_QUESTION_NUMBER = re.compile(r"^[\s#*|>-]*(\d{1,2}(?:\.\d{1,2}){1,3})(?=[\s*|)])", re.MULTILINE)
+
+# Numbers are compared to this depth (2.6.1 -> 2.6): memos often answer a
+# block of sub-questions under one id, and deeper checks would escalate them
+COVERAGE_DEPTH = 2
+
+
+def _truncate(number: str) -> str:
+    return ".".join(number.split(".")[:COVERAGE_DEPTH])
+
+
+def count_question_groups(markdown: str) -> int:
+    """Number of distinct "QUESTION n" headings in a document's Markdown."""
+    return len(set(_QUESTION_HEADING.findall(markdown)))
+
+
+def expected_question_numbers(markdown: str) -> Set[str]:
+    """Question numbers a complete extraction must cover, from the Markdown.
+
+    Top-level numbers come from "QUESTION n" headings; sub-question numbers
+    from lines starting with a number like 1.1 or 2.3.1 (truncated to
+    COVERAGE_DEPTH). When the document has headings, numbers under a
+    question without one are ignored (they are usually quantities in text).
+    """
+    top_level = set(_QUESTION_HEADING.findall(markdown))
+    expected = set(top_level)
+    for number in _QUESTION_NUMBER.findall(markdown):
+        if not top_level or number.split(".")[0] in top_level:
+            expected.add(_truncate(number))
+    return expected
+
+
+def missing_question_numbers(markdown: str, extracted_ids: Iterable[str]) -> List[str]:
+    """Question numbers of the Markdown not covered by any extracted id.
+
+    Args:
+        markdown: The document's Markdown (DocumentStructure.markdown)
+        extracted_ids: Question, parent and group ids of the extraction
+            (group ids like "QUESTION 2" count as "2")
+
+    Returns:
+        Sorted missing numbers (empty when the extraction is complete)
+    """
+    covered: Set[str] = set()
+    for extracted in extracted_ids:
+        heading = _QUESTION_HEADING.search(extracted)
+        number = heading.group(1) if heading else extracted.strip()
+        parts = _truncate(number).split(".")
+        # An id covers itself and every question it is nested in
+        covered.update(".".join(parts[:depth]) for depth in range(1, len(parts) + 1))
+    missing = expected_question_numbers(markdown) - covered
+    return sorted(missing, key=lambda n: [int(p) for p in n.split(".")])
+
+
+def choose_tier(doc_structure: DocumentStructure) -> str:
+    """Tier to extract a document with first: FAST for simple documents when the cascade is enabled."""
+    settings = get_settings()
+    if not settings.model_cascade_enabled:
+        return STRONG
+    simple = (
+        doc_structure.quality_score >= settings.model_cascade_min_quality
+        and len(doc_structure.markdown) <= settings.model_cascade_max_markdown_chars
+        and count_question_groups(doc_structure.markdown) <= settings.model_cascade_max_groups
+    )
+    return FAST if simple else STRONG
+
+
+def model_for_tier(tier: str, strong_model: str) -> str:
+    """Model name of a tier; the strong tier is the extractor's own model."""
+    return get_settings().model_cascade_fast_model if tier == FAST else strong_model
@@ -6,13 +6,15 @@ including markdown conversion, tables, and bounding boxes. This is the first sta
 of the hybrid extraction pipeline before sending to Gemini API.
 """
 
-import json
 import os
 import tempfile
+import time
 from typing import Dict, List, Any
 from opendataloader_pdf import convert
 
 from app.models.extraction import DocumentStructure
+from app.utils.live_stats import PARSE_LATENCY_MS, record_metric
+from app.utils.serialization import loads
 
 
 def calculate_quality_score(
@@ -104,7 +106,9 @@ def extract_pdf_structure(file_path: str) -> DocumentStructure:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"PDF file not found: {file_path}")
 
-    # Create temporary directory for output files
+    parse_start = time.perf_counter()
+
+    # Create temporary directory for output files (the parse counts toward admission control)
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
             # Convert PDF to JSON and Markdown using OpenDataLoader
@@ -121,8 +125,8 @@ def extract_pdf_structure(file_path: str) -> DocumentStructure:
             markdown_path = os.path.join(temp_dir, f"{base_name}.md")
 
             # Parse JSON structure
-            with open(json_path, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
+            with open(json_path, 'rb') as f:
+                json_data = loads(f.read())
 
             # Read markdown content
             markdown = ""
@@ -184,6 +188,8 @@ def extract_pdf_structure(file_path: str) -> DocumentStructure:
                 tables=tables
             )
 
+            record_metric(PARSE_LATENCY_MS, (time.perf_counter() - parse_start) * 1000, "opendataloader")
+
             return DocumentStructure(
                 markdown=markdown,
                 tables=tables,
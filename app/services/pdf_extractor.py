@@ -9,16 +9,23 @@ Uses context caching to reduce API costs by ~90% for repeated system instruction
 """
 
 import asyncio
-import json
 import logging
-from typing import Optional, Any, Dict
+import os
+import time
+from typing import Optional, Any, Dict, List, Tuple
 from pydantic import ValidationError
 from google import genai
 from google.genai import types
 
 from app.models.extraction import DocumentStructure, ExtractionResult, ExtractedTable, FullExamPaper
+from app.services.gemini_client import generate_content
+from app.services.hedging import size_bucket
+from app.services.model_cascade import FAST, STRONG, choose_tier, missing_question_numbers, model_for_tier
 from app.services.opendataloader_extractor import extract_pdf_structure
+from app.services.scheduler import run_stage
+from app.utils.deadline import DeadlineExceeded
 from app.utils.retry import retry_with_backoff
+from app.utils.serialization import parse_model
 
 
 def _remove_additional_properties(schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -320,8 +327,12 @@ CRITICAL RULES:
         if cache_name is not None:
             config_dict['cached_content'] = cache_name
 
+        hedge_bucket = size_bucket("vision", os.path.getsize(file_path))
+        gemini_start = time.perf_counter()
         try:
-            response = client.models.generate_content(
+            response = await generate_content(
+                client,
+                hedge_bucket=hedge_bucket,
                 model=model,
                 contents=contents_list,
                 config=types.GenerateContentConfig(**config_dict)
@@ -331,36 +342,36 @@ CRITICAL RULES:
                 global _EXTRACTION_CACHE_NAME
                 _EXTRACTION_CACHE_NAME = None
                 config_dict = {k: v for k, v in config_dict.items() if k != 'cached_content'}
-                response = client.models.generate_content(
+                response = await generate_content(
+                    client,
+                    hedge_bucket=hedge_bucket,
                     model=model,
                     contents=contents_list,
                     config=types.GenerateContentConfig(**config_dict)
                 )
             else:
                 raise
+        gemini_latency_ms = (time.perf_counter() - gemini_start) * 1000
 
         # Parse structured response - manually parse JSON since we used dict schema
         response_text = response.text
         if response_text is None:
             raise ValueError("Gemini API returned empty response")
         try:
-            response_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
+            # Parsed and validated in one pass (model_validate_json)
+            result = parse_model(FullExamPaper, response_text)
+        except ValidationError as e:
+            logging.getLogger(__name__).warning(
+                "Gemini response schema validation failed: %s", e
+            )
+            raise
+        except ValueError as e:
             logging.getLogger(__name__).warning(
                 "Gemini response JSON decode failed: %s; response snippet: %s",
                 e,
                 (response_text[:500] if response_text else "") + "...",
             )
             raise ValueError(f"Invalid JSON in Gemini response: {e}") from e
-        try:
-            result = FullExamPaper.model_validate(response_data)
-        except ValidationError as e:
-            logging.getLogger(__name__).warning(
-                "Gemini response schema validation failed: %s; data keys: %s",
-                e,
-                list(response_data.keys()) if isinstance(response_data, dict) else type(response_data).__name__,
-            )
-            raise
 
         # Extract cache statistics from usage metadata
         cache_hit = False
@@ -381,11 +392,13 @@ CRITICAL RULES:
             "reason": "Low OpenDataLoader quality score",
             "cost_savings_percent": 0,  # No cost savings from hybrid mode
             "model": model,
+            "model_tier": STRONG,
             "cache_eligible": cache_name is not None,  # Was caching available?
             "cache_hit": cache_hit,
             "cached_tokens": cached_tokens,
             "total_tokens": total_tokens,
-            "cached_tokens_saved": cached_tokens  # Tokens that benefited from cache discount
+            "cached_tokens_saved": cached_tokens,  # Tokens that benefited from cache discount
+            "gemini_latency_ms": round(gemini_latency_ms, 1)
         }
 
         return result
@@ -400,6 +413,86 @@ CRITICAL RULES:
                 pass
 
 
+async def _generate_exam_paper(
+    client: genai.Client,
+    model: str,
+    prompt: str,
+    config_dict: Dict[str, Any],
+    hedge_bucket: str,
+) -> Tuple[FullExamPaper, Any]:
+    """
+    Run one hybrid extraction call and parse its response.
+
+    Args:
+        client: Gemini API client
+        model: Gemini model name
+        prompt: Extraction prompt with the document Markdown
+        config_dict: GenerateContentConfig fields (with cached_content if cached)
+        hedge_bucket: Size bucket for hedging the call
+
+    Returns:
+        Tuple of (parsed FullExamPaper, GenerateContentResponse)
+
+    Raises:
+        ValidationError: If the response does not match the schema
+        ValueError: If the response is empty or not valid JSON
+    """
+    global _EXTRACTION_CACHE_NAME
+    try:
+        response = await generate_content(
+            client,
+            hedge_bucket=hedge_bucket,
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(**config_dict)
+        )
+    except Exception as e:
+        if 'cached_content' in config_dict and _is_cache_expired_error(e):
+            _EXTRACTION_CACHE_NAME = None
+            config_dict = {k: v for k, v in config_dict.items() if k != 'cached_content'}
+            response = await generate_content(
+                client,
+                hedge_bucket=hedge_bucket,
+                model=model,
+                contents=prompt,
+                config=types.GenerateContentConfig(**config_dict)
+            )
+        else:
+            raise
+
+    # Parse structured response - manually parse JSON since we used dict schema
+    response_text = response.text
+    if response_text is None:
+        raise ValueError("Gemini API returned empty response")
+    try:
+        # Parsed and validated in one pass (model_validate_json)
+        result = parse_model(FullExamPaper, response_text)
+    except ValidationError as e:
+        logging.getLogger(__name__).warning(
+            "Gemini response schema validation failed: %s", e
+        )
+        raise
+    except ValueError as e:
+        logging.getLogger(__name__).warning(
+            "Gemini response JSON decode failed: %s; response snippet: %s",
+            e,
+            (response_text[:500] if response_text else "") + "...",
+        )
+        raise ValueError(f"Invalid JSON in Gemini response: {e}") from e
+    return result, response
+
+
+def _exam_question_ids(paper: FullExamPaper) -> List[str]:
+    """Group, question and parent ids of an extraction (for the coverage check)."""
+    ids = [group.group_id for group in paper.groups]
+    for group in paper.groups:
+        for question in group.questions:
+            ids.append(question.id)
+            if question.parent_id:
+                ids.append(question.parent_id)
+    return ids
+
+
 @retry_with_backoff()
 async def extract_pdf_data_hybrid(
     client: genai.Client,
@@ -415,8 +508,9 @@ async def extract_pdf_data_hybrid(
     1. Extract PDF structure locally using OpenDataLoader
     2. Calculate quality score and route based on threshold
     3. Build prompt with structured markdown content
-    4. Call Gemini API with response schema for structured output
-    5. Add processing metadata (method, quality scores, cost savings)
+    4. Call Gemini API with response schema for structured output (simple
+       documents try the model cascade's fast tier first; see model_cascade.py)
+    5. Add processing metadata (method, quality scores, cost savings, model tier)
 
     If Gemini extraction fails but raise_on_partial=False, returns partial
     extraction with basic metadata only.
@@ -434,6 +528,7 @@ async def extract_pdf_data_hybrid(
         FileNotFoundError: If PDF file doesn't exist
         ValueError: If PDF cannot be processed
         Exception: For Gemini API errors (only if raise_on_partial=True)
+        DeadlineExceeded: If the request's deadline passed
         PartialExtractionError: If Gemini fails and raise_on_partial=False (contains partial result)
 
     Example:
@@ -445,12 +540,14 @@ async def extract_pdf_data_hybrid(
     # Step 1: Extract PDF structure using OpenDataLoader (local, fast, free)
     # Re-use pre-computed structure if provided (avoids duplicate work during classification)
     if doc_structure is None:
-        doc_structure = extract_pdf_structure(file_path)
+        doc_structure = await run_stage("parse", extract_pdf_structure, file_path)
 
     # Step 2: Route based on quality score
     if doc_structure.quality_score < 0.7:
         # Low quality: fallback to Gemini Vision API
-        return await extract_with_vision_fallback(client, file_path, model)
+        result = await extract_with_vision_fallback(client, file_path, model)
+        result.processing_metadata["opendataloader_quality"] = doc_structure.quality_score
+        return result
 
     # Step 3: Get or create context cache for cost optimization (may be None if content too small)
     cache_name = await get_or_create_cache(client, model)
@@ -473,12 +570,12 @@ GROUPS (CRITICAL):
 
 QUESTION TYPES:
 
-1. **MCQs**: Use `options` array [{label: "A", text: "..."}, ...]
+1. **MCQs**: Use `options` array [{{label: "A", text: "..."}}, ...]
 
 2. **Match Columns** (CRITICAL - Extract BOTH columns as SEPARATE lists):
    Use `match_data` with:
-   - column_a_items: [{label: "1.3.1", text: "..."}, ...]
-   - column_b_items: [{label: "A", text: "..."}, {label: "B", text: "..."}, ...] - include ALL items
+   - column_a_items: [{{label: "1.3.1", text: "..."}}, ...]
+   - column_b_items: [{{label: "A", text: "..."}}, {{label: "B", text: "..."}}, ...] - include ALL items
    Column B often has MORE items than Column A (distractors). Extract ALL of them.
 
 3. **Fill-in-blanks**:
@@ -501,6 +598,7 @@ CRITICAL:
 """
 
     # Step 5: Call Gemini API with structured output schema (wrapped in try/except for partial results)
+    tier = choose_tier(doc_structure)
     try:
         # Generate clean schema without additionalProperties for Gemini compatibility
         raw_schema = FullExamPaper.model_json_schema()
@@ -514,47 +612,36 @@ CRITICAL:
         if cache_name is not None:
             config_dict['cached_content'] = cache_name
 
-        try:
-            response = client.models.generate_content(
-                model=model,
-                contents=prompt,
-                config=types.GenerateContentConfig(**config_dict)
-            )
-        except Exception as e:
-            if cache_name is not None and _is_cache_expired_error(e):
-                global _EXTRACTION_CACHE_NAME
-                _EXTRACTION_CACHE_NAME = None
-                config_dict = {k: v for k, v in config_dict.items() if k != 'cached_content'}
-                response = client.models.generate_content(
-                    model=model,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(**config_dict)
+        # Tiers are hedged on their own latencies: fast-model samples would
+        # pull the strong model's percentile down
+        hedge_bucket = size_bucket("hybrid", _estimate_token_count(prompt))
+        escalation_reason: Optional[str] = None
+        gemini_start = time.perf_counter()
+        if tier == FAST:
+            served_model = model_for_tier(FAST, model)
+            # The context cache was created for the strong model
+            fast_config = {k: v for k, v in config_dict.items() if k != 'cached_content'}
+            try:
+                result, response = await _generate_exam_paper(
+                    client, served_model, prompt, fast_config, f"{FAST}:{hedge_bucket}"
                 )
-            else:
-                raise
-
-        # Parse structured response - manually parse JSON since we used dict schema
-        response_text = response.text
-        if response_text is None:
-            raise ValueError("Gemini API returned empty response")
-        try:
-            response_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            logging.getLogger(__name__).warning(
-                "Gemini response JSON decode failed: %s; response snippet: %s",
-                e,
-                (response_text[:500] if response_text else "") + "...",
-            )
-            raise ValueError(f"Invalid JSON in Gemini response: {e}") from e
-        try:
-            result = FullExamPaper.model_validate(response_data)
-        except ValidationError as e:
-            logging.getLogger(__name__).warning(
-                "Gemini response schema validation failed: %s; data keys: %s",
-                e,
-                list(response_data.keys()) if isinstance(response_data, dict) else type(response_data).__name__,
+                missing = missing_question_numbers(doc_structure.markdown, _exam_question_ids(result))
+                if missing:
+                    escalation_reason = "coverage"
+                    logging.getLogger(__name__).info(
+                        "Fast tier (%s) missed questions %s; escalating to %s", served_model, missing, model
+                    )
+            except ValueError as e:  # Includes ValidationError
+                escalation_reason = "validation"
+                logging.getLogger(__name__).info(
+                    "Fast tier (%s) response failed validation (%s); escalating to %s", served_model, e, model
+                )
+        if tier == STRONG or escalation_reason is not None:
+            served_model = model
+            result, response = await _generate_exam_paper(
+                client, model, prompt, config_dict, f"{STRONG}:{hedge_bucket}"
             )
-            raise
+        gemini_latency_ms = (time.perf_counter() - gemini_start) * 1000
 
         # Step 6: Extract cache statistics from usage metadata
         cache_hit = False
@@ -575,19 +662,23 @@ CRITICAL:
             "opendataloader_quality": doc_structure.quality_score,
             "cost_savings_percent": 80,  # Hybrid mode achieves ~80% cost reduction
             "element_count": doc_structure.element_count,
-            "model": model,
+            "model": served_model,
+            "model_tier": STRONG if escalation_reason is not None else tier,
+            "escalation_reason": escalation_reason,
             "cache_eligible": cache_name is not None,  # Was caching available?
             "cache_hit": cache_hit,
             "cached_tokens": cached_tokens,
             "total_tokens": total_tokens,
-            "cached_tokens_saved": cached_tokens  # Tokens that benefited from cache discount
+            "cached_tokens_saved": cached_tokens,  # Tokens that benefited from cache discount
+            "gemini_latency_ms": round(gemini_latency_ms, 1)
         }
 
         return result
 
     except Exception as e:
-        # If Gemini extraction fails, create partial result
-        if raise_on_partial:
+        # If Gemini extraction fails, create partial result (not when the
+        # request's deadline passed: nobody is waiting for it)
+        if raise_on_partial or isinstance(e, DeadlineExceeded):
             raise
 
         # Build partial extraction result with minimal data
@@ -605,6 +696,7 @@ CRITICAL:
                 "cost_savings_percent": 0,
                 "element_count": doc_structure.element_count,
                 "model": model,
+                "model_tier": tier,
                 "error": str(e),
                 "error_type": type(e).__name__
             }
@@ -0,0 +1,296 @@
+"""Priority lanes in front of the parse and LLM stages.
+
+Interactive /api/extract calls, /api/batch jobs and background work (the CLI,
+resumed checkpoints) share the same OpenDataLoader and Gemini capacity. Each
+stage ("parse", "llm") has a LaneScheduler with a fixed number of slots;
+work waits for a slot in the queue of its lane:
+
+- interactive: a client is waiting on the response
+- batch: files of an /api/batch job
+- background: nobody is waiting (CLI runs, resumed checkpoints)
+
+Free slots go to lanes by weighted fair sharing (stride scheduling): each
+grant advances the lane's virtual time by 1/weight and the non-empty lane
+with the lowest virtual time goes next. With the default weights 8:2:1 an
+interactive request arriving behind a queue of batch items is served at the
+next free slot (it preempts the queued items, not running ones), while batch
+still gets a fifth of the slots under sustained interactive load. A lane
+that was idle does not bank credit. As a starvation bound, a waiter queued
+longer than max_wait_seconds is served before any weighting.
+
+Which lane a call belongs to is carried in a context variable: endpoints
+and jobs set it with `with lane("batch"):` and run_stage() reads it.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+from app.config import get_settings
+from app.services.admission import get_admission_controller
+from app.utils.deadline import check_deadline
+from app.utils.live_stats import QUEUE_WAIT_MS, record_metric
+
+T = TypeVar("T")
+
+LANES = ("interactive", "batch", "background")
+
+# Admission control budget each stage counts toward (queued and running calls)
+_ADMISSION_KIND = {"parse": "parse", "llm": "gemini"}
+
+_current_lane: ContextVar[str] = ContextVar("pipeline_lane", default="interactive")
+
+
+def current_lane() -> str:
+    """Lane of the work running in this context (default: interactive)."""
+    return _current_lane.get()
+
+
+@contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Run the block (and tasks it starts) in lane `name`."""
+    if name not in LANES:
+        raise ValueError(f"Unknown lane '{name}'. Must be one of {LANES}")
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("future", "enqueued_at")
+
+    def __init__(self, future: "asyncio.Future[None]", enqueued_at: float) -> None:
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class _LaneStats:
+    __slots__ = ("running", "granted", "preempted", "wait_total", "wait_max")
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.granted = 0
+        self.preempted = 0  # Grants made ahead of earlier-queued items of other lanes
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class LaneScheduler:
+    """Slots of one pipeline stage shared between lanes by weighted fair queuing.
+
+    Usage:
+        async with scheduler.slot("interactive"):
+            ...  # the stage
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        slots: int,
+        weights: Optional[Dict[str, int]] = None,
+        max_wait_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.stage = stage
+        self.slots = slots
+        self.weights = weights or {"interactive": 8, "batch": 2, "background": 1}
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._queues: Dict[str, Deque[_Waiter]] = {name: deque() for name in LANES}
+        self._pass: Dict[str, float] = {name: 0.0 for name in LANES}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._stats: Dict[str, _LaneStats] = {name: _LaneStats() for name in LANES}
+
+    @asynccontextmanager
+    async def slot(self, lane_name: str) -> AsyncIterator[None]:
+        """Hold one slot of the stage for the block, waiting in `lane_name`'s queue."""
+        await self.acquire(lane_name)
+        try:
+            yield
+        finally:
+            self.release(lane_name)
+
+    async def acquire(self, lane_name: str) -> None:
+        """Wait for a slot in lane `lane_name`."""
+        if self._running < self.slots and not any(self._queues.values()):
+            self._grant(lane_name, 0.0)
+            return
+
+        queue = self._queues[lane_name]
+        if not queue and self._stats[lane_name].running == 0:
+            # An idle lane rejoins at the current virtual time (no banked credit)
+            self._pass[lane_name] = max(self._pass[lane_name], self._virtual_time)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), self._clock())
+        queue.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(lane_name)  # Granted just before the cancellation
+            else:
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self, lane_name: str) -> None:
+        """Return a slot held by lane `lane_name` and hand it to the next waiter."""
+        self._running -= 1
+        self._stats[lane_name].running -= 1
+        self._dispatch()
+
+    def _grant(self, lane_name: str, waited: float) -> None:
+        self._running += 1
+        stats = self._stats[lane_name]
+        stats.running += 1
+        stats.granted += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        self._pass[lane_name] += 1.0 / self.weights.get(lane_name, 1)
+        self._virtual_time = self._pass[lane_name]
+        record_metric(QUEUE_WAIT_MS, waited * 1000, f"{self.stage}:{lane_name}")
+
+    def _dispatch(self) -> None:
+        while self._running < self.slots:
+            lane_name = self._next_lane()
+            if lane_name is None:
+                return
+            waiter = self._queues[lane_name].popleft()
+            if waiter.future.done():
+                continue  # Cancelled while queued
+            if any(q and q[0].enqueued_at < waiter.enqueued_at for name, q in self._queues.items() if name != lane_name):
+                self._stats[lane_name].preempted += 1
+            self._grant(lane_name, self._clock() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _next_lane(self) -> Optional[str]:
+        waiting = [name for name in LANES if self._queues[name]]
+        if not waiting:
+            return None
+        now = self._clock()
+        starving = [name for name in waiting if now - self._queues[name][0].enqueued_at >= self.max_wait_seconds]
+        if starving:
+            return min(starving, key=lambda name: self._queues[name][0].enqueued_at)
+        return min(waiting, key=lambda name: (self._pass[name], LANES.index(name)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Slots in use and per-lane queue metrics."""
+        now = self._clock()
+        lanes: Dict[str, Any] = {}
+        for name in LANES:
+            stats = self._stats[name]
+            queue = self._queues[name]
+            lanes[name] = {
+                "weight": self.weights.get(name, 1),
+                "queued": len(queue),
+                "running": stats.running,
+                "granted": stats.granted,
+                "preempted": stats.preempted,
+                "avg_wait_ms": round(stats.wait_total / stats.granted * 1000, 1) if stats.granted else 0.0,
+                "max_wait_ms": round(stats.wait_max * 1000, 1),
+                "oldest_wait_ms": round((now - queue[0].enqueued_at) * 1000, 1) if queue else 0.0,
+            }
+        return {"slots": self.slots, "running": self._running, "lanes": lanes}
+
+
+_schedulers: Dict[str, LaneScheduler] = {}
+
+
+def get_scheduler(stage: str) -> LaneScheduler:
+    """Get the process-wide scheduler of a stage ("parse" or "llm")."""
+    scheduler = _schedulers.get(stage)
+    if scheduler is None:
+        settings = get_settings()
+        scheduler = LaneScheduler(
+            stage,
+            slots=settings.scheduler_parse_slots if stage == "parse" else settings.scheduler_llm_slots,
+            weights={
+                "interactive": settings.scheduler_weight_interactive,
+                "batch": settings.scheduler_weight_batch,
+                "background": settings.scheduler_weight_background,
+            },
+            max_wait_seconds=settings.scheduler_max_wait_seconds,
+        )
+        _schedulers[stage] = scheduler
+    return scheduler
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """Snapshot of both stage schedulers (for /api/stats/scheduler)."""
+    return {stage: get_scheduler(stage).snapshot() for stage in _ADMISSION_KIND}
+
+
+async def run_stage(stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking stage call in a worker thread once its lane gets a slot.
+
+    While queued and running, the call counts toward the stage's in-flight
+    budget of admission control. The request's deadline is checked before
+    queueing and again once a slot is granted. If the caller is cancelled
+    while the thread runs, the slot and admission count are held until the
+    thread returns (it cannot be interrupted).
+
+    Args:
+        stage: "parse" (OpenDataLoader) or "llm" (Gemini)
+        fn: Blocking function to run
+        *args, **kwargs: Passed to fn
+
+    Returns:
+        fn's return value
+
+    Raises:
+        DeadlineExceeded: If the request's deadline passed before the call started
+    """
+    check_deadline(stage)
+    lane_name = current_lane()
+    scheduler = get_scheduler(stage)
+    held = ExitStack()
+    held.enter_context(get_admission_controller().track(_ADMISSION_KIND[stage]))
+    try:
+        await scheduler.acquire(lane_name)
+        held.callback(scheduler.release, lane_name)
+        check_deadline(stage)
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+    except BaseException:
+        held.close()
+        raise
+    future.add_done_callback(lambda done: _finish(done, held))
+    return await asyncio.shield(future)
+
+
+async def run_async_stage(stage: str, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """Await an async stage call once its lane gets a slot.
+
+    Like run_stage(), but the call runs on the event loop: cancelling the
+    caller cancels the call itself and frees its slot and admission count.
+
+    Args:
+        stage: "parse" (OpenDataLoader) or "llm" (Gemini)
+        fn: Coroutine function to await
+        *args, **kwargs: Passed to fn
+
+    Returns:
+        fn's return value
+
+    Raises:
+        DeadlineExceeded: If the request's deadline passed before the call started
+    """
+    check_deadline(stage)
+    lane_name = current_lane()
+    with get_admission_controller().track(_ADMISSION_KIND[stage]):
+        async with get_scheduler(stage).slot(lane_name):
+            check_deadline(stage)
+            return await fn(*args, **kwargs)
+
+
+def _finish(future: "asyncio.Future[Any]", held: ExitStack) -> None:
+    held.close()
+    if not future.cancelled():
+        future.exception()  # Retrieved even when the caller was cancelled meanwhile
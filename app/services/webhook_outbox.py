@@ -0,0 +1,408 @@
+"""Durable webhook delivery from the webhook_outbox table.
+
+Endpoints call enqueue_webhook(), which inserts the event into the outbox
+(migration 015) instead of POSTing it from a detached task, so an event
+survives restarts and is never lost with its task. A WebhookDispatcher,
+started with the application, runs a fixed pool of worker tasks that lease
+due events, POST them through one shared httpx.AsyncClient (connections to a
+receiver are kept alive across deliveries) and record each outcome.
+
+A failed attempt is rescheduled in the table with exponential backoff and
+full jitter, so pending retries also survive a restart; after
+webhook_max_attempts the event is marked dead. Deliveries are at least once:
+an event whose worker died mid-attempt is claimed again when its lease
+expires. Concurrency is bounded per process (webhook_workers) and per
+receiving host (webhook_per_host_limit).
+
+If the outbox insert itself fails, the event is delivered in-process by
+send_webhook() as before, as tracked work (app/services/drain.py) that is
+checkpointed and re-queued on the next start if shutdown interrupts it.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, UTC
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import httpx
+from supabase import Client
+
+from app.config import get_settings
+from app.db.supabase_client import get_supabase_client
+from app.db.webhook_outbox import (
+    claim_webhook_deliveries,
+    enqueue_webhook_event,
+    mark_webhook_dead,
+    mark_webhook_delivered,
+    reschedule_webhook_delivery,
+)
+from app.services.drain import WorkCheckpointed, get_work_tracker, save_checkpoint
+from app.services.webhook_sender import post_webhook, send_webhook, validate_webhook_url, webhook_headers
+from app.utils.live_stats import WEBHOOK_ATTEMPT_MS, WEBHOOK_LATENCY_MS, record_metric
+from app.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Minimum lease on a claimed event; must outlast one attempt including the
+# wait for a per-host slot
+MIN_LEASE_SECONDS = 120
+
+
+def retry_delay(attempt: int, base_seconds: float, max_seconds: float,
+                rand: Callable[[], float] = random.random) -> float:
+    """Delay before the attempt after `attempt` (1-based): full-jitter backoff.
+
+    The ceiling doubles per attempt from base_seconds up to max_seconds and
+    the delay is drawn uniformly below it, so receivers recovering from an
+    outage are not hit by every pending event at once.
+    """
+    ceiling = min(max_seconds, base_seconds * 2.0 ** max(attempt - 1, 0))
+    return ceiling * rand()
+
+
+class WebhookMetrics:
+    """Process-wide webhook delivery counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.enqueued = 0
+            self.enqueue_failures = 0
+            self.attempts = 0
+            self.delivered = 0
+            self.failed_attempts = 0
+            self.dead_lettered = 0
+
+    def record_enqueue(self, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self.enqueue_failures += 1
+            else:
+                self.enqueued += 1
+
+    def record_attempt(self, delivered: bool, dead: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            if delivered:
+                self.delivered += 1
+            else:
+                self.failed_attempts += 1
+            self.dead_lettered += int(dead)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "enqueue_failures": self.enqueue_failures,
+                "attempts": self.attempts,
+                "delivered": self.delivered,
+                "failed_attempts": self.failed_attempts,
+                "dead_lettered": self.dead_lettered,
+            }
+
+
+_metrics = WebhookMetrics()
+
+
+class WebhookDispatcher:
+    """Pool of workers delivering due events from the webhook outbox.
+
+    Usage:
+        dispatcher = WebhookDispatcher(client)
+        await dispatcher.start()
+        ...
+        await dispatcher.stop()
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        workers: int = 4,
+        per_host_limit: int = 2,
+        timeout_seconds: float = 10.0,
+        poll_interval_seconds: float = 5.0,
+        retry_base_seconds: float = 2.0,
+        retry_max_seconds: float = 900.0,
+    ) -> None:
+        self._client = client
+        self._workers = workers
+        self._per_host_limit = per_host_limit
+        self._timeout_seconds = timeout_seconds
+        self._poll_interval_seconds = poll_interval_seconds
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+        self._lease_seconds = max(MIN_LEASE_SECONDS, int(timeout_seconds * 4))
+
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._wake = asyncio.Event()
+        self._busy = 0
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._poller: Optional["asyncio.Task[None]"] = None
+        self._worker_tasks: list["asyncio.Task[None]"] = []
+
+    @property
+    def running(self) -> bool:
+        return self._poller is not None
+
+    async def start(self) -> None:
+        """Open the shared HTTP client and start the poller and workers."""
+        if self.running:
+            return
+        self._http = httpx.AsyncClient(
+            timeout=self._timeout_seconds,
+            limits=httpx.Limits(max_connections=self._workers, max_keepalive_connections=self._workers),
+        )
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming, let in-flight deliveries finish (up to `timeout`), then close.
+
+        Events still leased when the timeout expires are claimed again by the
+        next dispatcher once their lease runs out.
+        """
+        if self._poller is None:
+            return
+        self._poller.cancel()
+        await asyncio.gather(self._poller, return_exceptions=True)
+        self._poller = None
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook dispatcher stopped with {self._busy} deliveries in flight")
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def wake(self) -> None:
+        """Check the outbox now instead of at the next poll."""
+        self._wake.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self._workers,
+            "per_host_limit": self._per_host_limit,
+            "in_flight": self._busy,
+            "queued": self._queue.qsize(),
+        }
+
+    async def _poll(self) -> None:
+        while True:
+            free = self._workers - self._busy - self._queue.qsize()
+            if free > 0:
+                self._wake.clear()
+                try:
+                    rows = await claim_webhook_deliveries(self._client, free, self._lease_seconds)
+                except RuntimeError as e:
+                    logger.warning(str(e))
+                    rows = []
+                for row in rows:
+                    self._queue.put_nowait(row)
+                if rows and len(rows) == free:
+                    # More may be due; claim again once a worker frees up
+                    continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self) -> None:
+        while True:
+            row = await self._queue.get()
+            self._busy += 1
+            try:
+                await self.deliver(row)
+            except Exception:
+                logger.exception(f"Webhook delivery {row.get('id')} failed unexpectedly")
+            finally:
+                self._busy -= 1
+                self._queue.task_done()
+                self._wake.set()
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self._per_host_limit)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with semaphore:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._hosts[host]
+
+    async def deliver(self, row: Dict[str, Any]) -> None:
+        """Make one attempt for a claimed outbox row and record the outcome."""
+        delivery_id = str(row['id'])
+        webhook_url = row['webhook_url']
+        attempts = int(row.get('attempts') or 1)
+        max_attempts = int(row.get('max_attempts') or 1)
+
+        try:
+            await asyncio.to_thread(validate_webhook_url, webhook_url)
+        except ValueError as e:
+            # An invalid or internal URL will not become valid on retry
+            logger.error(f"Webhook {delivery_id} dead-lettered: {str(e)}")
+            _metrics.record_attempt(delivered=False, dead=True)
+            await mark_webhook_dead(self._client, delivery_id, str(e))
+            return
+
+        assert self._http is not None, "dispatcher not started"
+        payload_bytes = dumps(row['payload'])
+        started = time.perf_counter()
+        async with self._host_slot(urlparse(webhook_url).hostname or ''):
+            delivered, status_code, error = await post_webhook(
+                self._http, webhook_url, payload_bytes, webhook_headers(payload_bytes)
+            )
+        record_metric(WEBHOOK_ATTEMPT_MS, (time.perf_counter() - started) * 1000, row.get('event') or 'all')
+
+        if delivered:
+            _metrics.record_attempt(delivered=True, dead=False)
+            record_metric(WEBHOOK_LATENCY_MS, _age_ms(row.get('created_at')), row.get('event') or 'all')
+            await mark_webhook_delivered(self._client, delivery_id, status_code or 200)
+            return
+
+        error = error or "Unknown error"
+        if attempts >= max_attempts:
+            logger.error(f"Webhook {delivery_id} dead-lettered after {attempts} attempts: {error}")
+            _metrics.record_attempt(delivered=False, dead=True)
+            await mark_webhook_dead(self._client, delivery_id, error, status_code)
+            return
+
+        delay = retry_delay(attempts, self._retry_base_seconds, self._retry_max_seconds)
+        logger.warning(
+            f"Webhook {delivery_id} attempt {attempts}/{max_attempts} failed ({error}); retrying in {delay:.1f}s"
+        )
+        _metrics.record_attempt(delivered=False, dead=False)
+        await reschedule_webhook_delivery(
+            self._client, delivery_id, datetime.now(UTC) + timedelta(seconds=delay), error, status_code
+        )
+
+
+def _age_ms(created_at: Optional[str]) -> Optional[float]:
+    """Milliseconds since an ISO timestamp (None if missing or unparseable)."""
+    if not created_at:
+        return None
+    try:
+        created = datetime.fromisoformat(created_at)
+    except ValueError:
+        return None
+    return max((datetime.now(UTC) - created).total_seconds() * 1000, 0.0)
+
+
+_dispatcher: Optional[WebhookDispatcher] = None
+
+# Fallback deliveries in flight (held so they are not garbage collected)
+_fallback_tasks: Set["asyncio.Task[bool]"] = set()
+
+
+async def start_webhook_dispatcher() -> Optional[WebhookDispatcher]:
+    """Start this process's dispatcher (no-op when webhook_outbox_enabled is off).
+
+    A failure to start is logged rather than raised: the API still serves
+    requests, and queued events wait for a process whose workers are running.
+    """
+    global _dispatcher
+    settings = get_settings()
+    if not settings.webhook_outbox_enabled or _dispatcher is not None:
+        return _dispatcher
+    try:
+        client = get_supabase_client()
+    except Exception as e:
+        logger.error(f"Webhook dispatcher not started: {str(e)}")
+        return None
+    _dispatcher = WebhookDispatcher(
+        client,
+        workers=settings.webhook_workers,
+        per_host_limit=settings.webhook_per_host_limit,
+        timeout_seconds=settings.webhook_timeout_seconds,
+        poll_interval_seconds=settings.webhook_poll_interval_seconds,
+        retry_base_seconds=settings.webhook_retry_base_seconds,
+        retry_max_seconds=settings.webhook_retry_max_seconds,
+    )
+    await _dispatcher.start()
+    return _dispatcher
+
+
+async def stop_webhook_dispatcher(timeout: float = 10.0) -> None:
+    """Stop this process's dispatcher, if running."""
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop(timeout)
+        _dispatcher = None
+
+
+async def _send_fallback(webhook_url: str, payload: Dict[str, Any]) -> bool:
+    async def checkpoint() -> None:
+        await asyncio.to_thread(save_checkpoint, "webhook", {"webhook_url": webhook_url, "payload": payload}, [])
+
+    try:
+        async with get_work_tracker().track("webhook", checkpoint):
+            return await send_webhook(webhook_url, payload)
+    except ValueError as e:
+        logger.error(f"Invalid webhook URL: {str(e)}")
+        return False
+    except WorkCheckpointed:
+        return False
+
+
+async def resume_webhook(params: Dict[str, Any], files: List[bytes]) -> None:
+    """Queue a fallback delivery checkpointed by a previous shutdown."""
+    await enqueue_webhook(get_supabase_client(), params["webhook_url"], params["payload"])
+
+
+async def enqueue_webhook(client: Client, webhook_url: str, payload: Dict[str, Any]) -> None:
+    """Queue a webhook event for durable delivery.
+
+    Never raises: if the outbox insert fails, the event is sent in-process
+    with send_webhook()'s own retries instead.
+
+    Args:
+        client: Supabase client instance
+        webhook_url: Target webhook URL
+        payload: Event payload; its 'event' key names the event
+    """
+    try:
+        await enqueue_webhook_event(
+            client, str(payload.get('event') or 'unknown'), webhook_url, payload,
+            get_settings().webhook_max_attempts,
+        )
+    except Exception as e:
+        logger.warning(f"{str(e)}; delivering webhook in-process")
+        _metrics.record_enqueue(failed=True)
+        task = asyncio.create_task(_send_fallback(webhook_url, payload))
+        _fallback_tasks.add(task)
+        task.add_done_callback(_fallback_tasks.discard)
+        return
+
+    _metrics.record_enqueue(failed=False)
+    if _dispatcher is not None:
+        _dispatcher.wake()
+
+
+def get_webhook_stats() -> Dict[str, Any]:
+    """Return delivery counters and dispatcher state for this process."""
+    return {
+        **_metrics.snapshot(),
+        "fallback_in_flight": len(_fallback_tasks),
+        "dispatcher": _dispatcher.snapshot() if _dispatcher is not None else {"running": False},
+    }
+
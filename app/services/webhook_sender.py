@@ -8,11 +8,10 @@ import asyncio
 import hmac
 import hashlib
 import ipaddress
-import json
 import logging
 import socket
 from datetime import datetime, UTC
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
 import httpx
@@ -30,32 +29,24 @@ _SSRF_BLOCKED_NETWORKS = [
 ]
 
 from app.config import get_settings
+from app.utils.serialization import dumps
 
 
 logger = logging.getLogger(__name__)
 
 
-async def send_webhook(
-    webhook_url: str,
-    payload: Dict[str, Any],
-    signature_key: Optional[str] = None,
-    max_retries: int = 3,
-    timeout_seconds: int = 30
-) -> bool:
-    """Send webhook notification with HMAC signature and retry logic.
+def validate_webhook_url(webhook_url: str) -> None:
+    """Check that a webhook URL is HTTPS, not too long, and not internal.
 
-    Args:
-        webhook_url: Target webhook URL (must be HTTPS)
-        payload: Webhook payload data
-        signature_key: Secret key for HMAC signature (uses GEMINI_API_KEY if not provided)
-        max_retries: Number of retry attempts on failure (default: 3)
-        timeout_seconds: Request timeout in seconds (default: 30)
+    Resolves the host (blocking DNS lookup) to reject URLs that point at
+    loopback, private or link-local addresses.
 
-    Returns:
-        bool: True if webhook delivered successfully, False otherwise
+    Args:
+        webhook_url: Target webhook URL
 
     Raises:
-        ValueError: If webhook_url is not HTTPS
+        ValueError: If the URL is not HTTPS, too long, unresolvable, or
+            resolves to a blocked address
     """
     # Validate HTTPS
     if not webhook_url.startswith('https://'):
@@ -89,15 +80,22 @@ async def send_webhook(
         except socket.gaierror as e:
             raise ValueError(f"Webhook URL host could not be resolved: {e}") from e
 
+
+def webhook_headers(payload_bytes: bytes, signature_key: Optional[str] = None) -> Dict[str, str]:
+    """Build request headers, including the HMAC-SHA256 signature of the body.
+
+    Args:
+        payload_bytes: Serialized JSON payload
+        signature_key: Secret key for HMAC signature (uses GEMINI_API_KEY if not provided)
+
+    Returns:
+        Dict[str, str]: Headers for the webhook POST
+    """
     # Use GEMINI_API_KEY as default signature key
     if signature_key is None:
         settings = get_settings()
         signature_key = settings.gemini_api_key
 
-    # Convert payload to JSON
-    payload_json = json.dumps(payload, default=str)
-    payload_bytes = payload_json.encode('utf-8')
-
     # Generate HMAC-SHA256 signature
     signature = hmac.new(
         signature_key.encode('utf-8'),
@@ -105,64 +103,137 @@ async def send_webhook(
         hashlib.sha256
     ).hexdigest()
 
-    # Prepare headers
-    headers = {
+    return {
         'Content-Type': 'application/json',
         'X-Webhook-Signature': signature,
         'User-Agent': 'PDF-Extraction-Service/1.0'
     }
 
+
+async def post_webhook(
+    client: httpx.AsyncClient,
+    webhook_url: str,
+    payload_bytes: bytes,
+    headers: Dict[str, str]
+) -> Tuple[bool, Optional[int], Optional[str]]:
+    """Make one delivery attempt with an open HTTP client.
+
+    Args:
+        client: HTTP client (its connection pool is reused across attempts)
+        webhook_url: Target webhook URL (already validated)
+        payload_bytes: Serialized JSON payload
+        headers: Headers from webhook_headers()
+
+    Returns:
+        Tuple[bool, Optional[int], Optional[str]]: (delivered, HTTP status
+            code if a response arrived, error description if not delivered)
+    """
+    try:
+        response = await client.post(
+            webhook_url,
+            content=payload_bytes,
+            headers=headers
+        )
+    except httpx.TimeoutException as e:
+        return False, None, f"Timeout: {str(e)}"
+    except Exception as e:
+        return False, None, str(e)
+
+    # Consider 2xx status codes as success
+    if 200 <= response.status_code < 300:
+        return True, response.status_code, None
+    return False, response.status_code, f"HTTP {response.status_code}: {response.text[:200]}"
+
+
+async def send_webhook(
+    webhook_url: str,
+    payload: Dict[str, Any],
+    signature_key: Optional[str] = None,
+    max_retries: int = 3,
+    timeout_seconds: int = 30
+) -> bool:
+    """Send webhook notification with HMAC signature and retry logic.
+
+    All attempts share one HTTP client, so retries reuse its connection.
+    Endpoints deliver through the durable outbox
+    (app/services/webhook_outbox.py) instead; this is its in-process
+    fallback.
+
+    Args:
+        webhook_url: Target webhook URL (must be HTTPS)
+        payload: Webhook payload data
+        signature_key: Secret key for HMAC signature (uses GEMINI_API_KEY if not provided)
+        max_retries: Number of retry attempts on failure (default: 3)
+        timeout_seconds: Request timeout in seconds (default: 30)
+
+    Returns:
+        bool: True if webhook delivered successfully, False otherwise
+
+    Raises:
+        ValueError: If webhook_url is not HTTPS
+    """
+    validate_webhook_url(webhook_url)
+
+    # Convert payload to JSON
+    payload_bytes = dumps(payload)
+    headers = webhook_headers(payload_bytes, signature_key)
+
     # Retry with exponential backoff
     retry_delays = [1, 2, 4]  # seconds
     last_error = None
 
-    for attempt in range(max_retries):
-        try:
+    async with httpx.AsyncClient(timeout=timeout_seconds) as client:
+        for attempt in range(max_retries):
             logger.info(f"Sending webhook to {webhook_url} (attempt {attempt + 1}/{max_retries})")
 
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-                response = await client.post(
-                    webhook_url,
-                    content=payload_bytes,
-                    headers=headers
-                )
-
-                # Log response
-                logger.info(
-                    f"Webhook delivery: status={response.status_code}, "
-                    f"url={webhook_url}, attempt={attempt + 1}"
-                )
-
-                # Consider 2xx status codes as success
-                if 200 <= response.status_code < 300:
-                    return True
-
-                # Log non-2xx responses
-                logger.warning(
-                    f"Webhook returned non-2xx status: {response.status_code}, "
-                    f"body={response.text[:200]}"
-                )
-                last_error = f"HTTP {response.status_code}: {response.text[:200]}"
-
-        except httpx.TimeoutException as e:
-            logger.warning(f"Webhook timeout on attempt {attempt + 1}: {str(e)}")
-            last_error = f"Timeout: {str(e)}"
-
-        except Exception as e:
-            logger.warning(f"Webhook error on attempt {attempt + 1}: {str(e)}")
-            last_error = str(e)
-
-        # Wait before retry (except on last attempt)
-        if attempt < max_retries - 1:
-            delay = retry_delays[attempt]
-            logger.info(f"Retrying webhook in {delay} seconds...")
-            await asyncio.sleep(delay)
+            delivered, status_code, last_error = await post_webhook(
+                client, webhook_url, payload_bytes, headers
+            )
+            logger.info(
+                f"Webhook delivery: status={status_code}, "
+                f"url={webhook_url}, attempt={attempt + 1}"
+            )
+            if delivered:
+                return True
+            logger.warning(f"Webhook attempt {attempt + 1} failed: {last_error}")
+
+            # Wait before retry (except on last attempt)
+            if attempt < max_retries - 1:
+                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
+                logger.info(f"Retrying webhook in {delay} seconds...")
+                await asyncio.sleep(delay)
 
     # All retries failed
     logger.error(f"Webhook delivery failed after {max_retries} attempts: {last_error}")
     return False
 
 
+def extraction_completed_payload(
+    extraction_id: str,
+    status: str,
+    data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build the extraction.completed event payload."""
+    return {
+        'event': 'extraction.completed',
+        'extraction_id': extraction_id,
+        'status': status,
+        'data': data or {},
+        'timestamp': datetime.now(UTC).isoformat()
+    }
+
+
+def batch_completed_payload(batch_job_id: str, status: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the batch.completed event payload."""
+    return {
+        'event': 'batch.completed',
+        'batch_job_id': batch_job_id,
+        'status': status,
+        'summary': summary,
+        'timestamp': datetime.now(UTC).isoformat()
+    }
+
+
 async def send_extraction_completed_webhook(
     webhook_url: str,
     extraction_id: str,
@@ -180,13 +251,7 @@ async def send_extraction_completed_webhook(
     Returns:
         bool: True if webhook delivered successfully, False otherwise
     """
-    payload = {
-        'event': 'extraction.completed',
-        'extraction_id': extraction_id,
-        'status': status,
-        'data': data or {},
-        'timestamp': datetime.now(UTC).isoformat()
-    }
+    payload = extraction_completed_payload(extraction_id, status, data)
 
     try:
         return await send_webhook(webhook_url, payload)
@@ -212,13 +277,7 @@ async def send_batch_completed_webhook(
     Returns:
         bool: True if webhook delivered successfully, False otherwise
     """
-    payload = {
-        'event': 'batch.completed',
-        'batch_job_id': batch_job_id,
-        'status': status,
-        'summary': summary,
-        'timestamp': datetime.now(UTC).isoformat()
-    }
+    payload = batch_completed_payload(batch_job_id, status, summary)
 
     try:
         return await send_webhook(webhook_url, payload)
@@ -0,0 +1,182 @@
+"""Content-coding negotiation and (streaming) compressors for HTTP responses.
+
+Extraction records and list pages are tens to hundreds of KB of repetitive
+JSON that compress 5-10x. gzip is always available (zlib); brotli ("br") and
+zstd are offered when the optional `brotli` / `zstandard` packages are
+installed. Among the codings a client accepts with equal q-value the server
+prefers zstd, then br, then gzip (fastest to compress at a comparable ratio).
+
+Used by CompressionMiddleware (app/middleware/compression.py) for ordinary
+responses, and by CachedRecord.encoded() (app/db/read_cache.py) to keep a
+compressed copy of hot records so repeat reads skip compression entirely.
+"""
+
+import zlib
+from typing import Callable, Dict, MutableMapping, Optional, Tuple, Union
+
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+# Compression levels: fast enough for per-request use on 100 KB bodies
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# Headers mark_encoded() edits: a response's dict or an ASGI message's MutableHeaders
+HeadersLike = Union[MutableHeaders, MutableMapping[str, str]]
+
+# Media types worth compressing (besides text/* and +json suffixes)
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+})
+
+
+class Encoder:
+    """Incremental compressor for one response body."""
+
+    def __init__(
+        self,
+        compress: Callable[[bytes], bytes],
+        flush: Callable[[], bytes],
+        finish: Callable[[], bytes],
+    ) -> None:
+        self._compress = compress
+        self._flush = flush
+        self._finish = finish
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress data and flush it, so the client can decode it right away."""
+        return self._compress(data) + self._flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last data and end the stream."""
+        return self._compress(data) + self._finish()
+
+
+def _gzip_encoder() -> Encoder:
+    z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return Encoder(z.compress, lambda: z.flush(zlib.Z_SYNC_FLUSH), z.flush)
+
+
+def _brotli_encoder() -> Encoder:
+    b = brotli.Compressor(quality=BROTLI_QUALITY)
+    return Encoder(b.process, b.flush, b.finish)
+
+
+def _zstd_encoder() -> Encoder:
+    z = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return Encoder(z.compress, lambda: z.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), z.flush)
+
+
+# Supported codings in server preference order
+ENCODERS: Dict[str, Callable[[], Encoder]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _zstd_encoder
+if brotli is not None:
+    ENCODERS["br"] = _brotli_encoder
+ENCODERS["gzip"] = _gzip_encoder
+
+
+def _parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the content-coding for a response, or None to send it uncompressed.
+
+    Args:
+        accept_encoding: Request Accept-Encoding header value
+
+    Returns:
+        Optional[str]: "zstd", "br" or "gzip" (highest q-value, ties broken by
+            server preference), or None if the client accepts none of them
+    """
+    if not accept_encoding:
+        return None
+    weights = _parse_accept_encoding(accept_encoding)
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in ENCODERS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Whether a response with this Content-Type is worth compressing."""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body with the given coding."""
+    return ENCODERS[encoding]().finish(data)
+
+
+def _find_header(headers: HeadersLike, name: str) -> Tuple[str, Optional[str]]:
+    """(key, value) of a header, matched case-insensitively in a plain dict too."""
+    for key, value in headers.items():
+        if key.lower() == name:
+            return key, value
+    return name, None
+
+
+def mark_encoded(headers: HeadersLike, encoding: Optional[str]) -> None:
+    """Set the headers of a response whose body may vary by Accept-Encoding.
+
+    Adds Vary: Accept-Encoding and, when the body was compressed, sets
+    Content-Encoding and weakens a strong ETag (the compressed bytes are a
+    different representation; If-None-Match uses weak comparison).
+
+    Args:
+        headers: Response headers (dict or starlette MutableHeaders)
+        encoding: Content-coding applied to the body, or None
+    """
+    vary_key, vary = _find_header(headers, "vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers[vary_key] = f"{vary}, Accept-Encoding"
+
+    if encoding is None:
+        return
+    headers["Content-Encoding"] = encoding
+    etag_key, etag = _find_header(headers, "etag")
+    if etag and not etag.startswith("W/"):
+        headers[etag_key] = "W/" + etag
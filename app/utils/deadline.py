@@ -0,0 +1,230 @@
+"""Per-request deadlines and cancellation of work nobody is waiting for.
+
+An /api/extract request carries a Deadline (settings.request_deadline_seconds,
+or the client's X-Request-Timeout header, capped at
+settings.request_deadline_max_seconds) in a context variable, so it follows
+the request into the pipeline task, retries and worker threads. Stages check
+it cooperatively:
+
+- retry_with_backoff checks before each attempt and does not sleep past it
+- run_stage checks before and after waiting for a parse or Gemini slot
+- the extraction router checks between its steps (dedup, classify,
+  extract, store); once stored, the webhook is still sent
+
+A stage past the deadline raises DeadlineExceeded (504). run_until_done()
+additionally cancels the awaited work at the deadline, or as soon as the
+client disconnects, and records why.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from starlette.requests import Request
+
+from app.utils.live_stats import CANCELLED_WORK_MS, record_metric
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Client override of the deadline, in seconds
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Response header naming why work was cancelled (also in the request log line)
+CANCEL_REASON_HEADER = "X-Cancel-Reason"
+
+# Status for a request whose client went away (nginx convention; nobody reads it)
+CLIENT_CLOSED_REQUEST = 499
+
+# How often run_until_done() polls for a client disconnect
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+class DeadlineExceeded(HTTPException):
+    """The request's deadline passed before the pipeline finished."""
+
+    def __init__(self, seconds: float, stage: str) -> None:
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Request deadline of {seconds:g}s exceeded during {stage}",
+            headers={CANCEL_REASON_HEADER: "deadline_exceeded"},
+        )
+        self.stage = stage
+
+
+class Deadline:
+    """Point in time by which a request's work must be done.
+
+    Usage:
+        with deadline_scope(Deadline(30)):
+            ...
+            check_deadline("extract")
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.seconds = seconds
+        self._clock = clock
+        self.started_at = clock()
+        self.expires_at = self.started_at + seconds
+        self.stage = "queued"  # Last stage that checked the deadline
+
+    def remaining(self) -> float:
+        """Seconds left (negative once expired)."""
+        return self.expires_at - self._clock()
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started_at
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str) -> None:
+        """Record that `stage` is starting; raise DeadlineExceeded if it is too late to."""
+        self.stage = stage
+        if self.expired():
+            raise DeadlineExceeded(self.seconds, stage)
+
+
+class SharedDeadline(Deadline):
+    """Deadline of work shared by several requests: the latest of their deadlines.
+
+    Each request still enforces its own deadline with run_until_done(); the
+    shared work only stops at the last one. Stages checked against it are
+    recorded on every joined deadline, so each request's 504 names the stage
+    the shared work was in.
+    """
+
+    def __init__(self, deadline: Deadline) -> None:
+        super().__init__(deadline.seconds, deadline._clock)
+        self.started_at = deadline.started_at
+        self.expires_at = deadline.expires_at
+        self.stage = deadline.stage
+        self._joined = [deadline]
+
+    def join(self, deadline: Deadline) -> None:
+        """Add a request's deadline, extending this one if it expires later."""
+        self._joined.append(deadline)
+        deadline.stage = self.stage
+        if deadline.expires_at > self.expires_at:
+            self.seconds = deadline.seconds
+            self.expires_at = deadline.expires_at
+
+    def check(self, stage: str) -> None:
+        for deadline in self._joined:
+            deadline.stage = stage
+        super().check(stage)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being processed in this context, if any."""
+    return _current_deadline.get()
+
+
+def check_deadline(stage: str) -> None:
+    """Raise DeadlineExceeded if the current request's deadline has passed (no-op without one)."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[None]:
+    """Make `deadline` current for the block (and tasks and threads it starts)."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def parse_deadline_header(value: Optional[str], default_seconds: float, max_seconds: float) -> Deadline:
+    """Deadline from an X-Request-Timeout header value, or the default.
+
+    Raises:
+        HTTPException: 400 if the header is not a positive number of seconds
+    """
+    if value is None:
+        return Deadline(default_seconds)
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0.0
+    if not 0 < seconds < float("inf"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{DEADLINE_HEADER} must be a positive number of seconds"
+        )
+    return Deadline(min(seconds, max_seconds))
+
+
+def record_cancellation(reason: str, deadline: Deadline) -> None:
+    """Log and count work cancelled for `reason` (e.g. client_disconnected)."""
+    logger.warning(
+        "Cancelled request work (%s) during %s after %.1fs", reason, deadline.stage, deadline.elapsed()
+    )
+    record_metric(CANCELLED_WORK_MS, deadline.elapsed() * 1000, reason)
+
+
+async def run_until_done(
+    request: Request,
+    work: Awaitable[T],
+    deadline: Deadline,
+    watch_disconnect: bool = True,
+) -> T:
+    """Await `work`, cancelling it at the deadline or when the client disconnects.
+
+    Args:
+        request: The request whose client is waiting on the result
+        work: Coroutine producing the response
+        deadline: The request's deadline
+        watch_disconnect: Cancel when the client disconnects (disable when the
+            result is delivered another way, e.g. a webhook)
+
+    Returns:
+        The result of work
+
+    Raises:
+        DeadlineExceeded: The deadline passed first (504)
+        HTTPException: 499 if the client disconnected first
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            timeout = max(deadline.remaining(), 0)
+            if watch_disconnect:
+                timeout = min(timeout, DISCONNECT_POLL_SECONDS)
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                try:
+                    return task.result()
+                except DeadlineExceeded:
+                    record_cancellation("deadline_exceeded", deadline)  # A stage gave up
+                    raise
+            if deadline.expired():
+                reason = "deadline_exceeded"
+                break
+            if watch_disconnect and await request.is_disconnected():
+                reason = "client_disconnected"
+                break
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    record_cancellation(reason, deadline)
+    if reason == "deadline_exceeded":
+        raise DeadlineExceeded(deadline.seconds, deadline.stage)
+    raise HTTPException(
+        status_code=CLIENT_CLOSED_REQUEST,
+        detail="Client closed request",
+        headers={CANCEL_REASON_HEADER: reason},
+    )
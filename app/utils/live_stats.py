@@ -0,0 +1,207 @@
+"""Rolling in-process quantile sketches for live latency and token statistics.
+
+/api/stats/routing answers "since the beginning of time" from the database.
+This module keeps per-worker sketches of the last hour so a regression that
+started minutes ago is visible immediately.
+
+Each series (metric, processing method) is a ring of one-minute sketches.
+Windows (1m/15m/1h) are answered by merging the minutes they cover, so memory
+per series is bounded regardless of traffic.
+
+The sketch is a log-bucketed histogram (DDSketch-style): values are mapped to
+buckets whose bounds grow geometrically, which gives quantiles within a fixed
+relative error, constant-time inserts and exact merges.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# Metric names recorded by the pipeline
+E2E_LATENCY_MS = "e2e_latency_ms"
+PARSE_LATENCY_MS = "parse_latency_ms"
+GEMINI_LATENCY_MS = "gemini_latency_ms"
+TOTAL_TOKENS = "total_tokens"
+QUALITY_SCORE = "quality_score"
+WEBHOOK_LATENCY_MS = "webhook_delivery_latency_ms"
+WEBHOOK_ATTEMPT_MS = "webhook_attempt_ms"
+QUEUE_WAIT_MS = "queue_wait_ms"
+CANCELLED_WORK_MS = "cancelled_work_ms"
+
+# Reporting windows in minutes
+WINDOWS: Dict[str, int] = {"1m": 1, "15m": 15, "1h": 60}
+
+QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.95, 0.99)
+
+# Relative accuracy of reported quantiles (1%)
+RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Mergeable log-bucketed quantile sketch for non-negative values.
+
+    Quantile estimates are within RELATIVE_ACCURACY of the true value.
+    Zero (and negative) values are counted in a dedicated bucket.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY) -> None:
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Record one observation."""
+        if value <= 0:
+            self._zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add every observation of another sketch into this one."""
+        for key, n in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + n
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None if empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self._zero_count:
+            return min(self.min, 0.0)
+        seen = self._zero_count
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key], clamped to observed range
+                estimate = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, min, max and QUANTILES as a JSON-serializable dict."""
+        if self.count == 0:
+            return {"count": 0}
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3),
+            "min": round(self.min, 3),
+            "max": round(self.max, 3),
+        }
+        for q in QUANTILES:
+            result[f"p{round(q * 100)}"] = round(self.quantile(q) or 0.0, 3)
+        return result
+
+
+class WindowedSketch:
+    """One-minute quantile sketches covering the longest reporting window."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._horizon = max(WINDOWS.values())
+        self._minutes: Dict[int, QuantileSketch] = {}
+
+    def add(self, value: float) -> None:
+        minute = int(self._clock() // 60)
+        sketch = self._minutes.get(minute)
+        if sketch is None:
+            sketch = self._minutes[minute] = QuantileSketch()
+            self._prune(minute)
+        sketch.add(value)
+
+    def window(self, minutes: int) -> QuantileSketch:
+        """Merged sketch of the last `minutes` minutes (current minute included)."""
+        now = int(self._clock() // 60)
+        merged = QuantileSketch()
+        for minute, sketch in self._minutes.items():
+            if now - minute < minutes:
+                merged.merge(sketch)
+        return merged
+
+    def _prune(self, now: int) -> None:
+        for minute in [m for m in self._minutes if now - m >= self._horizon]:
+            del self._minutes[minute]
+
+
+class LiveStats:
+    """Thread-safe registry of windowed sketches keyed by (metric, method)."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], WindowedSketch] = {}
+
+    def record(self, metric: str, value: Optional[float], method: str = "all") -> None:
+        """Record one observation (None values are ignored)."""
+        if value is None:
+            return
+        with self._lock:
+            series = self._series.get((metric, method))
+            if series is None:
+                series = self._series[(metric, method)] = WindowedSketch(self._clock)
+            series.add(float(value))
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Summaries as {metric: {method: {window: summary}}}."""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with self._lock:
+            for (metric, method), series in sorted(self._series.items()):
+                result.setdefault(metric, {})[method] = {
+                    name: series.window(minutes).summary() for name, minutes in WINDOWS.items()
+                }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+_live_stats = LiveStats()
+
+
+def record_metric(metric: str, value: Optional[float], method: str = "all") -> None:
+    """Record one observation in the process-wide live statistics."""
+    _live_stats.record(metric, value, method)
+
+
+def record_extraction(processing_metadata: Optional[Mapping[str, Any]], e2e_seconds: float) -> None:
+    """Record the per-document metrics of one finished extraction.
+
+    Args:
+        processing_metadata: Extraction processing_metadata (method, tokens,
+            gemini_latency_ms, opendataloader_quality); may be None for
+            failures without a result
+        e2e_seconds: Wall-clock time from upload to stored result
+    """
+    metadata = processing_metadata or {}
+    method = str(metadata.get("method") or "unknown")
+    _live_stats.record(E2E_LATENCY_MS, e2e_seconds * 1000, method)
+    _live_stats.record(GEMINI_LATENCY_MS, metadata.get("gemini_latency_ms"), method)
+    if metadata.get("total_tokens"):
+        _live_stats.record(TOTAL_TOKENS, metadata["total_tokens"], method)
+    _live_stats.record(QUALITY_SCORE, metadata.get("opendataloader_quality"), method)
+
+
+def get_live_stats() -> Dict[str, Any]:
+    """Return windowed summaries for this worker process."""
+    return {
+        "windows": list(WINDOWS),
+        "quantiles": [f"p{round(q * 100)}" for q in QUANTILES],
+        "metrics": _live_stats.snapshot(),
+    }
+
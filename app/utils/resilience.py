@@ -0,0 +1,262 @@
+"""Process-wide retry budget and per-dependency circuit breakers.
+
+retry_with_backoff used to retry every failure of every call independently,
+so during a Gemini outage each request made six attempts with sleeps between
+them, multiplying the load on the failing service and pinning workers for
+minutes. Two shared mechanisms bound that:
+
+- RetryBudget: retries across the process may not exceed min_retries plus
+  `ratio` times the successful calls in the last window_seconds. Under
+  normal operation every retry fits; when most calls fail, the budget runs
+  out and failures surface immediately.
+- CircuitBreaker (one per dependency: "gemini", "supabase"): after
+  failure_threshold consecutive dependency failures the breaker opens and
+  calls fail fast with CircuitOpenError. After reset_seconds it lets
+  half_open_max_calls probe calls through; a successful probe closes it,
+  a failed one opens it again.
+
+Only dependency failures (timeouts, connection errors, 5xx, 429) count
+against a breaker; a 4xx or a response that fails validation says nothing
+about the dependency's health. Breaker states and the budget are reported
+by /health and /api/stats/resilience.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_settings
+
+# Dependencies guarded by a breaker (always listed in /health)
+DEPENDENCIES = ("gemini", "supabase")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """A call was refused because its dependency's circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"{name} circuit breaker is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RetryBudget:
+    """Caps retries at min_retries + ratio x successful calls per sliding window.
+
+    Counts are kept in one-second buckets, so memory is bounded by
+    window_seconds regardless of traffic. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries: int = 10,
+        window_seconds: int = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # second -> [successes, retries]
+        self._buckets: Dict[int, List[int]] = {}
+        self._rejected = 0
+
+    def _bucket(self) -> List[int]:
+        now = int(self._clock())
+        for second in [s for s in self._buckets if s <= now - self.window_seconds]:
+            del self._buckets[second]
+        return self._buckets.setdefault(now, [0, 0])
+
+    def _totals(self) -> List[int]:
+        self._bucket()
+        return [sum(b[0] for b in self._buckets.values()), sum(b[1] for b in self._buckets.values())]
+
+    def record_success(self) -> None:
+        """Count one successful call (earns ratio of a retry)."""
+        with self._lock:
+            self._bucket()[0] += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False (and counted as rejected) if none is left."""
+        with self._lock:
+            successes, retries = self._totals()
+            if retries >= self.min_retries + self.ratio * successes:
+                self._rejected += 1
+                return False
+            self._bucket()[1] += 1
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Window totals, remaining retries and rejections since startup."""
+        with self._lock:
+            successes, retries = self._totals()
+            return {
+                "ratio": self.ratio,
+                "min_retries": self.min_retries,
+                "window_seconds": self.window_seconds,
+                "successes": successes,
+                "retries": retries,
+                "available": max(0, int(self.min_retries + self.ratio * successes) - retries),
+                "rejected": self._rejected,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets = {}
+            self._rejected = 0
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one dependency. Thread-safe.
+
+    Usage:
+        breaker.before_call()  # Raises CircuitOpenError while open
+        try:
+            result = call()
+        except Exception as e:
+            breaker.record_failure() if is_dependency_failure(e) else breaker.release()
+            raise
+        breaker.record_success()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0  # Half-open calls in flight
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    def _advance(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def before_call(self) -> None:
+        """Admit a call, or raise CircuitOpenError while open (or while half-open probes are out)."""
+        with self._lock:
+            self._advance()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self._rejected += 1
+            retry_after = max(0.0, self.reset_seconds - (self._clock() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._times_opened += 1
+
+    def release(self) -> None:
+        """End an admitted call that says nothing about the dependency (e.g. a 4xx)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._advance()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": (
+                    round(max(0.0, self.reset_seconds - (self._clock() - self._opened_at)), 1)
+                    if self._state == OPEN else 0.0
+                ),
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probes = 0
+            self._times_opened = 0
+            self._rejected = 0
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_retry_budget: Optional[RetryBudget] = None
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker of a dependency (created on first use)."""
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            settings = get_settings()
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                reset_seconds=settings.circuit_breaker_reset_seconds,
+            )
+        return breaker
+
+
+def get_retry_budget() -> RetryBudget:
+    """Get the process-wide retry budget."""
+    global _retry_budget
+    with _lock:
+        if _retry_budget is None:
+            settings = get_settings()
+            _retry_budget = RetryBudget(
+                ratio=settings.retry_budget_ratio,
+                min_retries=settings.retry_budget_min_retries,
+                window_seconds=settings.retry_budget_window_seconds,
+            )
+        return _retry_budget
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every circuit breaker, by dependency."""
+    with _lock:
+        names = sorted(set(DEPENDENCIES) | set(_breakers))
+    return {name: get_breaker(name).snapshot() for name in names}
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """Retry budget and circuit breakers (for /api/stats/resilience)."""
+    return {"retry_budget": get_retry_budget().snapshot(), "circuit_breakers": get_breaker_states()}
@@ -2,14 +2,23 @@
 
 This module provides a decorator for automatic retry of transient failures
 with exponential backoff and jitter to prevent thundering herd problems.
+Retries stop at the current request's deadline (app/utils/deadline.py) and
+are drawn from the process-wide retry budget (app/utils/resilience.py).
 """
 
 import asyncio
 import functools
+import json
 import logging
 import random
 import time
-from typing import Any, Callable, Set, Type, TypeVar, cast
+from typing import Any, Callable, Iterator, Set, Type, TypeVar, cast
+
+import httpx
+from pydantic import ValidationError
+
+from app.utils.deadline import DeadlineExceeded, check_deadline, current_deadline
+from app.utils.resilience import CircuitOpenError, get_retry_budget
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -33,6 +42,23 @@ NON_RETRYABLE_STATUS_CODES: Set[int] = {
     422,  # Unprocessable entity
 }
 
+# Failures a retry cannot fix: the dependency answered, but with a response
+# that is malformed or fails the schema, or the call was refused locally.
+# Matched anywhere in the exception's cause chain.
+NON_RETRYABLE_EXCEPTIONS: tuple[Type[BaseException], ...] = (
+    ValidationError,
+    json.JSONDecodeError,
+    CircuitOpenError,
+    DeadlineExceeded,
+)
+
+# Transport-level failures: the dependency could not be reached or did not answer in time
+TRANSPORT_EXCEPTIONS: tuple[Type[BaseException], ...] = (
+    httpx.TransportError,
+    TimeoutError,
+    ConnectionError,
+)
+
 # Retry configuration
 MAX_RETRIES = 5
 BASE_DELAY = 1.0  # seconds
@@ -59,6 +85,13 @@ def retry_with_backoff(
     - 403 (forbidden)
     - 404 (not found)
     - 422 (unprocessable entity)
+    - Schema validation and JSON decode errors, and an open circuit breaker
+    - DeadlineExceeded, or a failure whose backoff would end past the
+      request's deadline (raised as DeadlineExceeded)
+    - Any failure once the process-wide retry budget is spent
+
+    Each successful call adds to the retry budget and each retry takes one
+    from it.
 
     Args:
         max_retries: Maximum number of retry attempts (default: 5)
@@ -76,8 +109,11 @@ def retry_with_backoff(
             last_exception: Exception | None = None
 
             for attempt in range(max_retries + 1):
+                check_deadline(func.__name__)
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
+                    get_retry_budget().record_success()
+                    return result
                 except Exception as e:
                     last_exception = e
 
@@ -94,6 +130,12 @@ def retry_with_backoff(
 
                     # Calculate exponential backoff with jitter
                     delay = (base_delay * (2**attempt)) + (random.random() * max_jitter)
+                    _raise_if_past_deadline(func.__name__, delay, e)
+                    if not get_retry_budget().try_spend():
+                        logger.warning(
+                            f"{func.__name__} attempt {attempt + 1} failed: {e}. Not retrying: retry budget exhausted"
+                        )
+                        raise
 
                     logger.warning(
                         f"{func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}. "
@@ -112,8 +154,11 @@ def retry_with_backoff(
             last_exception: Exception | None = None
 
             for attempt in range(max_retries + 1):
+                check_deadline(func.__name__)
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
+                    get_retry_budget().record_success()
+                    return result
                 except Exception as e:
                     last_exception = e
 
@@ -130,6 +175,12 @@ def retry_with_backoff(
 
                     # Calculate exponential backoff with jitter
                     delay = (base_delay * (2**attempt)) + (random.random() * max_jitter)
+                    _raise_if_past_deadline(func.__name__, delay, e)
+                    if not get_retry_budget().try_spend():
+                        logger.warning(
+                            f"{func.__name__} attempt {attempt + 1} failed: {e}. Not retrying: retry budget exhausted"
+                        )
+                        raise
 
                     logger.warning(
                         f"{func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}. "
@@ -154,6 +205,50 @@ def retry_with_backoff(
     return decorator
 
 
+def _raise_if_past_deadline(name: str, delay: float, exception: Exception) -> None:
+    """Give up instead of sleeping `delay` when the request's deadline comes first."""
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() <= delay:
+        logger.warning(
+            f"{name} failed: {exception}. Not retrying: request deadline in {max(deadline.remaining(), 0):.2f}s"
+        )
+        raise DeadlineExceeded(deadline.seconds, name) from exception
+
+
+def _cause_chain(exception: BaseException) -> Iterator[BaseException]:
+    """The exception and its explicit causes (raise ... from ...), innermost last."""
+    seen = 0
+    current: BaseException | None = exception
+    while current is not None and seen < 10:
+        yield current
+        current = current.__cause__
+        seen += 1
+
+
+def is_dependency_failure(exception: Exception) -> bool:
+    """True if the exception says the dependency itself is failing.
+
+    Only timeouts, connection errors, 5xx, 429 and quota exhaustion count;
+    anything else (client errors, malformed responses, calls refused by a
+    breaker or a deadline, and local bugs such as a TypeError) does not.
+    Used to feed circuit breakers.
+    """
+    original = getattr(exception, "original_exception", None)
+    if isinstance(original, Exception):
+        exception = original
+
+    if any(isinstance(cause, NON_RETRYABLE_EXCEPTIONS) for cause in _cause_chain(exception)):
+        return False
+    if _is_quota_exhaustion(exception):
+        return True
+    if any(isinstance(cause, TRANSPORT_EXCEPTIONS) for cause in _cause_chain(exception)):
+        return True
+    status_code = _extract_status_code(exception)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    return _is_network_error(exception)
+
+
 def _is_quota_exhaustion(exception: Exception) -> bool:
     """Detect quota exhaustion (do not retry)."""
     msg = str(exception).lower()
@@ -175,6 +270,16 @@ def _should_retry_exception(
     Returns:
         True if the exception should trigger retry, False otherwise
     """
+    # Classify the dependency's failure, not a wrapper around it (e.g.
+    # PartialExtractionError carries the Gemini error as original_exception)
+    original = getattr(exception, "original_exception", None)
+    if isinstance(original, Exception):
+        exception = original
+
+    # Do not retry what a retry cannot fix (see NON_RETRYABLE_EXCEPTIONS)
+    if any(isinstance(cause, NON_RETRYABLE_EXCEPTIONS) for cause in _cause_chain(exception)):
+        return False
+
     # Do not retry on quota exhaustion (429 with quota/billing message)
     if _is_quota_exhaustion(exception):
         return False
@@ -190,6 +295,15 @@ def _should_retry_exception(
             return True
 
     # Check for common network errors
+    if _is_network_error(exception):
+        return True
+
+    # Check if exception type matches retryable types
+    return isinstance(exception, retryable_exceptions)
+
+
+def _is_network_error(exception: Exception) -> bool:
+    """Detect timeouts and connection errors from the exception message."""
     exception_str = str(exception).lower()
     network_errors = [
         "timeout",
@@ -199,13 +313,7 @@ def _should_retry_exception(
         "connection reset",
         "connection refused",
     ]
-
-    for error in network_errors:
-        if error in exception_str:
-            return True
-
-    # Check if exception type matches retryable types
-    return isinstance(exception, retryable_exceptions)
+    return any(error in exception_str for error in network_errors)
 
 
 def _extract_status_code(exception: Exception) -> int | None:
@@ -0,0 +1,88 @@
+"""Fast JSON serialization for response bodies, DB payloads and batch outputs.
+
+Extraction records are large nested structures (groups -> questions ->
+sub-questions), and the hot paths serialize them several times per request.
+Everything here goes through orjson, which encodes these documents several
+times faster than the stdlib json module, and through pydantic's Rust
+validators, which parse a JSON string straight into a model without building
+an intermediate dict first (model_validate_json).
+
+orjson output is compact UTF-8 (no spaces after separators, non-ASCII left
+as-is), datetimes/UUIDs are encoded natively, and any other unsupported
+type falls back to str() like json.dumps(default=str).
+
+Run scripts/benchmark_serialization.py to compare against the stdlib on the
+sample outputs in "Sample PDFS/".
+"""
+
+from typing import Any, Type, TypeVar
+
+import orjson
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+# orjson raises orjson.JSONDecodeError, a subclass of json.JSONDecodeError
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes.
+
+    Args:
+        obj: JSON-compatible value (dicts may have non-str keys)
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        bytes: Encoded JSON
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=str, option=option)
+
+
+def dumps_str(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to a JSON string (see dumps)."""
+    return dumps(obj, indent).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str, bytes or bytearray.
+
+    Raises:
+        JSONDecodeError: If data is not valid JSON
+    """
+    return orjson.loads(data)
+
+
+def model_dumps(model: BaseModel, indent: bool = False) -> bytes:
+    """Serialize a model to JSON bytes in one pass (no intermediate dict)."""
+    if indent:
+        return dumps(model.model_dump(mode="json"), indent=True)
+    return model.model_dump_json().encode("utf-8")
+
+
+def parse_model(model_cls: Type[M], data: Any) -> M:
+    """Parse a JSON document straight into a model.
+
+    One pass over the input instead of loads() followed by model_validate().
+
+    Args:
+        model_cls: Pydantic model class
+        data: JSON text (str or bytes)
+
+    Returns:
+        The validated model instance
+
+    Raises:
+        ValueError: If data is not valid JSON
+        ValidationError: If the document does not match the model schema
+    """
+    try:
+        return model_cls.model_validate_json(data)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        if errors and errors[0]["type"] == "json_invalid":
+            raise ValueError(errors[0]["msg"]) from e
+        raise
@@ -0,0 +1,163 @@
+"""Single-flight coalescing of concurrent work, and Idempotency-Key bookkeeping.
+
+Two uploads of the same PDF arriving close together would both pass the
+duplicate check, both parse the file and both call Gemini, and one of them
+would then lose at the unique file_hash index. SingleFlight runs the pipeline
+once per key: the first caller starts it and every concurrent caller with the
+same key awaits that same run. The run works under the latest deadline of
+the callers awaiting it, while each caller enforces its own.
+
+The coalescing is per worker process. Across workers the unique file_hash
+index remains the backstop (the losing insert resolves to the existing row).
+
+IdempotencyKeys remembers which file an Idempotency-Key was used for and, once
+the request succeeded, its response, so a client retrying with the same key
+attaches to the in-flight run or gets the stored response back.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from app.utils.deadline import Deadline, SharedDeadline, deadline_scope
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Flight(Generic[T]):
+    """One in-progress run and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters", "deadline")
+
+    def __init__(self, task: "asyncio.Task[T]", deadline: Optional[SharedDeadline]) -> None:
+        self.task = task
+        self.waiters = 0
+        self.deadline = deadline
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls with the same key into one execution."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight[T]] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[T, bool]:
+        """Run fn() unless a run for key is already in progress, and await the result.
+
+        The run is shielded from the cancellation of any single caller; it is
+        cancelled only when every caller awaiting it has gone away.
+
+        Args:
+            key: Coalescing key (e.g. the file hash)
+            fn: Zero-argument coroutine function performing the work
+            deadline: This caller's deadline. The run works under the latest
+                deadline of its callers (without one, under none); callers
+                enforce their own, e.g. with run_until_done()
+
+        Returns:
+            Tuple[T, bool]: (result, shared) where shared is True when this
+                caller joined a run started by another caller
+
+        Raises:
+            Exception: Whatever the run raised, re-raised in every caller
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            shared_deadline = SharedDeadline(deadline) if deadline is not None else None
+            flight = _Flight(asyncio.ensure_future(self._run(fn, shared_deadline)), shared_deadline)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            if flight.deadline is not None and deadline is not None:
+                flight.deadline.join(deadline)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    @staticmethod
+    async def _run(fn: Callable[[], Awaitable[T]], deadline: Optional[SharedDeadline]) -> T:
+        # Not the starting caller's deadline, which the task would otherwise inherit
+        with deadline_scope(deadline):
+            return await fn()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def _forget(self, key: str, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """An Idempotency-Key was reused for a different file."""
+
+
+class IdempotencyKeys(Generic[R]):
+    """TTL + LRU map of Idempotency-Key -> (fingerprint, stored response)."""
+
+    def __init__(
+        self,
+        max_keys: int = 1024,
+        ttl_seconds: float = 86400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys: "OrderedDict[str, Tuple[float, str, Optional[R]]]" = OrderedDict()
+
+    def claim(self, key: str, fingerprint: str) -> Optional[R]:
+        """Register key for fingerprint and return its stored response, if any.
+
+        Raises:
+            IdempotencyKeyMismatch: If key was already used for another fingerprint
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry is not None and entry[0] > now:
+                if entry[1] != fingerprint:
+                    raise IdempotencyKeyMismatch(
+                        "Idempotency-Key was already used for a different file"
+                    )
+                self._keys.move_to_end(key)
+                return entry[2]
+            self._set(key, fingerprint, None, now)
+            return None
+
+    def store(self, key: str, fingerprint: str, response: R) -> None:
+        """Remember the response of a completed request for replay."""
+        with self._lock:
+            self._set(key, fingerprint, response, self._clock())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+    def _set(self, key: str, fingerprint: str, response: Optional[R], now: float) -> None:
+        self._keys[key] = (now + self.ttl_seconds, fingerprint, response)
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+
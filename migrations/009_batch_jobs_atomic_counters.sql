@@ -0,0 +1,63 @@
+-- Migration: 009_batch_jobs_atomic_counters.sql
+-- Description: Atomic server-side batch counter updates (replaces read-modify-write in add_extraction_to_batch)
+-- Created: 2026-10-19
+-- Depends on: 003_create_batch_jobs_table.sql
+
+-- =============================================================================
+-- add_extraction_to_batch(): one statement per finished file
+-- =============================================================================
+-- Increments completed/failed counters, appends the extraction ID, bumps the
+-- routing_stats JSON keys and cost totals, and derives the batch status.
+-- The UPDATE takes a row lock, so concurrent calls for the same batch job are
+-- serialized by Postgres instead of overwriting each other.
+-- Only the counters are returned (not the growing extraction_ids array).
+
+CREATE OR REPLACE FUNCTION add_extraction_to_batch(
+    p_batch_job_id UUID,
+    p_extraction_id UUID,
+    p_processing_method TEXT,
+    p_status TEXT,
+    p_cost_estimate_usd NUMERIC DEFAULT 0,
+    p_cost_savings_usd NUMERIC DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    status batch_status,
+    total_files INTEGER,
+    completed_files INTEGER,
+    failed_files INTEGER
+)
+LANGUAGE sql
+AS $$
+    WITH inc AS (
+        SELECT
+            CASE WHEN p_status IN ('completed', 'partial') THEN 1 ELSE 0 END AS completed_inc,
+            CASE WHEN p_status IN ('completed', 'partial') THEN 0 ELSE 1 END AS failed_inc
+    )
+    UPDATE batch_jobs AS b
+    SET
+        completed_files = b.completed_files + inc.completed_inc,
+        failed_files = b.failed_files + inc.failed_inc,
+        routing_stats = b.routing_stats || jsonb_build_object(
+            'pending', GREATEST(COALESCE((b.routing_stats ->> 'pending')::INTEGER, 0) - 1, 0),
+            p_processing_method, COALESCE((b.routing_stats ->> p_processing_method)::INTEGER, 0) + 1
+        ),
+        extraction_ids = array_append(b.extraction_ids, p_extraction_id),
+        cost_estimate_usd = COALESCE(b.cost_estimate_usd, 0) + COALESCE(p_cost_estimate_usd, 0),
+        cost_savings_usd = COALESCE(b.cost_savings_usd, 0) + COALESCE(p_cost_savings_usd, 0),
+        status = (
+            CASE
+                WHEN b.completed_files + inc.completed_inc + b.failed_files + inc.failed_inc < b.total_files
+                    THEN 'processing'
+                WHEN b.failed_files + inc.failed_inc = 0 THEN 'completed'
+                WHEN b.completed_files + inc.completed_inc = 0 THEN 'failed'
+                ELSE 'partial'
+            END
+        )::batch_status
+    FROM inc
+    WHERE b.id = p_batch_job_id
+    RETURNING b.id, b.status, b.total_files, b.completed_files, b.failed_files;
+$$;
+
+COMMENT ON FUNCTION add_extraction_to_batch(UUID, UUID, TEXT, TEXT, NUMERIC, NUMERIC) IS
+    'Atomically record one finished file on a batch job (counters, routing_stats, extraction_ids, costs, status)';
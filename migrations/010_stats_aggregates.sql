@@ -0,0 +1,176 @@
+-- Migration: 010_stats_aggregates.sql
+-- Description: Server-side aggregates for /api/stats/caching and /api/stats/routing
+-- Created: 2026-10-19
+-- Depends on: 004_create_memo_extractions_table.sql, 005_update_extractions_for_exam_papers.sql
+
+-- =============================================================================
+-- extraction_stats_rows: question papers and memos in one relation
+-- =============================================================================
+-- Only the columns the stats functions read, tagged with the source table so
+-- every aggregate can be reported per table and combined.
+
+CREATE OR REPLACE VIEW extraction_stats_rows AS
+SELECT
+    'extractions'::TEXT AS source,
+    status,
+    processing_method,
+    quality_score,
+    processing_time_seconds,
+    cost_estimate_usd,
+    processing_metadata
+FROM extractions
+UNION ALL
+SELECT
+    'memo_extractions'::TEXT AS source,
+    status,
+    processing_method,
+    quality_score,
+    processing_time_seconds,
+    cost_estimate_usd,
+    processing_metadata
+FROM memo_extractions;
+
+COMMENT ON VIEW extraction_stats_rows IS 'Stats columns of extractions and memo_extractions, tagged with source table';
+
+-- =============================================================================
+-- get_caching_stats(): context cache usage from processing_metadata
+-- =============================================================================
+-- Counts completed/partial rows whose processing_metadata is a non-empty JSON
+-- object. A row is a cache hit when processing_metadata.cache_hit is true;
+-- cached_tokens is summed over hits only (non-numeric values count as 0).
+-- Returns {"all": {...}, "extractions": {...}, "memo_extractions": {...}};
+-- a table with no qualifying rows is omitted.
+
+CREATE OR REPLACE FUNCTION get_caching_stats()
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH usage AS (
+        SELECT
+            source,
+            processing_metadata -> 'cache_hit' = 'true'::JSONB AS cache_hit,
+            CASE
+                WHEN jsonb_typeof(processing_metadata -> 'cached_tokens') = 'number'
+                    THEN (processing_metadata ->> 'cached_tokens')::NUMERIC
+                ELSE 0
+            END AS cached_tokens
+        FROM extraction_stats_rows
+        WHERE status IN ('completed', 'partial')
+          AND jsonb_typeof(processing_metadata) = 'object'
+          AND processing_metadata <> '{}'::JSONB
+    ),
+    totals AS (
+        SELECT
+            COALESCE(source, 'all') AS source,
+            COUNT(*) AS total_requests,
+            COUNT(*) FILTER (WHERE cache_hit) AS cache_hits,
+            COALESCE(SUM(cached_tokens) FILTER (WHERE cache_hit), 0) AS total_cached_tokens
+        FROM usage
+        GROUP BY GROUPING SETS ((source), ())
+    )
+    SELECT COALESCE(
+        jsonb_object_agg(
+            source,
+            jsonb_build_object(
+                'total_requests', total_requests,
+                'cache_hits', cache_hits,
+                'total_cached_tokens', total_cached_tokens
+            )
+        ),
+        '{}'::JSONB
+    )
+    FROM totals;
+$$;
+
+COMMENT ON FUNCTION get_caching_stats() IS
+    'Cache hit counts and cached token sums for extractions and memo_extractions (per table and combined)';
+
+-- =============================================================================
+-- get_routing_stats(): routing distribution, quality, cost and latency
+-- =============================================================================
+-- Counts rows by processing_method (NULL reported as 'unknown'), averages
+-- quality_score and processing_time_seconds (NULLs ignored), sums cost, and
+-- computes p50/p95/p99 processing time with percentile_cont.
+-- The pure-vision estimate assumes hybrid costs 20% of vision (cost * 5).
+-- Returns {"all": {...}, "extractions": {...}, "memo_extractions": {...}};
+-- "all" is always present, a table with no rows is omitted.
+
+CREATE OR REPLACE FUNCTION get_routing_stats()
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH totals AS (
+        SELECT
+            COALESCE(source, 'all') AS source,
+            COUNT(*) AS total_extractions,
+            AVG(quality_score) AS avg_quality_score,
+            COALESCE(SUM(cost_estimate_usd), 0) AS total_cost_usd,
+            COALESCE(SUM(
+                CASE WHEN processing_method = 'hybrid' THEN cost_estimate_usd * 5 ELSE cost_estimate_usd END
+            ), 0) AS estimated_pure_vision_cost_usd,
+            AVG(processing_time_seconds) AS avg_processing_time_seconds,
+            percentile_cont(0.50) WITHIN GROUP (ORDER BY processing_time_seconds) AS p50_processing_time,
+            percentile_cont(0.95) WITHIN GROUP (ORDER BY processing_time_seconds) AS p95_processing_time,
+            percentile_cont(0.99) WITHIN GROUP (ORDER BY processing_time_seconds) AS p99_processing_time
+        FROM extraction_stats_rows
+        GROUP BY GROUPING SETS ((source), ())
+    ),
+    method_counts AS (
+        SELECT source, COALESCE(processing_method::TEXT, 'unknown') AS method, COUNT(*) AS n
+        FROM extraction_stats_rows
+        GROUP BY 1, 2
+    ),
+    distribution AS (
+        SELECT source, jsonb_object_agg(method, n) AS routing_distribution
+        FROM method_counts
+        GROUP BY source
+        UNION ALL
+        SELECT 'all', jsonb_object_agg(method, n)
+        FROM (SELECT method, SUM(n) AS n FROM method_counts GROUP BY method) AS combined
+        HAVING COUNT(*) > 0
+    )
+    SELECT jsonb_object_agg(
+        t.source,
+        jsonb_build_object(
+            'total_extractions', t.total_extractions,
+            'routing_distribution', COALESCE(d.routing_distribution, '{}'::JSONB),
+            'avg_quality_score', t.avg_quality_score,
+            'total_cost_usd', t.total_cost_usd,
+            'estimated_pure_vision_cost_usd', t.estimated_pure_vision_cost_usd,
+            'avg_processing_time_seconds', t.avg_processing_time_seconds,
+            'p50_processing_time', t.p50_processing_time,
+            'p95_processing_time', t.p95_processing_time,
+            'p99_processing_time', t.p99_processing_time
+        )
+    )
+    FROM totals AS t
+    LEFT JOIN distribution AS d ON d.source = t.source;
+$$;
+
+COMMENT ON FUNCTION get_routing_stats() IS
+    'Routing distribution, quality, cost and processing-time percentiles for extractions and memo_extractions';
+
+-- =============================================================================
+-- Supporting indexes
+-- =============================================================================
+-- Covering indexes let get_routing_stats() read the four numeric columns with
+-- an index-only scan instead of fetching wide JSONB rows from the heap.
+
+CREATE INDEX IF NOT EXISTS idx_extractions_routing_stats
+    ON extractions(processing_method)
+    INCLUDE (quality_score, processing_time_seconds, cost_estimate_usd);
+
+CREATE INDEX IF NOT EXISTS idx_memo_extractions_routing_stats
+    ON memo_extractions(processing_method)
+    INCLUDE (quality_score, processing_time_seconds, cost_estimate_usd);
+
+-- Partial indexes over the rows get_caching_stats() reads
+CREATE INDEX IF NOT EXISTS idx_extractions_cache_usage
+    ON extractions(((processing_metadata ->> 'cache_hit')))
+    WHERE status IN ('completed', 'partial');
+
+CREATE INDEX IF NOT EXISTS idx_memo_extractions_cache_usage
+    ON memo_extractions(((processing_metadata ->> 'cache_hit')))
+    WHERE status IN ('completed', 'partial');
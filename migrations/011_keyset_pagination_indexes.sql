@@ -0,0 +1,63 @@
+-- Migration: 011_keyset_pagination_indexes.sql
+-- Description: Composite (timestamp, id) indexes for keyset (cursor) pagination of list endpoints
+-- Created: 2026-10-19
+-- Depends on: 001-004 (extractions, review_queue, batch_jobs, memo_extractions), 007_extend_scraped_files_for_firebase.sql
+
+-- =============================================================================
+-- Keyset pagination
+-- =============================================================================
+-- Listings are ordered by (created_at DESC, id DESC) and each page after the
+-- first asks for rows strictly after the previous page's last row:
+--
+--     WHERE created_at < $ts OR (created_at = $ts AND id < $id)
+--     ORDER BY created_at DESC, id DESC
+--     LIMIT $n
+--
+-- With these indexes every page is one index range scan of $n entries, no
+-- matter how deep, instead of the OFFSET scan-and-discard of .range().
+-- id makes the order total, so rows sharing a timestamp are neither skipped
+-- nor repeated across pages.
+
+-- extractions: GET /api/extractions
+CREATE INDEX IF NOT EXISTS idx_extractions_created_at_id
+    ON extractions(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_extractions_status_created_at_id
+    ON extractions(status, created_at DESC, id DESC);
+
+-- memo_extractions
+CREATE INDEX IF NOT EXISTS idx_memo_extractions_created_at_id
+    ON memo_extractions(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_memo_extractions_status_created_at_id
+    ON memo_extractions(status, created_at DESC, id DESC);
+
+-- batch_jobs: GET /api/batch
+CREATE INDEX IF NOT EXISTS idx_batch_jobs_created_at_id
+    ON batch_jobs(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_batch_jobs_status_created_at_id
+    ON batch_jobs(status, created_at DESC, id DESC);
+
+-- review_queue: GET /api/review-queue (pending items, keyed on queued_at)
+CREATE INDEX IF NOT EXISTS idx_review_queue_pending_queued_at_id
+    ON review_queue(queued_at DESC, id DESC)
+    WHERE resolution IS NULL;
+
+-- scraped_files: scripts/batch_operations.py
+CREATE INDEX IF NOT EXISTS idx_scraped_files_created_at_id
+    ON scraped_files(created_at DESC, id DESC);
+
+-- =============================================================================
+-- Superseded indexes
+-- =============================================================================
+-- The (created_at DESC) and (status, created_at DESC) indexes are prefixes of
+-- the new ones and no longer needed.
+
+DROP INDEX IF EXISTS idx_extractions_created_at;
+DROP INDEX IF EXISTS idx_extractions_status_created_at;
+DROP INDEX IF EXISTS idx_memo_extractions_created_at;
+DROP INDEX IF EXISTS idx_memo_extractions_status_created_at;
+DROP INDEX IF EXISTS idx_batch_jobs_created_at;
+DROP INDEX IF EXISTS idx_batch_jobs_status_created_at;
+DROP INDEX IF EXISTS idx_review_queue_pending;
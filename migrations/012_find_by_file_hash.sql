@@ -0,0 +1,57 @@
+-- Migration: 012_find_by_file_hash.sql
+-- Description: One-round-trip duplicate lookup across extractions and memo_extractions
+-- Created: 2026-10-19
+-- Depends on: 004_create_memo_extractions_table.sql, 006_add_constraints_and_indexes.sql
+
+-- =============================================================================
+-- find_by_file_hash(): dedup lookup for POST /api/extract and batch uploads
+-- =============================================================================
+-- Returns at most one row per table: the best existing record for the hash,
+-- ranked completed > pending > partial > failed, newest first within a status.
+-- Each row carries what the upload path decides on (status, retry_count), and
+-- a completed row also carries the full record so a duplicate upload can be
+-- answered without a second query.
+--
+-- Both branches are answered by the file_hash indexes of migration 006.
+
+CREATE OR REPLACE FUNCTION find_by_file_hash(p_file_hash TEXT)
+RETURNS TABLE (
+    source_table TEXT,
+    id UUID,
+    status extraction_status,
+    retry_count INTEGER,
+    record JSONB
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT DISTINCT ON (m.source_table)
+        m.source_table,
+        m.id,
+        m.status,
+        m.retry_count,
+        CASE WHEN m.status = 'completed' THEN m.record END AS record
+    FROM (
+        SELECT 'extractions'::TEXT AS source_table, e.id, e.status, e.retry_count, e.created_at,
+               to_jsonb(e) AS record
+        FROM extractions AS e
+        WHERE e.file_hash = p_file_hash
+        UNION ALL
+        SELECT 'memo_extractions'::TEXT, me.id, me.status, me.retry_count, me.created_at,
+               to_jsonb(me)
+        FROM memo_extractions AS me
+        WHERE me.file_hash = p_file_hash
+    ) AS m
+    ORDER BY
+        m.source_table,
+        CASE m.status
+            WHEN 'completed' THEN 0
+            WHEN 'pending' THEN 1
+            WHEN 'partial' THEN 2
+            ELSE 3
+        END,
+        m.created_at DESC;
+$$;
+
+COMMENT ON FUNCTION find_by_file_hash(TEXT) IS
+    'Best extraction per table for a file hash: (source_table, id, status, retry_count, record if completed)';
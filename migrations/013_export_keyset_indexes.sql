@@ -0,0 +1,25 @@
+-- Migration: 013_export_keyset_indexes.sql
+-- Description: (updated_at, id) indexes for streaming keyset exports and incremental (updated_since) syncs
+-- Created: 2026-10-19
+-- Depends on: 001_create_extractions_table.sql, 004_create_memo_extractions_table.sql
+
+-- =============================================================================
+-- Export keyset
+-- =============================================================================
+-- GET /api/extractions/export walks a table oldest change first and reads each
+-- page strictly after the previous page's last row:
+--
+--     WHERE updated_at >= $since                        -- incremental mode
+--       AND (updated_at > $ts OR (updated_at = $ts AND id > $id))
+--     ORDER BY updated_at, id
+--     LIMIT 500
+--
+-- With these indexes every page is one index range scan, so an export of the
+-- whole table costs the same per page from the first page to the last, and an
+-- incremental sync only touches the rows changed since the last run.
+
+CREATE INDEX IF NOT EXISTS idx_extractions_updated_at_id
+    ON extractions(updated_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_memo_extractions_updated_at_id
+    ON memo_extractions(updated_at, id);
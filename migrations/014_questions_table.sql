@@ -0,0 +1,186 @@
+-- Migration: 014_questions_table.sql
+-- Description: Normalized questions table kept in sync with extractions.groups, with full-text search
+-- Created: 2026-10-19
+-- Depends on: 001_create_extractions_table.sql, 005_update_extractions_for_exam_papers.sql
+
+-- =============================================================================
+-- questions: one row per Question of a question paper
+-- =============================================================================
+-- Questions otherwise live only inside extractions.groups (JSONB), so a search
+-- such as "2025 Business Studies questions mentioning 'franchise'" has to read
+-- and decode every paper. This table flattens them, copies the paper metadata
+-- used for filtering, and keeps a tsvector of the question text for a GIN
+-- full-text index. GET /api/questions/search reads it (app/db/questions.py).
+
+CREATE TABLE IF NOT EXISTS questions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+
+    -- Position in the paper
+    extraction_id UUID NOT NULL REFERENCES extractions(id) ON DELETE CASCADE,
+    group_index INTEGER NOT NULL,
+    question_index INTEGER NOT NULL,
+    group_id TEXT,
+
+    -- Question (FullExamPaper.groups[].questions[])
+    question_id TEXT NOT NULL,
+    parent_id TEXT,
+    marks INTEGER,
+    text TEXT NOT NULL DEFAULT '',
+
+    -- Question type flags
+    is_mcq BOOLEAN NOT NULL DEFAULT FALSE,
+    has_match_data BOOLEAN NOT NULL DEFAULT FALSE,
+    has_guide_table BOOLEAN NOT NULL DEFAULT FALSE,
+
+    -- Paper metadata (copied from extractions for filtering)
+    subject TEXT,
+    year INTEGER,
+    session TEXT,
+    grade TEXT,
+    language TEXT,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    -- 'simple' config: papers are English, Afrikaans, IsiZulu, ... (no stemming)
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED,
+
+    UNIQUE (extraction_id, group_index, question_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_questions_search_vector
+    ON questions USING GIN (search_vector);
+
+-- Filters, newest first with the keyset of app/db/pagination.py
+CREATE INDEX IF NOT EXISTS idx_questions_created_at_id
+    ON questions(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_questions_year_subject
+    ON questions(year, subject);
+
+COMMENT ON TABLE questions IS 'One row per question of a completed/partial extraction, maintained by trigger from extractions.groups';
+
+-- =============================================================================
+-- extraction_question_rows(): a paper's questions as questions rows
+-- =============================================================================
+-- Shared by the trigger and the backfill. Only completed and partial papers
+-- have rows.
+
+CREATE OR REPLACE FUNCTION extraction_question_rows(e extractions)
+RETURNS TABLE (
+    extraction_id UUID, group_index INTEGER, question_index INTEGER, group_id TEXT,
+    question_id TEXT, parent_id TEXT, marks INTEGER, text TEXT,
+    is_mcq BOOLEAN, has_match_data BOOLEAN, has_guide_table BOOLEAN,
+    subject TEXT, year INTEGER, session TEXT, grade TEXT, language TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        e.id,
+        (g.ordinality - 1)::INTEGER,
+        (q.ordinality - 1)::INTEGER,
+        g.value ->> 'group_id',
+        COALESCE(q.value ->> 'id', ''),
+        q.value ->> 'parent_id',
+        CASE WHEN (q.value ->> 'marks') ~ '^[0-9]{1,9}$' THEN (q.value ->> 'marks')::INTEGER END,
+        COALESCE(q.value ->> 'text', ''),
+        COALESCE(jsonb_typeof(q.value -> 'options') = 'array'
+            AND jsonb_array_length(q.value -> 'options') > 0, FALSE),
+        COALESCE(jsonb_typeof(q.value -> 'match_data') = 'object', FALSE),
+        COALESCE(jsonb_typeof(q.value -> 'guide_table') = 'array'
+            AND jsonb_array_length(q.value -> 'guide_table') > 0, FALSE),
+        e.subject, e.year, e.session, e.grade, e.language
+    FROM jsonb_array_elements(
+        CASE WHEN e.status IN ('completed', 'partial') AND jsonb_typeof(e.groups) = 'array'
+            THEN e.groups ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS g(value, ordinality)
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(g.value -> 'questions') = 'array'
+            THEN g.value -> 'questions' ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS q(value, ordinality);
+$$;
+
+-- =============================================================================
+-- sync_extraction_questions(): bring a paper's rows up to date on write
+-- =============================================================================
+-- Runs in the same statement as the insert/update, so create_extraction,
+-- update_extraction and the batch write buffer keep the table current without
+-- an extra round trip. Rows are upserted on their position, so a question
+-- keeps its id and created_at (and the search keyset stays stable) across
+-- re-extractions, unchanged rows are not rewritten, and positions that no
+-- longer exist are deleted. A paper that becomes failed/pending loses its rows.
+
+CREATE OR REPLACE FUNCTION sync_extraction_questions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    WITH current_rows AS (
+        SELECT * FROM extraction_question_rows(NEW)
+    ), upserted AS (
+        INSERT INTO questions AS existing (
+            extraction_id, group_index, question_index, group_id,
+            question_id, parent_id, marks, text,
+            is_mcq, has_match_data, has_guide_table,
+            subject, year, session, grade, language
+        )
+        SELECT * FROM current_rows
+        ON CONFLICT (extraction_id, group_index, question_index) DO UPDATE SET
+            group_id = EXCLUDED.group_id,
+            question_id = EXCLUDED.question_id,
+            parent_id = EXCLUDED.parent_id,
+            marks = EXCLUDED.marks,
+            text = EXCLUDED.text,
+            is_mcq = EXCLUDED.is_mcq,
+            has_match_data = EXCLUDED.has_match_data,
+            has_guide_table = EXCLUDED.has_guide_table,
+            subject = EXCLUDED.subject,
+            year = EXCLUDED.year,
+            session = EXCLUDED.session,
+            grade = EXCLUDED.grade,
+            language = EXCLUDED.language
+        WHERE (existing.group_id, existing.question_id, existing.parent_id, existing.marks, existing.text,
+               existing.is_mcq, existing.has_match_data, existing.has_guide_table,
+               existing.subject, existing.year, existing.session, existing.grade, existing.language)
+            IS DISTINCT FROM
+              (EXCLUDED.group_id, EXCLUDED.question_id, EXCLUDED.parent_id, EXCLUDED.marks, EXCLUDED.text,
+               EXCLUDED.is_mcq, EXCLUDED.has_match_data, EXCLUDED.has_guide_table,
+               EXCLUDED.subject, EXCLUDED.year, EXCLUDED.session, EXCLUDED.grade, EXCLUDED.language)
+    )
+    DELETE FROM questions
+    WHERE questions.extraction_id = NEW.id
+      AND NOT EXISTS (
+          SELECT 1 FROM current_rows
+          WHERE current_rows.group_index = questions.group_index
+            AND current_rows.question_index = questions.question_index
+      );
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS sync_extraction_questions ON extractions;
+CREATE TRIGGER sync_extraction_questions
+    AFTER INSERT OR UPDATE OF groups, status, subject, year, session, grade, language
+    ON extractions
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_extraction_questions();
+
+-- =============================================================================
+-- Backfill existing papers
+-- =============================================================================
+-- Inserted straight from extractions: an UPDATE of extractions would fire the
+-- updated_at trigger and change every paper's updated_at (and ETag, and its
+-- position in incremental exports). Re-running the migration is a no-op.
+
+INSERT INTO questions (
+    extraction_id, group_index, question_index, group_id,
+    question_id, parent_id, marks, text,
+    is_mcq, has_match_data, has_guide_table,
+    subject, year, session, grade, language
+)
+SELECT r.*
+FROM extractions e
+CROSS JOIN LATERAL extraction_question_rows(e) AS r
+WHERE e.status IN ('completed', 'partial')
+ON CONFLICT (extraction_id, group_index, question_index) DO NOTHING;
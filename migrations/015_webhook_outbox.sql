@@ -0,0 +1,89 @@
+-- Migration: 015_webhook_outbox.sql
+-- Description: Durable webhook outbox with leased claiming and persisted retry schedule
+-- Created: 2026-10-19
+-- Depends on: none
+
+-- =============================================================================
+-- webhook_outbox: one row per webhook event to deliver
+-- =============================================================================
+-- Endpoints insert the event here instead of sending it from a detached task,
+-- so an event survives restarts and crashes. Delivery workers
+-- (app/services/webhook_outbox.py) claim due rows with
+-- claim_webhook_deliveries(), POST them and record the outcome; a failed
+-- attempt is rescheduled by writing next_attempt_at, so the retry schedule
+-- persists too.
+
+DO $$ BEGIN
+    CREATE TYPE webhook_delivery_status AS ENUM ('pending', 'delivering', 'delivered', 'dead');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS webhook_outbox (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+
+    -- Event
+    event TEXT NOT NULL,
+    webhook_url TEXT NOT NULL,
+    payload JSONB NOT NULL,
+
+    -- Delivery state
+    status webhook_delivery_status NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0 CHECK (attempts >= 0),
+    max_attempts INTEGER NOT NULL DEFAULT 8 CHECK (max_attempts >= 1),
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMPTZ,
+    last_status_code INTEGER,
+    last_error TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    delivered_at TIMESTAMPTZ
+);
+
+-- Due work: pending rows by next attempt, and leases to reclaim
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due
+    ON webhook_outbox(next_attempt_at)
+    WHERE status IN ('pending', 'delivering');
+
+COMMENT ON TABLE webhook_outbox IS 'Webhook events awaiting (or done with) delivery; see app/services/webhook_outbox.py';
+
+-- =============================================================================
+-- claim_webhook_deliveries(): lease up to p_limit due events
+-- =============================================================================
+-- FOR UPDATE SKIP LOCKED lets several workers (and several API processes)
+-- claim concurrently without handing out the same row twice. A claimed row is
+-- leased until locked_until; if its worker dies before recording the outcome,
+-- the lease expires and the row is claimed again (at-least-once delivery).
+
+CREATE OR REPLACE FUNCTION claim_webhook_deliveries(
+    p_limit INTEGER,
+    p_lease_seconds INTEGER DEFAULT 120
+)
+RETURNS TABLE (
+    id UUID,
+    event TEXT,
+    webhook_url TEXT,
+    payload JSONB,
+    attempts INTEGER,
+    max_attempts INTEGER,
+    created_at TIMESTAMPTZ
+)
+LANGUAGE sql
+AS $$
+    UPDATE webhook_outbox AS o
+    SET
+        status = 'delivering',
+        attempts = o.attempts + 1,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE o.id IN (
+        SELECT d.id
+        FROM webhook_outbox AS d
+        WHERE (d.status = 'pending' AND d.next_attempt_at <= NOW())
+           OR (d.status = 'delivering' AND d.locked_until < NOW())
+        ORDER BY d.next_attempt_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.id, o.event, o.webhook_url, o.payload, o.attempts, o.max_attempts, o.created_at;
+$$;
@@ -69,6 +69,62 @@ if errorlevel 1 (
 )
 echo [OK] Migration 006 complete
 
+echo Applying migration 009_batch_jobs_atomic_counters.sql...
+psql "%DATABASE_URL%" -f "migrations\009_batch_jobs_atomic_counters.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 009 failed
+    exit /b 1
+)
+echo [OK] Migration 009 complete
+
+echo Applying migration 010_stats_aggregates.sql...
+psql "%DATABASE_URL%" -f "migrations\010_stats_aggregates.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 010 failed
+    exit /b 1
+)
+echo [OK] Migration 010 complete
+
+echo Applying migration 011_keyset_pagination_indexes.sql...
+psql "%DATABASE_URL%" -f "migrations\011_keyset_pagination_indexes.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 011 failed
+    exit /b 1
+)
+echo [OK] Migration 011 complete
+
+echo Applying migration 012_find_by_file_hash.sql...
+psql "%DATABASE_URL%" -f "migrations\012_find_by_file_hash.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 012 failed
+    exit /b 1
+)
+echo [OK] Migration 012 complete
+
+echo Applying migration 013_export_keyset_indexes.sql...
+psql "%DATABASE_URL%" -f "migrations\013_export_keyset_indexes.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 013 failed
+    exit /b 1
+)
+echo [OK] Migration 013 complete
+
+echo Applying migration 014_questions_table.sql...
+psql "%DATABASE_URL%" -f "migrations\014_questions_table.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 014 failed
+    exit /b 1
+)
+echo [OK] Migration 014 complete
+
+echo Applying migration 015_webhook_outbox.sql...
+psql "%DATABASE_URL%" -f "migrations\015_webhook_outbox.sql" >nul 2>&1
+if errorlevel 1 (
+    echo [FAILED] Migration 015 failed
+    exit /b 1
+)
+echo [OK] Migration 015 complete
+
 echo.
 echo ==========================================
 echo All migrations applied successfully!
@@ -36,6 +36,13 @@ MIGRATIONS=(
     "004_create_memo_extractions_table.sql"
     "005_update_extractions_for_exam_papers.sql"
     "006_add_constraints_and_indexes.sql"
+    "009_batch_jobs_atomic_counters.sql"
+    "010_stats_aggregates.sql"
+    "011_keyset_pagination_indexes.sql"
+    "012_find_by_file_hash.sql"
+    "013_export_keyset_indexes.sql"
+    "014_questions_table.sql"
+    "015_webhook_outbox.sql"
 )
 
 echo "Found ${#MIGRATIONS[@]} migration files"
@@ -7,6 +7,7 @@ Query, export, update, and analyze papers stored in Supabase.
 Usage:
     python scripts/batch_operations.py stats
     python scripts/batch_operations.py list --subject "Mathematics" --grade 12
+    python scripts/batch_operations.py list --subject "Mathematics" --cursor <next page cursor>
     python scripts/batch_operations.py export-csv --output papers.csv
     python scripts/batch_operations.py update-metadata --filter-subject "Maths" --set-subject "Mathematics"
     python scripts/batch_operations.py rename --file-id abc123 --new-filename "Paper1.pdf"
@@ -20,10 +21,15 @@ import csv
 import json
 import argparse
 import logging
-from typing import Dict, Any, List, Optional
+from pathlib import Path
+from typing import Dict, Any, Iterator, List
 
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.pagination import apply_keyset, next_cursor  # noqa: E402
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -167,12 +173,16 @@ def cmd_list(args) -> None:
     sb = get_supabase()
 
     query = sb.table(TABLE).select(
-        "file_id, filename, subject, grade, year, document_type, session, status"
+        "id, created_at, file_id, filename, subject, grade, year, document_type, session, status"
     )
     query = apply_filters(query, args)
 
     limit = getattr(args, "limit", 50) or 50
-    query = query.limit(limit).order("filename")
+    try:
+        query = apply_keyset(query, limit, getattr(args, "cursor", None))
+    except ValueError as e:
+        print(e)
+        return
 
     resp = query.execute()
     records = resp.data
@@ -195,40 +205,47 @@ def cmd_list(args) -> None:
         print(f"{fn:<50} {subj:<20} {gr:<3} {yr:<5} {dt:<5} {sess:<12} {st:<12}")
 
     print(f"\nShowing {len(records)} records (limit: {limit})")
+    cursor = next_cursor(records, limit)
+    if cursor:
+        print(f"Next page: --cursor {cursor}")
 
 
 def cmd_export_csv(args) -> None:
-    """Export papers to CSV file."""
+    """Export papers to CSV file, writing each page as it is fetched."""
     sb = get_supabase()
 
-    query = sb.table(TABLE).select("*")
-    query = apply_filters(query, args)
-
-    records = _fetch_all_query(sb, query, args)
-
-    if not records:
+    output = args.output or "scraped_files_export.csv"
+    exported = 0
+    f = None
+    writer = None
+
+    try:
+        for page in _iter_pages(sb, args):
+            if writer is None:
+                # Determine columns from first record
+                columns = list(page[0].keys())
+                # Move metadata to end (it's large JSONB)
+                if "metadata" in columns:
+                    columns.remove("metadata")
+                    columns.append("metadata")
+                f = open(output, "w", newline="", encoding="utf-8")
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+                writer.writeheader()
+            for rec in page:
+                # Convert metadata dict to JSON string for CSV
+                if "metadata" in rec and isinstance(rec["metadata"], dict):
+                    rec["metadata"] = json.dumps(rec["metadata"])
+                writer.writerow(rec)
+            exported += len(page)
+    finally:
+        if f is not None:
+            f.close()
+
+    if not exported:
         print("No records to export.")
         return
 
-    output = args.output or "scraped_files_export.csv"
-
-    # Determine columns from first record
-    columns = list(records[0].keys())
-    # Move metadata to end (it's large JSONB)
-    if "metadata" in columns:
-        columns.remove("metadata")
-        columns.append("metadata")
-
-    with open(output, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
-        writer.writeheader()
-        for rec in records:
-            # Convert metadata dict to JSON string for CSV
-            if "metadata" in rec and isinstance(rec["metadata"], dict):
-                rec["metadata"] = json.dumps(rec["metadata"])
-            writer.writerow(rec)
-
-    print(f"Exported {len(records)} records to {output}")
+    print(f"Exported {exported} records to {output}")
 
 
 def cmd_update_metadata(args) -> None:
@@ -347,43 +364,32 @@ def cmd_rename(args) -> None:
 # ============================================================================
 
 
-def _fetch_all(sb, table: str = TABLE) -> List[Dict[str, Any]]:
-    """Fetch all records from a table, handling pagination."""
-    all_records = []
-    offset = 0
-    page_size = 1000
+PAGE_SIZE = 1000
 
-    while True:
-        resp = sb.table(table).select("*").range(offset, offset + page_size - 1).execute()
-        if not resp.data:
-            break
-        all_records.extend(resp.data)
-        if len(resp.data) < page_size:
-            break
-        offset += page_size
 
+def _fetch_all(sb, table: str = TABLE) -> List[Dict[str, Any]]:
+    """Fetch all records from a table, paging by (created_at, id) cursor."""
+    all_records = []
+    for page in _iter_pages(sb, None, table):
+        all_records.extend(page)
     return all_records
 
 
-def _fetch_all_query(sb, base_query, args, table: str = TABLE) -> List[Dict[str, Any]]:
-    """Fetch all records with filters applied, handling pagination."""
-    all_records = []
-    offset = 0
-    page_size = 1000
+def _iter_pages(sb, args, table: str = TABLE) -> Iterator[List[Dict[str, Any]]]:
+    """Yield non-empty pages of records with filters applied, one query at a time."""
+    cursor = None
 
     while True:
         query = sb.table(table).select("*")
-        query = apply_filters(query, args)
-        query = query.range(offset, offset + page_size - 1)
-        resp = query.execute()
-        if not resp.data:
-            break
-        all_records.extend(resp.data)
-        if len(resp.data) < page_size:
+        if args is not None:
+            query = apply_filters(query, args)
+        resp = apply_keyset(query, PAGE_SIZE, cursor).execute()
+        page = resp.data or []
+        if page:
+            yield page
+        cursor = next_cursor(page, PAGE_SIZE)
+        if cursor is None:
             break
-        offset += page_size
-
-    return all_records
 
 
 # ============================================================================
@@ -404,6 +410,7 @@ def main():
     list_parser = subparsers.add_parser("list", help="List papers matching filters")
     add_filter_args(list_parser)
     list_parser.add_argument("--limit", type=int, default=50, help="Max records to show (default: 50)")
+    list_parser.add_argument("--cursor", help="Continue after a previous page (printed as 'Next page')")
 
     # export-csv
     export_parser = subparsers.add_parser("export-csv", help="Export papers to CSV")
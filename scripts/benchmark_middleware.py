@@ -0,0 +1,173 @@
+"""
+Micro-benchmark: per-request overhead of the request-context middleware.
+
+Compares the previous stack of three BaseHTTPMiddleware layers (request ID,
+request logging, X-RateLimit-Remaining; reproduced below as they were) with
+the single plain ASGI RequestContextMiddleware from app/middleware/logging.py,
+and with no middleware at all as the floor. Requests are driven straight
+through the ASGI interface (no sockets), so the numbers are middleware and
+framework cost only:
+
+  trivial   GET returning a small JSON body
+  stream    GET returning a StreamingResponse of --chunks chunks
+
+Log lines are built as in production but not written (the logger is raised
+to WARNING), so console I/O does not swamp the difference.
+
+Usage:
+    python scripts/benchmark_middleware.py [--requests 2000] [--chunks 100]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse, Response, StreamingResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from starlette.types import ASGIApp, Message  # noqa: E402
+
+from app.middleware.logging import RequestContextMiddleware, logger  # noqa: E402
+
+CallNext = Callable[[Request], Awaitable[Response]]
+
+
+class _LegacyRequestID(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class _LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        request_id = getattr(request.state, "request_id", None) or str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        log_data: Dict[str, Any] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "user_ip": request.client.host if request.client else "unknown",
+        }
+        response = await call_next(request)
+        log_data.update({
+            "status_code": response.status_code,
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+        })
+        if "X-Processing-Method" in response.headers:
+            log_data["processing_method"] = response.headers["X-Processing-Method"]
+        logger.info(json.dumps(log_data))
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class _LegacyRateLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        response: Response = await call_next(request)
+        if hasattr(request.state, "_rate_limiting_complete"):
+            rate_limit_data = getattr(request.state, "_rate_limit_data", None)
+            if rate_limit_data:
+                response.headers["X-RateLimit-Remaining"] = str(rate_limit_data.get("remaining", 0))
+        return response
+
+
+def _build_app(stack: str, chunks: int) -> ASGIApp:
+    async def trivial(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    async def stream(request: Request) -> StreamingResponse:
+        async def rows() -> AsyncIterator[bytes]:
+            for i in range(chunks):
+                yield b'{"row": %d}\n' % i
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    app = Starlette(routes=[Route("/trivial", trivial), Route("/stream", stream)])
+    if stack == "before":
+        # Same add order as app/main.py had (last added is outermost)
+        app.add_middleware(_LegacyRequestID)
+        app.add_middleware(_LegacyLogging)
+        app.add_middleware(_LegacyRateLimit)
+    elif stack == "after":
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def _request(app: ASGIApp, path: str) -> int:
+    """Send one GET through the ASGI app; returns the number of body messages."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    received = False
+    messages: List[Message] = []
+
+    async def receive() -> Message:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # Never disconnects
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return sum(1 for m in messages if m["type"] == "http.response.body")
+
+
+async def _time_per_request(app: ASGIApp, path: str, requests: int, repeat: int) -> float:
+    """Median seconds per request over `repeat` passes of `requests` requests."""
+    for _ in range(min(requests, 200)):  # Warm up
+        await _request(app, path)
+    passes = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await _request(app, path)
+        passes.append((time.perf_counter() - start) / requests)
+    return statistics.median(passes)
+
+
+async def _run(requests: int, chunks: int, repeat: int) -> None:
+    logger.setLevel(logging.WARNING)
+    stacks = {name: _build_app(name, chunks) for name in ("none", "before", "after")}
+
+    print(f"{requests} requests x {repeat} passes, stream of {chunks} chunks\n")
+    print(f"{'endpoint':<10}{'none (us)':>12}{'before (us)':>14}{'after (us)':>13}"
+          f"{'overhead before':>18}{'overhead after':>17}")
+    for name, path in (("trivial", "/trivial"), ("stream", "/stream")):
+        times = {stack: await _time_per_request(app, path, requests, repeat) for stack, app in stacks.items()}
+        floor = times["none"]
+        print(f"{name:<10}{floor * 1e6:>12.1f}{times['before'] * 1e6:>14.1f}{times['after'] * 1e6:>13.1f}"
+              f"{(times['before'] - floor) * 1e6:>18.1f}{(times['after'] - floor) * 1e6:>17.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per timed pass (default: 2000)")
+    parser.add_argument("--chunks", type=int, default=100, help="Chunks per streamed response (default: 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per case (default: 5)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests, args.chunks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
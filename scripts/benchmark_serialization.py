@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: stdlib json vs app.utils.serialization on the sample outputs.
+
+Loads every question paper (*-qp.json) and memo (*-mg.json) in "Sample PDFS/"
+and times, per document, the serialization steps the service performs:
+
+  parse     Gemini response text -> model
+            json.loads + model_validate   vs  model_validate_json
+  record    stored record dict -> response body (duplicate hits, GET by id)
+            json.dumps(default=str)       vs  orjson
+  response  model -> response body
+            json.dumps(model_dump())      vs  model_dump_json
+  file      model -> pretty-printed batch output file
+            json.dumps(indent=2)          vs  orjson OPT_INDENT_2
+
+Usage:
+    python scripts/benchmark_serialization.py [--repeat 50] [--dir "Sample PDFS"]
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.extraction import FullExamPaper  # noqa: E402
+from app.models.memo_extraction import MarkingGuideline  # noqa: E402
+from app.utils.serialization import dumps, model_dumps, parse_model  # noqa: E402
+
+DEFAULT_DIR = Path(__file__).resolve().parent.parent / "Sample PDFS"
+
+
+def _load_samples(directory: Path) -> List[Tuple[type, str]]:
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, "*-qp.json"))):
+        samples.append((FullExamPaper, Path(path).read_text(encoding="utf-8")))
+    for path in sorted(glob.glob(os.path.join(directory, "*-mg.json"))):
+        samples.append((MarkingGuideline, Path(path).read_text(encoding="utf-8")))
+    return samples
+
+
+def _time_per_doc(fn: Callable[[Any], Any], inputs: List[Any], repeat: int) -> float:
+    """Median seconds per document over `repeat` passes."""
+    passes = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            fn(item)
+        passes.append((time.perf_counter() - start) / len(inputs))
+    return statistics.median(passes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Timed passes over all samples (default: 50)")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_DIR, help="Directory with sample JSON outputs")
+    args = parser.parse_args()
+
+    samples = _load_samples(args.dir)
+    if not samples:
+        print(f"No *-qp.json / *-mg.json samples found in {args.dir}")
+        sys.exit(1)
+
+    models = [cls.model_validate_json(text) for cls, text in samples]
+    records = [json.loads(text) for _, text in samples]
+    avg_kb = statistics.mean(len(text.encode("utf-8")) for _, text in samples) / 1024
+
+    cases: Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], Any], List[Any]]] = {
+        "parse": (
+            lambda s: s[0].model_validate(json.loads(s[1])),
+            lambda s: parse_model(s[0], s[1]),
+            samples,
+        ),
+        "record": (
+            lambda r: json.dumps(r, default=str),
+            lambda r: dumps(r),
+            records,
+        ),
+        "response": (
+            lambda m: json.dumps(m.model_dump()),
+            lambda m: model_dumps(m),
+            models,
+        ),
+        "file": (
+            lambda m: json.dumps(m.model_dump(), indent=2, ensure_ascii=False),
+            lambda m: model_dumps(m, indent=True),
+            models,
+        ),
+    }
+
+    print(f"{len(samples)} documents, {avg_kb:.1f} KiB average, {args.repeat} passes\n")
+    print(f"{'step':<10}{'stdlib (us/doc)':>18}{'fast (us/doc)':>16}{'speedup':>10}")
+    for name, (baseline, fast, inputs) in cases.items():
+        base_s = _time_per_doc(baseline, inputs, args.repeat)
+        fast_s = _time_per_doc(fast, inputs, args.repeat)
+        print(f"{name:<10}{base_s * 1e6:>18.1f}{fast_s * 1e6:>16.1f}{base_s / fast_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
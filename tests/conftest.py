@@ -0,0 +1,19 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+class FakeClock:
+    """Manually advanced monotonic clock (seconds), starting on a minute boundary."""
+
+    def __init__(self, now: float = 1200.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A FakeClock; advance it with clock.now += seconds."""
+    return FakeClock()
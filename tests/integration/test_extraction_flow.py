@@ -15,6 +15,7 @@ import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from app.db.dedup import DedupLookup, HashMatch
 from app.main import app
 from app.middleware.rate_limit import get_limiter
 from app.models.extraction import (
@@ -146,7 +147,7 @@ class TestEndToEndExtractionFlow:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -161,7 +162,7 @@ class TestEndToEndExtractionFlow:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -175,7 +176,7 @@ class TestEndToEndExtractionFlow:
 
         mock_validate.return_value = (sample_pdf_bytes, file_hash, "academic_paper.pdf")
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None  # No duplicate
+        mock_lookup_file_hash.return_value = DedupLookup()  # No duplicate
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = high_quality_extraction_result
         mock_create_extraction.return_value = extraction_id
@@ -261,7 +262,7 @@ class TestEndToEndExtractionFlow:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -276,7 +277,7 @@ class TestEndToEndExtractionFlow:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -291,7 +292,7 @@ class TestEndToEndExtractionFlow:
 
         mock_validate.return_value = (sample_pdf_bytes, file_hash, "scanned.pdf")
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
 
         # Hybrid returns low-quality result with vision_fallback method
@@ -338,12 +339,12 @@ class TestDuplicateDetection:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_extraction")
     def test_duplicate_pdf_returns_cached_result(
         self,
         mock_get_extraction: AsyncMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -355,7 +356,6 @@ class TestDuplicateDetection:
 
         mock_validate.return_value = (sample_pdf_bytes, file_hash, "duplicate.pdf")
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = cached_extraction_id
 
         # Mock existing cached result
         cached_result = {
@@ -368,6 +368,9 @@ class TestDuplicateDetection:
             "bounding_boxes": {},
             "processing_metadata": {"method": "hybrid"},
         }
+        mock_lookup_file_hash.return_value = DedupLookup(
+            (HashMatch("extractions", cached_extraction_id, "completed", 0),)
+        )
         mock_get_extraction.return_value = cached_result
 
         # Upload duplicate PDF
@@ -385,7 +388,7 @@ class TestDuplicateDetection:
         assert "Cached Paper" in result
 
         # Verify no new extraction was performed
-        mock_check_duplicate.assert_called_once_with(mock_supabase_client.return_value, file_hash)
+        mock_lookup_file_hash.assert_called_once_with(mock_supabase_client.return_value, file_hash)
         mock_get_extraction.assert_called_once_with(
             mock_supabase_client.return_value, cached_extraction_id
         )
@@ -575,7 +578,7 @@ class TestWebhookNotifications:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -590,7 +593,7 @@ class TestWebhookNotifications:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -604,7 +607,7 @@ class TestWebhookNotifications:
         # Setup mocks
         mock_validate.return_value = (sample_pdf_bytes, "hash123", "test.pdf")
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = high_quality_extraction_result
         mock_create_extraction.return_value = extraction_id
@@ -0,0 +1,122 @@
+"""Tests for admission control and load shedding (app/services/admission.py)."""
+
+import asyncio
+import threading
+import time
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.admission import AdmissionMiddleware
+from app.services.admission import AdmissionController
+from app.services.gemini_client import generate_content
+
+
+def test_in_flight_budget() -> None:
+    controller = AdmissionController(max_parses=2)
+    with controller.track("parse"):
+        assert controller.check() is None
+        with controller.track("parse"):
+            assert controller.check() == "parse: 2 in flight"
+    assert controller.check() is None
+    assert controller.snapshot()["rejected"] == {"parse": 1}
+
+
+def test_spooled_bytes_budget_admits_one_oversized_upload() -> None:
+    controller = AdmissionController(max_spooled_bytes=100)
+    assert controller.check(incoming_bytes=500) is None  # Nothing else spooled
+    with controller.spool(60):
+        assert controller.check(incoming_bytes=30) is None
+        assert controller.check(incoming_bytes=50) is not None
+    assert controller.snapshot()["spooled_bytes"] == 0
+
+
+def test_loop_lag_uses_recent_samples() -> None:
+    controller = AdmissionController(max_loop_lag_ms=100, lag_window=2)
+    controller.record_lag(250)
+    assert controller.check() == "event loop lag: 250ms"
+    controller.record_lag(5)
+    controller.record_lag(5)
+    assert controller.check() is None
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_measures_blocked_loop() -> None:
+    controller = AdmissionController(lag_interval_seconds=0.01)
+    await controller.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.15)  # Block the loop
+    await asyncio.sleep(0.02)
+    await controller.stop()
+    assert controller.loop_lag_ms >= 100
+
+
+@pytest.mark.asyncio
+async def test_gemini_calls_are_tracked() -> None:
+    controller = AdmissionController(max_gemini_calls=1)
+    client = MagicMock()
+    seen = []
+    client.aio.models.generate_content = AsyncMock(side_effect=lambda **kwargs: seen.append(controller.check()) or "ok")
+
+    with patch("app.services.scheduler.get_admission_controller", return_value=controller):
+        assert await generate_content(client, model="m", contents="hi") == "ok"
+
+    assert seen == ["gemini: 1 in flight"]
+    client.aio.models.generate_content.assert_called_once_with(model="m", contents="hi")
+
+
+def _app(controller: AdmissionController, entered: threading.Event, release: threading.Event) -> Starlette:
+    async def upload(request: Request) -> JSONResponse:
+        entered.set()
+        await asyncio.to_thread(release.wait, 5)
+        return JSONResponse({"spooled": controller.snapshot()["spooled_bytes"]})
+
+    async def read(request: Request) -> JSONResponse:
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[Route("/api/extract", upload, methods=["POST"]), Route("/api/read", read)])
+    app.add_middleware(AdmissionMiddleware, retry_after_seconds=7, controller=controller)
+    return app
+
+
+def test_middleware_rejects_uploads_over_budget() -> None:
+    controller = AdmissionController(max_parses=1)
+    entered, release = threading.Event(), threading.Event()
+    release.set()
+    client = TestClient(_app(controller, entered, release))
+
+    with controller.track("parse"):
+        rejected = client.post("/api/extract", content=b"x" * 10)
+        assert client.get("/api/read").status_code == 200  # Other routes are not shed
+
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "7"
+    assert rejected.json()["detail"] == "Server is at capacity (parse: 1 in flight); retry shortly"
+    assert not entered.is_set()  # Rejected before the endpoint ran
+
+    admitted = client.post("/api/extract", content=b"x" * 10)
+    assert admitted.status_code == 200 and admitted.json() == {"spooled": 10}
+    assert controller.snapshot()["spooled_bytes"] == 0
+
+
+def test_middleware_counts_admitted_upload_bytes() -> None:
+    controller = AdmissionController(max_spooled_bytes=15)
+    entered, release = threading.Event(), threading.Event()
+    client = TestClient(_app(controller, entered, release))
+    results: Any = {}
+
+    first = threading.Thread(target=lambda: results.update(first=client.post("/api/extract", content=b"x" * 10)))
+    first.start()
+    assert entered.wait(5)
+    second = client.post("/api/extract", content=b"y" * 10)
+    release.set()
+    first.join(5)
+
+    assert second.status_code == 503
+    assert results["first"].status_code == 200
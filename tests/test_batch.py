@@ -1,5 +1,7 @@
 """Tests for batch processing operations."""
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from uuid import uuid4
@@ -10,6 +12,7 @@ from app.db.batch_jobs import (
     add_extraction_to_batch,
     list_batch_jobs,
 )
+from app.db.pagination import encode_cursor
 
 
 @pytest.mark.asyncio
@@ -91,36 +94,22 @@ async def test_get_batch_job_invalid_uuid():
 
 @pytest.mark.asyncio
 async def test_add_extraction_to_batch():
-    """Test adding extraction to batch job."""
+    """Test adding extraction to batch job uses the atomic RPC."""
     batch_id = str(uuid4())
     extraction_id = str(uuid4())
 
     mock_client = MagicMock()
-
-    # Mock get_batch_job response
-    initial_batch = {
-        'id': batch_id,
-        'total_files': 3,
-        'status': 'processing',
-        'completed_files': 1,
-        'failed_files': 0,
-        'routing_stats': {'hybrid': 1, 'vision_fallback': 0, 'pending': 2},
-        'extraction_ids': [str(uuid4())],
-        'cost_estimate_usd': 0.01,
-        'cost_savings_usd': 0.04
-    }
-
-    # Mock the select query for get_batch_job
-    mock_client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
-        initial_batch
-    ]
-
-    # Mock the update query
-    mock_client.table.return_value.update.return_value.eq.return_value.execute.return_value.data = [
-        {'id': batch_id}
+    mock_client.rpc.return_value.execute.return_value.data = [
+        {
+            'id': batch_id,
+            'status': 'processing',
+            'total_files': 3,
+            'completed_files': 2,
+            'failed_files': 0
+        }
     ]
 
-    await add_extraction_to_batch(
+    result = await add_extraction_to_batch(
         mock_client,
         batch_id,
         extraction_id,
@@ -130,8 +119,130 @@ async def test_add_extraction_to_batch():
         cost_savings_usd=0.04
     )
 
-    # Verify update was called
-    assert mock_client.table.return_value.update.called
+    assert result['completed_files'] == 2
+    mock_client.rpc.assert_called_once_with('add_extraction_to_batch', {
+        'p_batch_job_id': batch_id,
+        'p_extraction_id': extraction_id,
+        'p_processing_method': 'hybrid',
+        'p_status': 'completed',
+        'p_cost_estimate_usd': 0.01,
+        'p_cost_savings_usd': 0.04,
+    })
+    # No read-modify-write round trips
+    assert not mock_client.table.called
+
+
+@pytest.mark.asyncio
+async def test_add_extraction_to_batch_not_found():
+    """Test adding extraction to a batch job that does not exist."""
+    mock_client = MagicMock()
+    mock_client.rpc.return_value.execute.return_value.data = []
+
+    with pytest.raises(Exception, match="No batch job found"):
+        await add_extraction_to_batch(
+            mock_client,
+            str(uuid4()),
+            str(uuid4()),
+            processing_method='hybrid',
+            status='completed'
+        )
+
+
+def _rpc_returning(rows):
+    """Supabase client whose successive rpc() calls return the given batch rows."""
+    responses = iter(rows)
+    mock_client = MagicMock()
+    mock_client.rpc.side_effect = lambda name, params: MagicMock(
+        execute=MagicMock(return_value=MagicMock(data=[next(responses)]))
+    )
+    return mock_client
+
+
+def _batch_row(batch_id, status, completed_files, failed_files, total_files=2):
+    return {
+        'id': batch_id, 'status': status, 'total_files': total_files,
+        'completed_files': completed_files, 'failed_files': failed_files,
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("statuses, counters", [
+    (['completed', 'partial'], [('processing', 1, 0), ('completed', 2, 0)]),
+    (['completed', 'failed'], [('processing', 1, 0), ('partial', 1, 1)]),
+    (['failed', 'failed'], [('processing', 0, 1), ('failed', 0, 2)]),
+])
+async def test_add_extraction_to_batch_returns_counters_of_each_transition(statuses, counters):
+    """Each file's status goes to the RPC, and its updated counters come back.
+
+    The rows are those migration 009's function returns for a 2-file batch
+    (a partial extraction counts as completed).
+    """
+    batch_id = str(uuid4())
+    rows = [_batch_row(batch_id, *c) for c in counters]
+    mock_client = _rpc_returning(rows)
+    extraction_ids = [str(uuid4()) for _ in statuses]
+
+    results = [
+        await add_extraction_to_batch(mock_client, batch_id, eid, processing_method='hybrid', status=file_status)
+        for eid, file_status in zip(extraction_ids, statuses)
+    ]
+
+    assert results == rows
+    assert [call.args[1] for call in mock_client.rpc.call_args_list] == [
+        {
+            'p_batch_job_id': batch_id,
+            'p_extraction_id': eid,
+            'p_processing_method': 'hybrid',
+            'p_status': file_status,
+            'p_cost_estimate_usd': 0.0,
+            'p_cost_savings_usd': 0.0,
+        }
+        for eid, file_status in zip(extraction_ids, statuses)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_add_extraction_to_batch_concurrent_calls_are_single_rpcs():
+    """Concurrent file completions each make one RPC and get its counters back.
+
+    No counter is read or written from Python, so nothing can be lost between
+    calls; serializing the increments is left to the UPDATE's row lock in the
+    SQL function (migration 009), which this unit test does not exercise.
+    """
+    batch_id = str(uuid4())
+    statuses = ['completed', 'partial', 'failed', 'completed']
+    # Counters after each increment, in whatever order the calls reach the database
+    rows = [
+        _batch_row(batch_id, 'processing', 1, 0, total_files=4),
+        _batch_row(batch_id, 'processing', 2, 0, total_files=4),
+        _batch_row(batch_id, 'processing', 2, 1, total_files=4),
+        _batch_row(batch_id, 'partial', 3, 1, total_files=4),
+    ]
+    mock_client = _rpc_returning(rows)
+    extraction_ids = [str(uuid4()) for _ in statuses]
+
+    results = await asyncio.gather(*[
+        add_extraction_to_batch(
+            mock_client,
+            batch_id,
+            eid,
+            processing_method='hybrid' if i % 2 else 'vision_fallback',
+            status=file_status,
+        )
+        for i, (eid, file_status) in enumerate(zip(extraction_ids, statuses))
+    ])
+
+    assert not mock_client.table.called
+    calls = mock_client.rpc.call_args_list
+    assert [call.args[0] for call in calls] == ['add_extraction_to_batch'] * len(statuses)
+    sent = {call.args[1]['p_extraction_id']: call.args[1] for call in calls}
+    assert {eid: (sent[eid]['p_status'], sent[eid]['p_processing_method']) for eid in extraction_ids} == {
+        eid: (file_status, 'hybrid' if i % 2 else 'vision_fallback')
+        for i, (eid, file_status) in enumerate(zip(extraction_ids, statuses))
+    }
+    assert all(params['p_batch_job_id'] == batch_id for params in sent.values())
+    # Every caller gets the counters of its own call; the last one sees the final totals
+    assert sorted(results, key=lambda r: r['completed_files'] + r['failed_files']) == rows
 
 
 @pytest.mark.asyncio
@@ -172,7 +283,7 @@ async def test_add_extraction_to_batch_invalid_status():
 async def test_list_batch_jobs():
     """Test listing batch jobs."""
     mock_client = MagicMock()
-    mock_client.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value.data = [
+    mock_client.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = [
         {'id': str(uuid4()), 'status': 'completed'},
         {'id': str(uuid4()), 'status': 'processing'}
     ]
@@ -188,7 +299,7 @@ async def test_list_batch_jobs_with_status_filter():
     """Test listing batch jobs with status filter."""
     mock_client = MagicMock()
     query_mock = mock_client.table.return_value.select.return_value
-    query_mock.eq.return_value.order.return_value.range.return_value.execute.return_value.data = [
+    query_mock.eq.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = [
         {'id': str(uuid4()), 'status': 'completed'}
     ]
 
@@ -197,6 +308,20 @@ async def test_list_batch_jobs_with_status_filter():
     assert len(batch_jobs) == 1
 
 
+@pytest.mark.asyncio
+async def test_list_batch_jobs_with_cursor():
+    """Test that a cursor continues after the previous page's last job."""
+    mock_client = MagicMock()
+    query_mock = mock_client.table.return_value.select.return_value
+    query_mock.or_.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = []
+    job_id = str(uuid4())
+
+    await list_batch_jobs(mock_client, limit=10, cursor=encode_cursor({'id': job_id, 'created_at': '2026-10-19T08:00:00+00:00'}))
+
+    assert f'id.lt."{job_id}"' in query_mock.or_.call_args[0][0]
+    query_mock.or_.return_value.order.return_value.order.return_value.limit.assert_called_once_with(10)
+
+
 @pytest.mark.asyncio
 async def test_list_batch_jobs_invalid_status():
     """Test listing batch jobs with invalid status filter."""
@@ -0,0 +1,158 @@
+"""Tests for negotiated response compression."""
+
+import asyncio
+import gzip
+import zlib
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.db.read_cache import CachedRecord
+from app.middleware.compression import CompressionMiddleware
+from app.utils import compression
+from app.utils.compression import mark_encoded, negotiate_encoding
+
+BIG_JSON = b'{"groups": [' + b",".join(b'{"question_id": "1.1", "marks": 2}' for _ in range(200)) + b"]}"
+
+
+def _app() -> Starlette:
+    async def big(request: Any) -> Response:
+        return Response(BIG_JSON, media_type="application/json", headers={"ETag": '"abc"'})
+
+    async def small(request: Any) -> Response:
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    async def binary(request: Any) -> Response:
+        return Response(b"%PDF" * 1000, media_type="application/pdf")
+
+    async def stream(request: Any) -> StreamingResponse:
+        async def rows():  # type: ignore[no-untyped-def]
+            for i in range(5):
+                yield b'{"row": %d, "padding": "%s"}\n' % (i, b"x" * 400)
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    async def text(request: Any) -> PlainTextResponse:
+        return PlainTextResponse("a" * 5000)
+
+    app = Starlette(routes=[
+        Route("/big", big), Route("/small", small), Route("/binary", binary),
+        Route("/stream", stream), Route("/text", text),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(_app())
+
+
+class TestNegotiation:
+    """Accept-Encoding parsing and coding choice."""
+
+    def test_gzip_and_absent_header(self) -> None:
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding(None) is None
+        assert negotiate_encoding("identity") is None
+
+    def test_q_values_and_wildcard(self) -> None:
+        assert negotiate_encoding("gzip;q=0") is None
+        assert negotiate_encoding("*;q=0.5") is not None
+        assert negotiate_encoding("*, gzip;q=0") in ("zstd", "br", None)
+
+    def test_highest_q_then_server_preference(self) -> None:
+        assert negotiate_encoding("gzip;q=1.0, br;q=0.1, zstd;q=0.1") == "gzip"
+        with patch.dict(compression.ENCODERS, {"zstd": compression._gzip_encoder}):
+            assert negotiate_encoding("gzip, zstd") == next(iter(compression.ENCODERS))
+
+    def test_mark_encoded_weakens_etag_and_merges_vary(self) -> None:
+        headers: Dict[str, str] = {"ETag": '"abc"', "Vary": "Origin"}
+        mark_encoded(headers, "gzip")
+        assert headers == {"ETag": 'W/"abc"', "Vary": "Origin, Accept-Encoding", "Content-Encoding": "gzip"}
+
+
+class TestCompressionMiddleware:
+    """Threshold, media type and streaming behavior."""
+
+    def test_large_json_is_gzipped(self, client: TestClient) -> None:
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert response.content == BIG_JSON
+        assert int(response.headers["content-length"]) < len(BIG_JSON) // 5
+
+    def test_small_binary_and_unaccepted_pass_through(self, client: TestClient) -> None:
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        binary = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+        identity = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in small.headers
+        assert small.headers["vary"] == "Accept-Encoding"
+        assert "content-encoding" not in binary.headers
+        assert "content-encoding" not in identity.headers
+        assert identity.content == BIG_JSON
+
+    def test_text_is_compressed(self, client: TestClient) -> None:
+        response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == "a" * 5000
+
+    @pytest.mark.asyncio
+    async def test_stream_chunks_are_flushed_incrementally(self) -> None:
+        """Every streamed chunk decodes on arrival (sync flush), not only at the end."""
+        sent: List[Dict[str, Any]] = []
+        requested = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal requested
+            if requested:  # StreamingResponse listens for disconnect until it is done
+                await asyncio.Event().wait()
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream",
+            "root_path": "", "scheme": "http", "query_string": b"", "server": ("test", 80),
+            "headers": [(b"accept-encoding", b"gzip")],
+        }
+        await _app()(scope, receive, send)
+
+        start = sent[0]
+        assert (b"content-encoding", b"gzip") in start["headers"]
+        assert not any(name == b"content-length" for name, _ in start["headers"])
+
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decoded_rows = []
+        for message in sent[1:]:
+            chunk = decoder.decompress(message["body"])
+            if message.get("more_body"):
+                assert chunk.endswith(b"\n")
+            decoded_rows.append(chunk)
+        assert b"".join(decoded_rows).count(b"\n") == 5
+
+
+def test_cached_record_compresses_once_per_coding() -> None:
+    """CachedRecord.encoded keeps the compressed body for repeat reads."""
+    record = CachedRecord({"id": "a", "status": "completed", "groups": ["x" * 50] * 100})
+
+    with patch("app.db.read_cache.compress", wraps=compression.compress) as mock_compress:
+        first, encoding = record.encoded("gzip")
+        second, _ = record.encoded("gzip")
+        plain, none = record.encoded(None)
+
+    assert encoding == "gzip"
+    assert first is second
+    assert gzip.decompress(first).decode() == record.body()
+    mock_compress.assert_called_once()
+    assert none is None and plain == record.body()
+    assert CachedRecord({"id": "b"}).encoded("gzip")[1] is None  # below threshold
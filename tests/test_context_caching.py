@@ -1,7 +1,7 @@
 """Tests for context caching functionality."""
 
 import pytest
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 from google import genai
 from google.genai import types
 
@@ -109,7 +109,7 @@ class TestContextCaching:
         mock_usage.total_token_count = 1000
         type(mock_response).usage_metadata = PropertyMock(return_value=mock_usage)
 
-        mock_client.models.generate_content.return_value = mock_response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
 
         # Call function
         with patch('os.path.exists', return_value=True):
@@ -122,7 +122,7 @@ class TestContextCaching:
         mock_client.caches.create.assert_called_once()
 
         # Verify generate_content was called with cache
-        call_args = mock_client.models.generate_content.call_args
+        call_args = mock_client.aio.models.generate_content.call_args
         config = call_args[1]["config"]
         assert config.cached_content == "cache_vision"
 
@@ -169,7 +169,7 @@ class TestContextCaching:
         mock_usage.total_token_count = 800
         type(mock_response).usage_metadata = PropertyMock(return_value=mock_usage)
 
-        mock_client.models.generate_content.return_value = mock_response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
 
         # Mock extract_pdf_structure
         with patch('app.services.pdf_extractor.extract_pdf_structure', return_value=mock_doc_structure):
@@ -182,7 +182,7 @@ class TestContextCaching:
         mock_client.caches.create.assert_called_once()
 
         # Verify generate_content was called with cache
-        call_args = mock_client.models.generate_content.call_args
+        call_args = mock_client.aio.models.generate_content.call_args
         config = call_args[1]["config"]
         assert config.cached_content == "cache_hybrid"
 
@@ -231,7 +231,7 @@ class TestContextCaching:
         mock_usage.total_token_count = 800
         type(mock_response).usage_metadata = PropertyMock(return_value=mock_usage)
 
-        mock_client.models.generate_content.return_value = mock_response
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
 
         # Mock extract_pdf_structure
         with patch('app.services.pdf_extractor.extract_pdf_structure', return_value=mock_doc_structure):
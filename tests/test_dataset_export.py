@@ -0,0 +1,214 @@
+"""Tests for the normalized Parquet dataset export (app/services/dataset_export.py)."""
+
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.db.pagination import decode_cursor, encode_cursor
+from app.models.extraction import (
+    FullExamPaper,
+    MatchColumnItem,
+    MatchData,
+    MultipleChoiceOption,
+    Question,
+    QuestionGroup,
+)
+from app.models.memo_extraction import MarkingGuideline, MemoQuestion, MemoSection
+from app.services import dataset_export
+from app.services.dataset_export import TABLE_COLUMNS, flatten_memo, flatten_paper
+
+
+def _by_table(pairs: Iterator[Tuple[str, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for table, row in pairs:
+        tables[table].append(row)
+    return tables
+
+
+@pytest.fixture
+def paper_record() -> Dict[str, Any]:
+    paper = FullExamPaper(
+        subject="Business Studies P1", syllabus="NSC", year=2024, session="NOV", grade="12",
+        language="English", total_marks=150,
+        groups=[
+            QuestionGroup(group_id="QUESTION 1", title="Section A", questions=[
+                Question(id="1.1.1", text="Pick one", marks=2, options=[
+                    MultipleChoiceOption(label="A", text="Yes"),
+                    MultipleChoiceOption(label="B", text="No"),
+                ]),
+                Question(id="1.2", text="Match the columns", marks=4, match_data=MatchData(
+                    column_a_items=[MatchColumnItem(label="1.2.1", text="TQM")],
+                    column_b_items=[
+                        MatchColumnItem(label="A", text="Quality"),
+                        MatchColumnItem(label="B", text="Cost"),
+                    ],
+                )),
+            ]),
+            QuestionGroup(group_id="QUESTION 2", title="Section B", questions=[
+                Question(id="2.1", text="Explain", marks=6, guide_table=[{"col": "val"}]),
+            ]),
+        ],
+    )
+    return {
+        "id": "11111111-1111-1111-1111-111111111111", "file_name": "bs.pdf",
+        "updated_at": "2026-10-01T00:00:00+00:00",
+        **paper.model_dump(exclude={"processing_metadata"}),
+    }
+
+
+@pytest.fixture
+def memo_record() -> Dict[str, Any]:
+    memo = MarkingGuideline(meta={"subject": "Business Studies P1"}, sections=[
+        MemoSection(section_id="SECTION A", questions=[
+            MemoQuestion(id="1.1", answers=[{"sub_id": "1.1.1", "value": "A"}, {"sub_id": "1.1.2", "value": "C"}]),
+        ]),
+        MemoSection(section_id="SECTION B", questions=[
+            MemoQuestion(
+                id="2.1", marks=4, marker_instruction="Mark the first TWO only",
+                model_answers={"positives": ["Cheaper"], "negatives": ["Slower", "Riskier"]},
+            ),
+            MemoQuestion(id="2.2", structured_answer=[{"strategy": "Merge", "motivation": "Scale"}]),
+        ]),
+    ])
+    return {
+        "id": "22222222-2222-2222-2222-222222222222", "file_name": "bs-memo.pdf",
+        "subject": "Business Studies P1", "year": 2024, "session": "NOV", "grade": "12",
+        "total_marks": 150, "updated_at": "2026-10-02T00:00:00+00:00",
+        "sections": [s.model_dump() for s in memo.sections],
+    }
+
+
+class TestFlatten:
+    """Flattening of paper and memo JSON into normalized rows."""
+
+    def test_paper_tables(self, paper_record: Dict[str, Any]) -> None:
+        tables = _by_table(flatten_paper(paper_record))
+
+        assert {t: len(rows) for t, rows in tables.items()} == {
+            "groups": 2, "questions": 3, "options": 2, "match_items": 3, "papers": 1,
+        }
+        paper = tables["papers"][0]
+        assert (paper["group_count"], paper["question_count"]) == (2, 3)
+        assert tables["questions"][1]["has_match_data"] is True
+        assert tables["questions"][2]["guide_table"] == '[{"col":"val"}]'
+        assert [(m["column"], m["label"]) for m in tables["match_items"]] == [("A", "1.2.1"), ("B", "A"), ("B", "B")]
+        assert tables["options"][1] == {
+            "extraction_id": "11111111-1111-1111-1111-111111111111", "question_id": "1.1.1",
+            "option_index": 1, "label": "B", "text": "No", "updated_at": "2026-10-01T00:00:00+00:00",
+            "year": 2024, "subject": "Business Studies P1", "language": "English",
+        }
+
+    def test_memo_tables(self, memo_record: Dict[str, Any]) -> None:
+        tables = _by_table(flatten_memo(memo_record))
+
+        assert len(tables["memos"]) == 1 and tables["memos"][0]["question_count"] == 3
+        questions = {q["question_id"]: q for q in tables["memo_questions"]}
+        assert questions["2.1"]["marker_instruction"] == "Mark the first TWO only"
+        assert questions["2.1"]["answer_count"] == 3
+        answers = [(a["question_id"], a["kind"], a["key"], a["value"]) for a in tables["memo_answers"]]
+        assert answers == [
+            ("1.1", "sub_answer", "1.1.1", "A"),
+            ("1.1", "sub_answer", "1.1.2", "C"),
+            ("2.1", "model_answer", "positives", "Cheaper"),
+            ("2.1", "model_answer", "negatives", "Slower"),
+            ("2.1", "model_answer", "negatives", "Riskier"),
+            ("2.2", "structured_answer", None, '{"strategy":"Merge","motivation":"Scale"}'),
+        ]
+        assert all(a["language"] is None and a["year"] == 2024 for a in tables["memo_answers"])
+
+    def test_rows_match_declared_columns(self, paper_record: Dict[str, Any], memo_record: Dict[str, Any]) -> None:
+        """Every flattened row has exactly its table's schema columns."""
+        for table, row in [*flatten_paper(paper_record), *flatten_memo(memo_record)]:
+            expected = {name for name, _ in TABLE_COLUMNS[table]} | {"year", "subject", "language"}
+            assert set(row) == expected, table
+
+    def test_sparse_record(self) -> None:
+        tables = _by_table(flatten_paper({"id": "x", "groups": None}))
+        assert list(tables) == ["papers"]
+        assert tables["papers"][0]["question_count"] == 0
+
+
+def test_writer_requires_pyarrow(tmp_path: Any) -> None:
+    with patch.object(dataset_export, "pyarrow", None):
+        with pytest.raises(RuntimeError, match="pyarrow"):
+            dataset_export.DatasetWriter(str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_export_dataset_writes_partitions_and_state(
+    tmp_path: Any, paper_record: Dict[str, Any], memo_record: Dict[str, Any]
+) -> None:
+    """End to end with pyarrow: partitioned files, row counts and incremental state."""
+    pyarrow_dataset = pytest.importorskip("pyarrow.dataset")
+
+    async def pages(client: Any, doc_type: str, **kwargs: Any) -> Any:
+        yield [paper_record] if doc_type == "question_paper" else [memo_record]
+
+    with patch("app.services.dataset_export.iter_export_pages", pages):
+        rows = await dataset_export.export_dataset(MagicMock(), str(tmp_path), batch_rows=2)
+
+    assert rows["questions"] == 3 and rows["memo_answers"] == 6
+    questions = pyarrow_dataset.dataset(
+        str(tmp_path / "questions"), format="parquet", partitioning="hive"
+    ).to_table()
+    assert questions.num_rows == 3
+    assert set(questions.column("year").to_pylist()) == {2024}
+    cursors = dataset_export.read_state(str(tmp_path))["cursors"]
+    assert cursors == {
+        "question_paper": encode_cursor(paper_record, "updated_at"),
+        "memo": encode_cursor(memo_record, "updated_at"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_incremental_export_resumes_after_last_record(
+    tmp_path: Any, paper_record: Dict[str, Any], memo_record: Dict[str, Any]
+) -> None:
+    """Runs without pyarrow: write_dataset is mocked and the rows handed to it are checked."""
+    records = {"question_paper": [paper_record], "memo": [memo_record]}
+    calls: List[Dict[str, Any]] = []
+
+    async def pages(client: Any, doc_type: str, updated_since: Any = None, after: Any = None, **kwargs: Any) -> Any:
+        calls.append({"doc_type": doc_type, "updated_since": updated_since, "after": after})
+        key = decode_cursor(after) if after else None
+        rows = sorted(records[doc_type], key=lambda r: (r["updated_at"], r["id"]))
+        rows = [r for r in rows if key is None or (r["updated_at"], r["id"]) > key]
+        if rows:
+            yield rows
+
+    fake_pyarrow = MagicMock()
+    written: Dict[str, int] = defaultdict(int)
+
+    def from_pylist(rows: List[Dict[str, Any]], schema: Any) -> Any:
+        return rows
+
+    def write_dataset(rows: List[Dict[str, Any]], base_dir: str, **kwargs: Any) -> None:
+        written[os.path.basename(base_dir)] += len(rows)
+
+    fake_pyarrow.Table.from_pylist.side_effect = from_pylist
+    fake_pyarrow.dataset.write_dataset.side_effect = write_dataset
+
+    with patch.object(dataset_export, "pyarrow", fake_pyarrow), \
+            patch("app.services.dataset_export.iter_export_pages", pages):
+        first = await dataset_export.export_dataset(MagicMock(), str(tmp_path), batch_rows=2)
+        assert first["papers"] == 1 and first["questions"] == 3 and first["memo_answers"] == 6
+        assert dict(written) == {table: count for table, count in first.items() if count}
+
+        # Nothing changed: the second run resumes after the last record and writes nothing
+        written.clear()
+        second = await dataset_export.export_dataset(MagicMock(), str(tmp_path), batch_rows=2)
+        assert sum(second.values()) == 0 and not written
+        assert calls[2]["after"] == encode_cursor(paper_record, "updated_at")
+        assert calls[2]["updated_since"] is None
+
+        # An updated paper is exported again, once
+        records["question_paper"] = [{**paper_record, "updated_at": "2026-10-05T00:00:00+00:00"}]
+        third = await dataset_export.export_dataset(MagicMock(), str(tmp_path), batch_rows=2)
+        assert third["papers"] == 1 and third["memos"] == 0
+
+    state = dataset_export.read_state(str(tmp_path))
+    assert decode_cursor(state["cursors"]["question_paper"])[0] == "2026-10-05T00:00:00+00:00"
+    assert decode_cursor(state["cursors"]["memo"]) == (memo_record["updated_at"], memo_record["id"])
@@ -0,0 +1,137 @@
+"""Tests for request deadlines and disconnect cancellation (app/utils/deadline.py)."""
+
+import asyncio
+import threading
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import scheduler as scheduler_module
+from app.services.admission import AdmissionController
+from app.services.scheduler import LaneScheduler, run_stage
+from app.utils import deadline as deadline_module
+from app.utils.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    check_deadline,
+    deadline_scope,
+    parse_deadline_header,
+    run_until_done,
+)
+from app.utils.live_stats import CANCELLED_WORK_MS, get_live_stats
+
+
+class FakeRequest:
+    """Request whose client disconnects after `connected_polls` polls."""
+
+    def __init__(self, connected_polls: int) -> None:
+        self.polls = 0
+        self.connected_polls = connected_polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls += 1
+        return self.polls > self.connected_polls
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(deadline_module, "DISCONNECT_POLL_SECONDS", 0.01)
+
+
+def test_deadline_header() -> None:
+    assert parse_deadline_header(None, 300, 900).seconds == 300
+    assert parse_deadline_header("12.5", 300, 900).seconds == 12.5
+    assert parse_deadline_header("5000", 300, 900).seconds == 900  # Capped
+    for value in ("0", "-1", "soon", "inf", "nan"):
+        with pytest.raises(HTTPException) as exc_info:
+            parse_deadline_header(value, 300, 900)
+        assert exc_info.value.status_code == 400
+
+
+def test_check_deadline_records_stage() -> None:
+    check_deadline("anything")  # No deadline in scope: no-op
+    now = [0.0]
+    deadline = Deadline(10, clock=lambda: now[0])
+    with deadline_scope(deadline):
+        check_deadline("classify")
+        now[0] = 10.0
+        with pytest.raises(DeadlineExceeded) as exc_info:
+            check_deadline("extract")
+    assert exc_info.value.status_code == 504 and exc_info.value.stage == "extract"
+    assert deadline.stage == "extract"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_work_and_records_reason() -> None:
+    cancelled = asyncio.Event()
+
+    async def work() -> str:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "done"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await run_until_done(FakeRequest(connected_polls=2), work(), Deadline(5))  # type: ignore[arg-type]
+
+    assert exc_info.value.status_code == 499
+    assert exc_info.value.headers == {"X-Cancel-Reason": "client_disconnected"}
+    assert cancelled.is_set()
+    assert "client_disconnected" in get_live_stats()["metrics"][CANCELLED_WORK_MS]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_ignored_when_not_watched() -> None:
+    async def work() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    request = FakeRequest(connected_polls=0)
+    result = await run_until_done(request, work(), Deadline(5), watch_disconnect=False)  # type: ignore[arg-type]
+    assert result == "done" and request.polls == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_work_with_last_stage() -> None:
+    deadline = Deadline(0.05)
+
+    async def work() -> None:
+        with deadline_scope(deadline):
+            check_deadline("extract")
+            await asyncio.sleep(5)
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        await run_until_done(FakeRequest(connected_polls=1000), work(), deadline)  # type: ignore[arg-type]
+    assert exc_info.value.detail == "Request deadline of 0.05s exceeded during extract"
+
+
+@pytest.mark.asyncio
+async def test_run_stage_checks_deadline_and_holds_slot_until_thread_returns(monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = AdmissionController()
+    sched = LaneScheduler("parse", slots=1)
+    monkeypatch.setattr(scheduler_module, "get_admission_controller", lambda: controller)
+    monkeypatch.setitem(scheduler_module._schedulers, "parse", sched)
+
+    with deadline_scope(Deadline(0)):
+        with pytest.raises(DeadlineExceeded):
+            await run_stage("parse", lambda: "never")
+    assert sched.snapshot()["running"] == 0
+
+    release = threading.Event()
+    task: Any = asyncio.ensure_future(run_stage("parse", release.wait, 5))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # The parse thread is still running: its slot and admission count stay taken
+    assert sched.snapshot()["running"] == 1 and controller.snapshot()["in_flight"]["parse"] == 1
+
+    release.set()
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if sched.snapshot()["running"] == 0:
+            break
+    assert sched.snapshot()["running"] == 0 and controller.snapshot()["in_flight"]["parse"] == 0
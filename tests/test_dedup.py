@@ -0,0 +1,108 @@
+"""Tests for the one-round-trip file-hash lookup and its dedup cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.db import dedup
+from app.db.dedup import DedupCache, DedupLookup, HashMatch, lookup_file_hash
+from app.db.memo_extractions import update_memo_extraction_status
+from app.db.read_cache import ReadCache
+from tests.conftest import FakeClock
+
+EXTRACTION_ID = '12345678-1234-5678-1234-567812345678'
+MEMO_ID = '87654321-4321-8765-4321-876543218765'
+
+
+def _rpc_row(table: str, record_id: str, status: str, retry_count: int = 0) -> dict:
+    record = {'id': record_id, 'status': status} if status == 'completed' else None
+    return {'source_table': table, 'id': record_id, 'status': status, 'retry_count': retry_count, 'record': record}
+
+
+def _completed_lookup(record_id: str = EXTRACTION_ID) -> DedupLookup:
+    return DedupLookup((HashMatch('extractions', record_id, 'completed', 0),))
+
+
+@pytest.fixture
+def cache(monkeypatch, clock: FakeClock) -> DedupCache:
+    """Install fresh process-wide dedup and read caches driven by a fake clock."""
+    cache = DedupCache(max_entries=10, ttl_seconds=60, clock=clock)
+    read_cache = ReadCache(max_entries=10, ttl_seconds=60, clock=clock)
+    monkeypatch.setattr(dedup, '_cache', cache)
+    monkeypatch.setattr(dedup, 'get_read_cache', lambda: read_cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_lookup_is_one_rpc_and_completed_hits_are_cached(cache: DedupCache) -> None:
+    """A completed match is answered by one RPC call, then from memory (matches only)."""
+    client = MagicMock()
+    client.rpc.return_value.execute.return_value.data = [
+        _rpc_row('memo_extractions', MEMO_ID, 'partial', retry_count=2),
+        _rpc_row('extractions', EXTRACTION_ID, 'completed'),
+    ]
+
+    first = await lookup_file_hash(client, 'hash-1')
+    second = await lookup_file_hash(client, 'hash-1')
+
+    client.rpc.assert_called_once_with('find_by_file_hash', {'p_file_hash': 'hash-1'})
+    assert first.completed == HashMatch('extractions', EXTRACTION_ID, 'completed', 0)
+    assert first.match('memo_extractions') == HashMatch('memo_extractions', MEMO_ID, 'partial', 2)
+    assert first.record.record == {'id': EXTRACTION_ID, 'status': 'completed'}
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.matches == first.matches
+    # The record is handed to the read cache; the dedup cache keeps no body
+    assert second.record is None
+    assert dedup.get_read_cache().get('extractions', EXTRACTION_ID) is first.record
+
+
+@pytest.mark.asyncio
+async def test_incomplete_lookups_and_misses_are_not_cached(cache: DedupCache) -> None:
+    client = MagicMock()
+    client.rpc.return_value.execute.return_value.data = [_rpc_row('extractions', EXTRACTION_ID, 'pending')]
+    await lookup_file_hash(client, 'hash-1')
+    client.rpc.return_value.execute.return_value.data = []
+    missing = await lookup_file_hash(client, 'hash-2')
+    await lookup_file_hash(client, 'hash-2')
+
+    assert missing.matches == ()
+    assert missing.completed is None
+    assert client.rpc.call_count == 3
+    assert cache.snapshot()['entries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_lookup_errors_are_wrapped(cache: DedupCache) -> None:
+    client = MagicMock()
+    client.rpc.return_value.execute.side_effect = Exception('connection reset')
+
+    with pytest.raises(RuntimeError, match='Failed to look up file hash'):
+        await lookup_file_hash(client, 'hash-1')
+
+
+def test_entries_expire_and_are_lru_bounded(clock: FakeClock) -> None:
+    cache = DedupCache(max_entries=2, ttl_seconds=60, clock=clock)
+    cache.put('a', _completed_lookup('id-a'))
+    cache.put('b', _completed_lookup('id-b'))
+    cache.get('a')
+    cache.put('c', _completed_lookup('id-c'))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    clock.now += 61
+    assert cache.get('a') is None
+    assert cache.get('c') is None
+
+
+@pytest.mark.asyncio
+async def test_updates_invalidate_cached_lookup(cache: DedupCache) -> None:
+    """Updating a record seen by a cached lookup drops that file hash."""
+    cache.put('hash-1', DedupLookup((HashMatch('memo_extractions', MEMO_ID, 'completed', 0),)))
+    client = MagicMock()
+    client.table.return_value.update.return_value.eq.return_value.execute.return_value.data = [{'id': MEMO_ID}]
+
+    await update_memo_extraction_status(client, MEMO_ID, 'failed')
+
+    assert cache.get('hash-1') is None
+    assert cache.snapshot()['invalidations'] == 1
@@ -0,0 +1,193 @@
+"""Tests for graceful shutdown draining and checkpoints (app/services/drain.py)."""
+
+import asyncio
+import os
+from io import BytesIO
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware.rate_limit import get_limiter
+from app.services import drain
+from app.services.drain import WorkCheckpointed, WorkTracker, reject_if_draining, resume_checkpoints, save_checkpoint
+
+
+@pytest.fixture(autouse=True)
+def reset_state() -> Any:
+    """Reset the process-wide tracker and rate limiter around each test."""
+    drain._tracker.reset()
+    get_limiter().reset()
+    yield
+    drain._tracker.reset()
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_work_that_finishes() -> None:
+    tracker = WorkTracker()
+    checkpoint = AsyncMock()
+
+    async def work() -> str:
+        async with tracker.track("extract", checkpoint):
+            await asyncio.sleep(0.01)
+        return "done"
+
+    task = asyncio.create_task(work())
+    await asyncio.sleep(0)
+    assert tracker.in_flight == 1
+
+    assert await tracker.drain(1.0) == {"checkpointed": 0, "cancelled": 0}
+    assert await task == "done"
+    checkpoint.assert_not_awaited()
+    assert tracker.draining
+
+
+@pytest.mark.asyncio
+async def test_drain_checkpoints_and_cancels_at_deadline() -> None:
+    tracker = WorkTracker()
+    checkpoint = AsyncMock()
+    cleaned_up = asyncio.Event()
+
+    async def work() -> None:
+        try:
+            async with tracker.track("extract", checkpoint):
+                await asyncio.sleep(60)
+        finally:
+            cleaned_up.set()
+
+    task = asyncio.create_task(work())
+    await asyncio.sleep(0)
+
+    assert await tracker.drain(0.01) == {"checkpointed": 1, "cancelled": 1}
+    checkpoint.assert_awaited_once()
+    with pytest.raises(WorkCheckpointed) as exc_info:
+        await task
+    assert exc_info.value.status_code == 503
+    assert cleaned_up.is_set() and tracker.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_counts_from_first_drain_signal() -> None:
+    """A second drain() call (lifespan after SIGTERM) shares the first deadline."""
+    now = [100.0]
+    tracker = WorkTracker(clock=lambda: now[0])
+    tracker.begin_drain()
+    now[0] = 130.0  # 30s since the signal; a 25s deadline has passed
+
+    async def work() -> None:
+        async with tracker.track("batch"):
+            await asyncio.sleep(60)
+
+    task = asyncio.create_task(work())
+    await asyncio.sleep(0)
+    result = await asyncio.wait_for(tracker.drain(25.0), timeout=1)
+
+    assert result == {"checkpointed": 0, "cancelled": 1}
+    with pytest.raises(WorkCheckpointed):
+        await task
+
+
+def test_reject_if_draining() -> None:
+    reject_if_draining()
+    drain._tracker.begin_drain()
+    with pytest.raises(HTTPException) as exc_info:
+        reject_if_draining()
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": str(drain.RETRY_AFTER_SECONDS)}
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_resumed_once(tmp_path: Any) -> None:
+    directory = str(tmp_path)
+    save_checkpoint("extract", {"file_hash": "abc"}, [b"%PDF-1"], directory=directory)
+    resumed: List[Dict[str, Any]] = []
+
+    async def handler(params: Dict[str, Any], files: List[bytes]) -> None:
+        resumed.append({"params": params, "files": files})
+
+    assert await resume_checkpoints({"extract": handler}, directory=directory) == 1
+    await asyncio.gather(*drain._resume_tasks)
+
+    assert resumed == [{"params": {"file_hash": "abc"}, "files": [b"%PDF-1"]}]
+    assert os.listdir(directory) == []
+    assert await resume_checkpoints({"extract": handler}, directory=directory) == 0
+
+
+@pytest.mark.asyncio
+async def test_incomplete_checkpoint_is_not_resumed(tmp_path: Any) -> None:
+    """A checkpoint still being written (staging directory) is skipped."""
+    os.makedirs(tmp_path / ".tmp-123-extract-x")
+    handler = AsyncMock()
+
+    assert await resume_checkpoints({"extract": handler}, directory=str(tmp_path)) == 0
+    handler.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_claims_of_dead_workers_are_reclaimed(tmp_path: Any) -> None:
+    """A claim left by a crashed worker is resumed; a live worker's claim is not."""
+    directory = str(tmp_path)
+    for owner, pid in (("dead", 999999), ("live", os.getppid())):
+        path = save_checkpoint("extract", {"owner": owner}, [], directory=directory)
+        os.rename(path, os.path.join(directory, f".resuming-{pid}-0123abcd-{os.path.basename(path)}"))
+    resumed: List[Dict[str, Any]] = []
+
+    async def handler(params: Dict[str, Any], files: List[bytes]) -> None:
+        resumed.append(params)
+
+    with patch("app.services.drain._pid_alive", side_effect=lambda pid: pid != 999999):
+        assert await resume_checkpoints({"extract": handler}, directory=directory) == 1
+    await asyncio.gather(*drain._resume_tasks)
+
+    assert resumed == [{"owner": "dead"}]
+    assert [name.split("-")[1] for name in os.listdir(directory)] == [str(os.getppid())]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_without_handler_is_moved_aside(tmp_path: Any) -> None:
+    directory = str(tmp_path)
+    path = save_checkpoint("retired-kind", {}, [b"%PDF-1"], directory=directory)
+
+    assert await resume_checkpoints({"extract": AsyncMock()}, directory=directory) == 0
+
+    assert os.listdir(directory) == [f".unhandled-{os.path.basename(path)}"]
+    assert await resume_checkpoints({"extract": AsyncMock()}, directory=directory) == 0
+
+
+@pytest.mark.asyncio
+async def test_draining_batch_checkpoints_unprocessed_files() -> None:
+    """A batch stops before its next file and checkpoints the rest."""
+    from app.routers import batch
+
+    drain._tracker.begin_drain()
+    files = [
+        (0, UploadFile(file=BytesIO(b"%PDF-a"), filename="a.pdf")),
+        (1, UploadFile(file=BytesIO(b"%PDF-b"), filename="b.pdf")),
+    ]
+    with patch("app.routers.batch.get_gemini_client"), \
+            patch("app.routers.batch.save_checkpoint") as mock_save, \
+            patch("app.routers.batch.validate_pdf", new_callable=AsyncMock) as mock_validate, \
+            patch("app.routers.batch.get_batch_job", AsyncMock(return_value={"status": "processing"})):
+        batch_job = await batch._run_batch(MagicMock(), "job-1", files, ["s0", "s1"], "https://hooks.example.com")
+
+    mock_validate.assert_not_awaited()
+    kind, params, contents = mock_save.call_args[0]
+    assert kind == "batch" and contents == [b"%PDF-a", b"%PDF-b"]
+    assert params == {
+        "batch_job_id": "job-1", "file_indexes": [0, 1], "file_names": ["a.pdf", "b.pdf"],
+        "source_ids": ["s0", "s1"], "webhook_url": "https://hooks.example.com",
+    }
+    assert batch_job == {"status": "processing"}
+
+
+def test_extract_rejected_while_draining() -> None:
+    drain._tracker.begin_drain()
+    client = TestClient(app)
+
+    response = client.post("/api/extract", files={"file": ("a.pdf", BytesIO(b"%PDF-1.4"), "application/pdf")})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(drain.RETRY_AFTER_SECONDS)
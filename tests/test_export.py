@@ -0,0 +1,205 @@
+"""Tests for the streaming bulk export (app/db/export.py and GET /api/extractions/export)."""
+
+import csv
+import io
+import json
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.db.export import EXPORT_SUMMARY_COLUMNS, iter_export_pages, resolve_export_columns
+from app.db.pagination import encode_cursor
+from app.main import app
+from app.middleware.rate_limit import get_limiter
+
+
+def _rows(start: int, count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "file_name": f"paper{i}.pdf",
+            "status": "completed",
+            "subject": "Mathematics",
+            "year": 2024,
+            "groups": [{"group_id": "A"}],
+            "updated_at": f"2026-01-01T00:00:{i:02d}+00:00",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _mock_client(*pages: List[Dict[str, Any]]) -> MagicMock:
+    """Supabase client whose query chain returns one page per execute()."""
+    query = MagicMock()
+    for method in ("select", "eq", "gte", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.side_effect = [MagicMock(data=page) for page in pages]
+    client = MagicMock()
+    client.table.return_value = query
+    return client
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter() -> None:
+    get_limiter().reset()
+
+
+class TestIterExportPages:
+    """Keyset paging of the export query."""
+
+    @pytest.mark.asyncio
+    async def test_pages_follow_updated_at_cursor_oldest_first(self) -> None:
+        client = _mock_client(_rows(0, 2), _rows(2, 1))
+
+        pages = [p async for p in iter_export_pages(client, subject="Mathematics", year=2024, page_size=2)]
+
+        assert [len(p) for p in pages] == [2, 1]
+        query = client.table.return_value
+        client.table.assert_called_with("extractions")
+        query.eq.assert_any_call("subject", "Mathematics")
+        query.eq.assert_any_call("year", 2024)
+        query.order.assert_any_call("updated_at", desc=False)
+        # Second page continues strictly after the first page's last row
+        filter_arg = query.or_.call_args.args[0]
+        assert filter_arg.startswith('updated_at.gt."2026-01-01T00:00:01+00:00"')
+        assert 'id.gt."00000000-0000-0000-0000-000000000001"' in filter_arg
+        assert query.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_updated_since_and_memo_table(self) -> None:
+        client = _mock_client([])
+
+        pages = [p async for p in iter_export_pages(client, doc_type="memo", updated_since="2026-01-01T00:00:00")]
+
+        assert pages == []
+        client.table.assert_called_with("memo_extractions")
+        client.table.return_value.gte.assert_called_once_with("updated_at", "2026-01-01T00:00:00")
+
+    @pytest.mark.asyncio
+    async def test_after_resumes_strictly_after_a_row(self) -> None:
+        client = _mock_client(_rows(5, 1))
+        after = encode_cursor(_rows(4, 1)[0], "updated_at")
+
+        pages = [p async for p in iter_export_pages(client, after=after, page_size=2)]
+
+        assert [len(p) for p in pages] == [1]
+        query = client.table.return_value
+        query.gte.assert_not_called()
+        filter_arg = query.or_.call_args.args[0]
+        assert filter_arg.startswith('updated_at.gt."2026-01-01T00:00:04+00:00"')
+
+    @pytest.mark.asyncio
+    async def test_invalid_filters(self) -> None:
+        with pytest.raises(ValueError, match="language"):
+            [p async for p in iter_export_pages(_mock_client([]), doc_type="memo", language="English")]
+        with pytest.raises(ValueError, match="status"):
+            [p async for p in iter_export_pages(_mock_client([]), status="done")]
+
+    @pytest.mark.asyncio
+    async def test_database_error(self) -> None:
+        client = _mock_client()
+        client.table.return_value.execute.side_effect = Exception("connection reset")
+
+        with pytest.raises(RuntimeError, match="Failed to export extractions: connection reset"):
+            [p async for p in iter_export_pages(client)]
+
+    def test_resolve_columns(self) -> None:
+        assert resolve_export_columns("memo", None, default_summary=True) == EXPORT_SUMMARY_COLUMNS["memo"]
+        assert "groups" in resolve_export_columns("question_paper", None, default_summary=False)
+        assert resolve_export_columns("question_paper", "file_name, status", True) == ("file_name", "status")
+        with pytest.raises(ValueError, match="Unknown field"):
+            resolve_export_columns("memo", "language", True)
+        with pytest.raises(ValueError, match="doc_type"):
+            resolve_export_columns("thesis", None, True)
+
+
+class TestExportEndpoint:
+    """GET /api/extractions/export."""
+
+    @patch("app.routers.extraction.get_supabase_client")
+    def test_ndjson_streams_every_page(self, mock_supabase_client: MagicMock) -> None:
+        mock_supabase_client.return_value = _mock_client(_rows(0, 500), _rows(500, 3))
+
+        response = TestClient(app).get("/api/extractions/export?fields=id,file_name,groups")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 503
+        assert lines[0] == {
+            "id": "00000000-0000-0000-0000-000000000000",
+            "file_name": "paper0.pdf",
+            "groups": [{"group_id": "A"}],
+        }
+        cursor_filter = mock_supabase_client.return_value.table.return_value.or_.call_args.args[0]
+        assert 'id.gt."00000000-0000-0000-0000-000000000499"' in cursor_filter
+
+    @patch("app.routers.extraction.get_supabase_client")
+    def test_csv_has_header_and_json_cells(self, mock_supabase_client: MagicMock) -> None:
+        mock_supabase_client.return_value = _mock_client(_rows(0, 2))
+
+        response = TestClient(app).get("/api/extractions/export?format=csv&fields=file_name,groups")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows == [
+            ["file_name", "groups"],
+            ["paper0.pdf", '[{"group_id":"A"}]'],
+            ["paper1.pdf", '[{"group_id":"A"}]'],
+        ]
+
+    @patch("app.routers.extraction.get_supabase_client")
+    def test_empty_csv_export_is_header_only(self, mock_supabase_client: MagicMock) -> None:
+        mock_supabase_client.return_value = _mock_client([])
+
+        response = TestClient(app).get("/api/extractions/export?format=csv&doc_type=memo&fields=id,subject")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text.strip() == "id,subject"
+
+    @pytest.mark.parametrize("query", [
+        "format=xml",
+        "doc_type=thesis",
+        "fields=nope",
+        "updated_since=yesterday",
+        "since=yesterday",
+        "after=not-a-cursor",
+        "status_filter=done",
+        "doc_type=memo&language=English",
+    ])
+    @patch("app.routers.extraction.get_supabase_client")
+    def test_invalid_parameters(self, mock_supabase_client: MagicMock, query: str) -> None:
+        mock_supabase_client.return_value = _mock_client([])
+
+        response = TestClient(app).get(f"/api/extractions/export?{query}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @patch("app.routers.extraction.get_supabase_client")
+    def test_since_and_after(self, mock_supabase_client: MagicMock) -> None:
+        mock_supabase_client.return_value = _mock_client(_rows(5, 1))
+        after = encode_cursor(_rows(4, 1)[0], "updated_at")
+
+        response = TestClient(app).get(f"/api/extractions/export?since=2026-01-01&after={after}&fields=id")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [_rows(5, 1)[0]["id"]]
+        query = mock_supabase_client.return_value.table.return_value
+        query.gte.assert_called_once_with("created_at", "2026-01-01T00:00:00")
+        assert query.or_.call_args.args[0].startswith('updated_at.gt."2026-01-01T00:00:04+00:00"')
+
+    @patch("app.routers.extraction.get_supabase_client")
+    def test_database_error_before_first_row(self, mock_supabase_client: MagicMock) -> None:
+        client = _mock_client()
+        client.table.return_value.execute.side_effect = Exception("timeout")
+        mock_supabase_client.return_value = client
+
+        response = TestClient(app).get("/api/extractions/export")
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert "timeout" in response.json()["detail"]
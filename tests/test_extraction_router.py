@@ -8,7 +8,12 @@ import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from app.db.dedup import DedupCache, DedupLookup, HashMatch
+from app.db.extractions import EXTRACTION_SUMMARY_COLUMNS
+from app.db.pagination import decode_cursor
+from app.db.read_cache import CachedRecord, get_read_cache
 from app.main import app
+from app.routers import extraction as extraction_router
 from app.middleware.rate_limit import get_limiter
 from app.models.extraction import (
     BoundingBox,
@@ -26,7 +31,9 @@ def reset_rate_limiter() -> None:
 
 @pytest.fixture
 def client() -> TestClient:
-    """Create a test client."""
+    """Create a test client (with an empty read cache and no idempotency keys)."""
+    get_read_cache().clear()
+    extraction_router._idempotency_keys.clear()
     return TestClient(app)
 
 
@@ -68,7 +75,7 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -81,7 +88,7 @@ class TestExtractEndpoint:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -96,7 +103,7 @@ class TestExtractEndpoint:
             "test_file.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None  # No duplicate
+        mock_lookup_file_hash.return_value = DedupLookup()  # No duplicate
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = sample_extraction_result
         mock_create_extraction.return_value = "extraction-uuid-123"
@@ -119,11 +126,42 @@ class TestExtractEndpoint:
 
         # Verify function calls
         mock_validate.assert_called_once()
-        mock_check_duplicate.assert_called_once()
+        mock_lookup_file_hash.assert_called_once()
         mock_extract_hybrid.assert_called_once()
         mock_create_extraction.assert_called_once()
         mock_remove.assert_called_once()  # File cleanup
 
+    @patch("app.routers.extraction.validate_pdf")
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.get_extraction")
+    def test_extract_pdf_idempotency_key_replay(
+        self,
+        mock_get_extraction: AsyncMock,
+        mock_supabase_client: MagicMock,
+        mock_validate: AsyncMock,
+        client: TestClient,
+        sample_pdf_content: bytes,
+    ) -> None:
+        """Test that a finished Idempotency-Key replays its record and rejects other files."""
+        mock_validate.return_value = (sample_pdf_content, "abc123hash", "test_file.pdf")
+        mock_get_extraction.return_value = {"id": "extraction-uuid-123", "status": "completed"}
+        extraction_router._idempotency_keys.store(
+            "retry-1", "abc123hash", (201, "extraction-uuid-123", "question_paper")
+        )
+        files = {"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")}
+
+        response = client.post("/api/extract", files=files, headers={"Idempotency-Key": "retry-1"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Idempotent-Replayed"] == "true"
+        assert response.headers["X-Extraction-ID"] == "extraction-uuid-123"
+        assert response.json()["status"] == "completed"
+
+        mock_validate.return_value = (sample_pdf_content, "otherhash", "other.pdf")
+        files = {"file": ("other.pdf", BytesIO(sample_pdf_content), "application/pdf")}
+        response = client.post("/api/extract", files=files, headers={"Idempotency-Key": "retry-1"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
     @patch("app.routers.extraction.validate_pdf")
     def test_extract_pdf_validation_error(
         self,
@@ -184,12 +222,12 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_extraction")
     def test_extract_pdf_duplicate_found(
         self,
         mock_get_extraction: AsyncMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -203,15 +241,17 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = "existing-uuid-456"
 
-        # Mock existing extraction result
+        # The lookup returns the completed record itself (find_by_file_hash)
         existing_result = {
             "id": "existing-uuid-456",
             "file_name": "original.pdf",
             "status": "completed",
         }
-        mock_get_extraction.return_value = existing_result
+        mock_lookup_file_hash.return_value = DedupLookup(
+            (HashMatch("extractions", "existing-uuid-456", "completed", 0),),
+            CachedRecord(existing_result),
+        )
 
         # Make request (explicit doc_type skips auto-classification)
         files = {"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")}
@@ -222,22 +262,53 @@ class TestExtractEndpoint:
         assert response.status_code == status.HTTP_200_OK
         assert response.headers["X-Extraction-ID"] == "existing-uuid-456"
 
-        # Verify we didn't run extraction again
-        mock_check_duplicate.assert_called_once()
-        mock_get_extraction.assert_called_once_with(
-            mock_supabase_client.return_value, "existing-uuid-456"
-        )
+        assert response.json() == existing_result
+
+        # Verify we didn't run extraction again, nor re-read the record
+        mock_lookup_file_hash.assert_called_once()
+        mock_get_extraction.assert_not_called()
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
+    @patch("app.routers.extraction.get_extraction")
+    def test_extract_pdf_dedup_cache_hit_reads_record_once(
+        self,
+        mock_get_extraction: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
+        mock_supabase_client: MagicMock,
+        mock_validate: AsyncMock,
+        client: TestClient,
+        sample_pdf_content: bytes,
+    ) -> None:
+        """A dedup cache hit holds no record: it is read once, then served from the read cache."""
+        dedup_cache = DedupCache(max_entries=10, ttl_seconds=60)
+        dedup_cache.put("cached-hash", DedupLookup((HashMatch("extractions", "cached-uuid", "completed", 0),)))
+        mock_validate.return_value = (sample_pdf_content, "cached-hash", "test.pdf")
+        existing_result = {"id": "cached-uuid", "status": "completed"}
+        mock_get_extraction.return_value = existing_result
+
+        files = {"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")}
+        with patch("app.routers.extraction.get_dedup_cache", return_value=dedup_cache):
+            responses = [client.post("/api/extract", files=files, data={"doc_type": "question_paper"}) for _ in range(2)]
+
+        for response in responses:
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["X-Dedup-Cache-Hit"] == "true"
+            assert response.json() == existing_result
+        mock_get_extraction.assert_called_once()
+        mock_lookup_file_hash.assert_not_called()
+
+    @patch("app.routers.extraction.validate_pdf")
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     def test_extract_pdf_processing_error(
         self,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -251,7 +322,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
 
         # Mock extraction failure
@@ -268,14 +339,14 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     def test_extract_pdf_validation_error_from_extractor(
         self,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -291,7 +362,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
 
         # Mock validation error (malformed extraction result)
@@ -311,7 +382,7 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -320,7 +391,7 @@ class TestExtractEndpoint:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -335,7 +406,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = sample_extraction_result
 
@@ -353,7 +424,114 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
+    @patch("app.routers.extraction.get_gemini_client")
+    @patch("app.routers.extraction.extract_pdf_data_hybrid")
+    @patch("app.routers.extraction.create_extraction")
+    def test_extract_pdf_deadline_exceeded(
+        self,
+        mock_create_extraction: AsyncMock,
+        mock_extract_hybrid: AsyncMock,
+        mock_gemini_client: MagicMock,
+        mock_lookup_file_hash: AsyncMock,
+        mock_supabase_client: MagicMock,
+        mock_validate: AsyncMock,
+        client: TestClient,
+        sample_pdf_content: bytes,
+    ) -> None:
+        """Test that an extraction past its X-Request-Timeout is cancelled with 504 and not stored."""
+        import asyncio
+
+        mock_validate.return_value = (sample_pdf_content, "hash-deadline", "test.pdf")
+        mock_supabase_client.return_value = MagicMock()
+        mock_lookup_file_hash.return_value = DedupLookup()
+        mock_gemini_client.return_value = MagicMock()
+
+        async def slow_extraction(**kwargs: object) -> None:
+            await asyncio.sleep(5)
+
+        mock_extract_hybrid.side_effect = slow_extraction
+
+        files = {"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")}
+        data = {"doc_type": "question_paper"}
+        response = client.post("/api/extract", files=files, data=data, headers={"X-Request-Timeout": "0.2"})
+
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert response.json()["detail"] == "Request deadline of 0.2s exceeded during extract"
+        assert response.headers["X-Cancel-Reason"] == "deadline_exceeded"
+        mock_create_extraction.assert_not_called()
+        assert extraction_router._extractions_in_flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    @patch("app.routers.extraction.validate_pdf")
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.lookup_file_hash")
+    @patch("app.routers.extraction.get_gemini_client")
+    @patch("app.routers.extraction.extract_pdf_data_hybrid")
+    @patch("app.routers.extraction.create_extraction")
+    async def test_extract_pdf_coalesced_uploads_keep_their_own_deadlines(
+        self,
+        mock_create_extraction: AsyncMock,
+        mock_extract_hybrid: AsyncMock,
+        mock_gemini_client: MagicMock,
+        mock_lookup_file_hash: AsyncMock,
+        mock_supabase_client: MagicMock,
+        mock_validate: AsyncMock,
+        client: TestClient,
+        sample_pdf_content: bytes,
+        sample_extraction_result: ExtractionResult,
+    ) -> None:
+        """Test that an upload joining a flight is not cut off by the deadline of the one that started it."""
+        import asyncio
+
+        import httpx
+
+        mock_validate.return_value = (sample_pdf_content, "hash-coalesced-deadlines", "test.pdf")
+        mock_supabase_client.return_value = MagicMock()
+        mock_lookup_file_hash.return_value = DedupLookup()
+        mock_gemini_client.return_value = MagicMock()
+        mock_create_extraction.return_value = "uuid-coalesced"
+
+        async def slow_extraction(**kwargs: object) -> ExtractionResult:
+            await asyncio.sleep(0.3)
+            return sample_extraction_result
+
+        mock_extract_hybrid.side_effect = slow_extraction
+
+        async def upload(http: httpx.AsyncClient, timeout: str) -> httpx.Response:
+            files = {"file": ("test.pdf", sample_pdf_content, "application/pdf")}
+            data = {"doc_type": "question_paper"}
+            return await http.post("/api/extract", files=files, data=data, headers={"X-Request-Timeout": timeout})
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            short = asyncio.create_task(upload(http, "0.1"))
+            while extraction_router._extractions_in_flight.in_flight() == 0:
+                await asyncio.sleep(0.01)
+            long = asyncio.create_task(upload(http, "30"))
+            short_response, long_response = await asyncio.gather(short, long)
+
+        assert short_response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert short_response.json()["detail"] == "Request deadline of 0.1s exceeded during extract"
+        assert long_response.status_code == status.HTTP_201_CREATED
+        assert long_response.headers["X-Coalesced"] == "true"
+        assert long_response.headers["X-Extraction-ID"] == "uuid-coalesced"
+        mock_extract_hybrid.assert_called_once()
+
+    def test_extract_pdf_invalid_request_timeout(
+        self,
+        client: TestClient,
+        sample_pdf_content: bytes,
+    ) -> None:
+        """Test that a malformed X-Request-Timeout header is rejected."""
+        files = {"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")}
+        response = client.post("/api/extract", files=files, headers={"X-Request-Timeout": "soon"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "X-Request-Timeout" in response.json()["detail"]
+
+    @patch("app.routers.extraction.validate_pdf")
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -366,7 +544,7 @@ class TestExtractEndpoint:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -381,7 +559,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = sample_extraction_result
         mock_create_extraction.return_value = "uuid-with-webhook"
@@ -404,7 +582,7 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -417,7 +595,7 @@ class TestExtractEndpoint:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -432,7 +610,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = sample_extraction_result
         mock_create_extraction.return_value = "uuid-123"
@@ -452,7 +630,7 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.os.path.exists")
@@ -463,7 +641,7 @@ class TestExtractEndpoint:
         mock_exists: MagicMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -477,7 +655,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
 
         # Mock extraction error
@@ -498,7 +676,7 @@ class TestExtractEndpoint:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -511,7 +689,7 @@ class TestExtractEndpoint:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -526,7 +704,7 @@ class TestExtractEndpoint:
             "test.pdf",
         )
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = sample_extraction_result
         mock_create_extraction.return_value = "uuid-123"
@@ -592,6 +770,41 @@ class TestGetExtractionByIdEndpoint:
             "12345678-1234-5678-1234-567812345678",
         )
 
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.get_extraction")
+    def test_get_extraction_etag_and_cache(
+        self,
+        mock_get_extraction: AsyncMock,
+        mock_supabase_client: MagicMock,
+        client: TestClient,
+    ) -> None:
+        """Test that repeat reads are cached and If-None-Match returns 304."""
+        extraction_id = "12345678-1234-5678-1234-567812345678"
+        mock_get_extraction.return_value = {
+            "id": extraction_id,
+            "status": "completed",
+            "updated_at": "2026-10-19T08:00:00+00:00",
+        }
+
+        first = client.get(f"/api/extractions/{extraction_id}")
+        etag = first.headers["ETag"]
+        assert first.status_code == status.HTTP_200_OK
+        assert first.headers["X-Cache-Hit"] == "false"
+
+        second = client.get(f"/api/extractions/{extraction_id}", headers={"If-None-Match": etag})
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.content == b""
+        assert second.headers["X-Cache-Hit"] == "true"
+        assert mock_get_extraction.call_count == 1
+
+        # An update through app/db invalidates the cached record
+        get_read_cache().invalidate("extractions", extraction_id)
+        mock_get_extraction.return_value = {**mock_get_extraction.return_value, "status": "failed"}
+        third = client.get(f"/api/extractions/{extraction_id}", headers={"If-None-Match": etag})
+        assert third.status_code == status.HTTP_200_OK
+        assert third.headers["ETag"] != etag
+        assert mock_get_extraction.call_count == 2
+
     @patch("app.routers.extraction.get_supabase_client")
     @patch("app.routers.extraction.get_extraction")
     def test_get_extraction_not_found(
@@ -695,6 +908,8 @@ class TestListExtractionsEndpoint:
             limit=50,
             offset=0,
             status=None,
+            columns=EXTRACTION_SUMMARY_COLUMNS,
+            cursor=None,
         )
 
     @patch("app.routers.extraction.get_supabase_client")
@@ -731,8 +946,34 @@ class TestListExtractionsEndpoint:
             limit=10,
             offset=20,
             status=None,
+            columns=EXTRACTION_SUMMARY_COLUMNS,
+            cursor=None,
         )
 
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.list_extractions")
+    def test_list_extractions_cursor_pagination(
+        self,
+        mock_list_extractions: AsyncMock,
+        mock_supabase_client: MagicMock,
+        client: TestClient,
+    ) -> None:
+        """Test that a full page returns next_cursor and cursor= is passed through."""
+        mock_supabase_client.return_value = MagicMock()
+        mock_list_extractions.return_value = [
+            {"id": f"uuid-{i}", "created_at": f"2024-01-0{9 - i}T00:00:00Z"}
+            for i in range(2)
+        ]
+
+        first = client.get("/api/extractions?limit=2").json()
+        next_cursor = first["pagination"]["next_cursor"]
+        assert decode_cursor(next_cursor) == ("2024-01-08T00:00:00Z", "uuid-1")
+
+        mock_list_extractions.return_value = []
+        second = client.get(f"/api/extractions?limit=2&cursor={next_cursor}").json()
+        assert second["pagination"]["next_cursor"] is None
+        assert mock_list_extractions.call_args.kwargs["cursor"] == next_cursor
+
     @patch("app.routers.extraction.get_supabase_client")
     @patch("app.routers.extraction.list_extractions")
     def test_list_extractions_with_status_filter(
@@ -769,6 +1010,8 @@ class TestListExtractionsEndpoint:
             limit=50,
             offset=0,
             status="failed",
+            columns=EXTRACTION_SUMMARY_COLUMNS,
+            cursor=None,
         )
 
     def test_list_extractions_invalid_limit_too_small(
@@ -865,6 +1108,37 @@ class TestListExtractionsEndpoint:
         assert result["pagination"]["has_more"] is False
 
 
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.list_extractions")
+    def test_list_extractions_with_fields(
+        self,
+        mock_list_extractions: AsyncMock,
+        mock_supabase_client: MagicMock,
+        client: TestClient,
+    ) -> None:
+        """Test fields= projection and fields=* for full records."""
+        mock_supabase_client.return_value = MagicMock()
+        mock_list_extractions.return_value = []
+
+        response = client.get("/api/extractions?fields=file_name,subject")
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_list_extractions.call_args.kwargs["columns"] == ["file_name", "subject"]
+
+        response = client.get("/api/extractions?fields=*")
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_list_extractions.call_args.kwargs["columns"] is None
+
+    def test_list_extractions_unknown_field(
+        self,
+        client: TestClient,
+    ) -> None:
+        """Test that unknown fields are rejected with 400."""
+        response = client.get("/api/extractions?fields=file_name,secret")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Unknown field(s): secret" in response.json()["detail"]
+
+
 class TestGetBoundingBoxesEndpoint:
     """Tests for GET /api/extractions/{extraction_id}/bounding-boxes endpoint."""
 
@@ -902,10 +1176,11 @@ class TestGetBoundingBoxesEndpoint:
         assert result["title_1"]["page"] == 1
         assert result["table_1"]["page"] == 2
 
-        # Verify function call
+        # Verify only the bounding_boxes column is requested
         mock_get_extraction.assert_called_once_with(
             mock_supabase_client.return_value,
             "12345678-1234-5678-1234-567812345678",
+            columns=["bounding_boxes"],
         )
 
     @patch("app.routers.extraction.get_supabase_client")
@@ -986,6 +1261,36 @@ class TestGetBoundingBoxesEndpoint:
         assert "Database error" in response.json()["detail"]
 
 
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.get_extraction")
+    def test_get_bounding_boxes_with_fields(
+        self,
+        mock_get_extraction: AsyncMock,
+        mock_supabase_client: MagicMock,
+        client: TestClient,
+    ) -> None:
+        """Test that fields= limits the returned bbox attributes."""
+        mock_supabase_client.return_value = MagicMock()
+        mock_get_extraction.return_value = {
+            "id": "12345678-1234-5678-1234-567812345678",
+            "bounding_boxes": {
+                "title_1": {"x1": 100, "y1": 200, "x2": 300, "y2": 220, "page": 1},
+            },
+        }
+
+        response = client.get(
+            "/api/extractions/12345678-1234-5678-1234-567812345678/bounding-boxes?fields=page"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"title_1": {"page": 1}}
+
+        response = client.get(
+            "/api/extractions/12345678-1234-5678-1234-567812345678/bounding-boxes?fields=width"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 class TestGetElementEndpoint:
     """Tests for GET /api/extractions/{extraction_id}/elements/{element_id} endpoint."""
 
@@ -1182,13 +1487,41 @@ class TestGetElementEndpoint:
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert "Database error" in response.json()["detail"]
 
+    @patch("app.routers.extraction.get_supabase_client")
+    @patch("app.routers.extraction.get_extraction")
+    def test_get_element_bounding_box_only(
+        self,
+        mock_get_extraction: AsyncMock,
+        mock_supabase_client: MagicMock,
+        client: TestClient,
+    ) -> None:
+        """Test that fields=bounding_box skips reading sections/tables."""
+        mock_supabase_client.return_value = MagicMock()
+        bbox = {"x1": 100, "y1": 200, "x2": 300, "y2": 220, "page": 1}
+        mock_get_extraction.return_value = {
+            "id": "12345678-1234-5678-1234-567812345678",
+            "bounding_boxes": {"section_1": bbox},
+        }
+
+        response = client.get(
+            "/api/extractions/12345678-1234-5678-1234-567812345678/elements/section_1?fields=bounding_box"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"element_id": "section_1", "bounding_box": bbox}
+        mock_get_extraction.assert_called_once_with(
+            mock_supabase_client.return_value,
+            "12345678-1234-5678-1234-567812345678",
+            columns=["bounding_boxes"],
+        )
+
 
 class TestPartialExtractionAndRetry:
     """Tests for partial extraction and retry functionality."""
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
     @patch("app.routers.extraction.create_extraction")
@@ -1201,7 +1534,7 @@ class TestPartialExtractionAndRetry:
         mock_create_extraction: AsyncMock,
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -1214,7 +1547,7 @@ class TestPartialExtractionAndRetry:
         # Setup mocks
         mock_validate.return_value = (sample_pdf_content, "hash123", "test.pdf")
         mock_supabase_client.return_value = MagicMock()
-        mock_check_duplicate.return_value = None
+        mock_lookup_file_hash.return_value = DedupLookup()
         mock_gemini_client.return_value = MagicMock()
         mock_exists.return_value = True
 
@@ -1259,7 +1592,7 @@ class TestPartialExtractionAndRetry:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_extraction")
     @patch("app.routers.extraction.get_gemini_client")
     @patch("app.routers.extraction.extract_pdf_data_hybrid")
@@ -1274,7 +1607,7 @@ class TestPartialExtractionAndRetry:
         mock_extract_hybrid: AsyncMock,
         mock_gemini_client: MagicMock,
         mock_get_extraction: AsyncMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -1288,12 +1621,9 @@ class TestPartialExtractionAndRetry:
 
         # Existing partial extraction
         existing_id = "partial-uuid-123"
-        mock_check_duplicate.return_value = existing_id
-        mock_get_extraction.return_value = {
-            "id": existing_id,
-            "status": "partial",
-            "retry_count": 0,
-        }
+        mock_lookup_file_hash.return_value = DedupLookup(
+            (HashMatch("extractions", existing_id, "partial", 0),)
+        )
 
         mock_gemini_client.return_value = MagicMock()
         mock_extract_hybrid.return_value = sample_extraction_result
@@ -1317,12 +1647,12 @@ class TestPartialExtractionAndRetry:
 
     @patch("app.routers.extraction.validate_pdf")
     @patch("app.routers.extraction.get_supabase_client")
-    @patch("app.routers.extraction.check_duplicate")
+    @patch("app.routers.extraction.lookup_file_hash")
     @patch("app.routers.extraction.get_extraction")
     def test_retry_completed_extraction_returns_existing(
         self,
         mock_get_extraction: AsyncMock,
-        mock_check_duplicate: AsyncMock,
+        mock_lookup_file_hash: AsyncMock,
         mock_supabase_client: MagicMock,
         mock_validate: AsyncMock,
         client: TestClient,
@@ -1335,7 +1665,9 @@ class TestPartialExtractionAndRetry:
 
         # Existing completed extraction
         existing_id = "completed-uuid-123"
-        mock_check_duplicate.return_value = existing_id
+        mock_lookup_file_hash.return_value = DedupLookup(
+            (HashMatch("extractions", existing_id, "completed", 0),)
+        )
         mock_get_extraction.return_value = {
             "id": existing_id,
             "status": "completed",
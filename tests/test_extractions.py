@@ -5,12 +5,15 @@ from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 from app.db.extractions import (
+    EXTRACTION_SUMMARY_COLUMNS,
     create_extraction,
     get_extraction,
     check_duplicate,
     update_extraction_status,
-    list_extractions
+    list_extractions,
+    parse_fields
 )
+from app.db.pagination import encode_cursor
 from app.models.extraction import (
     ExtractionResult,
     ExtractedMetadata,
@@ -233,6 +236,27 @@ class TestGetExtraction:
 
         assert "Failed to retrieve extraction" in str(exc_info.value)
 
+    @pytest.mark.asyncio
+    async def test_get_extraction_with_projection(self, mock_supabase_client):
+        """Test that columns are projected (id always included, legacy columns skipped)."""
+        test_id = str(uuid4())
+        mock_response = MagicMock()
+        mock_response.data = [{'id': test_id, 'status': 'completed'}]
+        mock_supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value = mock_response
+
+        result = await get_extraction(mock_supabase_client, test_id, columns=['status', 'bounding_boxes'])
+
+        assert result == {'id': test_id, 'status': 'completed'}
+        mock_supabase_client.table.return_value.select.assert_called_once_with('id,status')
+
+    @pytest.mark.asyncio
+    async def test_get_extraction_unknown_column(self, mock_supabase_client):
+        """Test that unknown projection columns are rejected before querying."""
+        with pytest.raises(ValueError, match="Unknown extraction column"):
+            await get_extraction(mock_supabase_client, str(uuid4()), columns=['no_such_column'])
+
+        mock_supabase_client.table.assert_not_called()
+
 
 class TestCheckDuplicate:
     """Tests for check_duplicate function."""
@@ -353,7 +377,7 @@ class TestListExtractions:
             {'id': str(uuid4()), 'file_name': 'test1.pdf'},
             {'id': str(uuid4()), 'file_name': 'test2.pdf'}
         ]
-        mock_supabase_client.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = mock_response
+        mock_supabase_client.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_response
 
         result = await list_extractions(mock_supabase_client)
 
@@ -371,12 +395,12 @@ class TestListExtractions:
         mock_select = MagicMock()
         mock_eq = MagicMock()
         mock_order = MagicMock()
-        mock_range = MagicMock()
+        mock_range = MagicMock()  # keyset page: .order().order().limit()
 
         mock_table.select.return_value = mock_select
         mock_select.eq.return_value = mock_eq
         mock_eq.order.return_value = mock_order
-        mock_order.range.return_value = mock_range
+        mock_order.order.return_value.limit.return_value = mock_range
         mock_range.execute.return_value = mock_response
 
         mock_supabase_client.table.return_value = mock_table
@@ -391,20 +415,21 @@ class TestListExtractions:
         """Test listing with custom limit and offset."""
         mock_response = MagicMock()
         mock_response.data = [{'id': str(uuid4())}]
-        mock_supabase_client.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = mock_response
+        order_mock = mock_supabase_client.table.return_value.select.return_value.order.return_value.order
+        order_mock.return_value.range.return_value.execute.return_value = mock_response
 
         result = await list_extractions(mock_supabase_client, limit=10, offset=20)
 
-        # Verify range was called with correct offset and limit
-        range_call = mock_supabase_client.table.return_value.select.return_value.order.return_value.range
-        range_call.assert_called_once_with(20, 29)  # offset to offset+limit-1
+        # Verify range was called with correct offset and limit, ordered by (created_at, id)
+        order_mock.assert_called_once_with('id', desc=True)
+        order_mock.return_value.range.assert_called_once_with(20, 29)  # offset to offset+limit-1
 
     @pytest.mark.asyncio
     async def test_list_extractions_empty_result(self, mock_supabase_client):
         """Test listing when no extractions exist."""
         mock_response = MagicMock()
         mock_response.data = []
-        mock_supabase_client.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = mock_response
+        mock_supabase_client.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_response
 
         result = await list_extractions(mock_supabase_client)
 
@@ -421,7 +446,7 @@ class TestListExtractions:
     @pytest.mark.asyncio
     async def test_list_extractions_database_error(self, mock_supabase_client):
         """Test error handling when database query fails."""
-        mock_supabase_client.table.return_value.select.return_value.order.return_value.range.return_value.execute.side_effect = Exception(
+        mock_supabase_client.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value.execute.side_effect = Exception(
             "Database error"
         )
 
@@ -435,8 +460,65 @@ class TestListExtractions:
         """Test handling when response.data is None."""
         mock_response = MagicMock()
         mock_response.data = None
-        mock_supabase_client.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = mock_response
+        mock_supabase_client.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_response
 
         result = await list_extractions(mock_supabase_client)
 
         assert result == []
+
+    @pytest.mark.asyncio
+    async def test_list_extractions_uses_summary_projection(self, mock_supabase_client):
+        """Test that lists select summary columns by default and '*' on request."""
+        mock_response = MagicMock()
+        mock_response.data = []
+        mock_supabase_client.table.return_value.select.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = mock_response
+
+        await list_extractions(mock_supabase_client)
+        select_clause = mock_supabase_client.table.return_value.select.call_args[0][0]
+        assert select_clause == ','.join(EXTRACTION_SUMMARY_COLUMNS)
+        assert 'groups' not in select_clause.split(',')
+
+        await list_extractions(mock_supabase_client, columns=None)
+        assert mock_supabase_client.table.return_value.select.call_args[0][0] == '*'
+
+    @pytest.mark.asyncio
+    async def test_list_extractions_with_cursor(self, mock_supabase_client):
+        """Test that a cursor pages by (created_at, id) instead of offset."""
+        row = {'id': str(uuid4()), 'created_at': '2026-10-19T08:30:00.123456+00:00'}
+        cursor = encode_cursor(row)
+        query = mock_supabase_client.table.return_value.select.return_value
+        query.or_.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = []
+
+        await list_extractions(mock_supabase_client, limit=10, cursor=cursor, columns=['subject'])
+
+        query.or_.assert_called_once_with(
+            'created_at.lt."2026-10-19T08:30:00.123456+00:00",'
+            f'and(created_at.eq."2026-10-19T08:30:00.123456+00:00",id.lt."{row["id"]}")'
+        )
+        query.or_.return_value.order.return_value.order.return_value.limit.assert_called_once_with(10)
+        assert mock_supabase_client.table.return_value.select.call_args[0][0] == 'id,subject,created_at'
+
+    @pytest.mark.asyncio
+    async def test_list_extractions_invalid_cursor(self, mock_supabase_client):
+        """Test that malformed cursors and cursor+offset are rejected."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await list_extractions(mock_supabase_client, cursor='not-a-cursor')
+
+        cursor = encode_cursor({'id': str(uuid4()), 'created_at': '2026-10-19T08:30:00+00:00'})
+        with pytest.raises(ValueError, match="cannot be combined"):
+            await list_extractions(mock_supabase_client, offset=10, cursor=cursor)
+
+
+class TestParseFields:
+    """Tests for parse_fields helper."""
+
+    def test_parse_fields(self):
+        assert parse_fields(None) is None
+        assert parse_fields('*') is None
+        assert parse_fields(' subject, year ,subject') == ['subject', 'year']
+
+    def test_parse_fields_rejects_unknown_and_empty(self):
+        with pytest.raises(ValueError, match="Unknown field"):
+            parse_fields('subject,password')
+        with pytest.raises(ValueError, match="at least one field"):
+            parse_fields(' , ')
@@ -0,0 +1,135 @@
+"""Tests for the cached health prober and the /livez and /readyz probes."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.services import drain
+from app.services.health import HealthProber, is_healthy
+
+
+@pytest.fixture(autouse=True)
+def reset_state() -> Any:
+    main.health_prober.reset()
+    drain._tracker.reset()
+    yield
+    drain._tracker.reset()
+
+
+def test_is_healthy() -> None:
+    assert is_healthy("healthy") and is_healthy("healthy: 10GB free")
+    assert not is_healthy("degraded: 0.5GB free") and not is_healthy("unhealthy: down")
+
+
+@pytest.mark.asyncio
+async def test_report_is_served_from_cache_until_stale() -> None:
+    now = [0.0]
+    check = AsyncMock(return_value="healthy")
+    prober = HealthProber({"db": check}, interval_seconds=10, clock=lambda: now[0])
+
+    first = await prober.report()
+    now[0] = 29.0
+    second = await prober.report()
+    assert check.await_count == 1
+    assert first["checks"] == second["checks"]
+    assert second["checks"]["db"]["status"] == "healthy"
+    assert second["age_seconds"] == 29.0
+
+    now[0] = 31.0  # Older than 3 intervals: the reader refreshes
+    await prober.report()
+    assert check.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_checks_are_unhealthy() -> None:
+    async def slow() -> str:
+        await asyncio.sleep(1)
+        return "healthy"
+
+    async def failing() -> str:
+        raise RuntimeError("connection refused")
+
+    prober = HealthProber({"slow": slow, "failing": failing}, timeout_seconds=0.01)
+    checks = (await prober.refresh())["checks"]
+
+    assert checks["slow"]["status"] == "unhealthy: timed out after 0.01s"
+    assert checks["failing"]["status"] == "unhealthy: connection refused"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_run() -> None:
+    calls = []
+
+    async def check() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "healthy"
+
+    prober = HealthProber({"db": check})
+    await asyncio.gather(*(prober.report() for _ in range(5)))
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_background_loop_refreshes() -> None:
+    check = AsyncMock(return_value="healthy")
+    prober = HealthProber({"db": check}, interval_seconds=0.01)
+
+    await prober.start()
+    await asyncio.sleep(0.05)
+    await prober.stop()
+
+    assert check.await_count >= 2
+
+
+def test_livez_checks_nothing() -> None:
+    with patch("app.main.get_supabase_client") as mock_supabase:
+        response = TestClient(app).get("/livez")
+    assert response.status_code == 200 and response.json() == {"status": "alive"}
+    mock_supabase.assert_not_called()
+
+
+def _healthy_supabase() -> MagicMock:
+    mock_client = MagicMock()
+    mock_client.table.return_value.select.return_value.limit.return_value.execute.return_value = MagicMock()
+    return mock_client
+
+
+@patch("app.main.get_gemini_client", MagicMock())
+def test_readyz_ready_and_draining() -> None:
+    client = TestClient(app)
+    with patch("app.main.get_supabase_client", return_value=_healthy_supabase()), \
+            patch("app.main._check_disk", AsyncMock(return_value="healthy: 50GB free")):
+        assert client.get("/readyz").status_code == 200
+
+        drain._tracker.begin_drain()
+        response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["draining"] is True and response.json()["failing"] == {}
+
+
+@patch("app.main.get_gemini_client", MagicMock())
+def test_readyz_lists_failing_dependencies() -> None:
+    with patch("app.main.get_supabase_client", side_effect=Exception("Connection refused")):
+        response = TestClient(app).get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["failing"]["supabase"] == "unhealthy: Connection refused"
+
+
+@patch("app.main.get_gemini_client", MagicMock())
+def test_health_reports_circuit_breakers() -> None:
+    with patch("app.main.get_supabase_client", return_value=_healthy_supabase()), \
+            patch("app.main._check_disk", AsyncMock(return_value="healthy: 50GB free")):
+        response = TestClient(app).get("/health")
+
+    breakers = response.json()["circuit_breakers"]
+    assert set(breakers) >= {"gemini", "supabase"}
+    assert breakers["gemini"]["state"] in ("closed", "open", "half_open")
+    assert "consecutive_failures" in breakers["supabase"]
@@ -0,0 +1,167 @@
+"""Tests for hedged Gemini calls (app/services/hedging.py)."""
+
+import asyncio
+from typing import Any, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import scheduler as scheduler_module
+from app.services.gemini_client import generate_content
+from app.services.hedging import HedgePolicy, size_bucket
+from app.services.scheduler import LaneScheduler
+
+
+def _warm(policy: HedgePolicy, bucket: str, seconds: float, count: int = 20) -> None:
+    for _ in range(count):
+        policy._observe(bucket, seconds)
+
+
+class Calls:
+    """call() whose attempts take the given delays (or raise) in order."""
+
+    def __init__(self, *outcomes: Any) -> None:
+        self.outcomes = list(outcomes)
+        self.started = 0
+        self.cancelled: List[int] = []
+
+    async def __call__(self) -> str:
+        attempt = self.started
+        self.started += 1
+        outcome = self.outcomes[attempt]
+        try:
+            await asyncio.sleep(outcome if not isinstance(outcome, Exception) else 0)
+        except asyncio.CancelledError:
+            self.cancelled.append(attempt)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return f"attempt {attempt}"
+
+
+def test_size_buckets() -> None:
+    assert size_bucket("hybrid", 3_000) == "hybrid:<=4000"
+    assert size_bucket("hybrid", 16_000) == "hybrid:<=16000"
+    assert size_bucket("vision", 50 << 20) == "vision:>20971520"
+
+
+def test_threshold_needs_min_samples() -> None:
+    policy = HedgePolicy(percentile=90, min_samples=10)
+    _warm(policy, "b", 1.0, count=9)
+    assert policy.threshold("b") is None
+    policy._observe("b", 5.0)
+    assert policy.threshold("b") == 1.0  # 9th of 10 sorted samples
+    assert policy.threshold("other") is None
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled() -> None:
+    policy = HedgePolicy(budget_ratio=1.0)
+    _warm(policy, "b", 0.01)
+    calls = Calls(5, 0.01)
+
+    assert await policy.run("b", policy.timed("b", calls)) == "attempt 1"
+    await asyncio.sleep(0)
+    assert calls.cancelled == [0]
+    stats = policy.snapshot()["buckets"]["b"]
+    assert stats["hedged"] == 1 and stats["hedge_won"] == 1 and stats["hedge_lost"] == 0
+    assert stats["samples"] == 21  # The hedge's latency; the cancelled primary adds none
+
+
+@pytest.mark.asyncio
+async def test_primary_can_still_win() -> None:
+    policy = HedgePolicy(budget_ratio=1.0)
+    _warm(policy, "b", 0.01)
+    calls = Calls(0.05, 5)
+
+    assert await policy.run("b", calls) == "attempt 0"
+    await asyncio.sleep(0)
+    assert calls.cancelled == [1]
+    assert policy.snapshot()["buckets"]["b"]["hedge_lost"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_falls_back_to_the_other() -> None:
+    policy = HedgePolicy(budget_ratio=1.0)
+    _warm(policy, "b", 0.01)
+
+    assert await policy.run("b", Calls(0.05, RuntimeError("503"))) == "attempt 0"
+    with pytest.raises(ValueError, match="primary"):
+        await policy.run("b", Calls(ValueError("primary"), 5))  # Failed before the threshold: no hedge
+    assert policy.snapshot()["buckets"]["b"]["hedged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_hedges() -> None:
+    policy = HedgePolicy(budget_ratio=0.5)
+    _warm(policy, "b", 0.001, count=100)  # Keeps the threshold below the slow calls added here
+
+    for _ in range(4):
+        await policy.run("b", policy.timed("b", Calls(0.02, 5)))
+
+    stats = policy.snapshot()
+    assert stats["buckets"]["b"]["hedged"] == 2 and stats["buckets"]["b"]["budget_rejected"] == 2
+    assert stats["budget"]["hedges"] == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_content_hedges_only_with_bucket() -> None:
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value="response")
+    policy = HedgePolicy()
+
+    with patch("app.services.gemini_client.get_hedge_policy", return_value=policy):
+        assert await generate_content(client, model="m", contents="hi") == "response"
+        assert policy.snapshot()["buckets"] == {}
+        assert await generate_content(client, hedge_bucket="hybrid:<=4000", model="m", contents="hi") == "response"
+
+    assert policy.snapshot()["buckets"]["hybrid:<=4000"]["calls"] == 1
+    client.aio.models.generate_content.assert_called_with(model="m", contents="hi")
+
+
+@pytest.mark.asyncio
+async def test_samples_exclude_the_wait_for_an_llm_slot() -> None:
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value="response")
+    policy = HedgePolicy()
+    sched = LaneScheduler("llm", slots=1)
+
+    with patch("app.services.gemini_client.get_hedge_policy", return_value=policy), \
+            patch.dict(scheduler_module._schedulers, {"llm": sched}):
+        await sched.acquire("interactive")
+        task = asyncio.ensure_future(generate_content(client, hedge_bucket="b", model="m", contents="hi"))
+        await asyncio.sleep(0.1)
+        sched.release("interactive")
+        assert await task == "response"
+
+    assert policy._samples["b"][0] < 0.05
+
+
+@pytest.mark.asyncio
+async def test_losing_gemini_request_is_cancelled_and_frees_its_slot() -> None:
+    started: List[int] = []
+    cancelled: List[int] = []
+
+    async def generate(**kwargs: Any) -> str:
+        attempt = len(started)
+        started.append(attempt)
+        try:
+            await asyncio.sleep(5 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return f"attempt {attempt}"
+
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(side_effect=generate)
+    policy = HedgePolicy(budget_ratio=1.0)
+    _warm(policy, "b", 0.01)
+    sched = LaneScheduler("llm", slots=2)
+
+    with patch("app.services.gemini_client.get_hedge_policy", return_value=policy), \
+            patch.dict(scheduler_module._schedulers, {"llm": sched}):
+        assert await generate_content(client, hedge_bucket="b", model="m", contents="hi") == "attempt 1"
+        await asyncio.sleep(0)
+
+    assert cancelled == [0]
+    assert sched.snapshot()["running"] == 0
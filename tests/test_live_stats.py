@@ -0,0 +1,119 @@
+"""Tests for rolling in-process quantile sketches."""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import live_stats
+from app.utils.live_stats import LiveStats, QuantileSketch, RELATIVE_ACCURACY
+from tests.conftest import FakeClock
+
+
+@pytest.fixture(autouse=True)
+def reset_live_stats() -> None:
+    """Reset process-wide live statistics before each test."""
+    live_stats._live_stats.reset()
+
+
+class TestQuantileSketch:
+    """Test QuantileSketch accuracy and merging."""
+
+    def test_empty_sketch(self) -> None:
+        sketch = QuantileSketch()
+        assert sketch.quantile(0.5) is None
+        assert sketch.summary() == {"count": 0}
+
+    def test_quantiles_within_relative_accuracy(self) -> None:
+        rng = random.Random(42)
+        values = [rng.lognormvariate(8, 1) for _ in range(10_000)]
+        sketch = QuantileSketch()
+        for v in values:
+            sketch.add(v)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.9, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert abs(sketch.quantile(q) - exact) <= exact * RELATIVE_ACCURACY * 1.01
+
+    def test_merge_matches_single_sketch(self) -> None:
+        combined, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for v in range(1, 1001):
+            combined.add(v)
+            (left if v % 2 else right).add(v)
+        left.merge(right)
+
+        assert left.count == combined.count
+        assert left.summary() == combined.summary()
+
+    def test_zero_values(self) -> None:
+        sketch = QuantileSketch()
+        for v in (0, 0, 0, 10):
+            sketch.add(v)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(10, rel=RELATIVE_ACCURACY)
+
+
+class TestLiveStats:
+    """Test windowing of LiveStats series."""
+
+    def test_windows_expire_old_observations(self, clock: FakeClock) -> None:
+        stats = LiveStats(clock)
+
+        stats.record("e2e_latency_ms", 100.0, "hybrid")
+        clock.now += 10 * 60
+        stats.record("e2e_latency_ms", 200.0, "hybrid")
+        clock.now += 30
+
+        windows = stats.snapshot()["e2e_latency_ms"]["hybrid"]
+        assert windows["1m"]["count"] == 1
+        assert windows["15m"]["count"] == 2
+        assert windows["1h"]["count"] == 2
+
+        clock.now += 55 * 60
+        windows = stats.snapshot()["e2e_latency_ms"]["hybrid"]
+        assert windows["15m"]["count"] == 0
+        assert windows["1h"]["count"] == 1
+
+    def test_series_keyed_by_metric_and_method(self, clock: FakeClock) -> None:
+        stats = LiveStats(clock)
+        stats.record("gemini_latency_ms", 50.0, "hybrid")
+        stats.record("gemini_latency_ms", 500.0, "vision_fallback")
+        stats.record("gemini_latency_ms", None, "hybrid")
+
+        snapshot = stats.snapshot()["gemini_latency_ms"]
+        assert snapshot["hybrid"]["1m"]["count"] == 1
+        assert snapshot["vision_fallback"]["1m"]["max"] == 500.0
+
+
+def test_record_extraction_uses_processing_metadata() -> None:
+    """record_extraction records e2e, Gemini latency, tokens and quality by method."""
+    live_stats.record_extraction(
+        {"method": "hybrid", "gemini_latency_ms": 1200.0, "total_tokens": 5000, "opendataloader_quality": 0.85},
+        e2e_seconds=2.5,
+    )
+    live_stats.record_extraction(None, e2e_seconds=0.5)
+
+    metrics = live_stats.get_live_stats()["metrics"]
+    assert metrics["e2e_latency_ms"]["hybrid"]["15m"]["max"] == 2500.0
+    assert metrics["gemini_latency_ms"]["hybrid"]["15m"]["count"] == 1
+    assert metrics["total_tokens"]["hybrid"]["15m"]["mean"] == 5000.0
+    assert metrics["quality_score"]["hybrid"]["15m"]["min"] == 0.85
+    assert metrics["e2e_latency_ms"]["unknown"]["15m"]["count"] == 1
+    assert "unknown" not in metrics["gemini_latency_ms"]
+
+
+def test_live_stats_endpoint() -> None:
+    """GET /api/stats/live returns windowed summaries."""
+    live_stats.record_metric("parse_latency_ms", 300.0, "opendataloader")
+
+    response = TestClient(app).get("/api/stats/live")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["windows"] == ["1m", "15m", "1h"]
+    assert data["quantiles"] == ["p50", "p90", "p95", "p99"]
+    summary = data["metrics"]["parse_latency_ms"]["opendataloader"]["15m"]
+    assert summary["count"] == 1
+    assert summary["p50"] == pytest.approx(300.0, rel=RELATIVE_ACCURACY)
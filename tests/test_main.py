@@ -6,9 +6,16 @@ from unittest.mock import MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 
+from app import main
 from app.main import app
 
 
+@pytest.fixture(autouse=True)
+def reset_health_cache() -> None:
+    """Each test probes with its own mocks instead of cached results."""
+    main.health_prober.reset()
+
+
 @pytest.fixture
 def client() -> TestClient:
     """Create FastAPI test client."""
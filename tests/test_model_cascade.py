@@ -0,0 +1,121 @@
+"""Tests for the fast/strong model cascade (app/services/model_cascade.py)."""
+
+import json
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import get_settings
+from app.models.extraction import DocumentStructure
+from app.services.hedging import HedgePolicy
+from app.services.model_cascade import (
+    FAST,
+    STRONG,
+    choose_tier,
+    count_question_groups,
+    expected_question_numbers,
+    missing_question_numbers,
+)
+from app.services.pdf_extractor import extract_pdf_data_hybrid
+
+MARKDOWN = """# SECTION A
+
+## QUESTION 1
+
+1.1 Various options are provided as possible answers.
+
+1.1.1 Which Act protects consumers?
+
+1.1.2 **Name** two rights.
+
+| 1.2 | Choose a word from the list. |
+
+A machine of 2.5 kg was delivered.
+
+## QUESTION 2
+
+2.1 Define diversification.
+"""
+
+FAST_MODEL = "fast-model"
+
+
+def _cascade_settings(**overrides: Any) -> Any:
+    values: Dict[str, Any] = {"model_cascade_enabled": True, "model_cascade_fast_model": FAST_MODEL}
+    values.update(overrides)
+    return get_settings().model_copy(update=values)
+
+
+def _structure(markdown: str = MARKDOWN, quality: float = 0.95) -> DocumentStructure:
+    return DocumentStructure(markdown=markdown, quality_score=quality, element_count=12)
+
+
+def _paper(question_ids: List[str]) -> str:
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    for question_id in question_ids:
+        groups.setdefault(f"QUESTION {question_id.split('.')[0]}", []).append({"id": question_id, "text": "..."})
+    return json.dumps({
+        "subject": "Business Studies P1", "syllabus": "NSC", "year": 2025, "session": "NOV", "grade": "12",
+        "groups": [{"group_id": gid, "title": gid, "questions": qs} for gid, qs in groups.items()],
+    })
+
+
+def test_expected_numbers_come_from_headings_and_numbered_lines() -> None:
+    assert count_question_groups(MARKDOWN) == 2
+    # 1.1.1 is compared as 1.1; "2.5 kg" is not at the start of a line
+    assert expected_question_numbers(MARKDOWN) == {"1", "1.1", "1.2", "2", "2.1"}
+
+
+def test_missing_numbers() -> None:
+    assert missing_question_numbers(MARKDOWN, ["1.1.1", "1.1.2", "1.2", "2.1"]) == []
+    assert missing_question_numbers(MARKDOWN, ["QUESTION 1", "1.1", "1.2"]) == ["2", "2.1"]
+    # Without headings, any numbered line counts
+    assert missing_question_numbers("3.1 Explain.\n3.2 Discuss.", ["3.1"]) == ["3.2"]
+
+
+def test_only_simple_documents_use_the_fast_tier() -> None:
+    assert choose_tier(_structure()) == STRONG  # Cascade disabled by default
+
+    with patch("app.services.model_cascade.get_settings", return_value=_cascade_settings()):
+        assert choose_tier(_structure()) == FAST
+        assert choose_tier(_structure(quality=0.8)) == STRONG
+        assert choose_tier(_structure(markdown=MARKDOWN * 1000)) == STRONG
+    with patch("app.services.model_cascade.get_settings", return_value=_cascade_settings(model_cascade_max_groups=1)):
+        assert choose_tier(_structure()) == STRONG
+
+
+def _client(responses: Dict[str, str]) -> MagicMock:
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(side_effect=lambda model, **kwargs: MagicMock(
+        text=responses[model], usage_metadata=None
+    ))
+    return client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fast_response, tier, reason",
+    [
+        (_paper(["1.1.1", "1.2", "2.1"]), FAST, None),
+        (_paper(["1.1.1", "1.2"]), STRONG, "coverage"),
+        ('{"subject": "truncated', STRONG, "validation"),
+    ],
+)
+async def test_hybrid_extraction_escalates_only_on_failure(fast_response: str, tier: str, reason: Any) -> None:
+    client = _client({FAST_MODEL: fast_response, "strong-model": _paper(["1.1", "1.2", "2.1"])})
+
+    policy = HedgePolicy()
+    with patch("app.services.model_cascade.get_settings", return_value=_cascade_settings()), \
+            patch("app.services.gemini_client.get_hedge_policy", return_value=policy):
+        result = await extract_pdf_data_hybrid(client, "exam.pdf", model="strong-model", doc_structure=_structure())
+
+    metadata = result.processing_metadata
+    assert metadata["model_tier"] == tier and metadata["escalation_reason"] == reason
+    assert metadata["model"] == (FAST_MODEL if tier == FAST else "strong-model")
+    models = [call.kwargs["model"] for call in client.aio.models.generate_content.call_args_list]
+    assert models == ([FAST_MODEL] if tier == FAST else [FAST_MODEL, "strong-model"])
+    # Each tier's latencies go to its own hedge bucket
+    assert sorted(policy.snapshot()["buckets"]) == (
+        ["fast:hybrid:<=4000"] if tier == FAST else ["fast:hybrid:<=4000", "strong:hybrid:<=4000"]
+    )
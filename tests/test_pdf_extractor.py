@@ -5,7 +5,7 @@ Tests the integration of OpenDataLoader structure extraction with Gemini semanti
 """
 
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 from google import genai
 
 from app.services.pdf_extractor import (
@@ -23,7 +23,9 @@ from app.models.extraction import (
 @pytest.fixture
 def mock_gemini_client():
     """Create a mock Gemini client for testing."""
-    return MagicMock(spec=genai.Client)
+    client = MagicMock(spec=genai.Client)
+    client.aio.models.generate_content = AsyncMock()
+    return client
 
 
 @pytest.fixture(autouse=True)
@@ -154,7 +156,7 @@ class TestVisionFallback:
 
         mock_response = Mock()
         mock_response.parsed = mock_result
-        mock_gemini_client.models.generate_content.return_value = mock_response
+        mock_gemini_client.aio.models.generate_content.return_value = mock_response
 
         # Execute Vision fallback
         result = extract_with_vision_fallback(
@@ -167,8 +169,8 @@ class TestVisionFallback:
         mock_gemini_client.files.upload.assert_called_once_with(file="scanned.pdf")
 
         # Verify Gemini API call with uploaded file
-        mock_gemini_client.models.generate_content.assert_called_once()
-        call_args = mock_gemini_client.models.generate_content.call_args
+        mock_gemini_client.aio.models.generate_content.assert_called_once()
+        call_args = mock_gemini_client.aio.models.generate_content.call_args
         assert mock_uploaded_file in call_args[1]["contents"]
         assert "academic research paper" in call_args[1]["contents"][1]
 
@@ -204,7 +206,7 @@ class TestVisionFallback:
         )
         mock_response = Mock()
         mock_response.parsed = mock_result
-        mock_gemini_client.models.generate_content.return_value = mock_response
+        mock_gemini_client.aio.models.generate_content.return_value = mock_response
 
         # Execute
         extract_with_vision_fallback(mock_gemini_client, "test.pdf")
@@ -223,7 +225,7 @@ class TestVisionFallback:
         mock_gemini_client.files.upload.return_value = mock_uploaded_file
 
         # Mock API error
-        mock_gemini_client.models.generate_content.side_effect = Exception("API Error")
+        mock_gemini_client.aio.models.generate_content.side_effect = Exception("API Error")
 
         # Execute and expect error
         with pytest.raises(Exception, match="API Error"):
@@ -262,7 +264,7 @@ class TestVisionFallback:
         )
         mock_response = Mock()
         mock_response.parsed = mock_result
-        mock_gemini_client.models.generate_content.return_value = mock_response
+        mock_gemini_client.aio.models.generate_content.return_value = mock_response
 
         # Mock cleanup failure
         mock_gemini_client.files.delete.side_effect = Exception("Delete failed")
@@ -292,7 +294,7 @@ class TestVisionFallback:
         )
         mock_response = Mock()
         mock_response.parsed = mock_result
-        mock_gemini_client.models.generate_content.return_value = mock_response
+        mock_gemini_client.aio.models.generate_content.return_value = mock_response
 
         # Execute with custom model
         result = extract_with_vision_fallback(
@@ -302,7 +304,7 @@ class TestVisionFallback:
         )
 
         # Verify custom model was used
-        call_args = mock_gemini_client.models.generate_content.call_args
+        call_args = mock_gemini_client.aio.models.generate_content.call_args
         assert call_args[1]["model"] == "gemini-3-pro-vision"
         assert result.processing_metadata["model"] == "gemini-3-pro-vision"
 
@@ -323,7 +325,7 @@ class TestHybridExtraction:
             mock_extract.return_value = mock_high_quality_structure
 
             # Mock Gemini API call
-            mock_gemini_client.models.generate_content.return_value = mock_gemini_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_gemini_response
 
             # Execute extraction
             result = await extract_pdf_data_hybrid(
@@ -336,8 +338,8 @@ class TestHybridExtraction:
             mock_extract.assert_called_once_with("test.pdf")
 
             # Verify Gemini API was called
-            mock_gemini_client.models.generate_content.assert_called_once()
-            call_args = mock_gemini_client.models.generate_content.call_args
+            mock_gemini_client.aio.models.generate_content.assert_called_once()
+            call_args = mock_gemini_client.aio.models.generate_content.call_args
 
             # Verify prompt contains markdown
             prompt_content = call_args[1]["contents"]
@@ -393,7 +395,7 @@ class TestHybridExtraction:
             )
             mock_response = Mock()
             mock_response.parsed = fallback_result
-            mock_gemini_client.models.generate_content.return_value = mock_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_response
 
             # Execute extraction - should trigger Vision fallback
             result = await extract_pdf_data_hybrid(mock_gemini_client, "test.pdf")
@@ -405,7 +407,7 @@ class TestHybridExtraction:
             mock_gemini_client.files.upload.assert_called_once_with(file="test.pdf")
 
             # Verify Gemini API was called via Vision mode
-            mock_gemini_client.models.generate_content.assert_called_once()
+            mock_gemini_client.aio.models.generate_content.assert_called_once()
 
             # Verify result has fallback metadata
             assert result.processing_metadata["method"] == "vision_fallback"
@@ -429,13 +431,13 @@ class TestHybridExtraction:
 
         with patch('app.services.pdf_extractor.extract_pdf_structure') as mock_extract:
             mock_extract.return_value = boundary_structure
-            mock_gemini_client.models.generate_content.return_value = mock_gemini_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_gemini_response
 
             result = await extract_pdf_data_hybrid(mock_gemini_client, "test.pdf")
 
             # At 0.7, should use hybrid mode (not fallback)
             assert result.processing_metadata["method"] == "hybrid"
-            mock_gemini_client.models.generate_content.assert_called_once()
+            mock_gemini_client.aio.models.generate_content.assert_called_once()
 
         # Test just below 0.7 (should trigger fallback)
         below_threshold = DocumentStructure(
@@ -465,7 +467,7 @@ class TestHybridExtraction:
             )
             mock_response = Mock()
             mock_response.parsed = fallback_result
-            mock_gemini_client.models.generate_content.return_value = mock_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_response
 
             result = await extract_pdf_data_hybrid(mock_gemini_client, "test.pdf")
             assert result.processing_metadata["method"] == "vision_fallback"
@@ -493,7 +495,7 @@ class TestHybridExtraction:
 
         with patch('app.services.pdf_extractor.extract_pdf_structure') as mock_extract:
             mock_extract.return_value = structure_with_bbox
-            mock_gemini_client.models.generate_content.return_value = mock_gemini_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_gemini_response
 
             result = await extract_pdf_data_hybrid(mock_gemini_client, "test.pdf")
 
@@ -521,7 +523,7 @@ class TestHybridExtraction:
 
         with patch('app.services.pdf_extractor.extract_pdf_structure') as mock_extract:
             mock_extract.return_value = no_tables_structure
-            mock_gemini_client.models.generate_content.return_value = mock_gemini_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_gemini_response
 
             result = await extract_pdf_data_hybrid(mock_gemini_client, "test.pdf")
 
@@ -538,7 +540,7 @@ class TestHybridExtraction:
         """Test extraction with custom Gemini model."""
         with patch('app.services.pdf_extractor.extract_pdf_structure') as mock_extract:
             mock_extract.return_value = mock_high_quality_structure
-            mock_gemini_client.models.generate_content.return_value = mock_gemini_response
+            mock_gemini_client.aio.models.generate_content.return_value = mock_gemini_response
 
             result = await extract_pdf_data_hybrid(
                 mock_gemini_client,
@@ -547,7 +549,7 @@ class TestHybridExtraction:
             )
 
             # Verify custom model was used
-            call_args = mock_gemini_client.models.generate_content.call_args
+            call_args = mock_gemini_client.aio.models.generate_content.call_args
             assert call_args[1]["model"] == "gemini-3-pro-preview"
             assert result.processing_metadata["model"] == "gemini-3-pro-preview"
 
@@ -0,0 +1,122 @@
+"""Tests for question search (app/db/questions.py and GET /api/questions/search)."""
+
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.db.questions import search_questions
+from app.main import app
+from app.middleware.rate_limit import get_limiter
+
+
+def _mock_client(rows: List[Dict[str, Any]]) -> MagicMock:
+    query = MagicMock()
+    for method in ("select", "filter", "ilike", "eq", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.return_value = MagicMock(data=rows)
+    client = MagicMock()
+    client.table.return_value = query
+    return client
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter() -> None:
+    get_limiter().reset()
+
+
+class TestSearchQuestions:
+    """Query building for the questions table."""
+
+    @pytest.mark.asyncio
+    async def test_full_text_and_filters(self) -> None:
+        client = _mock_client([{"id": "q1"}])
+
+        rows = await search_questions(
+            client, q="franchise", subject="Business_Studies 100%", year=2025, question_type="mcq", limit=10
+        )
+
+        assert rows == [{"id": "q1"}]
+        query = client.table.return_value
+        client.table.assert_called_once_with("questions")
+        query.filter.assert_called_once_with("search_vector", "wfts(simple)", "franchise")
+        query.ilike.assert_called_once_with("subject", "Business\\_Studies 100\\%%")
+        query.eq.assert_any_call("year", 2025)
+        query.eq.assert_any_call("is_mcq", True)
+        query.order.assert_any_call("created_at", desc=True)
+        query.limit.assert_called_once_with(10)
+
+    @pytest.mark.asyncio
+    async def test_no_text_query_skips_full_text_filter(self) -> None:
+        client = _mock_client([])
+
+        assert await search_questions(client, year=2024) == []
+        client.table.return_value.filter.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalid_question_type(self) -> None:
+        with pytest.raises(ValueError, match="question_type"):
+            await search_questions(_mock_client([]), question_type="essay")
+
+    @pytest.mark.asyncio
+    async def test_database_error(self) -> None:
+        client = _mock_client([])
+        client.table.return_value.execute.side_effect = Exception("syntax error in tsquery")
+
+        with pytest.raises(RuntimeError, match="Failed to search questions: syntax error"):
+            await search_questions(client, q="a & b")
+
+
+class TestSearchEndpoint:
+    """GET /api/questions/search."""
+
+    @patch("app.routers.questions.get_supabase_client")
+    @patch("app.routers.questions.search_questions", new_callable=AsyncMock)
+    def test_returns_page_with_cursor(self, mock_search: AsyncMock, mock_supabase_client: MagicMock) -> None:
+        mock_search.return_value = [
+            {"id": f"00000000-0000-0000-0000-00000000000{i}", "question_id": f"1.{i}",
+             "created_at": "2026-10-01T00:00:00+00:00"}
+            for i in range(2)
+        ]
+
+        response = TestClient(app).get(
+            "/api/questions/search?q=franchise&subject=Business%20Studies&year=2025&limit=2"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [r["question_id"] for r in body["data"]] == ["1.0", "1.1"]
+        assert body["pagination"]["has_more"] is True
+        assert body["pagination"]["next_cursor"]
+        mock_search.assert_called_once_with(
+            mock_supabase_client.return_value,
+            q="franchise", subject="Business Studies", year=2025, grade=None, language=None,
+            question_type=None, extraction_id=None, limit=2, cursor=None,
+        )
+
+    @pytest.mark.parametrize("query", [
+        "limit=0",
+        "limit=101",
+        "q=" + "x" * 201,
+        "extraction_id=not-a-uuid",
+        "question_type=essay",
+        "cursor=%%%",
+    ])
+    @patch("app.routers.questions.get_supabase_client")
+    def test_invalid_parameters(self, mock_supabase_client: MagicMock, query: str) -> None:
+        mock_supabase_client.return_value = _mock_client([])
+
+        response = TestClient(app).get(f"/api/questions/search?{query}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @patch("app.routers.questions.get_supabase_client")
+    @patch("app.routers.questions.search_questions", new_callable=AsyncMock)
+    def test_database_error(self, mock_search: AsyncMock, mock_supabase_client: MagicMock) -> None:
+        mock_search.side_effect = RuntimeError("Failed to search questions: timeout")
+
+        response = TestClient(app).get("/api/questions/search?q=franchise")
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -1,26 +1,37 @@
 """Tests for rate limiting middleware."""
 
+import asyncio
 import json
-from unittest.mock import MagicMock, patch
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from fastapi import Request
+from fastapi import Request, Response
 from fastapi.testclient import TestClient
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
 
+from app.db.dedup import DedupLookup
 from app.main import app
 from app.middleware.rate_limit import (
+    CostLimitExceeded,
+    charge_cost,
     get_client_ip,
     get_limiter,
     rate_limit_exceeded_handler,
     RATE_LIMITS,
 )
+from app.services import drain
+from app.services.extraction_cost import estimate_extraction_cost
 
 
 @pytest.fixture(autouse=True)
 def reset_rate_limiter() -> None:
-    """Reset the rate limiter before each test."""
+    """Reset the rate limiter (and drain state left by lifespan shutdowns) before each test."""
     limiter = get_limiter()
     limiter.reset()
+    drain._tracker.reset()
 
 
 @pytest.fixture
@@ -214,7 +225,7 @@ def test_version_endpoint_no_rate_limit(client: TestClient) -> None:
 @patch("app.routers.extraction.get_supabase_client")
 @patch("app.routers.extraction.get_gemini_client")
 @patch("app.routers.extraction.validate_pdf")
-@patch("app.routers.extraction.check_duplicate")
+@patch("app.routers.extraction.lookup_file_hash")
 @patch("app.routers.extraction.extract_pdf_data_hybrid")
 @patch("app.routers.extraction.create_extraction")
 def test_extract_rate_limit_enforcement(
@@ -232,7 +243,7 @@ def test_extract_rate_limit_enforcement(
         mock_supabase.return_value = MagicMock()
         mock_gemini.return_value = MagicMock()
         mock_validate.return_value = (b"content", "hash123", "test.pdf")
-        mock_check_dup.return_value = None
+        mock_check_dup.return_value = DedupLookup()
         mock_extract.return_value = MagicMock(
             model_dump_json=MagicMock(return_value='{"test": "data"}'),
             processing_metadata=None,
@@ -309,3 +320,91 @@ def test_429_error_message_content() -> None:
     assert "retry" in body["message"].lower()
     assert "42" in body["message"]
     assert body["detail"] == "Rate limit exceeded"
+
+
+# Shared Storage Tests
+
+
+def test_sqlite_storage_is_shared_between_instances(tmp_path: Any) -> None:
+    """Two workers opening the same file see one counter."""
+    uri = f"sqlite:///{tmp_path}/limits.db"
+    item = parse("10/minute")
+    worker_a = FixedWindowRateLimiter(storage_from_string(uri))
+    worker_b = FixedWindowRateLimiter(storage_from_string(uri))
+
+    assert worker_a.hit(item, "1.2.3.4", cost=6)
+    assert not worker_b.hit(item, "1.2.3.4", cost=6)
+    assert worker_b.get_window_stats(item, "1.2.3.4").remaining == 0
+    assert worker_b.get_window_stats(item, "5.6.7.8").remaining == 10
+
+
+# Cost-Weighted Limit Tests
+
+
+def test_extraction_cost_counts_pages_and_predicts_route() -> None:
+    text_pdf = b"%PDF-1.4 /Font /F1" + b" /Type /Page " * 4 + b"/Type /Pages"
+    scanned_pdf = b"%PDF-1.4 /XObject /Image" + b" /Type /Page" * 4
+
+    text_cost = estimate_extraction_cost(text_pdf)
+    scanned_cost = estimate_extraction_cost(scanned_pdf)
+
+    assert (text_cost.pages, text_cost.predicted_route, text_cost.units) == (4, "hybrid", 6)
+    assert (scanned_cost.pages, scanned_cost.predicted_route) == (4, "vision_fallback")
+    assert scanned_cost.units == 3 * text_cost.units
+
+
+def _request_from(ip: str) -> Request:
+    return Request({"type": "http", "headers": [], "client": (ip, 1234), "state": {}})
+
+
+@pytest.mark.asyncio
+async def test_charge_cost_rejects_without_consuming_budget() -> None:
+    request = _request_from("10.1.1.1")
+    assert await charge_cost(request, 70, budget=100) == 30
+    assert request.state._rate_limit_data == {"limit": 100, "remaining": 30}
+
+    with pytest.raises(CostLimitExceeded) as exc_info:
+        await charge_cost(_request_from("10.1.1.1"), 40, budget=100)
+    assert exc_info.value.status_code == 429 and 0 < exc_info.value.retry_after <= 60
+
+    # The rejected charge did not use budget; other clients are unaffected
+    assert await charge_cost(_request_from("10.1.1.1"), 30, budget=100) == 0
+    assert await charge_cost(_request_from("10.2.2.2"), 500, budget=100) == 0  # Capped at the budget
+
+
+@pytest.mark.asyncio
+async def test_concurrent_charges_cannot_overspend() -> None:
+    """Check and charge are one increment: only as many charges as fit go through."""
+    results = await asyncio.gather(
+        *(charge_cost(_request_from("10.3.3.3"), 30, budget=100) for _ in range(6)), return_exceptions=True
+    )
+
+    assert sum(not isinstance(result, CostLimitExceeded) for result in results) == 3
+    assert await charge_cost(_request_from("10.3.3.3"), 10, budget=100) == 0
+
+
+@patch("app.routers.extraction.validate_pdf")
+def test_extract_cost_budget_exhausted_returns_429(mock_validate: MagicMock, client: TestClient) -> None:
+    mock_validate.return_value = (b"%PDF-1.4", "hash-cost", "big.pdf")
+    with patch("app.routers.extraction.estimate_extraction_cost") as mock_estimate, \
+            patch("app.routers.extraction._extractions_in_flight") as mock_flight:
+        mock_estimate.return_value = MagicMock(units=150)
+        mock_flight.do = AsyncMock(return_value=(Response(status_code=201), False))
+
+        first = client.post("/api/extract", files={"file": ("big.pdf", b"%PDF-1.4", "application/pdf")})
+        second = client.post("/api/extract", files={"file": ("big.pdf", b"%PDF-1.4", "application/pdf")})
+
+    assert first.status_code == 201 and first.headers["X-RateLimit-Remaining"] == "50"
+    assert second.status_code == 429
+    assert second.headers["X-RateLimit-Remaining"] == "50" and "Retry-After" in second.headers
+    assert mock_flight.do.await_count == 1
+
+
+def test_read_endpoint_reports_remaining(client: TestClient) -> None:
+    with patch("app.routers.extraction.get_supabase_client"), \
+            patch("app.routers.extraction.list_extractions", AsyncMock(return_value=[])):
+        first = client.get("/api/extractions")
+        second = client.get("/api/extractions")
+
+    assert first.headers["X-RateLimit-Limit"] == "100"
+    assert int(first.headers["X-RateLimit-Remaining"]) - int(second.headers["X-RateLimit-Remaining"]) == 1
@@ -0,0 +1,129 @@
+"""Tests for the in-process read cache and ETag helpers."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.db import read_cache
+from app.db.batch_jobs import add_extraction_to_batch
+from app.db.extractions import update_extraction_status
+from app.db.read_cache import ReadCache, compute_etag, etag_matches
+from tests.conftest import FakeClock
+
+
+def _row(record_id: str = 'a', updated_at: str = '2026-10-19T08:00:00+00:00', status: str = 'completed') -> dict:
+    return {'id': record_id, 'updated_at': updated_at, 'status': status}
+
+
+def test_entries_expire_after_ttl(clock: FakeClock) -> None:
+    cache = ReadCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.put('extractions', 'a', _row())
+
+    clock.now += 4.9
+    assert cache.get('extractions', 'a') is not None
+    clock.now += 0.2
+    assert cache.get('extractions', 'a') is None
+    assert cache.snapshot()['hits'] == 1
+    assert cache.snapshot()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock: FakeClock) -> None:
+    cache = ReadCache(max_entries=2, ttl_seconds=60, clock=clock)
+    cache.put('extractions', 'a', _row('a'))
+    cache.put('extractions', 'b', _row('b'))
+    cache.get('extractions', 'a')
+    cache.put('extractions', 'c', _row('c'))
+
+    assert cache.get('extractions', 'b') is None
+    assert cache.get('extractions', 'a') is not None
+    assert cache.get('extractions', 'c') is not None
+
+
+def test_put_purges_expired_entries(clock: FakeClock) -> None:
+    cache = ReadCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.put('extractions', 'a', _row('a'))
+    cache.put('extractions', 'b', _row('b'))
+
+    clock.now += 6
+    cache.put('extractions', 'c', _row('c'))
+
+    assert cache.snapshot()['entries'] == 1
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    cache = ReadCache(max_entries=0, ttl_seconds=5)
+    cached = cache.put('extractions', 'a', _row())
+    assert cached.etag == compute_etag(_row())
+    assert cache.get('extractions', 'a') is None
+
+
+def test_body_is_rendered_once(clock: FakeClock) -> None:
+    cache = ReadCache(clock=clock)
+    render = MagicMock(return_value='{"id": "a"}')
+    cached = cache.put('batch_jobs', 'a', _row())
+
+    assert cached.body(render) == '{"id": "a"}'
+    assert cache.get('batch_jobs', 'a').body(render) == '{"id": "a"}'
+    render.assert_called_once()
+
+
+def test_etag_changes_with_updated_at_and_status() -> None:
+    etag = compute_etag(_row())
+    assert etag.startswith('"') and etag.endswith('"')
+    assert compute_etag(_row(updated_at='2026-10-19T08:00:01+00:00')) != etag
+    assert compute_etag(_row(status='failed')) != etag
+
+
+def test_etag_matches_if_none_match_lists() -> None:
+    etag = compute_etag(_row())
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.asyncio
+async def test_db_updates_invalidate_cached_records(monkeypatch, clock: FakeClock) -> None:
+    """Extraction and batch job updates drop the cached record."""
+    cache = ReadCache(clock=clock)
+    monkeypatch.setattr(read_cache, '_cache', cache)
+    extraction_id = '12345678-1234-5678-1234-567812345678'
+    batch_id = '87654321-4321-8765-4321-876543218765'
+    cache.put('extractions', extraction_id, _row(extraction_id))
+    cache.put('batch_jobs', batch_id, _row(batch_id))
+
+    client = MagicMock()
+    client.table.return_value.update.return_value.eq.return_value.execute.return_value.data = [{'id': extraction_id}]
+    client.rpc.return_value.execute.return_value.data = [{'id': batch_id}]
+
+    await update_extraction_status(client, extraction_id, 'failed')
+    await add_extraction_to_batch(client, batch_id, extraction_id, 'hybrid', 'completed')
+
+    assert cache.get('extractions', extraction_id) is None
+    assert cache.get('batch_jobs', batch_id) is None
+    assert cache.snapshot()['invalidations'] == 2
+
+
+@pytest.mark.asyncio
+async def test_updates_invalidate_before_and_after_the_write(monkeypatch, clock: FakeClock) -> None:
+    """The old row is not served during a write, nor kept if re-read meanwhile."""
+    cache = ReadCache(clock=clock)
+    monkeypatch.setattr(read_cache, '_cache', cache)
+    extraction_id = '12345678-1234-5678-1234-567812345678'
+    cache.put('extractions', extraction_id, _row(extraction_id))
+    served_during_write = []
+
+    def execute() -> MagicMock:
+        served_during_write.append(cache.get('extractions', extraction_id))
+        # A concurrent GET re-reads and caches the row before the update commits
+        cache.put('extractions', extraction_id, _row(extraction_id))
+        return MagicMock(data=[{'id': extraction_id}])
+
+    client = MagicMock()
+    client.table.return_value.update.return_value.eq.return_value.execute.side_effect = execute
+
+    await update_extraction_status(client, extraction_id, 'failed')
+
+    assert served_during_write == [None]
+    assert cache.get('extractions', extraction_id) is None
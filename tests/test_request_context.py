@@ -0,0 +1,94 @@
+"""Tests for the request context middleware (app/middleware/logging.py)."""
+
+import json
+import logging
+from typing import Any, List
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.logging import RequestContextMiddleware, get_request_id
+from app.middleware.rate_limit import rate_limit_headers
+
+
+def _app() -> Starlette:
+    async def echo_id(request: Request) -> JSONResponse:
+        return JSONResponse({"request_id": get_request_id(request)}, headers={
+            "X-Processing-Method": "hybrid", "X-Quality-Score": "0.82",
+        })
+
+    async def limited(request: Request) -> Response:
+        request.state._rate_limit_data = {"limit": 10, "remaining": 7}
+        return Response(b"ok")
+
+    async def stream(request: Request) -> StreamingResponse:
+        async def rows():  # type: ignore[no-untyped-def]
+            for i in range(3):
+                yield b'{"row": %d}\n' % i
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    async def boom(request: Request) -> Response:
+        raise RuntimeError("kaboom")
+
+    app = Starlette(routes=[
+        Route("/echo", echo_id), Route("/limited", limited), Route("/stream", stream), Route("/boom", boom),
+    ])
+    app.add_middleware(RequestContextMiddleware, rate_limit_headers=rate_limit_headers)
+    return app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(_app(), raise_server_exceptions=False)
+
+
+def _log_lines(caplog: Any) -> List[dict]:
+    return [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.middleware.logging"]
+
+
+def test_generates_one_request_id_for_state_header_and_log(client: TestClient, caplog: Any) -> None:
+    with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+        response = client.get("/echo")
+
+    request_id = response.headers["X-Request-ID"]
+    assert response.json() == {"request_id": request_id}
+    [line] = _log_lines(caplog)
+    assert line["request_id"] == request_id
+    assert line["method"] == "GET" and line["path"] == "/echo" and line["status_code"] == 200
+    assert line["processing_method"] == "hybrid" and line["quality_score"] == 0.82
+    assert line["user_ip"] == "testclient" and "processing_time_ms" in line
+
+
+def test_client_request_id_is_kept(client: TestClient) -> None:
+    response = client.get("/echo", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["X-Request-ID"] == "abc-123"
+    assert response.json() == {"request_id": "abc-123"}
+
+
+def test_rate_limit_remaining_header(client: TestClient) -> None:
+    response = client.get("/limited")
+    assert response.headers["X-RateLimit-Remaining"] == "7" and response.headers["X-RateLimit-Limit"] == "10"
+    assert "X-RateLimit-Remaining" not in client.get("/echo").headers
+
+
+def test_streamed_response_is_logged_once_after_last_chunk(client: TestClient, caplog: Any) -> None:
+    with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+        response = client.get("/stream")
+
+    assert response.text == '{"row": 0}\n{"row": 1}\n{"row": 2}\n'
+    assert "X-Request-ID" in response.headers
+    assert [line["status_code"] for line in _log_lines(caplog)] == [200]
+
+
+def test_unhandled_error_is_logged_and_reraised(client: TestClient, caplog: Any) -> None:
+    with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+        response = client.get("/boom")
+
+    assert response.status_code == 500
+    [line] = _log_lines(caplog)
+    assert line["status_code"] == 500
+    assert line["error"] == "kaboom" and line["error_type"] == "RuntimeError"
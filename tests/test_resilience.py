@@ -0,0 +1,169 @@
+"""Tests for the retry budget and circuit breakers (app/utils/resilience.py)."""
+
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from app.services.gemini_client import generate_content
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, get_retry_budget
+from app.utils.retry import _should_retry_exception, is_dependency_failure, retry_with_backoff
+from tests.conftest import FakeClock
+
+
+class ServerError(Exception):
+    def __init__(self, code: int) -> None:
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture(autouse=True)
+def reset_retry_budget() -> Any:
+    get_retry_budget().reset()
+    yield
+    get_retry_budget().reset()
+
+
+def test_retry_budget_is_a_ratio_of_successes(clock: FakeClock) -> None:
+    budget = RetryBudget(ratio=0.5, min_retries=1, window_seconds=10, clock=clock)
+
+    assert budget.try_spend()  # The floor
+    assert not budget.try_spend()
+    for _ in range(4):
+        budget.record_success()
+    assert budget.try_spend() and budget.try_spend()  # 1 + 0.5 * 4 = 3 retries
+    assert not budget.try_spend()
+    assert budget.snapshot()["rejected"] == 2
+
+    clock.now += 11  # Window has passed
+    assert budget.snapshot()["retries"] == 0 and budget.try_spend()
+
+
+def test_breaker_opens_fails_fast_and_probes(clock: FakeClock) -> None:
+    breaker = CircuitBreaker("gemini", failure_threshold=3, reset_seconds=30, clock=clock)
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == 30
+
+    clock.now += 30
+    breaker.before_call()  # The probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"  # Failed probe reopens
+
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["times_opened"] == 2 and breaker.snapshot()["rejected"] == 2
+
+
+def test_success_resets_consecutive_failures() -> None:
+    breaker = CircuitBreaker("supabase", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_validation_and_json_errors_are_not_retried() -> None:
+    class Model(BaseModel):
+        x: int
+
+    with pytest.raises(Exception) as validation:
+        Model.model_validate({"x": "nope"})
+    try:
+        json.loads("{")
+    except json.JSONDecodeError as e:
+        try:
+            raise ValueError("Invalid JSON in Gemini response") from e
+        except ValueError as wrapped:
+            decode_error = wrapped
+
+    assert _should_retry_exception(validation.value, (Exception,)) is False
+    assert _should_retry_exception(decode_error, (Exception,)) is False
+    assert _should_retry_exception(CircuitOpenError("gemini", 5), (Exception,)) is False
+    assert _should_retry_exception(ServerError(503), (Exception,)) is True
+
+    partial = Exception("Gemini extraction failed")
+    partial.original_exception = decode_error  # type: ignore[attr-defined]
+    assert _should_retry_exception(partial, (Exception,)) is False
+
+    assert is_dependency_failure(ServerError(503)) is True
+    assert is_dependency_failure(Exception("quota exceeded for project")) is True
+    assert is_dependency_failure(ServerError(400)) is False
+    assert is_dependency_failure(validation.value) is False
+    assert is_dependency_failure(httpx.ConnectTimeout("slow")) is True
+    assert is_dependency_failure(ServerError(502)) is True
+    for local_error in (TypeError("bad argument"), KeyError("model"), ValueError("file too large")):
+        assert is_dependency_failure(local_error) is False
+
+
+def test_retries_stop_when_budget_is_spent() -> None:
+    get_retry_budget().min_retries = 2
+    calls = 0
+
+    @retry_with_backoff(max_retries=5, base_delay=0, max_jitter=0)
+    def always_fails() -> None:
+        nonlocal calls
+        calls += 1
+        raise ServerError(503)
+
+    try:
+        with pytest.raises(ServerError):
+            always_fails()
+        assert calls == 3  # First attempt + the 2 retries in the budget
+
+        calls = 0
+        with pytest.raises(ServerError):
+            always_fails()
+        assert calls == 1  # Budget spent: no retries
+    finally:
+        get_retry_budget().min_retries = 10
+
+
+@pytest.mark.asyncio
+async def test_gemini_breaker_counts_dependency_failures_only() -> None:
+    breaker = CircuitBreaker("gemini", failure_threshold=2)
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock()
+
+    with patch("app.services.gemini_client.get_breaker", return_value=breaker):
+        client.aio.models.generate_content.side_effect = ServerError(400)
+        for _ in range(3):
+            with pytest.raises(ServerError):
+                await generate_content(client, model="m", contents="hi")
+        assert breaker.state == "closed"  # Client errors do not open the breaker
+
+        client.aio.models.generate_content.side_effect = ServerError(503)
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                await generate_content(client, model="m", contents="hi")
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            await generate_content(client, model="m", contents="hi")
+    assert client.aio.models.generate_content.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_local_errors_do_not_trip_the_gemini_breaker() -> None:
+    breaker = CircuitBreaker("gemini", failure_threshold=2)
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(side_effect=TypeError("unexpected keyword argument 'configg'"))
+
+    with patch("app.services.gemini_client.get_breaker", return_value=breaker):
+        for _ in range(5):
+            with pytest.raises(TypeError):
+                await generate_content(client, model="m", contents="hi")
+    assert breaker.state == "closed" and breaker.snapshot()["consecutive_failures"] == 0
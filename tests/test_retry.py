@@ -15,6 +15,14 @@ from app.utils.retry import (
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_retry_budget():
+    """Start each test with a full process-wide retry budget."""
+    from app.utils.resilience import get_retry_budget
+
+    get_retry_budget().reset()
+
+
 class MockHTTPException(Exception):
     """Mock HTTP exception with status code."""
 
@@ -331,3 +339,50 @@ async def test_retry_async_exponential_backoff():
     assert delays[0] == 1.0  # 2^0 * 1.0 + 0
     assert delays[1] == 2.0  # 2^1 * 1.0 + 0
     assert delays[2] == 4.0  # 2^2 * 1.0 + 0
+
+
+# Tests for request deadlines
+
+
+@pytest.mark.asyncio
+async def test_retry_async_stops_at_request_deadline():
+    """Test that a retry whose backoff would end past the deadline is not attempted."""
+    from app.utils.deadline import Deadline, DeadlineExceeded, deadline_scope
+
+    call_count = 0
+
+    @retry_with_backoff(max_retries=5, base_delay=1.0, max_jitter=0.0)
+    async def async_always_fails():
+        nonlocal call_count
+        call_count += 1
+        raise MockHTTPException("Server error", 503)
+
+    with deadline_scope(Deadline(0.5)):
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded) as exc_info:
+            await async_always_fails()
+
+    assert call_count == 1
+    assert time.monotonic() - started < 0.5  # Did not sleep the 1s backoff
+    assert exc_info.value.stage == "async_always_fails"
+    assert isinstance(exc_info.value.__cause__, MockHTTPException)
+
+
+def test_retry_not_attempted_after_deadline():
+    """Test that an expired deadline stops the call before its first attempt."""
+    from app.utils.deadline import Deadline, DeadlineExceeded, deadline_scope
+
+    call_count = 0
+
+    @retry_with_backoff()
+    def succeeds():
+        nonlocal call_count
+        call_count += 1
+        return "success"
+
+    with deadline_scope(Deadline(0)):
+        with pytest.raises(DeadlineExceeded):
+            succeeds()
+
+    assert call_count == 0
+    assert _should_retry_exception(DeadlineExceeded(1, "x"), (Exception,)) is False
@@ -0,0 +1,140 @@
+"""Tests for priority lanes of the parse and LLM stages (app/services/scheduler.py)."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from app.services import scheduler as scheduler_module
+from app.services.admission import AdmissionController
+from app.services.scheduler import LaneScheduler, current_lane, lane, run_stage
+from tests.conftest import FakeClock
+
+
+async def _queue(sched: LaneScheduler, lanes: List[str], order: List[str]) -> List["asyncio.Task[None]"]:
+    """Queue one waiter per entry of lanes; each records its lane when granted and releases at once."""
+    async def waiter(name: str) -> None:
+        async with sched.slot(name):
+            order.append(name)
+
+    tasks = []
+    for name in lanes:
+        tasks.append(asyncio.create_task(waiter(name)))
+        await asyncio.sleep(0)  # Enqueue in this order
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_interactive_preempts_queued_batch() -> None:
+    sched = LaneScheduler("parse", slots=1)
+    order: List[str] = []
+
+    await sched.acquire("batch")  # Slot busy
+    tasks = await _queue(sched, ["batch", "batch", "batch", "interactive"], order)
+    sched.release("batch")
+    await asyncio.gather(*tasks)
+
+    assert order[0] == "interactive"
+    lanes = sched.snapshot()["lanes"]
+    assert lanes["interactive"]["preempted"] == 1
+    assert lanes["batch"]["granted"] == 4 and lanes["batch"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slots_are_shared_by_weight() -> None:
+    sched = LaneScheduler("llm", slots=1, weights={"interactive": 4, "batch": 1, "background": 1})
+    order: List[str] = []
+
+    await sched.acquire("interactive")
+    tasks = await _queue(sched, ["interactive"] * 12 + ["batch"] * 4, order)
+    sched.release("interactive")
+    await asyncio.gather(*tasks)
+
+    # Batch gets one slot in five while both lanes are backlogged, not only after interactive drains
+    first_ten = order[:10]
+    assert first_ten.count("batch") == 2
+    assert sched.snapshot()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_lane_does_not_bank_credit() -> None:
+    sched = LaneScheduler("parse", slots=1, weights={"interactive": 1, "batch": 1, "background": 1})
+    order: List[str] = []
+
+    # Batch alone runs a long time while interactive is idle
+    for _ in range(20):
+        await sched.acquire("batch")
+        sched.release("batch")
+
+    await sched.acquire("batch")
+    tasks = await _queue(sched, ["batch", "batch", "interactive", "interactive"], order)
+    sched.release("batch")
+    await asyncio.gather(*tasks)
+
+    # Interactive alternates with batch instead of running its 20 "missed" turns first
+    assert order in (["batch", "interactive", "batch", "interactive"], ["interactive", "batch", "interactive", "batch"])
+
+
+@pytest.mark.asyncio
+async def test_long_waiter_is_not_starved(clock: FakeClock) -> None:
+    sched = LaneScheduler(
+        "parse", slots=1, weights={"interactive": 1000, "batch": 1, "background": 1},
+        max_wait_seconds=10, clock=clock,
+    )
+    order: List[str] = []
+
+    await sched.acquire("interactive")
+    tasks = await _queue(sched, ["background"], order)
+    clock.now += 11
+    tasks += await _queue(sched, ["interactive"] * 3, order)
+    sched.release("interactive")
+    await asyncio.gather(*tasks)
+
+    assert order[0] == "background"
+    assert sched.snapshot()["lanes"]["background"]["max_wait_ms"] == 11000.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue() -> None:
+    sched = LaneScheduler("parse", slots=1)
+    await sched.acquire("interactive")
+    task = asyncio.create_task(sched.acquire("batch"))
+    await asyncio.sleep(0)
+    assert sched.snapshot()["lanes"]["batch"]["queued"] == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    sched.release("interactive")
+
+    snapshot = sched.snapshot()
+    assert snapshot["running"] == 0 and snapshot["lanes"]["batch"]["queued"] == 0
+    await sched.acquire("batch")  # Slot is free again
+    assert sched.snapshot()["running"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_stage_uses_context_lane_and_admission(monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = AdmissionController(max_parses=1)
+    sched = LaneScheduler("parse", slots=1)
+    monkeypatch.setattr(scheduler_module, "get_admission_controller", lambda: controller)
+    monkeypatch.setitem(scheduler_module._schedulers, "parse", sched)
+    seen = []
+
+    def parse(path: str) -> str:
+        seen.append((controller.check(), sched.snapshot()["lanes"]["batch"]["running"]))
+        return path.upper()
+
+    assert current_lane() == "interactive"
+    with lane("batch"):
+        assert await run_stage("parse", parse, "a.pdf") == "A.PDF"
+    assert current_lane() == "interactive"
+
+    assert seen == [("parse: 1 in flight", 1)]
+    assert controller.snapshot()["in_flight"]["parse"] == 0
+
+
+def test_unknown_lane_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        with lane("urgent"):
+            pass
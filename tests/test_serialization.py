@@ -0,0 +1,60 @@
+"""Tests for the orjson-based serialization helpers."""
+
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.memo_extraction import MarkingGuideline
+from app.utils.serialization import JSONDecodeError, dumps, dumps_str, loads, model_dumps, parse_model
+
+MEMO_JSON = '{"meta": {"subject": "Accounting", "year": 2025}, "sections": []}'
+
+
+def test_dumps_matches_stdlib_semantics() -> None:
+    """Output parses back to what json.dumps(default=str) would have produced."""
+    record = {
+        "id": UUID("12345678-1234-5678-1234-567812345678"),
+        "created_at": datetime(2026, 10, 19, 8, 0, tzinfo=timezone.utc),
+        "subject": "IsiZulu Ulimi Lwasekhaya",
+        1: "non-str key",
+    }
+
+    encoded = dumps(record)
+
+    assert isinstance(encoded, bytes)
+    assert loads(encoded) == {
+        "id": "12345678-1234-5678-1234-567812345678",
+        "created_at": "2026-10-19T08:00:00+00:00",
+        "subject": "IsiZulu Ulimi Lwasekhaya",
+        "1": "non-str key",
+    }
+
+
+def test_indent_and_str_output() -> None:
+    assert dumps_str({"a": [1]}, indent=True) == '{\n  "a": [\n    1\n  ]\n}'
+    assert dumps_str({"a": 1}) == '{"a":1}'
+
+
+def test_loads_error_is_json_decode_error() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        loads("{not json")
+    assert issubclass(JSONDecodeError, ValueError)
+
+
+def test_parse_model_round_trip() -> None:
+    memo = parse_model(MarkingGuideline, MEMO_JSON)
+
+    assert memo.meta["subject"] == "Accounting"
+    assert loads(model_dumps(memo)) == loads(model_dumps(memo, indent=True))
+
+
+def test_parse_model_distinguishes_bad_json_from_bad_schema() -> None:
+    with pytest.raises(ValueError) as bad_json:
+        parse_model(MarkingGuideline, '{"meta": ')
+    assert not isinstance(bad_json.value, ValidationError)
+
+    with pytest.raises(ValidationError):
+        parse_model(MarkingGuideline, '{"sections": "not a list"}')
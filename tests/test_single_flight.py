@@ -0,0 +1,103 @@
+"""Tests for single-flight coalescing and Idempotency-Key bookkeeping."""
+
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import IdempotencyKeyMismatch, IdempotencyKeys, SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(flights.do("hash", work))
+    second = asyncio.create_task(flights.do("hash", work))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == ("result", False)
+    assert await second == ("result", True)
+    assert calls == 1
+    assert flights.in_flight() == 0
+    assert (flights.started, flights.coalesced) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_and_key_is_released() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+
+    async def fail() -> str:
+        await asyncio.sleep(0)
+        raise RuntimeError("gemini down")
+
+    results = await asyncio.gather(flights.do("hash", fail), flights.do("hash", fail), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def succeed() -> str:
+        return "ok"
+
+    assert await flights.do("hash", succeed) == ("ok", False)
+
+
+@pytest.mark.asyncio
+async def test_run_survives_until_last_caller_is_cancelled() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def work() -> str:
+        started.set()
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flights.do("hash", work))
+    follower = asyncio.create_task(flights.do("hash", work))
+    await started.wait()
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await follower == ("done", True)
+
+    release.clear()
+    only = asyncio.create_task(flights.do("other", work))
+    await asyncio.sleep(0.01)
+    only.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    await asyncio.sleep(0)
+    assert flights.in_flight() == 0
+
+
+def test_idempotency_keys_replay_and_mismatch() -> None:
+    keys: IdempotencyKeys[str] = IdempotencyKeys(max_keys=2)
+
+    assert keys.claim("k1", "hash-a") is None
+    assert keys.claim("k1", "hash-a") is None  # still in flight
+    keys.store("k1", "hash-a", "response")
+    assert keys.claim("k1", "hash-a") == "response"
+
+    with pytest.raises(IdempotencyKeyMismatch):
+        keys.claim("k1", "hash-b")
+
+
+def test_idempotency_keys_expire_and_evict() -> None:
+    now = [0.0]
+    keys: IdempotencyKeys[str] = IdempotencyKeys(max_keys=2, ttl_seconds=10, clock=lambda: now[0])
+    keys.store("k1", "hash-a", "r1")
+
+    now[0] = 11.0
+    assert keys.claim("k1", "hash-b") is None  # expired, free to reuse
+
+    keys.claim("k2", "hash-c")
+    keys.claim("k3", "hash-d")
+    assert keys.claim("k1", "hash-a") is None  # k1 evicted as least recently used
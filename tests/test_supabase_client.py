@@ -2,9 +2,12 @@
 
 import os
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
+
+import httpx
 from pydantic import ValidationError
 
+from app.db import supabase_client
 from app.db.supabase_client import get_supabase_client
 from app.config import get_settings
 
@@ -12,8 +15,10 @@ from app.config import get_settings
 @pytest.fixture(autouse=True)
 def setup_env():
     """Set up test environment variables."""
-    # Clear settings cache before each test
+    # Clear settings cache and the client singleton (the app lifespan may
+    # have created it in an earlier test) before each test
     get_settings.cache_clear()
+    supabase_client._client = None
 
     # Set required environment variables
     os.environ["GEMINI_API_KEY"] = "test-gemini-key"
@@ -24,6 +29,7 @@ def setup_env():
 
     # Clean up after test
     get_settings.cache_clear()
+    supabase_client._client = None
 
 
 class TestGetSupabaseClient:
@@ -43,7 +49,8 @@ class TestGetSupabaseClient:
         assert client is mock_client
         mock_create_client.assert_called_once_with(
             "https://test-project.supabase.co",
-            "test-supabase-key"
+            "test-supabase-key",
+            options=ANY,
         )
 
     @patch("app.db.supabase_client.create_client")
@@ -62,7 +69,8 @@ class TestGetSupabaseClient:
         assert client is mock_client
         mock_create_client.assert_called_once_with(
             "https://custom-project.supabase.co",
-            "test-supabase-key"
+            "test-supabase-key",
+            options=ANY,
         )
 
     def test_missing_supabase_url(self):
@@ -180,3 +188,28 @@ class TestGetSupabaseClient:
         # Assert
         assert hasattr(client, "table")
         assert callable(client.table)
+
+    def test_requests_pass_through_supabase_circuit_breaker(self):
+        """Test that failing Supabase requests open the breaker and then fail fast."""
+        from app.utils.resilience import CircuitBreaker, CircuitOpenError
+
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            return httpx.Response(503, json={"message": "unavailable"})
+
+        breaker = CircuitBreaker("supabase", failure_threshold=2, reset_seconds=60)
+        with patch("app.db.supabase_client.get_breaker", return_value=breaker), \
+                patch("app.db.supabase_client.httpx.HTTPTransport", return_value=httpx.MockTransport(handler)):
+            client = get_supabase_client()
+
+        query = client.table("extractions").select("id").limit(1)
+        for _ in range(2):
+            with pytest.raises(Exception):
+                query.execute()
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            query.execute()
+        assert calls == ["/rest/v1/extractions"] * 2  # The third request never left the process
@@ -0,0 +1,166 @@
+"""Tests for the durable webhook outbox (app/services/webhook_outbox.py)."""
+
+import asyncio
+from datetime import datetime, UTC
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import webhook_outbox
+from app.services.webhook_outbox import WebhookDispatcher, enqueue_webhook, get_webhook_stats, retry_delay
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics() -> None:
+    """Reset process-wide delivery counters before each test."""
+    webhook_outbox._metrics.reset()
+
+
+@pytest.fixture
+def db() -> Dict[str, AsyncMock]:
+    """Patch the outbox DAO functions used by the dispatcher."""
+    names = ['claim_webhook_deliveries', 'mark_webhook_delivered', 'reschedule_webhook_delivery', 'mark_webhook_dead']
+    patches = {name: patch(f"app.services.webhook_outbox.{name}", new_callable=AsyncMock) for name in names}
+    mocks = {name: p.start() for name, p in patches.items()}
+    with patch("app.services.webhook_outbox.validate_webhook_url"):
+        yield mocks
+    for p in patches.values():
+        p.stop()
+
+
+def _row(attempts: int = 1, max_attempts: int = 3, url: str = "https://hooks.example.com/a") -> Dict[str, Any]:
+    return {
+        'id': 'evt-1', 'event': 'extraction.completed', 'webhook_url': url,
+        'payload': {'event': 'extraction.completed', 'extraction_id': 'x'},
+        'attempts': attempts, 'max_attempts': max_attempts,
+        'created_at': datetime.now(UTC).isoformat(),
+    }
+
+
+def _response(status_code: int) -> MagicMock:
+    response = MagicMock(status_code=status_code, text="body")
+    return response
+
+
+def test_retry_delay_is_capped_full_jitter() -> None:
+    assert retry_delay(1, 2.0, 900.0, rand=lambda: 1.0) == 2.0
+    assert retry_delay(4, 2.0, 900.0, rand=lambda: 1.0) == 16.0
+    assert retry_delay(20, 2.0, 900.0, rand=lambda: 1.0) == 900.0
+    assert retry_delay(4, 2.0, 900.0, rand=lambda: 0.5) == 8.0
+
+
+@pytest.mark.asyncio
+async def test_delivery_success_is_recorded(db: Dict[str, AsyncMock]) -> None:
+    dispatcher = WebhookDispatcher(MagicMock())
+    dispatcher._http = MagicMock(post=AsyncMock(return_value=_response(204)))
+
+    await dispatcher.deliver(_row())
+
+    db['mark_webhook_delivered'].assert_awaited_once()
+    assert db['mark_webhook_delivered'].call_args[0][1:] == ('evt-1', 204)
+    headers = dispatcher._http.post.call_args.kwargs['headers']
+    assert len(headers['X-Webhook-Signature']) == 64
+    assert get_webhook_stats()['delivered'] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_is_rescheduled(db: Dict[str, AsyncMock]) -> None:
+    dispatcher = WebhookDispatcher(MagicMock(), retry_base_seconds=10, retry_max_seconds=10)
+    dispatcher._http = MagicMock(post=AsyncMock(return_value=_response(503)))
+
+    before = datetime.now(UTC)
+    await dispatcher.deliver(_row(attempts=1, max_attempts=3))
+
+    _, delivery_id, next_attempt_at, error, status_code = db['reschedule_webhook_delivery'].call_args[0]
+    assert delivery_id == 'evt-1' and status_code == 503 and error.startswith("HTTP 503")
+    assert 0 <= (next_attempt_at - before).total_seconds() <= 11
+    db['mark_webhook_dead'].assert_not_awaited()
+    assert get_webhook_stats()['failed_attempts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_last_attempt_is_dead_lettered(db: Dict[str, AsyncMock]) -> None:
+    import httpx
+
+    dispatcher = WebhookDispatcher(MagicMock())
+    dispatcher._http = MagicMock(post=AsyncMock(side_effect=httpx.ConnectTimeout("slow")))
+
+    await dispatcher.deliver(_row(attempts=3, max_attempts=3))
+
+    db['mark_webhook_dead'].assert_awaited_once()
+    assert db['mark_webhook_dead'].call_args[0][2].startswith("Timeout")
+    db['reschedule_webhook_delivery'].assert_not_awaited()
+    assert get_webhook_stats()['dead_lettered'] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_url_is_dead_lettered_without_posting(db: Dict[str, AsyncMock]) -> None:
+    dispatcher = WebhookDispatcher(MagicMock())
+    dispatcher._http = MagicMock(post=AsyncMock())
+
+    with patch("app.services.webhook_outbox.validate_webhook_url", side_effect=ValueError("blocked")):
+        await dispatcher.deliver(_row(attempts=1, max_attempts=5))
+
+    dispatcher._http.post.assert_not_awaited()
+    assert db['mark_webhook_dead'].call_args[0][2] == "blocked"
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_bounds_concurrency(db: Dict[str, AsyncMock]) -> None:
+    """Deliveries to one host never exceed per_host_limit at a time."""
+    dispatcher = WebhookDispatcher(MagicMock(), workers=4, per_host_limit=1)
+    active: List[int] = [0]
+    peak: List[int] = [0]
+
+    async def post(*args: Any, **kwargs: Any) -> MagicMock:
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return _response(200)
+
+    dispatcher._http = MagicMock(post=post)
+    await asyncio.gather(*(dispatcher.deliver(_row()) for _ in range(3)))
+
+    assert peak[0] == 1
+    assert db['mark_webhook_delivered'].await_count == 3
+    assert dispatcher._hosts == {}
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_claims_and_delivers(db: Dict[str, AsyncMock]) -> None:
+    """Started workers claim due rows, deliver them, and stop cleanly."""
+    delivered = asyncio.Event()
+    db['claim_webhook_deliveries'].side_effect = [[_row()], [], [], []]
+    db['mark_webhook_delivered'].side_effect = lambda *args: delivered.set()
+
+    dispatcher = WebhookDispatcher(MagicMock(), workers=2, poll_interval_seconds=0.01)
+    with patch("app.services.webhook_outbox.post_webhook", AsyncMock(return_value=(True, 200, None))):
+        await dispatcher.start()
+        await asyncio.wait_for(delivered.wait(), timeout=1)
+        await dispatcher.stop()
+
+    assert db['claim_webhook_deliveries'].call_args_list[0][0][1] == 2
+    assert not dispatcher.running
+
+
+@pytest.mark.asyncio
+async def test_enqueue_inserts_outbox_row() -> None:
+    with patch("app.services.webhook_outbox.enqueue_webhook_event", new_callable=AsyncMock) as mock_insert:
+        await enqueue_webhook(MagicMock(), "https://hooks.example.com/a", {'event': 'batch.completed'})
+
+    assert mock_insert.call_args[0][1:3] == ('batch.completed', "https://hooks.example.com/a")
+    assert get_webhook_stats()['enqueued'] == 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_failure_falls_back_to_in_process_delivery() -> None:
+    with patch("app.services.webhook_outbox.enqueue_webhook_event",
+               AsyncMock(side_effect=RuntimeError("Failed to enqueue webhook event: down"))), \
+            patch("app.services.webhook_outbox.send_webhook", new_callable=AsyncMock) as mock_send:
+        await enqueue_webhook(MagicMock(), "https://hooks.example.com/a", {'event': 'batch.completed'})
+        await asyncio.gather(*webhook_outbox._fallback_tasks)
+
+    mock_send.assert_awaited_once()
+    assert get_webhook_stats()['enqueue_failures'] == 1
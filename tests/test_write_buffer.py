@@ -0,0 +1,141 @@
+"""Tests for the write-behind extraction buffer."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.db import write_buffer
+from app.db.write_buffer import ExtractionWriteBuffer, get_write_buffer_metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics() -> None:
+    """Reset process-wide buffer metrics before each test."""
+    write_buffer._metrics.reset()
+
+
+def _record(file_hash: str) -> dict:
+    return {'file_name': f'{file_hash}.pdf', 'file_size_bytes': 10, 'file_hash': file_hash, 'status': 'completed'}
+
+
+def _bulk_client() -> MagicMock:
+    """Client whose multi-row insert echoes one ID per inserted row."""
+    mock_client = MagicMock()
+
+    def insert(records):
+        query = MagicMock()
+        query.execute.return_value.data = [{'id': f"id-{r['file_hash']}"} for r in records]
+        return query
+
+    mock_client.table.return_value.insert.side_effect = insert
+    return mock_client
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_max_rows_reached():
+    """Reaching max_rows triggers a single multi-row insert."""
+    mock_client = _bulk_client()
+    buffer = ExtractionWriteBuffer(mock_client, max_rows=3, max_delay_seconds=60)
+
+    futures = [await buffer.add('extractions', _record(f'h{i}')) for i in range(3)]
+
+    assert [f.result() for f in futures] == ['id-h0', 'id-h1', 'id-h2']
+    assert mock_client.table.return_value.insert.call_count == 1
+    assert len(mock_client.table.return_value.insert.call_args[0][0]) == 3
+    assert buffer.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_max_delay():
+    """Rows below the size threshold are flushed by the timer."""
+    mock_client = _bulk_client()
+    buffer = ExtractionWriteBuffer(mock_client, max_rows=100, max_delay_seconds=0.01)
+
+    future = await buffer.add('extractions', _record('h1'))
+    assert not future.done()
+
+    assert await asyncio.wait_for(future, timeout=1) == 'id-h1'
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_each_table_separately():
+    """close() writes remaining rows with one insert per table."""
+    mock_client = _bulk_client()
+    buffer = ExtractionWriteBuffer(mock_client, max_rows=100, max_delay_seconds=60)
+
+    paper = await buffer.add('extractions', _record('qp'))
+    memo = await buffer.add('memo_extractions', _record('mg'))
+    await buffer.close()
+
+    assert paper.result() == 'id-qp'
+    assert memo.result() == 'id-mg'
+    tables = [c.args[0] for c in mock_client.table.call_args_list]
+    assert sorted(tables) == ['extractions', 'memo_extractions']
+
+    with pytest.raises(RuntimeError, match="closed"):
+        await buffer.add('extractions', _record('late'))
+
+
+@pytest.mark.asyncio
+async def test_unique_conflict_falls_back_to_single_row_path():
+    """A file_hash conflict resolves the conflicting row to the existing ID."""
+    mock_client = MagicMock()
+    mock_client.table.return_value.insert.return_value.execute.side_effect = Exception(
+        'duplicate key value violates unique constraint (23505)'
+    )
+    existing_id = str(uuid4())
+
+    async def insert_one(client, record):
+        return existing_id if record['file_hash'] == 'dup' else f"id-{record['file_hash']}"
+
+    buffer = ExtractionWriteBuffer(mock_client, max_rows=2, max_delay_seconds=60)
+    with patch.dict(write_buffer._SINGLE_ROW_INSERTS, {'extractions': insert_one}):
+        new = await buffer.add('extractions', _record('new'))
+        dup = await buffer.add('extractions', _record('dup'))
+
+    assert new.result() == 'id-new'
+    assert dup.result() == existing_id
+    assert get_write_buffer_metrics()['conflict_fallbacks'] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_conflict_error_fails_every_row():
+    """Other database errors are propagated to every waiting caller."""
+    mock_client = MagicMock()
+    mock_client.table.return_value.insert.return_value.execute.side_effect = Exception('connection reset')
+    buffer = ExtractionWriteBuffer(mock_client, max_rows=10, max_delay_seconds=60)
+
+    futures = [await buffer.add('extractions', _record(f'h{i}')) for i in range(2)]
+    await buffer.close()
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="Failed to insert extractions rows"):
+            await future
+    assert get_write_buffer_metrics()['failed_flushes'] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_track_batch_size_and_latency():
+    """Flush metrics report batch sizes and latencies."""
+    buffer = ExtractionWriteBuffer(_bulk_client(), max_rows=2, max_delay_seconds=60)
+    for i in range(5):
+        await buffer.add('extractions', _record(f'h{i}'))
+    await buffer.close()
+
+    metrics = get_write_buffer_metrics()
+    assert metrics['flushes'] == 3
+    assert metrics['rows_flushed'] == 5
+    assert metrics['max_batch_size'] == 2
+    assert metrics['last_batch_size'] == 1
+    assert metrics['avg_flush_latency_ms'] >= 0.0
+
+
+@pytest.mark.asyncio
+async def test_rejects_unknown_table():
+    """Only extraction tables can be buffered."""
+    buffer = ExtractionWriteBuffer(MagicMock(), max_rows=2, max_delay_seconds=60)
+    with pytest.raises(ValueError, match="Unsupported table"):
+        await buffer.add('batch_jobs', {})